@@ -32,7 +32,7 @@ import { WidgetStateManager } from "lib/WidgetStateManager"
 import { ConnectionState } from "lib/ConnectionState"
 import { ReportRunState } from "lib/ReportRunState"
 import { SessionEventDispatcher } from "lib/SessionEventDispatcher"
-import { applyDelta } from "lib/DeltaParser"
+import { applyDataFrameWindow, applyDelta } from "lib/DeltaParser"
 
 import { RERUN_PROMPT_MODAL_DIALOG } from "lib/baseconsts"
 import { SessionInfo } from "lib/SessionInfo"
@@ -183,6 +183,8 @@ class App extends PureComponent {
         sessionEvent: evtMsg => this.handleSessionEvent(evtMsg),
         newReport: newReportMsg => this.handleNewReport(newReportMsg),
         delta: deltaMsg => this.handleDeltaMsg(deltaMsg, msgProto.metadata),
+        dataFrameWindow: dataFrameMsg =>
+          this.handleDataFrameWindow(dataFrameMsg),
         reportFinished: () => this.handleReportFinished(),
         uploadReportProgress: progress =>
           this.openDialog({ progress, type: DialogType.UPLOAD_PROGRESS }),
@@ -419,6 +421,16 @@ class App extends PureComponent {
     }
   }
 
+  /**
+   * Handler for ForwardMsg.dataFrameWindow messages, which carry the rows a
+   * windowed DataFrame asked for as the user scrolled.
+   */
+  handleDataFrameWindow = dataFrameMsg => {
+    this.setState(state => ({
+      elements: applyDataFrameWindow(state.elements, dataFrameMsg),
+    }))
+  }
+
   /**
    * Used by e2e tests to test disabling widgets
    */
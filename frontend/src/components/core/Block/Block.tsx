@@ -224,6 +224,7 @@ class Block extends PureComponent<Props> {
           element={el}
           width={width}
           elementDimensionSpec={metadata.elementDimensionSpec}
+          widgetMgr={this.props.widgetMgr}
         />
       ),
       deckGlChart: (el: SimpleElement) => (
@@ -23,9 +23,11 @@ import { SortDirection } from "./SortDirection"
 import {
   dataFrameGet,
   dataFrameGetDimensions,
+  dataFrameGetWindow,
   getSortedDataRowIndices,
 } from "lib/dataFrameProto"
 import { toFormattedString } from "lib/format"
+import { WidgetStateManager } from "lib/WidgetStateManager"
 import { ElementDimensionSpec } from "autogen/proto"
 import "./DataFrame.scss"
 
@@ -49,10 +51,16 @@ const MAX_CELL_WIDTH_PX = 200
  */
 const MAX_LONELY_CELL_WIDTH_PX = 400
 
+/**
+ * Placeholder for the cells of rows a windowed DataFrame doesn't have yet.
+ */
+const MISSING_ROW_CONTENTS = "..."
+
 interface Props {
   width: number
   elementDimensionSpec: ElementDimensionSpec
   element: ImmutableMap<string, any>
+  widgetMgr?: WidgetStateManager
 }
 
 interface State {
@@ -109,12 +117,41 @@ interface CellRenderer {
   (input: CellRendererInput): React.ReactNode
 }
 
+/**
+ * The rows a windowed DataFrame holds. See DataFrameWindow in
+ * DataFrame.proto.
+ */
+interface DataFrameWindow {
+  id: string
+  start: number
+  totalRows: number
+}
+
 /**
  * Functional element representing a DataFrame.
  */
 class DataFrame extends React.PureComponent<Props, State> {
   private multiGridRef = React.createRef<MultiGrid>()
 
+  /**
+   * The data rows a windowed DataFrame was asked to render but doesn't have,
+   * since the last window request.
+   */
+  private firstMissingRow = Infinity
+
+  private lastMissingRow = -Infinity
+
+  private windowRequestTimer?: number
+
+  /**
+   * The last window requested from the server, and the DataFrame it was
+   * requested for. The server sends a new DataFrame when rows are added, so
+   * a window can be needed again even if it was requested last.
+   */
+  private requestedWindowElement?: ImmutableMap<string, any>
+
+  private requestedWindowStart?: number
+
   public constructor(props: Props) {
     super(props)
     this.state = {
@@ -137,11 +174,16 @@ class DataFrame extends React.PureComponent<Props, State> {
     this.toggleSortOrder = this.toggleSortOrder.bind(this)
   }
 
+  public componentWillUnmount(): void {
+    window.clearTimeout(this.windowRequestTimer)
+  }
+
   /**
    * Returns a function that creates a DataFrameCell component for the given cell.
    */
   private getCellRenderer(
-    cellContentsGetter: CellContentsGetter
+    cellContentsGetter: CellContentsGetter,
+    sortable: boolean
   ): CellRenderer {
     return ({
       columnIndex,
@@ -155,7 +197,7 @@ class DataFrame extends React.PureComponent<Props, State> {
         contents,
       } = cellContentsGetter(columnIndex, rowIndex)
       const headerClickedCallback =
-        rowIndex === 0 ? this.toggleSortOrder : undefined
+        sortable && rowIndex === 0 ? this.toggleSortOrder : undefined
       const sortDirection =
         columnIndex === this.state.sortColumn
           ? this.state.sortDirection
@@ -231,6 +273,87 @@ class DataFrame extends React.PureComponent<Props, State> {
     )
   }
 
+  /**
+   * Returns a cellContentsGetter for a windowed DataFrame, which takes row
+   * indices in the whole DataFrame rather than in its window.
+   *
+   * Rows outside the window are shown as placeholders, and the window around
+   * them is requested from the server.
+   */
+  private getWindowedCellContentsGetter(
+    cellContentsGetter: CellContentsGetter,
+    dfWindow: DataFrameWindow,
+    headerRows: number,
+    windowRows: number
+  ): CellContentsGetter {
+    return (columnIndex: number, rowIndex: number): CellContents => {
+      if (rowIndex < headerRows) {
+        return cellContentsGetter(columnIndex, rowIndex)
+      }
+
+      const dataRow = rowIndex - headerRows
+      const windowRow = dataRow - dfWindow.start
+      if (windowRow >= 0 && windowRow < windowRows) {
+        return cellContentsGetter(columnIndex, headerRows + windowRow)
+      }
+
+      this.requestRow(dfWindow, dataRow, windowRows)
+      return { classes: "dataframe", styles: {}, contents: MISSING_ROW_CONTENTS }
+    }
+  }
+
+  /**
+   * Notes that a data row is missing, and schedules a request for the
+   * window around the missing rows once the grid is done rendering.
+   */
+  private requestRow(
+    dfWindow: DataFrameWindow,
+    dataRow: number,
+    windowRows: number
+  ): void {
+    this.firstMissingRow = Math.min(this.firstMissingRow, dataRow)
+    this.lastMissingRow = Math.max(this.lastMissingRow, dataRow)
+
+    if (this.windowRequestTimer != null) {
+      return
+    }
+
+    this.windowRequestTimer = window.setTimeout(() => {
+      const middle = Math.floor(
+        (this.firstMissingRow + this.lastMissingRow) / 2
+      )
+      const start = Math.max(
+        0,
+        Math.min(
+          middle - Math.floor(windowRows / 2),
+          dfWindow.totalRows - windowRows
+        )
+      )
+
+      this.firstMissingRow = Infinity
+      this.lastMissingRow = -Infinity
+      this.windowRequestTimer = undefined
+
+      // Don't ask again for a window that's on its way, or that the server
+      // couldn't send.
+      if (
+        (this.props.element === this.requestedWindowElement &&
+          start === this.requestedWindowStart) ||
+        !this.props.widgetMgr
+      ) {
+        return
+      }
+
+      this.requestedWindowElement = this.props.element
+      this.requestedWindowStart = start
+      this.props.widgetMgr.requestDataFrameWindow(
+        dfWindow.id,
+        start,
+        windowRows
+      )
+    }, 0)
+  }
+
   /**
    * Returns rendering dimensions for this DataFrame
    */
@@ -245,6 +368,11 @@ class DataFrame extends React.PureComponent<Props, State> {
       rows,
     } = dataFrameGetDimensions(element)
 
+    // Windowed DataFrames are as tall as all their rows, though column
+    // widths only come from the rows in the window.
+    const dfWindow = dataFrameGetWindow(element)
+    const totalRows = dfWindow ? headerRows + dfWindow.totalRows : rows
+
     // Rendering constants.
     const rowHeight = 25
     const headerHeight = rowHeight * headerRows
@@ -252,7 +380,7 @@ class DataFrame extends React.PureComponent<Props, State> {
     const height =
       border +
       Math.min(
-        rows * rowHeight,
+        totalRows * rowHeight,
         elementDimensionSpec && elementDimensionSpec.height > 0
           ? elementDimensionSpec.height
           : 300
@@ -314,10 +442,15 @@ class DataFrame extends React.PureComponent<Props, State> {
       headerCols,
       dataRows,
       cols,
-      rows,
     } = dataFrameGetDimensions(element)
 
-    const sortedDataRowIndices = this.getDataRowIndices()
+    // Windowed DataFrames only have some of their rows, so they can't be
+    // sorted here.
+    const dfWindow: DataFrameWindow | null = dataFrameGetWindow(element)
+    const sortedDataRowIndices = dfWindow
+      ? undefined
+      : this.getDataRowIndices()
+    const totalDataRows = dfWindow ? dfWindow.totalRows : dataRows
 
     // Get the cell renderer.
     const cellContentsGetter = getCellContentsGetter(
@@ -326,7 +459,17 @@ class DataFrame extends React.PureComponent<Props, State> {
       headerCols,
       sortedDataRowIndices
     )
-    const cellRenderer = this.getCellRenderer(cellContentsGetter)
+    const cellRenderer = this.getCellRenderer(
+      dfWindow
+        ? this.getWindowedCellContentsGetter(
+            cellContentsGetter,
+            dfWindow,
+            headerRows,
+            dataRows
+          )
+        : cellContentsGetter,
+      dfWindow == null
+    )
 
     // Determine our rendering dimensions
     const {
@@ -361,7 +504,7 @@ class DataFrame extends React.PureComponent<Props, State> {
           enableFixedRowScroll
           height={height - border}
           rowHeight={rowHeight}
-          rowCount={rows}
+          rowCount={headerRows + totalDataRows}
           width={elementWidth}
           classNameBottomLeftGrid="table-bottom-left"
           classNameTopRightGrid="table-top-right"
@@ -381,7 +524,9 @@ class DataFrame extends React.PureComponent<Props, State> {
             height: border,
           }}
         />
-        {dataRows === 0 ? <div className="empty-dataframe">empty</div> : null}
+        {totalDataRows === 0 ? (
+          <div className="empty-dataframe">empty</div>
+        ) : null}
       </div>
     )
   }
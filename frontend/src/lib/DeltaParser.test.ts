@@ -0,0 +1,168 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import {
+  BackMsg,
+  BlockPath,
+  DataFrame,
+  Delta,
+  ForwardMsg,
+  ForwardMsgMetadata,
+  IForwardMsg,
+} from "autogen/proto"
+import { List } from "immutable"
+import { dataFrameGetWindow } from "lib/dataFrameProto"
+import { applyDataFrameWindow, applyDelta } from "lib/DeltaParser"
+import { requireNonNull } from "lib/utils"
+import { WidgetStateManager } from "lib/WidgetStateManager"
+
+const REPORT_ID = "reportId"
+
+/**
+ * Encodes a ForwardMsg like the server does, and decodes it like the browser.
+ */
+function decodeForwardMsg(obj: IForwardMsg): ForwardMsg {
+  const bytes = ForwardMsg.encode(ForwardMsg.fromObject(obj)).finish()
+  return ForwardMsg.decode(bytes)
+}
+
+/**
+ * A window of a 100-row DataFrame, holding the given values from start on.
+ */
+function createWindow(id: string, start: number, values: number[]): any {
+  return {
+    data: { cols: [{ doubles: { data: values } }] },
+    index: { plainIndex: { data: { strings: { data: values.map(String) } } } },
+    columns: { plainIndex: { data: { strings: { data: ["col"] } } } },
+    window: { id, start, totalRows: 100 },
+  }
+}
+
+function createDelta(path: number[], deltaId: number, delta: any): ForwardMsg {
+  return decodeForwardMsg({
+    delta,
+    metadata: {
+      deltaId,
+      parentBlock: { container: BlockPath.Container.MAIN, path },
+    },
+  })
+}
+
+/**
+ * Main-container elements with a window of DataFrame "top" at [0], and one
+ * of DataFrame "nested" at [1, 0], in a block.
+ */
+function createElements(): any {
+  const msgs = [
+    createDelta([], 0, {
+      newElement: { dataFrame: createWindow("top", 0, [0]) },
+    }),
+    createDelta([], 1, { newBlock: true }),
+    createDelta([1], 0, {
+      newElement: { dataFrame: createWindow("nested", 0, [0, 1]) },
+    }),
+  ]
+
+  return msgs.reduce(
+    (elements, msg) =>
+      applyDelta(
+        elements,
+        REPORT_ID,
+        requireNonNull(msg.delta) as Delta,
+        requireNonNull(msg.metadata) as ForwardMsgMetadata
+      ),
+    { main: List(), sidebar: List() }
+  )
+}
+
+function getValues(element: any): number[] {
+  const path = ["dataFrame", "data", "cols", 0, "doubles", "data"]
+  return element.getIn(path).toJS()
+}
+
+test("splices windows into the DataFrame they belong to", () => {
+  const elements = createElements()
+  const msg = decodeForwardMsg({
+    dataFrameWindow: createWindow("nested", 50, [50, 51]),
+  })
+  const newElements = applyDataFrameWindow(
+    elements,
+    requireNonNull(msg.dataFrameWindow) as DataFrame
+  )
+
+  const nested = newElements.main.getIn([1, 0])
+  expect(getValues(nested)).toEqual([50, 51])
+  expect(dataFrameGetWindow(nested.get("dataFrame"))).toEqual({
+    id: "nested",
+    start: 50,
+    totalRows: 100,
+  })
+
+  // The element keeps what applyDelta set on it.
+  expect(nested.get("reportId")).toBe(REPORT_ID)
+  expect(nested.get("metadata")).toBe(elements.main.getIn([1, 0, "metadata"]))
+
+  // Other DataFrames are left alone.
+  expect(newElements.main.get(0)).toBe(elements.main.get(0))
+  expect(newElements.sidebar).toBe(elements.sidebar)
+})
+
+test("ignores windows of DataFrames that are gone", () => {
+  const elements = createElements()
+  const msg = decodeForwardMsg({
+    dataFrameWindow: createWindow("gone", 50, [50]),
+  })
+  const newElements = applyDataFrameWindow(
+    elements,
+    requireNonNull(msg.dataFrameWindow) as DataFrame
+  )
+
+  expect(newElements.main.equals(elements.main)).toBe(true)
+})
+
+test("requests windows and applies the server's reply", () => {
+  const backMsgs: BackMsg[] = []
+  const widgetMgr = new WidgetStateManager(obj => {
+    // Like WebsocketConnection.sendMessage.
+    const bytes = BackMsg.encode(BackMsg.create(obj)).finish()
+    backMsgs.push(BackMsg.decode(bytes))
+  })
+
+  widgetMgr.requestDataFrameWindow("top", 20, 3)
+
+  expect(backMsgs.length).toBe(1)
+  expect(backMsgs[0].type).toBe("dataFrameWindow")
+  const request = requireNonNull(backMsgs[0].dataFrameWindow)
+  expect(request.id).toBe("top")
+  expect(request.start).toBe(20)
+  expect(request.numRows).toBe(3)
+
+  // What ReportSession.handle_data_frame_window_request sends back.
+  const reply = decodeForwardMsg({
+    dataFrameWindow: createWindow(request.id, request.start, [20, 21, 22]),
+  })
+  const elements = applyDataFrameWindow(
+    createElements(),
+    requireNonNull(reply.dataFrameWindow) as DataFrame
+  )
+
+  const top = elements.main.get(0)
+  expect(getValues(top)).toEqual([20, 21, 22])
+  expect(dataFrameGetWindow(top.get("dataFrame"))).toMatchObject({
+    start: 20,
+  })
+})
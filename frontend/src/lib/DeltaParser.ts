@@ -17,6 +17,7 @@
 
 import {
   BlockPath,
+  DataFrame,
   Delta,
   ForwardMsgMetadata,
   NamedDataSet,
@@ -74,6 +75,38 @@ export function applyDelta(
   return elements
 }
 
+/**
+ * Puts the rows of a ForwardMsg.dataFrameWindow into the windowed DataFrame
+ * they belong to, in place of the rows it had.
+ */
+export function applyDataFrameWindow(
+  elements: Elements,
+  dataFrameMsg: DataFrame
+): Elements {
+  const dataFrame = toImmutableProto(DataFrame, dataFrameMsg)
+  const windowId = dataFrame.getIn(["window", "id"])
+
+  const updateBlock = (block: BlockElement): BlockElement =>
+    block.map((element: Element) => {
+      if (element instanceof List) {
+        return updateBlock(element as BlockElement)
+      }
+      if (
+        element instanceof ImmutableMap &&
+        element.get("type") === "dataFrame" &&
+        element.getIn(["dataFrame", "window", "id"]) === windowId
+      ) {
+        return element.set("dataFrame", dataFrame)
+      }
+      return element
+    }) as BlockElement
+
+  return {
+    main: updateBlock(elements.main),
+    sidebar: updateBlock(elements.sidebar),
+  }
+}
+
 function handleNewElementMessage(
   container: Container,
   element: SimpleElement,
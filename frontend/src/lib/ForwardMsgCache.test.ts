@@ -0,0 +1,60 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import { ForwardMsg } from "autogen/proto"
+import { ForwardMsgCache } from "lib/ForwardMsgCache"
+
+function createCacheableMsg(hash: string): ForwardMsg {
+  return ForwardMsg.create({
+    hash,
+    metadata: { cacheable: true, deltaId: 1 },
+    delta: { newElement: { text: { body: "text" } } },
+  })
+}
+
+test("Resolves references to cached messages", () => {
+  const cache = new ForwardMsgCache(10)
+  const msg = createCacheableMsg("abc")
+  expect(cache.processMessagePayload(msg)).toBe(msg)
+
+  const refMsg = ForwardMsg.create({ refHash: "abc", metadata: { deltaId: 2 } })
+  const resolved = cache.processMessagePayload(refMsg)
+  expect(resolved.type).toBe("delta")
+  expect(resolved.delta).toEqual(msg.delta)
+  expect(resolved.metadata).toEqual(refMsg.metadata)
+})
+
+test("Throws on references to unknown messages", () => {
+  const cache = new ForwardMsgCache(10)
+  const refMsg = ForwardMsg.create({ refHash: "abc" })
+  expect(() => cache.processMessagePayload(refMsg)).toThrow()
+})
+
+test("Evicts the least recently used messages", () => {
+  const cache = new ForwardMsgCache(2)
+  cache.processMessagePayload(createCacheableMsg("a"))
+  cache.processMessagePayload(createCacheableMsg("b"))
+
+  // Referencing "a" makes "b" the least recently used message.
+  cache.processMessagePayload(ForwardMsg.create({ refHash: "a" }))
+  cache.processMessagePayload(createCacheableMsg("c"))
+
+  const refA = ForwardMsg.create({ refHash: "a" })
+  const refB = ForwardMsg.create({ refHash: "b" })
+  expect(() => cache.processMessagePayload(refA)).not.toThrow()
+  expect(() => cache.processMessagePayload(refB)).toThrow()
+})
@@ -0,0 +1,96 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import { ForwardMsg } from "autogen/proto"
+
+/**
+ * Holds the ForwardMsgs that the server marked as cacheable, so that it can
+ * later send us a small reference message (with refHash set) instead of the
+ * whole payload. See ForwardMsgCache.py.
+ *
+ * This is an LRU cache. The server mirrors it, evicting the same messages in
+ * the same order, so it knows which messages we still have. For that to
+ * work, every cacheable and reference message must go through
+ * processMessagePayload, in the order they were sent.
+ */
+export class ForwardMsgCache {
+  /**
+   * Maximum number of messages to keep. The server never tracks more
+   * messages than this for us.
+   */
+  public readonly maxMessages: number
+
+  /**
+   * Map: hash -> cached message, from least to most recently used.
+   */
+  private readonly messages = new Map<string, ForwardMsg>()
+
+  public constructor(maxMessages: number) {
+    this.maxMessages = maxMessages
+  }
+
+  /**
+   * Caches the message if it's cacheable, and resolves it if it's a
+   * reference to a cached message.
+   *
+   * Returns the message that should be handled in place of the given one.
+   */
+  public processMessagePayload(msg: ForwardMsg): ForwardMsg {
+    if (msg.type === "refHash") {
+      const cached = this.messages.get(msg.refHash)
+      if (cached == null) {
+        throw new Error(`Cached ForwardMsg not found (hash=${msg.refHash})`)
+      }
+      this.touch(msg.refHash, cached)
+
+      // The same payload can be delivered to different places in the
+      // report, so we use the metadata from the reference message.
+      const resolved = ForwardMsg.create(cached)
+      resolved.metadata = msg.metadata
+      return resolved
+    }
+
+    if (msg.hash && msg.metadata != null && msg.metadata.cacheable) {
+      this.touch(msg.hash, msg)
+    }
+
+    return msg
+  }
+
+  /**
+   * Removes all messages from the cache.
+   */
+  public clear(): void {
+    this.messages.clear()
+  }
+
+  /**
+   * Makes the given message the most recently used one, evicting the least
+   * recently used messages if we're over capacity.
+   */
+  private touch(hash: string, msg: ForwardMsg): void {
+    // Maps iterate in insertion order, so re-inserting moves the entry to
+    // the end.
+    this.messages.delete(hash)
+    this.messages.set(hash, msg)
+
+    while (this.messages.size > this.maxMessages) {
+      const oldestHash = this.messages.keys().next().value
+      this.messages.delete(oldestHash)
+    }
+  }
+}
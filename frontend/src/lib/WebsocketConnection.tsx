@@ -19,6 +19,7 @@ import React, { Fragment } from "react"
 import Resolver from "lib/Resolver"
 import { SessionInfo } from "lib/SessionInfo"
 import { ConnectionState } from "lib/ConnectionState"
+import { ForwardMsgCache } from "lib/ForwardMsgCache"
 import { ForwardMsg, BackMsg, IBackMsg } from "autogen/proto"
 import { logMessage, logWarning, logError } from "lib/log"
 
@@ -43,6 +44,18 @@ const PING_RETRY_PERIOD_MS = 500
  */
 const WEBSOCKET_TIMEOUT_MS = 1000
 
+/**
+ * Optional protocol features this client supports. These are sent to the
+ * server when connecting, and the server only uses features listed here.
+ * Must match the CAPABILITY_* constants in server_util.py.
+ */
+const CLIENT_CAPABILITIES = ["batched_messages", "message_cache"]
+
+/**
+ * Number of messages our ForwardMsgCache holds.
+ */
+const MAX_CACHED_MESSAGES = 100
+
 /**
  * If the ping retrieves a 403 status code a message will be displayed.
  * This constant is the link to the documentation.
@@ -141,6 +154,12 @@ export class WebsocketConnection {
    */
   private messageQueue: MessageQueue = {}
 
+  /**
+   * Messages the server told us to cache, so it can refer to them by hash
+   * instead of sending them again.
+   */
+  private readonly messageCache = new ForwardMsgCache(MAX_CACHED_MESSAGES)
+
   /**
    * The current state of this object's state machine.
    */
@@ -177,6 +196,9 @@ export class WebsocketConnection {
         break
 
       case ConnectionState.CONNECTING:
+        // The server starts a new session for each connection, and doesn't
+        // know what we cached in previous ones.
+        this.messageCache.clear()
         this.connectToWebSocket()
         break
 
@@ -398,17 +420,36 @@ export class WebsocketConnection {
       this.messageQueue[messageIndex] = ForwardMsg.decode(resultArray)
       while (this.lastDispatchedMessageIndex + 1 in this.messageQueue) {
         const dispatchMessageIndex = this.lastDispatchedMessageIndex + 1
-        this.args.onMessage(this.messageQueue[dispatchMessageIndex])
+        this.dispatchMessage(this.messageQueue[dispatchMessageIndex])
         delete this.messageQueue[dispatchMessageIndex]
         this.lastDispatchedMessageIndex = dispatchMessageIndex
       }
     }
   }
+
+  /**
+   * Passes a received ForwardMsg on to our onMessage handler, unpacking it
+   * first if it's a batch of messages, and resolving it if it refers to a
+   * cached message.
+   */
+  private dispatchMessage(msg: ForwardMsg): void {
+    if (msg.type === "batch") {
+      const batchedMsgs = (msg.batch && msg.batch.messages) || []
+      for (const batchedMsg of batchedMsgs) {
+        this.dispatchMessage(batchedMsg as ForwardMsg)
+      }
+    } else {
+      this.args.onMessage(this.messageCache.processMessagePayload(msg))
+    }
+  }
 }
 
 function buildWsUri({ host, port }: BaseUriParts): string {
   const protocol = window.location.href.startsWith("https://") ? "wss" : "ws"
-  return `${protocol}://${host}:${port}/stream`
+  const query =
+    `capabilities=${CLIENT_CAPABILITIES.join(",")}` +
+    `&max_cached_messages=${MAX_CACHED_MESSAGES}`
+  return `${protocol}://${host}:${port}/stream?${query}`
 }
 
 function buildHttpUri({ host, port }: BaseUriParts, path: string): string {
@@ -154,6 +154,18 @@ export class WidgetStateManager {
     this.sendUpdateWidgetsMessage()
   }
 
+  /**
+   * Asks the server for rows of a DataFrame that st.dataframe sent a window
+   * at a time. The rows arrive in a ForwardMsg.dataFrameWindow.
+   */
+  public requestDataFrameWindow(
+    id: string,
+    start: number,
+    numRows: number
+  ): void {
+    this.sendBackMsg({ dataFrameWindow: { id, start, numRows } })
+  }
+
   public sendUpdateWidgetsMessage(): void {
     this.sendBackMsg({ updateWidgets: this.createWigetStatesMsg() })
   }
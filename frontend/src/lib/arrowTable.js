@@ -0,0 +1,391 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/**
+ * Reads the Arrow IPC streams that the server sends DataFrame tables as,
+ * when global.dataFrameSerialization is "arrow". See _marshall_arrow_table
+ * in data_frame_proto.py.
+ *
+ * This only understands what the server writes: flat int, floating point,
+ * bool and utf8 columns, and dictionary-encoded utf8 columns. Anything else
+ * throws an error.
+ */
+
+/**
+ * The Arrow type ids of the columns we can read. See Schema.fbs in the
+ * Arrow repo.
+ */
+export const ArrowType = {
+  Int: 2,
+  Float: 3,
+  Utf8: 5,
+  Bool: 6,
+}
+
+// MessageHeader union types.
+const SCHEMA = 1
+const DICTIONARY_BATCH = 2
+const RECORD_BATCH = 3
+
+// FloatingPoint.precision values.
+const SINGLE = 1
+const DOUBLE = 2
+
+// Streams written since Arrow 0.15 start each message with this.
+const CONTINUATION_MARKER = -1
+
+/**
+ * Reads an Arrow IPC stream.
+ *
+ * Returns an array with one object per column, with these properties:
+ * - name: the column's name.
+ * - typeId: its ArrowType. Dictionary-encoded columns have the type of their
+ *   dictionary.
+ * - metadata: a Map of the column's custom metadata.
+ * - values: an Array of its values, with null for missing values. 64-bit ints
+ *   lose precision past 2^53, same as repeated int64 proto fields.
+ */
+export function readArrowTable(bytes) {
+  const view = getDataView(bytes)
+  let fields = null
+  const dictionaries = new Map()
+  let pos = 0
+
+  while (pos + 4 <= bytes.byteLength) {
+    let metadataLength = view.getInt32(pos, true)
+    pos += 4
+    if (metadataLength === CONTINUATION_MARKER) {
+      metadataLength = view.getInt32(pos, true)
+      pos += 4
+    }
+    if (metadataLength === 0) {
+      // End of stream.
+      break
+    }
+
+    const message = readRootTable(bytes.subarray(pos, pos + metadataLength))
+    pos += metadataLength
+    const bodyLength = message.getInt64(3, 0)
+    const body = bytes.subarray(pos, pos + bodyLength)
+    pos += bodyLength
+
+    const headerType = message.getUint8(1, 0)
+    const header = message.getTable(2)
+    if (headerType === SCHEMA) {
+      fields = header.getTables(1).map(readField)
+    } else if (headerType === DICTIONARY_BATCH) {
+      readDictionaryBatch(header, body, fields, dictionaries)
+    } else if (headerType === RECORD_BATCH) {
+      const columns = readRecordBatch(header, body, fields, dictionaries)
+      fields.forEach((field, i) => {
+        field.values = field.values.concat(columns[i])
+      })
+    } else {
+      throw new Error(`Unsupported Arrow message type ${headerType}`)
+    }
+  }
+
+  if (fields === null) {
+    throw new Error("Arrow stream has no schema")
+  }
+
+  return fields.map(({ name, typeId, metadata, values }) => ({
+    name,
+    typeId,
+    metadata,
+    values,
+  }))
+}
+
+function readField(field) {
+  const metadata = new Map(
+    field
+      .getTables(6)
+      .map(keyValue => [keyValue.getString(0), keyValue.getString(1)])
+  )
+
+  const dictionary = field.getTable(4)
+  return {
+    name: field.getString(0),
+    typeId: field.getUint8(2, 0),
+    type: field.getTable(3),
+    dictionaryId: dictionary ? dictionary.getInt64(0, 0) : null,
+    // Dictionary indices are int32s unless the schema says otherwise.
+    indexType: dictionary ? dictionary.getTable(1) : null,
+    metadata,
+    values: [],
+  }
+}
+
+function readDictionaryBatch(header, body, fields, dictionaries) {
+  const id = header.getInt64(0, 0)
+  const field = fields.find(f => f.dictionaryId === id)
+  if (!field) {
+    throw new Error(`Arrow dictionary ${id} has no field`)
+  }
+
+  // A dictionary is a record batch with one column of the field's type.
+  const valueField = { ...field, dictionaryId: null }
+  const [values] = readRecordBatch(header.getTable(1), body, [valueField])
+
+  const isDelta = header.getBool(2, false)
+  dictionaries.set(id, isDelta ? dictionaries.get(id).concat(values) : values)
+}
+
+function readRecordBatch(header, body, fields, dictionaries) {
+  const nodes = header.getStructs(1, 16)
+  const buffers = header.getStructs(2, 16)
+  const bodyView = getDataView(body)
+  let nextBuffer = 0
+
+  const takeBuffer = () => {
+    const pos = buffers[nextBuffer++]
+    const offset = readInt64(buffers.view, pos)
+    const length = readInt64(buffers.view, pos + 8)
+    return { offset, length }
+  }
+
+  return fields.map((field, i) => {
+    const length = readInt64(nodes.view, nodes[i])
+    const nullCount = readInt64(nodes.view, nodes[i] + 8)
+    const validity = takeBuffer()
+    const isValid =
+      nullCount === 0 || validity.length === 0
+        ? () => true
+        : index => readBit(bodyView, validity.offset, index)
+
+    if (field.dictionaryId !== null) {
+      const dictionary = dictionaries.get(field.dictionaryId)
+      const indices = readInts(bodyView, takeBuffer(), length, field.indexType)
+      return indices.map((index, j) =>
+        isValid(j) ? dictionary[index] : null
+      )
+    }
+
+    let values
+    if (field.typeId === ArrowType.Int) {
+      values = readInts(bodyView, takeBuffer(), length, field.type)
+    } else if (field.typeId === ArrowType.Float) {
+      values = readFloats(bodyView, takeBuffer(), length, field.type)
+    } else if (field.typeId === ArrowType.Bool) {
+      const data = takeBuffer()
+      values = new Array(length)
+      for (let j = 0; j < length; j++) {
+        values[j] = readBit(bodyView, data.offset, j)
+      }
+    } else if (field.typeId === ArrowType.Utf8) {
+      values = readStrings(body, bodyView, takeBuffer(), takeBuffer(), length)
+    } else {
+      throw new Error(`Unsupported Arrow type ${field.typeId}`)
+    }
+
+    return values.map((value, j) => (isValid(j) ? value : null))
+  })
+}
+
+/**
+ * Reads ints of the given Int type table, or int32s if it's null.
+ */
+function readInts(view, buffer, length, intType) {
+  const bitWidth = intType ? intType.getInt32(0, 0) : 32
+  const isSigned = intType ? intType.getBool(1, false) : true
+  const size = bitWidth / 8
+
+  let read
+  if (bitWidth === 8) {
+    read = isSigned ? i => view.getInt8(i) : i => view.getUint8(i)
+  } else if (bitWidth === 16) {
+    read = isSigned
+      ? i => view.getInt16(i, true)
+      : i => view.getUint16(i, true)
+  } else if (bitWidth === 32) {
+    read = isSigned
+      ? i => view.getInt32(i, true)
+      : i => view.getUint32(i, true)
+  } else if (bitWidth === 64) {
+    read = isSigned ? i => readInt64(view, i) : i => readUint64(view, i)
+  } else {
+    throw new Error(`Unsupported Arrow int width ${bitWidth}`)
+  }
+
+  const values = new Array(length)
+  for (let i = 0; i < length; i++) {
+    values[i] = read(buffer.offset + i * size)
+  }
+  return values
+}
+
+function readFloats(view, buffer, length, floatType) {
+  const precision = floatType.getInt16(0, 0)
+  let size
+  let read
+  if (precision === DOUBLE) {
+    size = 8
+    read = i => view.getFloat64(i, true)
+  } else if (precision === SINGLE) {
+    size = 4
+    read = i => view.getFloat32(i, true)
+  } else {
+    throw new Error(`Unsupported Arrow float precision ${precision}`)
+  }
+
+  const values = new Array(length)
+  for (let i = 0; i < length; i++) {
+    values[i] = read(buffer.offset + i * size)
+  }
+  return values
+}
+
+function readStrings(body, view, offsets, data, length) {
+  const decoder = new TextDecoder("utf-8")
+  const values = new Array(length)
+  for (let i = 0; i < length; i++) {
+    const start = view.getInt32(offsets.offset + i * 4, true)
+    const end = view.getInt32(offsets.offset + (i + 1) * 4, true)
+    values[i] = decoder.decode(
+      body.subarray(data.offset + start, data.offset + end)
+    )
+  }
+  return values
+}
+
+function readBit(view, offset, index) {
+  return ((view.getUint8(offset + (index >> 3)) >> (index & 7)) & 1) === 1
+}
+
+function readInt64(view, i) {
+  const low = view.getUint32(i, true)
+  const high = view.getInt32(i + 4, true)
+  return high * 0x100000000 + low
+}
+
+function readUint64(view, i) {
+  const low = view.getUint32(i, true)
+  const high = view.getUint32(i + 4, true)
+  return high * 0x100000000 + low
+}
+
+function getDataView(bytes) {
+  return new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+}
+
+function readRootTable(bytes) {
+  const view = getDataView(bytes)
+  return new FlatTable(view, view.getUint32(0, true))
+}
+
+/**
+ * A table in a FlatBuffer, which is how Arrow messages are encoded. Fields
+ * are looked up by their index in the table's definition, and absent fields
+ * have default values.
+ */
+class FlatTable {
+  constructor(view, pos) {
+    this.view = view
+    this.pos = pos
+    this.vtable = pos - view.getInt32(pos, true)
+  }
+
+  /** The position of a field, or 0 if it's absent. */
+  fieldPos(field) {
+    const vtableOffset = 4 + field * 2
+    if (vtableOffset >= this.view.getUint16(this.vtable, true)) {
+      return 0
+    }
+    const offset = this.view.getUint16(this.vtable + vtableOffset, true)
+    return offset === 0 ? 0 : this.pos + offset
+  }
+
+  getBool(field, defaultValue) {
+    const pos = this.fieldPos(field)
+    return pos ? this.view.getUint8(pos) !== 0 : defaultValue
+  }
+
+  getUint8(field, defaultValue) {
+    const pos = this.fieldPos(field)
+    return pos ? this.view.getUint8(pos) : defaultValue
+  }
+
+  getInt16(field, defaultValue) {
+    const pos = this.fieldPos(field)
+    return pos ? this.view.getInt16(pos, true) : defaultValue
+  }
+
+  getInt32(field, defaultValue) {
+    const pos = this.fieldPos(field)
+    return pos ? this.view.getInt32(pos, true) : defaultValue
+  }
+
+  getInt64(field, defaultValue) {
+    const pos = this.fieldPos(field)
+    return pos ? readInt64(this.view, pos) : defaultValue
+  }
+
+  /** Follows a field's offset to the table, string or vector it points to. */
+  deref(field) {
+    const pos = this.fieldPos(field)
+    return pos ? pos + this.view.getUint32(pos, true) : 0
+  }
+
+  getTable(field) {
+    const pos = this.deref(field)
+    return pos ? new FlatTable(this.view, pos) : null
+  }
+
+  getString(field) {
+    const pos = this.deref(field)
+    if (!pos) {
+      return null
+    }
+    const length = this.view.getUint32(pos, true)
+    const { buffer, byteOffset } = this.view
+    return new TextDecoder("utf-8").decode(
+      new Uint8Array(buffer, byteOffset + pos + 4, length)
+    )
+  }
+
+  getTables(field) {
+    const pos = this.deref(field)
+    if (!pos) {
+      return []
+    }
+    const tables = new Array(this.view.getUint32(pos, true))
+    for (let i = 0; i < tables.length; i++) {
+      const elementPos = pos + 4 + i * 4
+      tables[i] = new FlatTable(
+        this.view,
+        elementPos + this.view.getUint32(elementPos, true)
+      )
+    }
+    return tables
+  }
+
+  /**
+   * Returns the positions of the structs in a vector field, with a view
+   * property to read them with.
+   */
+  getStructs(field, structSize) {
+    const pos = this.deref(field)
+    const length = pos ? this.view.getUint32(pos, true) : 0
+    const positions = new Array(length)
+    for (let i = 0; i < length; i++) {
+      positions[i] = pos + 4 + i * structSize
+    }
+    positions.view = this.view
+    return positions
+  }
+}
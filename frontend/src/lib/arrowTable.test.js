@@ -0,0 +1,60 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import { TextDecoder } from "util"
+import { ArrowType, readArrowTable } from "./arrowTable"
+import { getArrowStreamBytes } from "./arrowTableTestUtils"
+
+// jsdom doesn't have a TextDecoder.
+global.TextDecoder = global.TextDecoder || TextDecoder
+
+function readFixture() {
+  return readArrowTable(getArrowStreamBytes())
+}
+
+test("reads column names and types", () => {
+  const columns = readFixture()
+  expect(columns.map(c => c.name)).toEqual(["0", "1", "2", "3", "4", "5"])
+  expect(columns.map(c => c.typeId)).toEqual([
+    ArrowType.Int,
+    ArrowType.Float,
+    ArrowType.Bool,
+    ArrowType.Utf8,
+    ArrowType.Utf8,
+    ArrowType.Int,
+  ])
+  expect(columns[5].metadata.get("streamlit.type")).toBe("datetime")
+  expect(columns[0].metadata.size).toBe(0)
+})
+
+test("reads values", () => {
+  const columns = readFixture()
+  expect(columns[0].values).toEqual([1, -2, 3])
+  expect(columns[1].values).toEqual([0.5, NaN, 2])
+  expect(columns[2].values).toEqual([true, false, true])
+  expect(columns[3].values).toEqual(["a", "b", "c"])
+  expect(columns[5].values).toEqual([0, 1000, 2000])
+})
+
+test("reads dictionaries, with null for missing values", () => {
+  const columns = readFixture()
+  expect(columns[4].values).toEqual(["x", null, "x"])
+})
+
+test("throws without a schema", () => {
+  expect(() => readArrowTable(new Uint8Array(8))).toThrow()
+})
@@ -0,0 +1,55 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+// An Arrow stream, as written by _marshall_arrow_table in data_frame_proto.py
+// for this DataFrame:
+//   pd.DataFrame({
+//     'ints': [1, -2, 3],
+//     'floats': [0.5, np.nan, 2.0],
+//     'bools': [True, False, True],
+//     'strings': ['a', 'b', 'c'],
+//     'cats': pd.Categorical(['x', None, 'x']),
+//     'dates': pd.to_datetime([0, 1000, 2000], unit='ns', utc=True),
+//   })
+const ARROW_STREAM =
+  "/////9gBAAAQAAAAAAAKAAwABgAFAAgACgAAAAABAwAEAAAAMP///wQAAAAGAAAAfAEAADgB" +
+  "AAAMAQAA5AAAAJwAAAAYAAAAAAASABgACAAGAAcADAAAABAAFAASAAAAAAABAmAAAABQAAAA" +
+  "SAAAAAQAAAABAAAADAAAAAgADAAEAAgACAAAAAgAAAAYAAAADgAAAHN0cmVhbWxpdC50eXBl" +
+  "AAAIAAAAZGF0ZXRpbWUAAAAAAAAAAPT+//8AAAABQAAAAAEAAAA1AAAAEAAYAAgABgAHAAwA" +
+  "EAAUABAAAAAAAAEFNAAAACwAAAAQAAAAIAAAAAgACAAAAAQACAAAAAQAAABA////AAAAAQgA" +
+  "AAAAAAAAuP///wEAAAA0AAAAhP///wAAAQUUAAAADAAAAAQAAAAAAAAA3P///wEAAAAzAAAA" +
+  "qP///wAAAQYYAAAAEAAAAAQAAAAAAAAABAAEAAQAAAABAAAAMgAAAND///8AAAEDIAAAABQA" +
+  "AAAEAAAAAAAAAAAABgAIAAYABgAAAAAAAgABAAAAMQAAABAAFAAIAAYABwAMAAAAEAAQAAAA" +
+  "AAABAiQAAAAUAAAABAAAAAAAAAAIAAwACAAHAAgAAAAAAAABQAAAAAEAAAAwAAAA/////6gA" +
+  "AAAUAAAAAAAAAAwAFAAGAAUACAAMAAwAAAAAAgMAFAAAABAAAAAAAAAACAAKAAAABAAIAAAA" +
+  "EAAAAAAACgAYAAwABAAIAAoAAABMAAAAEAAAAAEAAAAAAAAAAAAAAAMAAAAAAAAAAAAAAAAA" +
+  "AAAAAAAAAAAAAAAAAAAIAAAAAAAAAAgAAAAAAAAAAQAAAAAAAAAAAAAAAQAAAAEAAAAAAAAA" +
+  "AAAAAAAAAAAAAAAAAQAAAHgAAAAAAAAA/////4gBAAAUAAAAAAAAAAwAFgAGAAUACAAMAAwA" +
+  "AAAAAwMAGAAAAHgAAAAAAAAAAAAKABgADAAEAAgACgAAAOwAAAAQAAAAAwAAAAAAAAAAAAAA" +
+  "DQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABgAAAAAAAAAGAAAAAAAAAAAAAAAAAAAABgA" +
+  "AAAAAAAAGAAAAAAAAAAwAAAAAAAAAAAAAAAAAAAAMAAAAAAAAAABAAAAAAAAADgAAAAAAAAA" +
+  "AAAAAAAAAAA4AAAAAAAAABAAAAAAAAAASAAAAAAAAAADAAAAAAAAAFAAAAAAAAAAAQAAAAAA" +
+  "AABYAAAAAAAAAAMAAAAAAAAAYAAAAAAAAAAAAAAAAAAAAGAAAAAAAAAAGAAAAAAAAAAAAAAA" +
+  "BgAAAAMAAAAAAAAAAAAAAAAAAAADAAAAAAAAAAAAAAAAAAAAAwAAAAAAAAAAAAAAAAAAAAMA" +
+  "AAAAAAAAAAAAAAAAAAADAAAAAAAAAAEAAAAAAAAAAwAAAAAAAAAAAAAAAAAAAAEAAAAAAAAA" +
+  "/v////////8DAAAAAAAAAAAAAAAAAOA/AAAAAAAA+H8AAAAAAAAAQAUAAAAAAAAAAAAAAAEA" +
+  "AAACAAAAAwAAAGFiYwAAAAAABQAAAAAAAAAA/wAAAAAAAAAAAAAAAAAA6AMAAAAAAADQBwAA" +
+  "AAAAAP////8AAAAA"
+
+export function getArrowStreamBytes() {
+  return new Uint8Array(Buffer.from(ARROW_STREAM, "base64"))
+}
@@ -21,7 +21,7 @@
 
 import camelcase from "camelcase"
 import { dispatchOneOf, mapOneOf, updateOneOf } from "./immutableProto"
-import { fromJS } from "immutable"
+import { fromJS, List, Range } from "immutable"
 import { format } from "./format"
 
 // Must match dict_builder.py
@@ -126,6 +126,24 @@ export function dataFrameGetDimensions(df) {
   }
 }
 
+/**
+ * Returns { id, start, totalRows } for a DataFrame that only holds a window
+ * of its rows (see DataFrameWindow in DataFrame.proto), or null if it holds
+ * all of them.
+ */
+export function dataFrameGetWindow(df) {
+  const window = df ? df.get("window") : null
+  if (!window || !window.get("id")) {
+    return null
+  }
+
+  return {
+    id: window.get("id"),
+    start: window.get("start"),
+    totalRows: window.get("totalRows"),
+  }
+}
+
 /**
  * Returns [rows, cls] for this table.
  */
@@ -239,14 +257,7 @@ export function dataFrameGet(df, col, row) {
  * or undefined if there's no such value.
  */
 export function tableStyleGetDisplayValue(tableStyle, columnIndex, rowIndex) {
-  if (tableStyle == null) {
-    return undefined
-  }
-
-  const cellStyle = tableStyle.getIn(
-    ["cols", columnIndex, "styles", rowIndex],
-    undefined
-  )
+  const cellStyle = tableStyleGetCellStyle(tableStyle, columnIndex, rowIndex)
   if (cellStyle == null) {
     return undefined
   }
@@ -261,14 +272,8 @@ export function tableStyleGetDisplayValue(tableStyle, columnIndex, rowIndex) {
  * JSX element's {style} attribute, or undefined if table/cell has no style.
  */
 export function tableStyleGetCSS(tableStyle, columnIndex, rowIndex) {
-  if (tableStyle == null) {
-    return undefined
-  }
-
-  const cssStyles = tableStyle.getIn(
-    ["cols", columnIndex, "styles", rowIndex, "css"],
-    undefined
-  )
+  const cellStyle = tableStyleGetCellStyle(tableStyle, columnIndex, rowIndex)
+  const cssStyles = cellStyle == null ? undefined : cellStyle.get("css")
   if (cssStyles == null) {
     return undefined
   }
@@ -283,6 +288,44 @@ export function tableStyleGetCSS(tableStyle, columnIndex, rowIndex) {
   return styles
 }
 
+/**
+ * Returns the CellStyle of the given element in a TableStyle, or undefined if
+ * the cell is unstyled.
+ */
+function tableStyleGetCellStyle(tableStyle, columnIndex, rowIndex) {
+  if (tableStyle == null) {
+    return undefined
+  }
+
+  const styleCol = tableStyle.getIn(["cols", columnIndex], undefined)
+  if (styleCol == null) {
+    return undefined
+  }
+
+  // Without rows, there's a style for every row.
+  const rows = styleCol.get("rows")
+  if (rows == null || rows.size === 0) {
+    return styleCol.getIn(["styles", rowIndex], undefined)
+  }
+
+  // Otherwise, only styled rows are listed, in ascending order.
+  let low = 0
+  let high = rows.size - 1
+  while (low <= high) {
+    const mid = (low + high) >>> 1
+    const row = rows.get(mid)
+    if (row === rowIndex) {
+      return styleCol.getIn(["styles", mid], undefined)
+    } else if (row < rowIndex) {
+      low = mid + 1
+    } else {
+      high = mid - 1
+    }
+  }
+
+  return undefined
+}
+
 /**
  * Returns the given element from the table, formatted for display.
  */
@@ -435,9 +478,14 @@ export function addRows(element, namedDataSet) {
 
   if (dataframeToModify.get("data") == null) {
     dataframeToModify = dataframeToModify.set("data", fromJS({ cols: [] }))
+  }
+  if (dataframeToModify.get("style") == null) {
     dataframeToModify = dataframeToModify.set("style", fromJS({ cols: [] }))
   }
 
+  // The rows of newRows' styles are offset by the rows we already have.
+  const [dataRows] = tableGetRowsAndCols(dataframeToModify.get("data"))
+
   const newDataFrame = dataframeToModify
     .update("index", index => concatIndex(index, newRows.get("index")))
     .updateIn(["data", "cols"], cols => {
@@ -447,21 +495,143 @@ export function addRows(element, namedDataSet) {
       )
     })
     .updateIn(["style", "cols"], style_cols => {
-      return style_cols.zipWith(
-        (col1, col2) => concatCellStyleArray(col1, col2),
-        newRows.getIn(["style", "cols"])
-      )
+      const newStyleCols = newRows.getIn(["style", "cols"])
+      if (newStyleCols == null || newStyleCols.size === 0) {
+        return style_cols
+      }
+      // Unstyled DataFrames have no style columns.
+      const emptyStyleCol = fromJS({ styles: [], rows: [] })
+      return style_cols
+        .setSize(Math.max(style_cols.size, newStyleCols.size))
+        .map(col => (col == null ? emptyStyleCol : col))
+        .zipWith(
+          (col1, col2) => concatCellStyleArray(col1, col2, dataRows),
+          newStyleCols
+        )
     })
 
+  // The rows from add_rows were already trimmed by the server, but the rows
+  // we had weren't.
+  const trimmedDataFrame = trimRows(newDataFrame, namedDataSet.get("maxRows"))
+
   if (existingDataSet) {
     return setDataFrameInNamedDataSet(
       element,
       existingDatasetIndex,
-      newDataFrame
+      trimmedDataFrame
     )
   } else {
-    return setDataFrame(element, newDataFrame)
+    return setDataFrame(element, trimmedDataFrame)
+  }
+}
+
+/**
+ * Drops all but the last maxRows rows of a DataFrame, returning the result.
+ * If maxRows is 0, returns the DataFrame as it is.
+ */
+function trimRows(df, maxRows) {
+  const [numRows] = tableGetRowsAndCols(df.get("data"))
+  const numDropped = numRows - maxRows
+  if (!maxRows || numDropped <= 0) {
+    return df
+  }
+
+  return df
+    .update("index", index => trimIndex(index, numDropped))
+    .updateIn(["data", "cols"], cols =>
+      cols.map(col => trimAnyArray(col, numDropped))
+    )
+    .updateIn(["style", "cols"], cols =>
+      cols.map(col => trimCellStyleArray(col, numDropped))
+    )
+}
+
+/**
+ * Drops the first numDropped elements of an index, returning the result.
+ */
+function trimIndex(index, numDropped) {
+  const trimData = idx =>
+    idx.updateIn(["data", "data"], data => data.slice(numDropped))
+  return updateOneOf(index, "type", {
+    plainIndex: idx =>
+      idx.update("data", data => trimAnyArray(data, numDropped)),
+    rangeIndex: idx => idx.update("start", start => start + numDropped),
+    multiIndex: idx => trimMultiIndex(idx, numDropped),
+    int_64Index: trimData,
+    float_64Index: trimData,
+    datetimeIndex: trimData,
+    timedeltaIndex: trimData,
+  })
+}
+
+/**
+ * Drops the first numDropped elements of a MultiIndex, returning the result.
+ * Level values that no label uses anymore are dropped too, so the levels
+ * don't keep growing.
+ */
+function trimMultiIndex(multiIndex, numDropped) {
+  const levels = multiIndex.get("levels")
+  const trimmed = multiIndex
+    .get("labels")
+    .map(label => label.update("data", data => data.slice(numDropped)))
+
+  let newLevels = levels
+  let newLabels = trimmed
+  trimmed.forEach((label, i) => {
+    const level = levels.get(i)
+    const codes = label.get("data")
+    const used = codes
+      .filter(code => code >= 0)
+      .toOrderedSet()
+      .sort()
+      .toList()
+    if (used.size === indexLen(level) || level.get("type") === "rangeIndex") {
+      return
+    }
+
+    // Labels of -1 are missing values.
+    const newCodes = new Map()
+    used.forEach((code, j) => newCodes.set(code, j))
+    newLevels = newLevels.set(i, takeIndex(level, used))
+    newLabels = newLabels.setIn(
+      [i, "data"],
+      codes.map(code => (code < 0 ? code : newCodes.get(code)))
+    )
+  })
+
+  return multiIndex.set("levels", newLevels).set("labels", newLabels)
+}
+
+/**
+ * Drops the first numDropped elements of an anyArray, returning the result.
+ */
+function trimAnyArray(anyArray, numDropped) {
+  return anyArray.updateIn([anyArray.get("type"), "data"], data =>
+    data.slice(numDropped)
+  )
+}
+
+/**
+ * Drops the styles of the first numDropped rows of a CellStyleArray,
+ * returning the result.
+ */
+function trimCellStyleArray(array, numDropped) {
+  const rows = array.get("rows")
+
+  // An array without rows has one style per row.
+  if (rows == null || rows.size === 0) {
+    return array.update("styles", styles => styles.slice(numDropped))
   }
+
+  // Rows are in order, so the dropped ones come first.
+  const firstKept = rows.findIndex(row => row >= numDropped)
+  const numStylesDropped = firstKept === -1 ? rows.size : firstKept
+  return array
+    .update("styles", styles => styles.slice(numStylesDropped))
+    .set(
+      "rows",
+      rows.slice(numStylesDropped).map(row => row - numDropped)
+    )
 }
 
 /**
@@ -487,7 +657,7 @@ function concatIndex(index1, index2) {
         concatAnyArray(data, index2.getIn(["plainIndex", "data"]))
       ),
     rangeIndex: idx => idx.update("stop", stop => stop + indexLen(index2)),
-    // multiIndex: <not supported>,
+    multiIndex: idx => concatMultiIndex(idx, index2.get("multiIndex")),
     int_64Index: idx =>
       idx.updateIn(["data", "data"], data =>
         data.concat(index2.getIn(["int_64Index", "data", "data"]))
@@ -507,6 +677,115 @@ function concatIndex(index1, index2) {
   })
 }
 
+/**
+ * Concatenates both MultiIndexes, returning the result. Only the values of
+ * multiIndex2's levels that multiIndex1's levels don't have are added, and
+ * its labels are mapped to the merged levels.
+ */
+function concatMultiIndex(multiIndex1, multiIndex2) {
+  const levels2 = multiIndex2.get("levels")
+  const labels2 = multiIndex2.get("labels")
+  if (multiIndex1.get("levels").size !== levels2.size) {
+    throw new Error(
+      "Cannot concatenate MultiIndices with different numbers of levels."
+    )
+  }
+
+  let levels = multiIndex1.get("levels")
+  let labels = multiIndex1.get("labels")
+  levels2.forEach((level2, i) => {
+    const level1 = levels.get(i)
+    const level1Len = indexLen(level1)
+    const positions = takeLevelPositions(level1)
+
+    // Where each value of level2 is in the merged level, and which of them
+    // are new.
+    const newPositions = []
+    const codes = indexValues(level2).map((value, j) => {
+      const key = String(value)
+      if (!positions.has(key)) {
+        positions.set(key, level1Len + newPositions.length)
+        newPositions.push(j)
+      }
+      return positions.get(key)
+    })
+
+    if (newPositions.length > 0) {
+      levels = levels.set(
+        i,
+        concatIndex(level1, takeIndex(level2, List(newPositions)))
+      )
+    }
+    levelPositions.set(levels.get(i), positions)
+
+    // Labels of -1 are missing values.
+    labels = labels.updateIn([i, "data"], data =>
+      data.concat(
+        labels2
+          .getIn([i, "data"])
+          .map(label => (label < 0 ? label : codes.get(label)))
+      )
+    )
+  })
+
+  return multiIndex1.set("levels", levels).set("labels", labels)
+}
+
+/**
+ * Map: MultiIndex level -> Map from String(value) to its position in the
+ * level. Kept for the levels concatMultiIndex returns, so that adding rows
+ * again only looks up the new values.
+ */
+const levelPositions = new WeakMap()
+
+/**
+ * Returns the positions of a level's values, and forgets them for the
+ * level. The caller adds values to them, which the level doesn't have.
+ */
+function takeLevelPositions(level) {
+  let positions = levelPositions.get(level)
+  if (positions === undefined) {
+    positions = new Map()
+    indexValues(level).forEach((value, j) => positions.set(String(value), j))
+  }
+  levelPositions.delete(level)
+  return positions
+}
+
+/**
+ * Returns the values of an index that isn't a MultiIndex, as a List.
+ */
+function indexValues(index) {
+  const getData = idx => idx.getIn(["data", "data"])
+  return dispatchOneOf(index, "type", {
+    plainIndex: idx => anyArrayData(idx.get("data")),
+    rangeIndex: idx => Range(idx.get("start"), idx.get("stop")).toList(),
+    int_64Index: getData,
+    float_64Index: getData,
+    datetimeIndex: getData,
+    timedeltaIndex: getData,
+  })
+}
+
+/**
+ * Returns an index of the values of an index at the given positions, with
+ * the same type. The index can't be a MultiIndex or RangeIndex.
+ */
+function takeIndex(index, positions) {
+  const take = data => positions.map(i => data.get(i))
+  const takeData = idx => idx.updateIn(["data", "data"], take)
+  return updateOneOf(index, "type", {
+    plainIndex: idx =>
+      idx.update("data", data =>
+        data.updateIn([data.get("type"), "data"], take)
+      ),
+    int_64Index: takeData,
+    float_64Index: takeData,
+    datetimeIndex: takeData,
+    timedeltaIndex: takeData,
+  })
+}
+
 /**
  * Concatenates both anyArrays, returning the result.
  */
@@ -528,14 +807,29 @@ function concatAnyArray(anyArray1, anyArray2) {
 }
 
 /**
- * Concatenates both CellStyleArrays, returning the result
+ * Concatenates both CellStyleArrays, returning the result. The rows of
+ * array2 are offset by numRows1, the number of rows in array1's column.
  */
-function concatCellStyleArray(array1, array2) {
-  // Special case if the left array is empty.
-  if (array1.get("styles").length === 0) {
-    return array2
+function concatCellStyleArray(array1, array2, numRows1) {
+  const styles2 = array2.get("styles")
+  if (styles2 == null || styles2.size === 0) {
+    return array1
   }
-  return array1.update("styles", styles => styles.concat(array2.get("styles")))
+
+  // An array without rows has one style per row. Make that explicit.
+  const getRows = array => {
+    const rows = array.get("rows")
+    return rows == null || rows.size === 0
+      ? Range(0, array.get("styles").size).toList()
+      : rows
+  }
+
+  return array1
+    .set("styles", array1.get("styles").concat(styles2))
+    .set(
+      "rows",
+      getRows(array1).concat(getRows(array2).map(row => row + numRows1))
+    )
 }
 
 /**
@@ -0,0 +1,98 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import { DataFrame } from "autogen/proto"
+import {
+  dataFrameGet,
+  tableStyleGetCSS,
+  tableStyleGetDisplayValue,
+} from "./dataFrameProto"
+import { toImmutableProto } from "./immutableProto"
+
+const RED = { css: [{ property: "color", value: "red" }] }
+
+function styled(displayValue) {
+  return { ...RED, displayValue, hasDisplayValue: true }
+}
+
+/**
+ * A one-column, five-row DataFrame with the given CellStyleArray, encoded
+ * like the server does and decoded like the browser.
+ */
+function createStyledDataFrame(styleCol) {
+  const df = DataFrame.fromObject({
+    data: { cols: [{ doubles: { data: [0, 1, 2, 3, 4] } }] },
+    index: {
+      plainIndex: { data: { strings: { data: ["a", "b", "c", "d", "e"] } } },
+    },
+    columns: { plainIndex: { data: { strings: { data: ["col"] } } } },
+    style: { cols: [styleCol] },
+  })
+  const bytes = DataFrame.encode(df).finish()
+  return toImmutableProto(DataFrame, DataFrame.decode(bytes))
+}
+
+test("reads a style for every row when rows is empty", () => {
+  const df = createStyledDataFrame({
+    styles: ["0", "1", "2", "3", "4"].map(styled),
+  })
+  const style = df.get("style")
+
+  for (let row = 0; row < 5; row++) {
+    expect(tableStyleGetDisplayValue(style, 0, row)).toBe(String(row))
+    expect(tableStyleGetCSS(style, 0, row)).toEqual({ color: "red" })
+  }
+})
+
+test("reads sparse styles from their rows", () => {
+  const df = createStyledDataFrame({
+    styles: [styled("one"), RED, styled("four")],
+    rows: [1, 3, 4],
+  })
+  const style = df.get("style")
+  const rows = [0, 1, 2, 3, 4]
+
+  const displayValues = rows.map(row =>
+    tableStyleGetDisplayValue(style, 0, row)
+  )
+  expect(displayValues).toEqual([
+    undefined,
+    "one",
+    undefined,
+    undefined,
+    "four",
+  ])
+  expect(rows.map(row => tableStyleGetCSS(style, 0, row))).toEqual([
+    undefined,
+    { color: "red" },
+    undefined,
+    { color: "red" },
+    { color: "red" },
+  ])
+})
+
+test("shows sparse styles in their cells", () => {
+  const df = createStyledDataFrame({ styles: [styled("two")], rows: [2] })
+
+  // Cells are offset by the header row and column.
+  expect(dataFrameGet(df, 1, 3)).toEqual({
+    contents: "two",
+    styles: { color: "red" },
+    type: "data",
+  })
+  expect(dataFrameGet(df, 1, 2)).toMatchObject({ styles: {}, type: "data" })
+})
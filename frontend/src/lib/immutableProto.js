@@ -15,7 +15,8 @@
  * limitations under the License.
  */
 
-import { fromJS } from "immutable"
+import { fromJS, isKeyed, List, Map as ImmutableMap } from "immutable"
+import { ArrowType, readArrowTable } from "./arrowTable"
 import { IS_DEV_ENV } from "./baseconsts"
 import { logMessage } from "./log"
 
@@ -30,7 +31,134 @@ export function toImmutableProto(messageType, message) {
   if (IS_DEV_ENV) {
     logMessage("Protobuf: ", x)
   }
-  return fromJS(x)
+  return fromJS(x, convertProtoObject)
+}
+
+/**
+ * fromJS converter that unpacks AnyArrays with packed or dictionary-encoded
+ * columns, and Tables sent as Arrow (see DataFrame.proto), into their
+ * repeated-field equivalents, so the rest of the frontend doesn't need to
+ * know about them.
+ */
+function convertProtoObject(key, value) {
+  if (!isKeyed(value)) {
+    return value.toList()
+  }
+
+  const type = value.get("type")
+  if (type === "packed") {
+    return unpackArray(value.get("packed"))
+  } else if (type === "packedStrings") {
+    return unpackStrings(value.get("packedStrings"))
+  } else if (type === "dictionaryStrings") {
+    return unpackDictionaryStrings(value.get("dictionaryStrings"))
+  }
+
+  const arrow = value.get("arrow")
+  if (value.has("cols") && arrow && arrow.byteLength > 0) {
+    return ImmutableMap({ cols: unpackArrowTable(arrow) })
+  }
+
+  return value.toMap()
+}
+
+/**
+ * How to read each PackedArray.DType, and the AnyArray field it unpacks to.
+ */
+const PACKED_DTYPES = [
+  // FLOAT64
+  { type: "doubles", size: 8, read: (view, i) => view.getFloat64(i, true) },
+  // INT64
+  { type: "int64s", size: 8, read: readInt64 },
+  // DATETIME64
+  { type: "datetimes", size: 8, read: readInt64 },
+  // TIMEDELTA64
+  { type: "timedeltas", size: 8, read: readInt64 },
+  // BOOL. Unpacked like the repeated path, which sends bools as int64s.
+  { type: "int64s", size: 1, read: (view, i) => view.getUint8(i) },
+]
+
+function readInt64(view, i) {
+  // JS numbers lose precision past 2^53, same as repeated int64 fields.
+  const low = view.getUint32(i, true)
+  const high = view.getInt32(i + 4, true)
+  return high * 0x100000000 + low
+}
+
+function getDataView(bytes) {
+  return new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+}
+
+function unpackArray(packed) {
+  const { type, size, read } = PACKED_DTYPES[packed.get("dtype")]
+  const bytes = packed.get("data")
+  const view = getDataView(bytes)
+
+  const data = new Array(bytes.byteLength / size)
+  for (let i = 0; i < data.length; i++) {
+    data[i] = read(view, i * size)
+  }
+
+  return fromJS({ type, [type]: { data: List(data) } })
+}
+
+function unpackStrings(packed) {
+  const offsets = getDataView(packed.get("offsets"))
+  const bytes = packed.get("data")
+  const decoder = new TextDecoder("utf-8")
+
+  const data = new Array(Math.max(0, offsets.byteLength / 4 - 1))
+  for (let i = 0; i < data.length; i++) {
+    const start = offsets.getInt32(i * 4, true)
+    const end = offsets.getInt32((i + 1) * 4, true)
+    data[i] = decoder.decode(bytes.subarray(start, end))
+  }
+
+  return fromJS({ type: "strings", strings: { data: List(data) } })
+}
+
+function unpackDictionaryStrings(encoded) {
+  const dictionary = encoded.get("dictionary")
+  const data = encoded.get("codes").map(code => dictionary.get(code))
+  return fromJS({ type: "strings", strings: { data } })
+}
+
+/**
+ * Key of the Arrow field metadata that says how to read int64 columns that
+ * aren't plain numbers. See _to_arrow_array in data_frame_proto.py.
+ */
+const ARROW_TYPE_METADATA_KEY = "streamlit.type"
+
+function unpackArrowTable(bytes) {
+  return List(readArrowTable(bytes).map(unpackArrowColumn))
+}
+
+function unpackArrowColumn({ typeId, metadata, values }) {
+  const streamlitType = metadata.get(ARROW_TYPE_METADATA_KEY)
+  let type
+  let read
+  if (streamlitType === "datetime") {
+    type = "datetimes"
+  } else if (streamlitType === "timedelta") {
+    type = "timedeltas"
+  } else if (typeId === ArrowType.Float) {
+    type = "doubles"
+    read = value => (value === null ? NaN : value)
+  } else if (typeId === ArrowType.Int) {
+    type = "int64s"
+  } else if (typeId === ArrowType.Bool) {
+    // Like the repeated path, which sends bools as int64s.
+    type = "int64s"
+    read = value => (value ? 1 : 0)
+  } else {
+    // Strings, dictionary-encoded or not. Missing values, like missing
+    // categories, show up as "nan", like in the other string arrays.
+    type = "strings"
+    read = value => (value === null ? "nan" : value)
+  }
+
+  const data = read ? values.map(read) : values
+  return fromJS({ type, [type]: { data: List(data) } })
 }
 
 /**
@@ -0,0 +1,149 @@
+/**
+ * @license
+ * Copyright 2018-2019 Streamlit Inc.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import { TextDecoder, TextEncoder } from "util"
+import { DataFrame } from "autogen/proto"
+import { getArrowStreamBytes } from "./arrowTableTestUtils"
+import { toImmutableProto } from "./immutableProto"
+
+// jsdom doesn't have a TextDecoder.
+global.TextDecoder = global.TextDecoder || TextDecoder
+
+/**
+ * Encodes a DataFrame like the server does, and decodes it like the browser.
+ */
+function decodeDataFrame(obj) {
+  const bytes = DataFrame.encode(DataFrame.fromObject(obj)).finish()
+  return toImmutableProto(DataFrame, DataFrame.decode(bytes))
+}
+
+function getCols(obj) {
+  return decodeDataFrame({ data: { cols: [obj] } })
+    .getIn(["data", "cols"])
+    .toJS()
+}
+
+function packFloat64s(values) {
+  return new Uint8Array(new Float64Array(values).buffer)
+}
+
+function packInt64s(values) {
+  const view = new DataView(new ArrayBuffer(values.length * 8))
+  values.forEach((value, i) => {
+    const high = Math.floor(value / 0x100000000)
+    view.setUint32(i * 8, value - high * 0x100000000, true)
+    view.setInt32(i * 8 + 4, high, true)
+  })
+  return new Uint8Array(view.buffer)
+}
+
+function packStrings(values) {
+  const encoded = values.map(value => new TextEncoder().encode(value))
+  const offsets = new Int32Array(values.length + 1)
+  encoded.forEach((bytes, i) => {
+    offsets[i + 1] = offsets[i] + bytes.length
+  })
+
+  const data = new Uint8Array(offsets[values.length])
+  encoded.forEach((bytes, i) => data.set(bytes, offsets[i]))
+  return { offsets: new Uint8Array(offsets.buffer), data }
+}
+
+test("leaves repeated arrays alone", () => {
+  expect(getCols({ strings: { data: ["a", "b"] } })).toEqual([
+    { type: "strings", strings: { data: ["a", "b"] } },
+  ])
+})
+
+test("unpacks packed doubles", () => {
+  const data = packFloat64s([1.5, NaN, -2])
+  expect(getCols({ packed: { dtype: 0, data } })).toEqual([
+    { type: "doubles", doubles: { data: [1.5, NaN, -2] } },
+  ])
+})
+
+test("unpacks packed int64s, datetimes and timedeltas", () => {
+  const values = [0, -2, 2 ** 40 + 1]
+  const data = packInt64s(values)
+  expect(getCols({ packed: { dtype: 1, data } })).toEqual([
+    { type: "int64s", int64s: { data: values } },
+  ])
+  expect(getCols({ packed: { dtype: 2, data } })).toEqual([
+    { type: "datetimes", datetimes: { data: values } },
+  ])
+  expect(getCols({ packed: { dtype: 3, data } })).toEqual([
+    { type: "timedeltas", timedeltas: { data: values } },
+  ])
+})
+
+test("unpacks packed bools as int64s", () => {
+  const data = new Uint8Array([1, 0, 1])
+  expect(getCols({ packed: { dtype: 4, data } })).toEqual([
+    { type: "int64s", int64s: { data: [1, 0, 1] } },
+  ])
+})
+
+test("unpacks packed strings", () => {
+  const values = ["a", "", "héllo", "\u{1f600}"]
+  expect(getCols({ packedStrings: packStrings(values) })).toEqual([
+    { type: "strings", strings: { data: values } },
+  ])
+})
+
+test("unpacks empty packed strings", () => {
+  expect(getCols({ packedStrings: packStrings([]) })).toEqual([
+    { type: "strings", strings: { data: [] } },
+  ])
+})
+
+test("unpacks dictionary strings", () => {
+  const dictionaryStrings = { dictionary: ["x", "y"], codes: [1, 0, 0, 1] }
+  expect(getCols({ dictionaryStrings })).toEqual([
+    { type: "strings", strings: { data: ["y", "x", "x", "y"] } },
+  ])
+})
+
+test("unpacks packed columns in the index and column names", () => {
+  const dictionaryStrings = { dictionary: ["c"], codes: [0] }
+  const df = decodeDataFrame({
+    index: { plainIndex: { data: { packedStrings: packStrings(["r"]) } } },
+    columns: { plainIndex: { data: { dictionaryStrings } } },
+  })
+  expect(df.getIn(["index", "plainIndex", "data"]).toJS()).toEqual({
+    type: "strings",
+    strings: { data: ["r"] },
+  })
+  expect(df.getIn(["columns", "plainIndex", "data"]).toJS()).toEqual({
+    type: "strings",
+    strings: { data: ["c"] },
+  })
+})
+
+test("decodes Arrow tables into columns", () => {
+  // See arrowTableTestUtils.js for the DataFrame this is.
+  const df = decodeDataFrame({ data: { arrow: getArrowStreamBytes() } })
+  expect(df.get("data").toJS()).toEqual({
+    cols: [
+      { type: "int64s", int64s: { data: [1, -2, 3] } },
+      { type: "doubles", doubles: { data: [0.5, NaN, 2] } },
+      { type: "int64s", int64s: { data: [1, 0, 1] } },
+      { type: "strings", strings: { data: ["a", "b", "c"] } },
+      { type: "strings", strings: { data: ["x", "nan", "x"] } },
+      { type: "datetimes", datetimes: { data: [0, 1000, 2000] } },
+    ],
+  })
+})
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure how long many small add_rows calls take to enqueue.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/add_rows_benchmark.py [CALLS] [SERIALIZATION]
+
+SERIALIZATION is a global.dataFrameSerialization value: "repeated",
+"packed" or "arrow". It defaults to the configured one.
+
+This enqueues a chart, and then CALLS add_rows deltas of a few rows each,
+like a training loop that plots its loss, into a Report. The Report's master
+queue composes all of them onto the chart, and its browser queue is flushed
+every FLUSH_INTERVAL calls, like the server does. It reports the time taken
+by each block of REPORT_INTERVAL calls, which stays flat if composing an
+add_rows delta doesn't depend on how many rows came before it.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from streamlit import config
+from streamlit.Report import Report
+from streamlit.elements import data_frame_proto
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+DEFAULT_CALLS = 10000
+ROWS_PER_CALL = 5
+NUM_COLS = 3
+
+FLUSH_INTERVAL = 100
+REPORT_INTERVAL = 1000
+
+
+def _create_msg(df, add_rows):
+    msg = ForwardMsg()
+    msg.metadata.delta_id = 0
+    if add_rows:
+        data_frame_proto.marshall_data_frame(df, msg.delta.add_rows.data)
+    else:
+        data_frame_proto.marshall_data_frame(
+            df, msg.delta.new_element.chart.data)
+    return msg
+
+
+def main(num_calls):
+    np.random.seed(0)
+    report = Report('benchmark.py', [])
+    report.enqueue(_create_msg(
+        pd.DataFrame(np.random.randn(ROWS_PER_CALL, NUM_COLS)), False))
+
+    # Marshall ahead of time, so only the queues are measured.
+    msgs = [
+        _create_msg(pd.DataFrame(np.random.randn(ROWS_PER_CALL, NUM_COLS)),
+                    True)
+        for _ in range(num_calls)
+    ]
+
+    print('%10s %12s %18s' % ('calls', 'rows', 'block time (ms)'))
+
+    total_start = time.time()
+    block_start = total_start
+    for i, msg in enumerate(msgs, 1):
+        report.enqueue(msg)
+
+        if i % FLUSH_INTERVAL == 0:
+            report.flush_browser_queue()
+
+        if i % REPORT_INTERVAL == 0 or i == num_calls:
+            now = time.time()
+            print('%10d %12d %18.1f' % (
+                i, (i + 1) * ROWS_PER_CALL, (now - block_start) * 1000))
+            block_start = now
+
+    print('Total: %.1f ms' % ((time.time() - total_start) * 1000))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        config.set_option('global.dataFrameSerialization', sys.argv[2])
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS)
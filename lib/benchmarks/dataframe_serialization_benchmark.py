@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the global.dataFrameSerialization options.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/dataframe_serialization_benchmark.py [ROWS ...]
+
+For DataFrames with 10 columns of each kind of data and each number of rows,
+this reports, per serialization option:
+
+- marshall: time spent in marshall_data_frame.
+- serialize: time to serialize the proto to bytes, as the server does before
+  sending it.
+- parse: time to parse those bytes back into a proto.
+- size of the serialized proto.
+
+The "arrow" option is only compared when pyarrow is installed. Its parse time
+doesn't include decoding the Arrow stream, which happens in the browser.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from streamlit import config
+from streamlit.elements import data_frame_proto
+from streamlit.proto.DataFrame_pb2 import DataFrame
+
+DEFAULT_ROWS = [1000, 100000, 1000000]
+NUM_COLS = 10
+SERIALIZATIONS = ['repeated', 'packed']
+KINDS = ['float', 'int', 'bool', 'string', 'category']
+
+try:
+    import pyarrow  # noqa: F401
+    SERIALIZATIONS.append('arrow')
+except ImportError:
+    pass
+
+
+def _make_df(kind, num_rows):
+    np.random.seed(0)
+    if kind == 'float':
+        data = np.random.randn(num_rows, NUM_COLS)
+    elif kind == 'int':
+        data = np.random.randint(0, 1 << 40, (num_rows, NUM_COLS))
+    elif kind == 'bool':
+        data = np.random.randn(num_rows, NUM_COLS) > 0
+    elif kind in ('string', 'category'):
+        words = np.array(['apple', 'banana', 'cherry', 'durian'], dtype=object)
+        data = words[np.random.randint(0, len(words), (num_rows, NUM_COLS))]
+        if kind == 'category':
+            return pd.DataFrame(data).astype('category')
+    return pd.DataFrame(data)
+
+
+def _time(func):
+    start = time.time()
+    result = func()
+    return result, (time.time() - start) * 1000
+
+
+def main(row_counts):
+    print('%8s %8s %10s %14s %14s %12s %10s' % (
+        'kind', 'rows', 'encoding', 'marshall (ms)', 'serialize (ms)',
+        'parse (ms)', 'size (MB)'))
+
+    for kind in KINDS:
+        for num_rows in row_counts:
+            df = _make_df(kind, num_rows)
+
+            for serialization in SERIALIZATIONS:
+                config.set_option(
+                    'global.dataFrameSerialization', serialization)
+
+                proto = DataFrame()
+                _, marshall_ms = _time(
+                    lambda: data_frame_proto.marshall_data_frame(df, proto))
+                data, serialize_ms = _time(proto.SerializeToString)
+                _, parse_ms = _time(lambda: DataFrame().ParseFromString(data))
+
+                print('%8s %8d %10s %14.1f %14.1f %12.1f %10.2f' % (
+                    kind, num_rows, serialization, marshall_ms, serialize_ms,
+                    parse_ms, len(data) / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS)
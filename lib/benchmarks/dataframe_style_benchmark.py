@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure what cell styles cost when marshalling DataFrames.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/dataframe_style_benchmark.py [ROWS ...]
+
+For DataFrames of 20 columns and each number of rows, this marshalls an
+unstyled DataFrame and a Styler that highlights each column's maximum, and
+reports the time spent in marshall_data_frame and the serialized size of the
+DataFrame's data and style.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from streamlit.elements import data_frame_proto
+from streamlit.proto.DataFrame_pb2 import DataFrame
+
+DEFAULT_ROWS = [1000, 10000, 100000, 1000000]
+NUM_COLS = 20
+
+# Stylers render HTML for every cell, so only style frames up to this size.
+MAX_STYLED_ROWS = 10000
+
+
+def _marshall(data):
+    proto = DataFrame()
+    start = time.time()
+    data_frame_proto.marshall_data_frame(data, proto)
+    return proto, time.time() - start
+
+
+def main(row_counts):
+    print('%10s %10s %12s %12s %12s' % (
+        'rows', 'styled', 'time (ms)', 'data (KB)', 'style (KB)'))
+
+    for num_rows in row_counts:
+        np.random.seed(0)
+        df = pd.DataFrame(np.random.randn(num_rows, NUM_COLS))
+
+        cases = [('no', df)]
+        if num_rows <= MAX_STYLED_ROWS:
+            cases.append(('yes', df.style.highlight_max(axis=0)))
+
+        for label, data in cases:
+            proto, secs = _marshall(data)
+            print('%10d %10s %12.1f %12.1f %12.1f' % (
+                num_rows,
+                label,
+                secs * 1000,
+                proto.data.ByteSize() / 1024.0,
+                proto.style.ByteSize() / 1024.0))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS)
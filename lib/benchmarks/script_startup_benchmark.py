@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure how long a new session's first script run takes in a worker.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/script_startup_benchmark.py [MODULE ...]
+
+This writes a script that imports the given modules (by default, a few
+heavy ones that Streamlit itself doesn't import), and times the first run of
+that script in each worker of a ScriptWorkerPool, from the moment a
+ProcessScriptRunner starts until the script finishes. That's the latency a
+new browser session sees. It compares cold workers with workers that
+pre-import the script's top-level imports, as runner.numProcesses does.
+
+Don't import the benchmarked modules here: workers are forked from this
+process, and would inherit them.
+"""
+
+import os
+import pkgutil
+import sys
+import tempfile
+import threading
+import time
+
+from streamlit.ProcessScriptRunner import ProcessScriptRunner
+from streamlit.Report import Report
+from streamlit.ScriptRequestQueue import RerunData
+from streamlit.ScriptRequestQueue import ScriptRequest
+from streamlit.ScriptRequestQueue import ScriptRequestQueue
+from streamlit.ScriptRunner import ScriptRunnerEvent
+from streamlit.ScriptWorkerPool import ScriptWorkerPool
+from streamlit.proto.Widget_pb2 import WidgetStates
+
+DEFAULT_MODULES = ['pandas', 'altair', 'matplotlib.pyplot', 'scipy.stats']
+NUM_WORKERS = 4
+
+# How long to give workers to warm up before the first session arrives.
+WARM_UP_SECS = 10.0
+
+
+def _is_installed(module_name):
+    # Check for the top-level package only, so nothing gets imported.
+    top_level = module_name.split('.')[0]
+    return any(name == top_level for _, name, _ in pkgutil.iter_modules())
+
+
+def _write_script(module_names):
+    script = tempfile.NamedTemporaryFile(
+        mode='w', suffix='.py', delete=False)
+    for name in module_names:
+        script.write('import %s\n' % name)
+    script.write('import streamlit as st\n')
+    script.write('st.text("done")\n')
+    script.close()
+    return script.name
+
+
+def _time_first_run(script_path, pool):
+    """Return the seconds it takes to run the script in the next worker."""
+    done = threading.Event()
+
+    def on_event(event, **kwargs):
+        if event == ScriptRunnerEvent.SHUTDOWN:
+            done.set()
+
+    request_queue = ScriptRequestQueue()
+    request_queue.enqueue(ScriptRequest.RERUN, RerunData(None, None))
+
+    scriptrunner = ProcessScriptRunner(
+        report=Report(script_path, []),
+        enqueue=lambda msg: True,
+        widget_states=WidgetStates(),
+        request_queue=request_queue,
+        pool=pool)
+    scriptrunner.on_event.connect(on_event)
+
+    start = time.time()
+    scriptrunner.start()
+    done.wait()
+    return time.time() - start
+
+
+def _run(script_path, pre_import):
+    pool = ScriptWorkerPool(
+        NUM_WORKERS, script_path if pre_import else None)
+
+    try:
+        time.sleep(WARM_UP_SECS)
+
+        # Workers are checked out in FIFO order, so each of these runs is
+        # the first run in its worker.
+        return [
+            _time_first_run(script_path, pool) for _ in range(NUM_WORKERS)]
+
+    finally:
+        pool.shutdown()
+        ScriptWorkerPool._singleton = None
+
+
+def main(module_names):
+    module_names = [name for name in module_names if _is_installed(name)]
+    print('Script imports: %s' % ', '.join(module_names))
+
+    script_path = _write_script(module_names)
+
+    print('%12s %14s %14s' % ('workers', 'mean (ms)', 'max (ms)'))
+
+    try:
+        for label, pre_import in [('cold', False), ('warm', True)]:
+            durations = _run(script_path, pre_import)
+            print('%12s %14.1f %14.1f' % (
+                label,
+                sum(durations) / len(durations) * 1000,
+                max(durations) * 1000))
+    finally:
+        os.unlink(script_path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_MODULES)
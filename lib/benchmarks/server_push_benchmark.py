@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the Server's idle CPU usage and delta latency vs. connection count.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/server_push_benchmark.py [NUM_CONNECTIONS ...]
+
+For each connection count, this opens that many WebSocket connections to an
+in-process Server, then measures:
+
+- idle CPU: process CPU time used per wall-clock second while no messages
+  are being produced.
+- latency: time from a ForwardMsg being enqueued on a non-IOLoop thread
+  (like a ScriptRunner would) until a browser receives it.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import tornado.gen
+import tornado.ioloop
+import tornado.websocket
+
+from streamlit import config
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.server.Server import Server
+
+DEFAULT_CONNECTION_COUNTS = [1, 10, 100, 500]
+IDLE_SECONDS = 2.0
+LATENCY_SAMPLES = 50
+
+
+def _get_free_port():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+@tornado.gen.coroutine
+def _measure_idle_cpu(seconds):
+    cpu_start = time.process_time()
+    wall_start = time.time()
+    yield tornado.gen.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.time() - wall_start
+    raise tornado.gen.Return(cpu / wall)
+
+
+@tornado.gen.coroutine
+def _measure_latency(session, ws_client, samples):
+    msg = ForwardMsg()
+    msg.report_finished = True
+
+    latencies = []
+    for _ in range(samples):
+        start = time.time()
+        threading.Thread(target=session.enqueue, args=(msg,)).start()
+        yield ws_client.read_message()
+        latencies.append(time.time() - start)
+
+        # Let the server go back to idle between samples.
+        yield tornado.gen.sleep(0.02)
+
+    raise tornado.gen.Return(latencies)
+
+
+@tornado.gen.coroutine
+def _run(server, port, connection_counts):
+    url = 'ws://localhost:%s/stream' % port
+    clients = []
+
+    print('%12s %14s %14s %14s' % (
+        'connections', 'idle CPU (%)', 'p50 lat (ms)', 'p95 lat (ms)'))
+
+    for count in connection_counts:
+        while len(clients) < count:
+            client = yield tornado.websocket.websocket_connect(url)
+            clients.append(client)
+
+        # Wait for connection setup to settle down.
+        yield tornado.gen.sleep(0.5)
+
+        idle_cpu = yield _measure_idle_cpu(IDLE_SECONDS)
+
+        session = list(server._report_sessions.values())[-1]
+        latencies = yield _measure_latency(
+            session, clients[-1], LATENCY_SAMPLES)
+
+        print('%12d %14.2f %14.2f %14.2f' % (
+            count,
+            idle_cpu * 100,
+            _percentile(latencies, 50) * 1000,
+            _percentile(latencies, 95) * 1000))
+
+    for client in clients:
+        client.close()
+
+    server.stop()
+
+
+def main(connection_counts):
+    script = tempfile.NamedTemporaryFile(
+        mode='w', suffix='.py', delete=False)
+    script.write('pass\n')
+    script.close()
+
+    port = _get_free_port()
+    config.set_option('server.port', port)
+    config.set_option('global.developmentMode', False)
+
+    ioloop = tornado.ioloop.IOLoop.current()
+    server = Server(ioloop, script.name, [])
+    server.start(
+        lambda _: ioloop.spawn_callback(
+            _run, server, port, connection_counts))
+
+    try:
+        ioloop.start()
+    finally:
+        os.unlink(script.name)
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_CONNECTION_COUNTS
+    main(counts)
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure how the Server scales with the number of connected browsers.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/server_scalability_benchmark.py [options]
+
+This starts a Server for a small script, and simulates browsers that speak
+the same BackMsg/ForwardMsg protocol as the frontend. For each connection
+count, every simulated browser repeatedly asks for a rerun (rerun_script)
+and changes a widget (update_widgets), all at the same time, and waits for
+the resulting report_finished message. It reports:
+
+- latency: time from sending a BackMsg until the report_finished arrives,
+  as percentiles over all browsers and rounds.
+- throughput: BackMsgs handled per second.
+- KB/msg: bytes the server sent per BackMsg, after the ForwardMsg cache.
+- server CPU: CPU time of the server (its IOLoop, serialization and script
+  threads) per wall-clock second. The simulated browsers run on a thread of
+  their own, whose CPU time is subtracted.
+- peak RSS of the process.
+
+Use it to track regressions in the Server's send loop, ReportQueue and
+ForwardMsg serialization.
+"""
+
+import argparse
+import os
+import resource
+import socket
+import tempfile
+import threading
+import time
+
+import tornado.gen
+import tornado.ioloop
+import tornado.websocket
+
+from streamlit import config
+from streamlit.credentials import Activation
+from streamlit.credentials import Credentials
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.server.Server import Server
+from streamlit.server.server_util import CAPABILITY_BATCHED_MESSAGES
+from streamlit.server.server_util import CAPABILITY_MESSAGE_CACHE
+
+DEFAULT_CONNECTION_COUNTS = [1, 10, 50, 100]
+DEFAULT_ROUNDS = 10
+DEFAULT_ROWS = 100
+
+# The same limit the frontend uses. See WebsocketConnection.tsx.
+MAX_CACHED_MESSAGES = 100
+
+SCRIPT = '''
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+name = st.text_input('name', 'world')
+st.text('Hello, %%s!' %% name)
+
+np.random.seed(0)
+df = pd.DataFrame(np.random.randn(%(rows)d, 4), columns=list('abcd'))
+st.dataframe(df)
+st.line_chart(df)
+'''
+
+WIDGET_ID = 'text_input-name'
+
+
+def _get_free_port():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def _is_report_finished(msg):
+    if msg.WhichOneof('type') == 'batch':
+        return any(_is_report_finished(m) for m in msg.batch.messages)
+    return msg.WhichOneof('type') == 'report_finished'
+
+
+def _create_rerun_msg(script_path):
+    msg = BackMsg()
+    msg.rerun_script = script_path
+    return msg
+
+
+def _create_update_widgets_msg(value):
+    msg = BackMsg()
+    widget = msg.update_widgets.widgets.add()
+    widget.id = WIDGET_ID
+    widget.string_value = value
+    return msg
+
+
+class _SimulatedBrowser(object):
+    """A WebSocket client that talks to the Server like the frontend does."""
+
+    def __init__(self):
+        self.bytes_received = 0
+        self._conn = None
+
+    @tornado.gen.coroutine
+    def connect(self, url):
+        capabilities = ','.join([
+            CAPABILITY_BATCHED_MESSAGES, CAPABILITY_MESSAGE_CACHE])
+        self._conn = yield tornado.websocket.websocket_connect(
+            '%s?capabilities=%s&max_cached_messages=%s' % (
+                url, capabilities, MAX_CACHED_MESSAGES))
+
+    @tornado.gen.coroutine
+    def request(self, back_msg):
+        """Send a BackMsg and wait for the report to finish.
+
+        Returns
+        -------
+        float
+            The latency, in seconds.
+
+        """
+        start = time.time()
+        yield self._conn.write_message(
+            back_msg.SerializeToString(), binary=True)
+
+        while True:
+            data = yield self._conn.read_message()
+            if data is None:
+                raise IOError('Connection closed')
+
+            self.bytes_received += len(data)
+
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            if _is_report_finished(msg):
+                raise tornado.gen.Return(time.time() - start)
+
+    def close(self):
+        self._conn.close()
+
+
+class _Stats(object):
+    """Resource usage between two points in time."""
+
+    def __init__(self, browsers):
+        self._browsers = browsers
+        self._wall = time.time()
+        self._process_cpu = time.process_time()
+        # Called on the browsers' thread.
+        self._browser_cpu = time.thread_time()
+        self._bytes = self._get_bytes_received()
+
+    def _get_bytes_received(self):
+        return sum(browser.bytes_received for browser in self._browsers)
+
+    def finish(self):
+        self.wall = time.time() - self._wall
+        self.server_cpu = (
+            time.process_time() - self._process_cpu -
+            (time.thread_time() - self._browser_cpu))
+        self.bytes_received = self._get_bytes_received() - self._bytes
+        self.peak_rss_mb = (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0)
+
+
+@tornado.gen.coroutine
+def _run_browsers(url, script_path, connection_counts, num_rounds):
+    browsers = []
+
+    print('%6s %14s %9s %9s %9s %9s %9s %9s %9s' % (
+        'conns', 'message', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'msgs/s',
+        'KB/msg', 'CPU (%)', 'RSS (MB)'))
+
+    for count in connection_counts:
+        while len(browsers) < count:
+            browser = _SimulatedBrowser()
+            yield browser.connect(url)
+            browsers.append(browser)
+
+        # Run the script once, so every session has its widgets set up.
+        yield [browser.request(_create_rerun_msg(script_path))
+               for browser in browsers]
+
+        for msg_type in ['rerun_script', 'update_widgets']:
+            latencies = []
+            stats = _Stats(browsers)
+
+            for i in range(num_rounds):
+                if msg_type == 'rerun_script':
+                    back_msg = _create_rerun_msg(script_path)
+                else:
+                    back_msg = _create_update_widgets_msg('user %s' % i)
+
+                round_latencies = yield [
+                    browser.request(back_msg) for browser in browsers]
+                latencies.extend(round_latencies)
+
+            stats.finish()
+
+            print('%6d %14s %9.1f %9.1f %9.1f %9.1f %9.1f %9.1f %9.1f' % (
+                count,
+                msg_type,
+                _percentile(latencies, 50) * 1000,
+                _percentile(latencies, 95) * 1000,
+                _percentile(latencies, 99) * 1000,
+                len(latencies) / stats.wall,
+                stats.bytes_received / 1024.0 / len(latencies),
+                stats.server_cpu / stats.wall * 100,
+                stats.peak_rss_mb))
+
+    for browser in browsers:
+        browser.close()
+
+
+def _run_browsers_thread(server, server_ioloop, port, script_path, args):
+    ioloop = tornado.ioloop.IOLoop()
+    ioloop.make_current()
+
+    url = 'ws://localhost:%s/stream' % port
+    try:
+        ioloop.run_sync(lambda: _run_browsers(
+            url, script_path, args.connections, args.rounds))
+    finally:
+        server_ioloop.add_callback(server.stop)
+
+
+def main(args):
+    script = tempfile.NamedTemporaryFile(
+        mode='w', suffix='.py', delete=False)
+    script.write(SCRIPT % {'rows': args.rows})
+    script.close()
+
+    port = _get_free_port()
+    config.set_option('server.port', port)
+    config.set_option('global.developmentMode', False)
+
+    # Don't prompt for an email, like `streamlit run` would.
+    Credentials.get_current().activation = Activation(None, '', True)
+
+    ioloop = tornado.ioloop.IOLoop.current()
+    server = Server(ioloop, script.name, [])
+
+    def on_started(_):
+        threading.Thread(
+            target=_run_browsers_thread,
+            args=(server, ioloop, port, script.name, args),
+            name='SimulatedBrowsers').start()
+
+    server.start(on_started)
+
+    try:
+        ioloop.start()
+    finally:
+        os.unlink(script.name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        'connections', type=int, nargs='*',
+        default=DEFAULT_CONNECTION_COUNTS,
+        help='Numbers of simultaneous browsers to measure.')
+    parser.add_argument(
+        '--rounds', type=int, default=DEFAULT_ROUNDS,
+        help='BackMsgs each browser sends, per message type.')
+    parser.add_argument(
+        '--rows', type=int, default=DEFAULT_ROWS,
+        help='Rows of the DataFrame the script displays.')
+    main(parser.parse_args())
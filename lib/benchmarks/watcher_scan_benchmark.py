@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure what LocalSourcesWatcher.update_watched_modules costs per rerun.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/watcher_scan_benchmark.py [MODULE ...]
+
+This imports the given modules (by default, a typical scientific stack), and
+times update_watched_modules(), which a session calls after every successful
+script run, in three cases:
+
+- first scan: a new watcher looks at every module in sys.modules.
+- new import: the script imported one more module since the last scan.
+- no change: the script imported nothing new.
+"""
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+from streamlit.Report import Report
+from streamlit.watcher.LocalSourcesWatcher import LocalSourcesWatcher
+
+DEFAULT_MODULES = [
+    'numpy', 'pandas', 'altair', 'matplotlib.pyplot', 'scipy.stats',
+    'sklearn.linear_model',
+]
+NUM_RUNS = 20
+
+
+def _import_modules(module_names):
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            print('Skipping %s: not installed' % name)
+
+
+def _time(func):
+    """Return the mean milliseconds that func takes."""
+    start = time.time()
+    for _ in range(NUM_RUNS):
+        func()
+    return (time.time() - start) / NUM_RUNS * 1000
+
+
+def main(module_names):
+    _import_modules(module_names)
+
+    # Watchers only look at files in the script's folder, which only has
+    # the script.
+    script_folder = tempfile.mkdtemp()
+    script_path = os.path.join(script_folder, 'script.py')
+    open(script_path, 'w').close()
+    report = Report(script_path, [])
+
+    def on_file_changed():
+        pass
+
+    watchers = []
+
+    def first_scan():
+        watcher = LocalSourcesWatcher(report, on_file_changed)
+        watchers.append(watcher)
+        watcher.update_watched_modules()
+
+    watcher = LocalSourcesWatcher(report, on_file_changed)
+    watchers.append(watcher)
+    watcher.update_watched_modules()
+
+    counter = [0]
+
+    def new_import():
+        counter[0] += 1
+        name = '_watcher_scan_benchmark_%s' % counter[0]
+        sys.modules[name] = types.ModuleType(name)
+        watcher.update_watched_modules()
+
+    print('Modules: %s' % len(sys.modules))
+    print('%12s %10s' % ('scan', 'ms'))
+
+    try:
+        for label, func in [
+                ('first scan', first_scan),
+                ('new import', new_import),
+                ('no change', watcher.update_watched_modules)]:
+            print('%12s %10.2f' % (label, _time(func)))
+    finally:
+        for w in watchers:
+            w.close()
+        shutil.rmtree(script_folder)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_MODULES)
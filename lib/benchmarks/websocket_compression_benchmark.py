@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the cost and benefit of WebSocket compression on ForwardMsgs.
+
+Run from the lib/ folder:
+
+    $ python benchmarks/websocket_compression_benchmark.py
+
+For a few representative ForwardMsgs, this compresses the serialized message
+the same way Tornado's permessage-deflate extension does, at several
+compression levels, and prints the compression ratio and CPU time per MB.
+Use it to pick server.websocketCompressionLevel and
+server.websocketCompressionMinSize.
+"""
+
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from streamlit.elements import data_frame_proto
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+COMPRESSION_LEVELS = [1, 3, 6, 9]
+REPETITIONS = 5
+
+# Tornado's defaults for permessage-deflate.
+MAX_WBITS = zlib.MAX_WBITS
+MEM_LEVEL = 8
+
+
+def _create_data_frame_msg(df):
+    msg = ForwardMsg()
+    data_frame_proto.marshall_data_frame(
+        df, msg.delta.new_element.data_frame)
+    return msg
+
+
+def _create_image_msg(num_bytes):
+    # Already-compressed image data (e.g. JPEG/PNG) looks like random bytes.
+    msg = ForwardMsg()
+    img = msg.delta.new_element.imgs.imgs.add()
+    img.data.base64 = np.random.bytes(num_bytes).hex()
+    return msg
+
+
+def _create_text_msg(num_chars):
+    msg = ForwardMsg()
+    msg.delta.new_element.text.body = 'Lorem ipsum dolor sit amet. ' * (
+        num_chars // 28 + 1)
+    return msg
+
+
+def _get_payloads():
+    num_rows = 20000
+    return [
+        ('small text', _create_text_msg(200).SerializeToString()),
+        ('markdown', _create_text_msg(20000).SerializeToString()),
+        ('random floats', _create_data_frame_msg(pd.DataFrame(
+            np.random.randn(num_rows, 5))).SerializeToString()),
+        ('ints+strings', _create_data_frame_msg(pd.DataFrame({
+            'id': np.arange(num_rows),
+            'category': np.random.choice(['red', 'green', 'blue'], num_rows),
+            'count': np.random.randint(0, 100, num_rows),
+        })).SerializeToString()),
+        ('image', _create_image_msg(200000).SerializeToString()),
+    ]
+
+
+def _compress(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -MAX_WBITS, MEM_LEVEL)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def main():
+    print('%14s %10s %6s %10s %12s' % (
+        'payload', 'size (KB)', 'level', 'ratio', 'CPU (ms/MB)'))
+
+    for name, data in _get_payloads():
+        for level in COMPRESSION_LEVELS:
+            start = time.process_time()
+            for _ in range(REPETITIONS):
+                compressed = _compress(data, level)
+            cpu = (time.process_time() - start) / REPETITIONS
+
+            print('%14s %10.1f %6d %10.2f %12.2f' % (
+                name,
+                len(data) / 1024.0,
+                level,
+                float(len(data)) / len(compressed),
+                cpu * 1000 / (len(data) / 1024.0 / 1024.0)))
+
+
+if __name__ == '__main__':
+    main()
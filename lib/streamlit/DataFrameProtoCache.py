@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Keeps the serialized DataFrame protos of recently marshalled DataFrames.
+
+Scripts usually display the same DataFrames on every rerun, and charts often
+display the same DataFrame several times. marshall_data_frame fingerprints
+the contents of large DataFrames, and reuses the proto it marshalled the last
+time it saw the same contents, rather than converting every value again.
+
+The cache is shared by all sessions, since the same contents always
+marshall to the same proto.
+"""
+
+import collections
+import threading
+
+
+class DataFrameProtoCache(object):
+    """A thread-safe LRU cache of serialized DataFrame protos, keyed by the
+    fingerprints of the DataFrames they were marshalled from.
+
+    The cache is bounded by the total size of the protos it holds.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._protos = collections.OrderedDict()
+        self._num_bytes = 0
+
+    def get(self, fingerprint):
+        """Return the serialized proto with the given fingerprint, or None
+        if there isn't one.
+        """
+        with self._lock:
+            data = self._protos.pop(fingerprint, None)
+            if data is not None:
+                # Mark it as the most recently used.
+                self._protos[fingerprint] = data
+            return data
+
+    def add(self, fingerprint, data):
+        """Store a serialized proto.
+
+        Protos bigger than the whole cache aren't stored. Otherwise, the
+        least recently used protos are dropped to make room for it.
+
+        Parameters
+        ----------
+        fingerprint : bytes
+            The fingerprint of the DataFrame data was marshalled from.
+        data : bytes
+            The serialized proto.DataFrame.
+
+        """
+        if len(data) > self._max_bytes:
+            return
+
+        with self._lock:
+            old_data = self._protos.pop(fingerprint, None)
+            if old_data is not None:
+                self._num_bytes -= len(old_data)
+
+            self._protos[fingerprint] = data
+            self._num_bytes += len(data)
+
+            while self._num_bytes > self._max_bytes:
+                _, dropped = self._protos.popitem(last=False)
+                self._num_bytes -= len(dropped)
+
+    def clear(self):
+        """Drop all protos."""
+        with self._lock:
+            self._protos.clear()
+            self._num_bytes = 0
+
+    @property
+    def num_bytes(self):
+        """The total size of the stored protos."""
+        return self._num_bytes
+
+    def __len__(self):
+        return len(self._protos)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Keeps the DataFrames of a session's windowed st.dataframe elements.
+
+When a DataFrame has more rows than global.dataFrameWindowRows, st.dataframe
+only sends the browser its first rows, and stores the DataFrame here. The
+browser then asks for other rows as the user scrolls, with a
+BackMsg.data_frame_window.
+
+add_rows on such an element appends the new rows here as a separate chunk,
+rather than concatenating them with the whole DataFrame. Chunks are only
+concatenated to marshall the rows of a window that spans several of them.
+"""
+
+import bisect
+import collections
+import threading
+import uuid
+
+# How many DataFrames a session keeps. When a script displays more windowed
+# DataFrames than this, the least recently used ones are dropped, and the
+# browser can no longer scroll through them.
+MAX_DATA_FRAMES = 20
+
+
+class DataFrameStore(object):
+    """A thread-safe LRU store of DataFrames, keyed by DataFrameWindow.id.
+
+    DataFrames are stored by reference, not copied.
+    """
+
+    def __init__(self, max_data_frames=MAX_DATA_FRAMES):
+        self._max_data_frames = max_data_frames
+        self._lock = threading.Lock()
+        # Map: window id -> _ChunkedDataFrame
+        self._data_frames = collections.OrderedDict()
+
+    def add(self, df):
+        """Store a DataFrame.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+
+        Returns
+        -------
+        str
+            The DataFrame's DataFrameWindow.id.
+
+        """
+        window_id = uuid.uuid4().hex
+        with self._lock:
+            self._data_frames[window_id] = _ChunkedDataFrame(df)
+            while len(self._data_frames) > self._max_data_frames:
+                self._data_frames.popitem(last=False)
+        return window_id
+
+    def get(self, window_id):
+        """Return the DataFrame with the given id, or None if there isn't
+        one.
+
+        If rows were appended to it, this concatenates them.
+        """
+        with self._lock:
+            chunked_df = self._get(window_id)
+            if chunked_df is None:
+                return None
+            return chunked_df.get_rows(0, len(chunked_df))
+
+    def append(self, window_id, df, max_rows=0):
+        """Append rows to the DataFrame with the given id.
+
+        Parameters
+        ----------
+        window_id : str
+        df : pandas.DataFrame
+            The rows to append. They're stored by reference, not copied.
+        max_rows : int
+            If positive, drop rows from the start of the DataFrame so that
+            it has at most this many.
+
+        Returns
+        -------
+        bool
+            False if there is no DataFrame with this id.
+
+        Raises
+        ------
+        ValueError
+            If df has a different number of columns.
+
+        """
+        with self._lock:
+            chunked_df = self._get(window_id)
+            if chunked_df is None:
+                return False
+            chunked_df.append(df, max_rows)
+            return True
+
+    def remove(self, window_id):
+        """Drop the DataFrame with the given id, if there is one."""
+        with self._lock:
+            self._data_frames.pop(window_id, None)
+
+    def clear(self):
+        """Drop all DataFrames."""
+        with self._lock:
+            self._data_frames.clear()
+
+    def marshall_window(self, window_id, start, num_rows, proto_df):
+        """Marshall some rows of a stored DataFrame.
+
+        Parameters
+        ----------
+        window_id : str
+        start : int | None
+            The first row to marshall. If None, this is the start of the
+            window that was marshalled last, so the browser gets the rows it
+            was showing again, e.g. after rows were appended.
+        num_rows : int
+            How many rows to marshall, at most.
+        proto_df : proto.DataFrame
+            The output.
+
+        Returns
+        -------
+        bool
+            False if there is no DataFrame with this id. It was evicted, or
+            belongs to another session.
+
+        """
+        import streamlit.elements.data_frame_proto as data_frame_proto
+
+        with self._lock:
+            chunked_df = self._get(window_id)
+            if chunked_df is None:
+                return False
+
+            if start is None:
+                start = chunked_df.window_start
+            start = min(start, len(chunked_df))
+            chunked_df.window_start = start
+
+            # The rows are sliced out under the lock, since add_rows may
+            # append to the DataFrame from the script thread.
+            window_df = chunked_df.get_rows(start, num_rows)
+            total_rows = len(chunked_df)
+
+        data_frame_proto.marshall_data_frame_window(
+            window_df, window_id, start, total_rows, proto_df)
+        return True
+
+    def _get(self, window_id):
+        """Return the _ChunkedDataFrame with the given id, or None.
+
+        The caller must hold _lock.
+        """
+        chunked_df = self._data_frames.pop(window_id, None)
+        if chunked_df is not None:
+            # Mark it as the most recently used.
+            self._data_frames[window_id] = chunked_df
+        return chunked_df
+
+    def __len__(self):
+        return len(self._data_frames)
+
+
+class _ChunkedDataFrame(object):
+    """A DataFrame that's stored as the chunks it was appended in.
+
+    Rows are numbered as if the chunks were concatenated. Rows dropped from
+    the start by max_rows are skipped.
+    """
+
+    def __init__(self, df):
+        self._chunks = [df]
+
+        # _ends[i] is the number of rows in _chunks[:i + 1], plus the rows
+        # of chunks that were dropped before them. For bisecting.
+        self._ends = [len(df)]
+
+        # The number of rows dropped from the start.
+        self._num_dropped_rows = 0
+
+        # The first row of the window that was marshalled last.
+        self.window_start = 0
+
+    def append(self, df, max_rows):
+        if len(df.columns) != len(self._chunks[0].columns):
+            raise ValueError('Dataframes have incompatible shapes')
+
+        self._chunks.append(df)
+        self._ends.append(self._ends[-1] + len(df))
+
+        if max_rows > 0 and len(self) > max_rows:
+            self._num_dropped_rows = self._ends[-1] - max_rows
+            num_dropped_chunks = bisect.bisect_right(
+                self._ends, self._num_dropped_rows)
+            del self._chunks[:num_dropped_chunks]
+            del self._ends[:num_dropped_chunks]
+
+    def get_rows(self, start, num_rows):
+        """Return num_rows rows at most, starting at start, as a DataFrame.
+
+        This only concatenates the chunks that the rows come from.
+        """
+        import pandas as pd
+
+        first_row = self._num_dropped_rows + start
+        stop_row = min(first_row + num_rows, self._ends[-1])
+
+        pieces = []
+        i = bisect.bisect_right(self._ends, first_row)
+        while i < len(self._chunks):
+            chunk = self._chunks[i]
+            chunk_start = self._ends[i] - len(chunk)
+            if chunk_start >= stop_row:
+                break
+            if first_row <= chunk_start and self._ends[i] <= stop_row:
+                pieces.append(chunk)
+            else:
+                pieces.append(chunk.iloc[
+                    max(first_row - chunk_start, 0):stop_row - chunk_start])
+            i += 1
+
+        if not pieces:
+            return self._chunks[-1].iloc[0:0]
+        if len(pieces) == 1:
+            return pieces[0]
+
+        # Keep the result, so the chunks don't have to be concatenated
+        # again if these are all the rows.
+        df = pd.concat(pieces)
+        if start == 0 and stop_row == self._ends[-1]:
+            self._chunks = [df]
+            self._ends = [self._ends[-1]]
+        return df
+
+    def __len__(self):
+        return self._ends[-1] - self._num_dropped_rows
@@ -30,7 +30,9 @@ from datetime import datetime
 from datetime import date
 from datetime import time
 
+from streamlit import config
 from streamlit import metrics
+from streamlit.ForwardMsgCache import set_payload_key
 from streamlit.proto import Balloons_pb2
 from streamlit.proto import BlockPath_pb2
 from streamlit.proto import ForwardMsg_pb2
@@ -194,6 +196,10 @@ class DeltaGenerator(object):
         self._container = container
         self._path = path
 
+        # The window id of this DeltaGenerator's element, if it's a
+        # windowed st.dataframe. See dataframe().
+        self._data_frame_window = None
+
     # Protected (should be used only by Streamlit, not by users).
     def _reset(self):
         """Reset delta generator so it starts from index 0."""
@@ -201,7 +207,7 @@ class DeltaGenerator(object):
         self._id = 0
 
     def _enqueue_new_element_delta(self, marshall_element, elementWidth=None,
-                                   elementHeight=None):
+                                   elementHeight=None, get_payload_key=None):
         """Create NewElement delta, fill it, and enqueue it.
 
         Parameters
@@ -212,6 +218,9 @@ class DeltaGenerator(object):
             Desired width for the element
         elementHeight : int or None
             Desired height for the element
+        get_payload_key : callable or None
+            Called after marshall_element. Returns a key that the NewElement
+            only depends on, or None. See ForwardMsgCache.set_payload_key.
 
         Returns
         -------
@@ -243,6 +252,10 @@ class DeltaGenerator(object):
                 msg.metadata.element_dimension_spec.width = elementWidth
             if elementHeight is not None:
                 msg.metadata.element_dimension_spec.height = elementHeight
+            payload_key = (
+                get_payload_key() if get_payload_key is not None else None)
+            if payload_key is not None:
+                set_payload_key(msg, payload_key)
 
         # "Null" delta generators (those without queues), don't send anything.
         if self._enqueue is None:
@@ -254,6 +267,8 @@ class DeltaGenerator(object):
                 self._enqueue, msg.metadata.delta_id, is_root=False)
         else:
             output_dg = self
+            # The element replaces whatever was here before.
+            self._data_frame_window = None
 
         kind = msg.delta.new_element.WhichOneof('type')
         m = metrics.Client.get('streamlit_enqueue_deltas_total')
@@ -668,10 +683,40 @@ class DeltaGenerator(object):
         """
         import streamlit.elements.data_frame_proto as data_frame_proto
 
+        window_rows = config.get_option('global.dataFrameWindowRows')
+        window_id = None
+        store = None
+        if window_rows > 0:
+            ctx = get_report_ctx()
+            store = ctx.data_frame_store if ctx is not None else None
+            # Styles may depend on the whole DataFrame, so Stylers aren't
+            # windowed.
+            if store is not None and not data_frame_proto.is_pandas_styler(
+                    data):
+                data = data_frame_proto.convert_anything_to_df(data)
+                if len(data) > window_rows:
+                    window_id = store.add(data)
+
+        # Sessions that display the same DataFrame share its serialized
+        # delta. See ForwardMsgCache.set_payload_key.
+        payload_key = [None]
+
         def set_data_frame(delta):
-            data_frame_proto.marshall_data_frame(data, delta.data_frame)
+            if window_id is None:
+                fingerprint = data_frame_proto.marshall_data_frame(
+                    data, delta.data_frame)
+                if fingerprint is not None:
+                    payload_key[0] = ('data_frame', fingerprint)
+            else:
+                store.marshall_window(
+                    window_id, 0, window_rows, delta.data_frame)
 
-        return self._enqueue_new_element_delta(set_data_frame, width, height)
+        dg = self._enqueue_new_element_delta(
+            set_data_frame, width, height,
+            get_payload_key=lambda: payload_key[0])
+        if window_id is not None and not dg._is_root:
+            dg._data_frame_window = window_id
+        return dg
 
     # TODO: Either remove this or make it public. This is only used in the
     # mnist demo right now.
@@ -1939,8 +1984,7 @@ class DeltaGenerator(object):
         import streamlit.elements.deck_gl as deck_gl
         deck_gl.marshall(element.deck_gl_chart, spec, **kwargs)
 
-    @_with_element
-    def table(self, element, data=None):
+    def table(self, data=None):
         """Display a static table.
 
         This differs from `st.dataframe` in that the table in this case is
@@ -1966,9 +2010,21 @@ class DeltaGenerator(object):
 
         """
         import streamlit.elements.data_frame_proto as data_frame_proto
-        data_frame_proto.marshall_data_frame(data, element.table)
 
-    def add_rows(self, data=None, **kwargs):
+        # Sessions that display the same DataFrame share its serialized
+        # delta. See ForwardMsgCache.set_payload_key.
+        payload_key = [None]
+
+        def set_table(element):
+            fingerprint = data_frame_proto.marshall_data_frame(
+                data, element.table)
+            if fingerprint is not None:
+                payload_key[0] = ('table', fingerprint)
+
+        return self._enqueue_new_element_delta(
+            set_table, get_payload_key=lambda: payload_key[0])
+
+    def add_rows(self, data=None, max_rows=None, **kwargs):
         """Concatenate a dataframe to the bottom of the current one.
 
         Parameters
@@ -1977,6 +2033,11 @@ class DeltaGenerator(object):
         or None
             Table to concat. Optional.
 
+        max_rows : int or None
+            If set, only the last max_rows rows of the combined dataframe are
+            kept, and older rows are dropped. Use this for data that's added
+            to indefinitely, like a live chart, so memory use stays bounded.
+
         **kwargs : pandas.DataFrame, numpy.ndarray, Iterable, dict, or None
             The named dataset to concat. Optional. You can only pass in 1
             dataset (including the one in the data parameter).
@@ -2019,6 +2080,12 @@ class DeltaGenerator(object):
         ... }),
         >>> my_chart.add_rows(some_fancy_name=df2)  # <-- name used as keyword
 
+        To keep a chart of only the most recent rows:
+
+        >>> my_chart = st.line_chart(df1)
+        >>> while True:
+        ...     my_chart.add_rows(get_new_rows(), max_rows=1000)
+
         """
         if self._enqueue is None:
             return self
@@ -2040,21 +2107,57 @@ class DeltaGenerator(object):
                 'Wrong number of arguments to add_rows().'
                 'Method requires exactly one dataset')
 
+        if max_rows is None:
+            max_rows = 0
+        elif not isinstance(max_rows, int) or max_rows <= 0:
+            raise ValueError('max_rows must be a positive integer.')
+
+        if self._data_frame_window is not None:
+            return self._add_rows_to_data_frame_window(data, max_rows)
+
         msg = ForwardMsg_pb2.ForwardMsg()
         msg.metadata.parent_block.container = self._container
         msg.metadata.parent_block.path[:] = self._path
         msg.metadata.delta_id = self._id
 
         data_frame_proto.marshall_data_frame(data, msg.delta.add_rows.data)
+        data_frame_proto.trim_rows(msg.delta.add_rows.data, max_rows)
 
         if name:
             msg.delta.add_rows.name = name
             msg.delta.add_rows.has_name = True
+        msg.delta.add_rows.max_rows = max_rows
 
         self._enqueue(msg)
 
         return self
 
+    def _add_rows_to_data_frame_window(self, data, max_rows):
+        """Add rows to a windowed st.dataframe.
+
+        The browser only has some of the rows, so rather than sending an
+        add_rows delta, this appends the rows to the stored DataFrame. Then
+        it sends the browser the window of rows it was last sent again,
+        with the new total.
+        """
+        import streamlit.elements.data_frame_proto as data_frame_proto
+
+        window_id = self._data_frame_window
+        store = get_report_ctx().data_frame_store
+        df = data_frame_proto.convert_anything_to_df(data)
+        if not store.append(window_id, df, max_rows):
+            raise RuntimeError(
+                'Cannot add rows to this DataFrame anymore: it was dropped '
+                'from the server to save memory.')
+
+        msg = ForwardMsg_pb2.ForwardMsg()
+        window_rows = config.get_option('global.dataFrameWindowRows')
+        if store.marshall_window(
+                window_id, None, window_rows, msg.data_frame_window):
+            self._enqueue(msg)
+
+        return self
+
 
 def _clean_text(text):
     return textwrap.dedent(str(text)).strip()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A content-addressed cache of ForwardMsg payloads.
+
+ForwardMsgs are identified by a hash of their payload, i.e. everything but
+their metadata. When a browser has already received a message with a given
+hash, the server sends it a small reference message (with `ref_hash` set)
+instead of the whole payload.
+
+The hash is computed from the serialized payload. Sessions run their scripts
+separately, so they never share messages, and telling whether two messages
+are identical takes about as long as serializing them. Instead, messages whose
+payload is known to depend only on some key can be tagged with it (see
+set_payload_key), and the sessions of the server share their serialized
+payloads and hashes through a PayloadCache. st.dataframe and st.table do so
+with the fingerprints of the DataFrameProtoCache.
+"""
+
+import collections
+import hashlib
+import threading
+import weakref
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.server.server_util import WIRETYPE_LENGTH_DELIMITED
+from streamlit.server.server_util import encode_varint
+
+# Wire-format tag of ForwardMsg.delta. See serialize_payload.
+_DELTA_TAG = bytes(bytearray([
+    ForwardMsg.DESCRIPTOR.fields_by_name['delta'].number << 3 |
+    WIRETYPE_LENGTH_DELIMITED]))
+
+
+# Map: id(msg) -> (weak reference to msg, payload key of msg). See
+# set_payload_key.
+_payload_keys = {}
+# Reentrant, since the garbage collector can drop a message, and call its
+# weak reference's callback, while the lock is held.
+_payload_keys_lock = threading.RLock()
+
+
+def set_payload_key(msg, key):
+    """Say that the payload of a ForwardMsg only depends on the given key.
+
+    Messages with the same key are serialized and hashed once, for every
+    session. The key is forgotten when the message is garbage collected, so
+    it must not be changed after this.
+
+    Parameters
+    ----------
+    msg : ForwardMsg
+        A message for which is_cacheable_msg() is True.
+    key : hashable
+        Identifies the payload. It must be different for any payload that
+        would serialize differently.
+
+    """
+    msg_id = id(msg)
+
+    def forget_payload_key(msg_ref):
+        with _payload_keys_lock:
+            if _payload_keys.get(msg_id, (None,))[0] is msg_ref:
+                del _payload_keys[msg_id]
+
+    with _payload_keys_lock:
+        _payload_keys[msg_id] = (weakref.ref(msg, forget_payload_key), key)
+
+
+def get_payload_key(msg):
+    """Return the key given to a ForwardMsg by set_payload_key, or None."""
+    with _payload_keys_lock:
+        msg_ref, key = _payload_keys.get(id(msg), (None, None))
+    if msg_ref is None or msg_ref() is not msg:
+        return None
+    return key
+
+
+def is_cacheable_msg(msg):
+    """True if the given ForwardMsg is a candidate for caching.
+
+    Only deltas are cached: they're the only messages that carry significant
+    payloads, and that are sent again with the same contents.
+
+    Parameters
+    ----------
+    msg : ForwardMsg
+
+    """
+    return msg.WhichOneof('type') == 'delta'
+
+
+def serialize_payload(msg):
+    """Serialize a cacheable ForwardMsg without its metadata.
+
+    This doesn't modify the message, so it's safe to call off the IOLoop.
+
+    Parameters
+    ----------
+    msg : ForwardMsg
+        A message for which is_cacheable_msg() is True.
+
+    Returns
+    -------
+    bytes
+        The serialized payload. Since protobuf messages can be concatenated,
+        this can be sent to the browser as-is after a serialized ForwardMsg
+        containing just the metadata and hash. See serialize_cacheable_msg.
+
+    """
+    # A ForwardMsg holding nothing but a delta serializes to the delta's
+    # field tag, its length, and the delta itself.
+    delta_str = msg.delta.SerializeToString()
+    return _DELTA_TAG + encode_varint(len(delta_str)) + delta_str
+
+
+def compute_hash(payload):
+    """Return the hash that identifies a serialized payload.
+
+    Parameters
+    ----------
+    payload : bytes
+        The output of serialize_payload().
+
+    Returns
+    -------
+    str
+
+    """
+    return hashlib.md5(payload).hexdigest()
+
+
+def serialize_cacheable_msg(metadata, msg_hash, payload):
+    """Serialize a ForwardMsg that the browser should cache.
+
+    Parameters
+    ----------
+    metadata : ForwardMsgMetadata
+        The message's metadata.
+    msg_hash : str
+        The hash of the payload.
+    payload : bytes
+        The output of serialize_payload().
+
+    Returns
+    -------
+    bytes
+
+    """
+    header = ForwardMsg()
+    header.metadata.CopyFrom(metadata)
+    header.metadata.cacheable = True
+    header.hash = msg_hash
+    return header.SerializeToString() + payload
+
+
+def create_reference_msg(metadata, msg_hash):
+    """Create a ForwardMsg that refers to a message the browser has cached.
+
+    Parameters
+    ----------
+    metadata : ForwardMsgMetadata
+        The metadata to use when handling the cached message. (The same
+        payload can be delivered to different delta_ids.)
+    msg_hash : str
+        The hash of the cached message's payload.
+
+    Returns
+    -------
+    ForwardMsg
+
+    """
+    ref_msg = ForwardMsg()
+    ref_msg.metadata.CopyFrom(metadata)
+    ref_msg.ref_hash = msg_hash
+    return ref_msg
+
+
+class PayloadCache(object):
+    """A thread-safe LRU cache of serialized payloads and their hashes, keyed
+    by payload key. See set_payload_key.
+
+    The cache is shared by all sessions, and bounded by the total size of
+    the payloads it holds.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._payloads = collections.OrderedDict()
+        self._num_bytes = 0
+
+    def get(self, key):
+        """Return the (msg_hash, payload) pair with the given key, or None if
+        there isn't one.
+        """
+        with self._lock:
+            entry = self._payloads.pop(key, None)
+            if entry is not None:
+                # Mark it as the most recently used.
+                self._payloads[key] = entry
+            return entry
+
+    def add(self, key, msg_hash, payload):
+        """Store a serialized payload and its hash.
+
+        Payloads bigger than the whole cache aren't stored. Otherwise, the
+        least recently used payloads are dropped to make room for it.
+
+        Parameters
+        ----------
+        key : hashable
+        msg_hash : str
+            The output of compute_hash().
+        payload : bytes
+            The output of serialize_payload().
+
+        """
+        if len(payload) > self._max_bytes:
+            return
+
+        with self._lock:
+            old_entry = self._payloads.pop(key, None)
+            if old_entry is not None:
+                self._num_bytes -= len(old_entry[1])
+
+            self._payloads[key] = (msg_hash, payload)
+            self._num_bytes += len(payload)
+
+            while self._num_bytes > self._max_bytes:
+                _, (_, dropped) = self._payloads.popitem(last=False)
+                self._num_bytes -= len(dropped)
+
+    def clear(self):
+        """Drop all payloads."""
+        with self._lock:
+            self._payloads.clear()
+            self._num_bytes = 0
+
+    def __len__(self):
+        return len(self._payloads)
+
+
+class ForwardMsgCache(object):
+    """The hashes of the cacheable ForwardMsgs each session's browser has.
+
+    Each session's browser keeps a bounded LRU cache of the messages it
+    received. We mirror that LRU here, per session: since the browser sees the
+    exact same sequence of cacheable and reference messages that we produce,
+    both sides evict the same hashes, and we never refer to a message the
+    browser no longer has.
+
+    Only the hashes are kept. The payloads live in the browsers, and in the
+    PayloadCache for messages that have a payload key.
+
+    This class is not thread safe. It should only be used on the IOLoop.
+    """
+
+    def __init__(self):
+        # Map: session -> OrderedDict of the hashes that session's browser
+        # has, from least to most recently used. (The dict values are unused.)
+        self._session_hashes = {}
+
+    def add_message(self, msg_hash, session, max_session_entries):
+        """Record that a session's browser received the message with the
+        given hash.
+
+        This must be called whenever the message is sent to the browser,
+        either in full or as a reference, so that it becomes the session's
+        most recently used entry.
+
+        Parameters
+        ----------
+        msg_hash : str
+        session : ReportSession
+        max_session_entries : int
+            The capacity of the browser's cache. The session's least recently
+            used entries are dropped beyond this.
+
+        """
+        session_hashes = self._session_hashes.setdefault(
+            session, collections.OrderedDict())
+        # Re-insert the hash to move it to the end (most recently used).
+        session_hashes.pop(msg_hash, None)
+        session_hashes[msg_hash] = None
+
+        while len(session_hashes) > max_session_entries:
+            session_hashes.popitem(last=False)
+
+    def has_message_reference(self, msg_hash, session):
+        """True if the session's browser has the message with the given hash.
+
+        Parameters
+        ----------
+        msg_hash : str
+        session : ReportSession
+
+        """
+        return msg_hash in self._session_hashes.get(session, ())
+
+    def remove_session(self, session):
+        """Forget everything a session's browser received.
+
+        Parameters
+        ----------
+        session : ReportSession
+
+        """
+        self._session_hashes.pop(session, None)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self._session_hashes.clear()
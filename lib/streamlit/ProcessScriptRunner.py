@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from blinker import Signal
+
+from streamlit.ScriptRunner import ScriptRunnerEvent
+from streamlit.ScriptWorkerPool import MSG_EVENT
+from streamlit.ScriptWorkerPool import MSG_FORWARD_MSG
+from streamlit.ScriptWorkerPool import MSG_IDLE
+from streamlit.ScriptWorkerPool import MSG_MODULES
+from streamlit.ScriptWorkerPool import MSG_RELEASE
+from streamlit.ScriptWorkerPool import MSG_REQUEST
+from streamlit.ScriptWorkerPool import MSG_START
+from streamlit.ScriptWorkerPool import parse_widget_states
+from streamlit.ScriptWorkerPool import serialize_rerun_data
+from streamlit.logger import get_logger
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+LOGGER = get_logger(__name__)
+
+
+class ProcessScriptRunner(object):
+    """A ScriptRunner that runs the script in a ScriptWorkerPool process.
+
+    This has the same interface as ScriptRunner. It checks out a worker when
+    it starts, forwards the ScriptRequestQueue to it, and relays the worker's
+    ForwardMsgs and ScriptRunnerEvents back, until the queue is empty and the
+    worker has nothing left to run.
+
+    Requests are forwarded as soon as they're enqueued, so the relay thread
+    only ever waits for the worker.
+    """
+
+    def __init__(self, report, enqueue, widget_states, request_queue, pool):
+        """Initialize the ProcessScriptRunner.
+
+        (The ProcessScriptRunner won't start executing until start() is
+        called.)
+
+        Parameters
+        ----------
+        report : Report
+            The ReportSession's report.
+
+        enqueue : callable
+            Function that enqueues ForwardMsgs to the ReportSession's
+            browser queue.
+
+        widget_states : streamlit.proto.Widget_pb2.WidgetStates
+            The ReportSession's current widget states
+
+        request_queue : ScriptRequestQueue
+            The queue that the ReportSession is publishing ScriptRequests to.
+
+        pool : ScriptWorkerPool
+            The pool to check out a worker from.
+
+        """
+        self._report = report
+        self._enqueue = enqueue
+        self._widget_states = widget_states
+        self._request_queue = request_queue
+        self._pool = pool
+
+        self.on_event = Signal(
+            doc="""Emitted when a ScriptRunnerEvent occurs.
+
+            See ScriptRunner.on_event.
+            """)
+
+        self.on_modules_imported = Signal(
+            doc="""Emitted when the worker reports the local modules that the
+            script imported, which the server's sys.modules doesn't have.
+
+            Parameters
+            ----------
+            modules : dict
+                Map: module name -> the path of its file.
+            """)
+
+        # This is initialized in start()
+        self._thread = None
+
+        # Guards _worker and _num_requests_sent, which are used from both the
+        # relay thread and the threads that enqueue requests.
+        self._lock = threading.Lock()
+        # The worker that requests are forwarded to, while we're relaying.
+        self._worker = None
+        self._num_requests_sent = 0
+
+    def start(self):
+        """Start a new thread to relay requests and messages.
+
+        This must be called only once.
+
+        """
+        if self._thread is not None:
+            raise Exception('ProcessScriptRunner was already started')
+
+        # A daemon, so that one still waiting for a worker doesn't keep the
+        # server from exiting.
+        self._thread = threading.Thread(
+            target=self._process_request_queue,
+            name='ProcessScriptRunner.relayThread')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def maybe_handle_execution_control_request(self):
+        # Requests are handled by the ScriptRunner in the worker process.
+        pass
+
+    def _process_request_queue(self):
+        """Run the script in a worker until the request queue is empty.
+
+        This is run in a separate thread.
+
+        """
+        worker = self._pool.acquire()
+        widget_states = self._widget_states
+
+        if worker is None:
+            # The server is shutting down.
+            self.on_event.send(
+                ScriptRunnerEvent.SHUTDOWN, widget_states=widget_states)
+            return
+
+        try:
+            widget_states = self._relay(worker, widget_states)
+            worker.send((MSG_RELEASE,))
+            self._pool.release(worker)
+
+        except (EOFError, IOError) as e:
+            LOGGER.warning('Script worker exited unexpectedly: %s', e)
+            self._pool.discard(worker)
+
+            # Surface the crash like a compile error, so the browser shows
+            # it and stops waiting for the run to finish.
+            self.on_event.send(
+                ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+                exception=RuntimeError(
+                    'The process running this script exited unexpectedly.'))
+
+        self.on_event.send(
+            ScriptRunnerEvent.SHUTDOWN, widget_states=widget_states)
+
+    def _relay(self, worker, widget_states):
+        """Relay requests to the worker and messages from it until it's idle.
+
+        Returns
+        -------
+        streamlit.proto.Widget_pb2.WidgetStates
+            The widget states after the last script run.
+
+        """
+        worker.send((
+            MSG_START,
+            self._report.script_path,
+            self._report.argv,
+            widget_states.SerializeToString()))
+
+        self._request_queue.on_enqueue.connect(self._on_request_enqueued)
+
+        try:
+            with self._lock:
+                self._worker = worker
+                self._forward_requests()
+
+            while True:
+                msg = worker.recv()
+                msg_type = msg[0]
+
+                if msg_type == MSG_FORWARD_MSG:
+                    forward_msg = ForwardMsg()
+                    forward_msg.ParseFromString(msg[1])
+                    self._enqueue(forward_msg)
+
+                elif msg_type == MSG_EVENT:
+                    _, event, exception = msg
+                    self.on_event.send(
+                        ScriptRunnerEvent(event), exception=exception)
+
+                elif msg_type == MSG_MODULES:
+                    self.on_modules_imported.send(msg[1])
+
+                elif msg_type == MSG_IDLE:
+                    _, num_requests, states = msg
+                    widget_states = parse_widget_states(states)
+
+                    # The worker may have gone idle before receiving
+                    # requests that are in flight.
+                    with self._lock:
+                        if (num_requests == self._num_requests_sent and
+                                not self._request_queue.has_request):
+                            # Requests enqueued from now on are left for
+                            # the ReportSession's next ScriptRunner.
+                            self._worker = None
+                            return widget_states
+
+                else:
+                    LOGGER.warning('No handler for "%s"', msg_type)
+
+        finally:
+            self._request_queue.on_enqueue.disconnect(
+                self._on_request_enqueued)
+            with self._lock:
+                self._worker = None
+
+    def _on_request_enqueued(self, request_queue):
+        with self._lock:
+            if self._worker is None:
+                return
+            try:
+                self._forward_requests()
+            except (EOFError, IOError) as e:
+                # The relay thread finds out when it reads from the worker.
+                LOGGER.debug('Failed to forward script request: %s', e)
+
+    def _forward_requests(self):
+        """Send the ScriptRequestQueue's requests to the worker.
+
+        The caller must hold _lock.
+        """
+        while True:
+            request, data = self._request_queue.dequeue()
+            if request is None:
+                return
+            self._worker.send((
+                MSG_REQUEST,
+                request.value,
+                serialize_rerun_data(data)))
+            self._num_requests_sent += 1
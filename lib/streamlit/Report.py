@@ -119,7 +119,10 @@ class Report(object):
         self.argv = cmd_line_list
 
     def enqueue(self, msg):
-        self._master_queue.enqueue(msg)
+        # DataFrame windows are only ever sent to the browser that asked for
+        # them, so don't keep them around for saving the report.
+        if msg.WhichOneof('type') != 'data_frame_window':
+            self._master_queue.enqueue(msg)
         self._browser_queue.enqueue(msg)
 
     def clear(self):
@@ -132,6 +135,23 @@ class Report(object):
 
         self._browser_queue.clear()
 
+    def drop_master_queue(self):
+        """Drop the messages that are kept for saving the report.
+
+        Only the initial message is kept. The master queue fills up again the
+        next time the script runs.
+
+        """
+        initial_msg = self._master_queue.get_initial_msg()
+        self._master_queue.clear()
+        if initial_msg:
+            self._master_queue.enqueue(initial_msg)
+
+    def get_byte_size(self):
+        """Return the serialized size of the messages held by the report."""
+        return (self._master_queue.get_byte_size() +
+                self._browser_queue.get_byte_size())
+
     def flush_browser_queue(self):
         """Clears our browser queue and returns the messages it contained.
 
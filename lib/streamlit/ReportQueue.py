@@ -18,7 +18,6 @@ A queue of ForwardMsg associated with a particular report.
 Whenever possible, message deltas are combined.
 """
 
-import copy
 import threading
 
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
@@ -42,15 +41,26 @@ class ReportQueue(object):
             # where delta_path = (container, parent block path as a string)
             self._delta_index_map = dict()
 
+            # Map: index of a _queue message that only this queue refers
+            # to, which deltas can be composed onto in place -> the lookups
+            # data_frame_proto.add_rows keeps for it.
+            self._owned_indices = dict()
+
     def get_debug(self):
         from google.protobuf.json_format import MessageToDict
+        with self._lock:
+            self._pack_owned_msgs()
         return {
             'queue': [MessageToDict(m) for m in self._queue],
             'ids': list(self._delta_index_map.keys()),
         }
 
     def __iter__(self):
-        return iter(self._queue)
+        with self._lock:
+            # The caller may hold on to these messages, so stop changing them.
+            self._pack_owned_msgs()
+            self._owned_indices.clear()
+            return iter(list(self._queue))
 
     def is_empty(self):
         return len(self._queue) == 0
@@ -83,18 +93,55 @@ class ReportQueue(object):
                 if delta_key in self._delta_index_map:
                     # Combine the previous message into the new message.
                     index = self._delta_index_map[delta_key]
-                    old_msg = self._queue[index]
-                    composed_delta = compose_deltas(old_msg.delta, msg.delta)
-                    new_msg = ForwardMsg()
-                    new_msg.delta.CopyFrom(composed_delta)
-                    new_msg.metadata.CopyFrom(msg.metadata)
-                    self._queue[index] = new_msg
+                    if msg.delta.WhichOneof('type') == 'add_rows':
+                        old_msg = self._get_owned_msg(index)
+                        lookups = self._owned_indices[index]
+                    else:
+                        old_msg = self._queue[index]
+                        lookups = None
+
+                    composed_delta = compose_deltas(
+                        old_msg.delta, msg.delta, lookups)
+                    if composed_delta is old_msg.delta:
+                        old_msg.metadata.CopyFrom(msg.metadata)
+                    else:
+                        self._queue[index] = msg
+                        self._owned_indices.pop(index, None)
                 else:
                     # Append this message to the queue, and store its index
                     # for future combining.
                     self._delta_index_map[delta_key] = len(self._queue)
                     self._queue.append(msg)
 
+    def _get_owned_msg(self, index):
+        """Return the message at the index, copying it first if it's shared.
+
+        Enqueued messages may be in other queues too, so composing onto one
+        in place would change those as well. Once copied, the message can be
+        composed onto in place, so adding rows to it again doesn't copy all
+        the rows it already has.
+        """
+        if index not in self._owned_indices:
+            msg = ForwardMsg()
+            msg.CopyFrom(self._queue[index])
+            self._queue[index] = msg
+            self._owned_indices[index] = {}
+        return self._queue[index]
+
+    def _pack_owned_msgs(self):
+        """Pack the columns that composing add_rows deltas left unpacked.
+
+        See compose_deltas.
+        """
+        import streamlit.elements.data_frame_proto as data_frame_proto
+        for index in self._owned_indices:
+            data_frame_proto.pack_data_frames(self._queue[index].delta)
+
+    def get_byte_size(self):
+        """Return the total serialized size of the queued messages."""
+        with self._lock:
+            return sum(msg.ByteSize() for msg in self._queue)
+
     def clone(self):
         """Return the elements of this ReportQueue as a collections.deque."""
         r = ReportQueue()
@@ -103,11 +150,16 @@ class ReportQueue(object):
             r._queue = list(self._queue)
             r._delta_index_map = dict(self._delta_index_map)
 
+            # Both queues now refer to the same messages.
+            self._pack_owned_msgs()
+            self._owned_indices.clear()
+
         return r
 
     def _clear(self):
         self._queue = []
         self._delta_index_map = dict()
+        self._owned_indices = dict()
 
     def clear(self):
         """Clear this queue."""
@@ -116,17 +168,25 @@ class ReportQueue(object):
 
     def flush(self):
         with self._lock:
+            self._pack_owned_msgs()
             queue = self._queue
             self._clear()
         return queue
 
 
-def compose_deltas(old_delta, new_delta):
+def compose_deltas(old_delta, new_delta, lookups=None):
     """Combines new_delta onto old_delta if possible.
 
     If combination takes place, returns old_delta, since it has the combined
     data. If not, returns new_delta.
 
+    This changes old_delta in place, and only copies the data in new_delta,
+    so composing many add_rows deltas onto one another takes linear time.
+    For that, packed columns are left as repeated fields, which
+    data_frame_proto.pack_data_frames packs again, and lookups keeps where
+    the values of old_delta's dictionaries and MultiIndex levels are. See
+    data_frame_proto.add_rows.
+
     """
     new_delta_type = new_delta.WhichOneof('type')
 
@@ -138,13 +198,16 @@ def compose_deltas(old_delta, new_delta):
 
     elif new_delta_type == 'add_rows':
         import streamlit.elements.data_frame_proto as data_frame_proto
-        # We should make data_frame_proto.add_rows *not* mutate any of the
-        # inputs. In the meantime, we have to deepcopy the input that will be
-        # mutated.
-        composed_delta = copy.deepcopy(old_delta)
         data_frame_proto.add_rows(
-            composed_delta, new_delta, name=new_delta.add_rows.name)
-        return composed_delta
+            old_delta, new_delta, name=new_delta.add_rows.name,
+            max_rows=new_delta.add_rows.max_rows, pack=False,
+            lookups=lookups)
+
+        # The browser may have rows from before old_delta, which it must
+        # still drop.
+        if old_delta.WhichOneof('type') == 'add_rows':
+            old_delta.add_rows.max_rows = new_delta.add_rows.max_rows
+        return old_delta
 
     LOGGER.error('Old delta: %s;\nNew delta: %s;', old_delta, new_delta)
 
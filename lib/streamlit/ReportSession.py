@@ -15,6 +15,8 @@
 
 from enum import Enum
 import sys
+import threading
+import time
 
 import tornado.gen
 import tornado.ioloop
@@ -25,20 +27,23 @@ from streamlit import __version__
 from streamlit import caching
 from streamlit import config
 from streamlit import util
+from streamlit.DataFrameStore import DataFrameStore
 from streamlit.DeltaGenerator import DeltaGenerator
+from streamlit.ProcessScriptRunner import ProcessScriptRunner
 from streamlit.Report import Report
 from streamlit.ScriptRequestQueue import RerunData
 from streamlit.ScriptRequestQueue import ScriptRequest
 from streamlit.ScriptRequestQueue import ScriptRequestQueue
 from streamlit.ScriptRunner import ScriptRunner
 from streamlit.ScriptRunner import ScriptRunnerEvent
+from streamlit.ScriptWorkerPool import ScriptWorkerPool
 from streamlit.credentials import Credentials
 from streamlit.logger import get_logger
 from streamlit.proto.BlockPath_pb2 import BlockPath
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.proto.Widget_pb2 import WidgetStates
 from streamlit.storage.S3Storage import S3Storage as Storage
-from streamlit.watcher.LocalSourcesWatcher import LocalSourcesWatcher
+from streamlit.watcher import LocalSourcesWatcher
 
 LOGGER = get_logger(__name__)
 
@@ -62,7 +67,8 @@ class ReportSession(object):
 
     _next_id = 0
 
-    def __init__(self, ioloop, script_path, script_argv):
+    def __init__(self, ioloop, script_path, script_argv,
+                 message_enqueued_callback=None):
         """Initialize the ReportSession.
 
         Parameters
@@ -76,6 +82,10 @@ class ReportSession(object):
         script_argv : list of str
             Command-line arguments to run the script with.
 
+        message_enqueued_callback : Callable[[], None] | None
+            Called after a ForwardMsg is enqueued to the browser queue.
+            This can be called from multiple threads.
+
         """
         # Each ReportSession gets a unique ID
         self.id = ReportSession._next_id
@@ -83,6 +93,7 @@ class ReportSession(object):
 
         self._ioloop = ioloop
         self._report = Report(script_path, script_argv)
+        self._message_enqueued_callback = message_enqueued_callback
 
         self._state = ReportSessionState.REPORT_NOT_RUNNING
 
@@ -92,7 +103,15 @@ class ReportSession(object):
                                           container=BlockPath.SIDEBAR)
 
         self._widget_states = WidgetStates()
-        self._local_sources_watcher = LocalSourcesWatcher(
+        self._data_frame_store = DataFrameStore()
+
+        # Window requests are handled on the Server's executor, so several
+        # can be in flight. Map: DataFrameWindow.id -> number of the latest
+        # request for it. See handle_data_frame_window_request.
+        self._data_frame_window_lock = threading.Lock()
+        self._data_frame_window_requests = {}
+        self._num_data_frame_window_requests = 0
+        self._local_sources_watcher = LocalSourcesWatcher.subscribe(
             self._report, self._on_source_file_changed)
         self._sent_initialize_message = False
         self._storage = None
@@ -105,6 +124,10 @@ class ReportSession(object):
 
         self._scriptrunner = None
 
+        # Set in make_idle(). See server.idleSessionTimeoutMins.
+        self._is_idle = False
+        self._last_active_time = time.time()
+
         LOGGER.debug('ReportSession initialized (id=%s)', self.id)
 
     def flush_browser_queue(self):
@@ -140,6 +163,54 @@ class ReportSession(object):
             self._state = ReportSessionState.SHUTDOWN_REQUESTED
             self._local_sources_watcher.close()
 
+    @property
+    def is_idle(self):
+        """True if the session released its resources. See make_idle."""
+        return self._is_idle
+
+    def get_idle_secs(self):
+        """Return the seconds since the browser last sent a BackMsg."""
+        return time.time() - self._last_active_time
+
+    def mark_active(self):
+        """Record that the browser sent a BackMsg.
+
+        If the session was idle, it watches its source files again.
+
+        """
+        self._last_active_time = time.time()
+
+        if self._is_idle:
+            LOGGER.debug('Waking up idle session (id=%s)', self.id)
+            self._is_idle = False
+            self._local_sources_watcher = LocalSourcesWatcher.subscribe(
+                self._report, self._on_source_file_changed)
+            self._local_sources_watcher.update_watched_modules()
+
+    def make_idle(self):
+        """Release the resources the session only needs while it's in use.
+
+        The messages kept for saving the report and the DataFrames of
+        windowed st.dataframe elements are dropped, and source files are no
+        longer watched, until the next call to mark_active(). The browser
+        can no longer scroll through those DataFrames, and add_rows to them
+        fails. A running script is left alone.
+
+        """
+        if (self._is_idle or
+                self._state != ReportSessionState.REPORT_NOT_RUNNING):
+            return
+
+        LOGGER.debug('Session is idle (id=%s)', self.id)
+        self._is_idle = True
+        self._report.drop_master_queue()
+        self._data_frame_store.clear()
+        self._local_sources_watcher.close()
+
+    def get_byte_size(self):
+        """Return the serialized size of the messages held by the session."""
+        return self._report.get_byte_size()
+
     def enqueue(self, msg):
         """Enqueues a new ForwardMsg to our browser queue.
 
@@ -170,6 +241,8 @@ class ReportSession(object):
             scriptrunner.maybe_handle_execution_control_request()
 
         self._report.enqueue(msg)
+        if self._message_enqueued_callback:
+            self._message_enqueued_callback()
         return True
 
     def enqueue_exception(self, e):
@@ -223,6 +296,15 @@ class ReportSession(object):
         else:
             self._enqueue_file_change_message()
 
+    def _on_worker_modules_imported(self, modules):
+        """Watch the local modules that the script imported in a worker.
+
+        This is *not* called on the main thread.
+
+        """
+        self._ioloop.spawn_callback(
+            self._local_sources_watcher.add_worker_modules, modules)
+
     def _clear_queue(self):
         self._report.clear()
 
@@ -435,6 +517,48 @@ class ReportSession(object):
         # terminal.
         caching.clear_cache()
 
+        if config.get_option('runner.numProcesses') > 0:
+            ScriptWorkerPool.get_current().clear_caches()
+
+    def handle_data_frame_window_request(self, request):
+        """Sends the browser the rows it asked for of a windowed DataFrame.
+
+        The Server calls this on its executor, since marshalling the rows can
+        take a while. If the browser asks for other rows of the same
+        DataFrame in the meantime, only the rows it asked for last are sent.
+
+        Parameters
+        ----------
+        request : streamlit.proto.BackMsg_pb2.DataFrameWindowRequest
+
+        """
+        with self._data_frame_window_lock:
+            self._num_data_frame_window_requests += 1
+            request_num = self._num_data_frame_window_requests
+            self._data_frame_window_requests[request.id] = request_num
+
+        num_rows = request.num_rows
+        window_rows = config.get_option('global.dataFrameWindowRows')
+        if window_rows > 0:
+            num_rows = min(num_rows, window_rows)
+
+        msg = ForwardMsg()
+        found = self._data_frame_store.marshall_window(
+            request.id, request.start, num_rows, msg.data_frame_window)
+
+        with self._data_frame_window_lock:
+            if self._data_frame_window_requests.get(request.id) != request_num:
+                # Superseded by a later request.
+                return
+            del self._data_frame_window_requests[request.id]
+
+            if not found:
+                LOGGER.debug(
+                    'DataFrame %s is no longer available', request.id)
+                return
+
+            self.enqueue(msg)
+
     def handle_set_run_on_save_request(self, new_value):
         """Changes our run_on_save flag to the given value.
 
@@ -489,12 +613,23 @@ class ReportSession(object):
             return
 
         # Create the ScriptRunner, attach event handlers, and start it
-        self._scriptrunner = ScriptRunner(
-            report=self._report,
-            main_dg=self._main_dg,
-            sidebar_dg=self._sidebar_dg,
-            widget_states=self._widget_states,
-            request_queue=self._script_request_queue)
+        if config.get_option('runner.numProcesses') > 0:
+            self._scriptrunner = ProcessScriptRunner(
+                report=self._report,
+                enqueue=self.enqueue,
+                widget_states=self._widget_states,
+                request_queue=self._script_request_queue,
+                pool=ScriptWorkerPool.get_current())
+            self._scriptrunner.on_modules_imported.connect(
+                self._on_worker_modules_imported)
+        else:
+            self._scriptrunner = ScriptRunner(
+                report=self._report,
+                main_dg=self._main_dg,
+                sidebar_dg=self._sidebar_dg,
+                widget_states=self._widget_states,
+                request_queue=self._script_request_queue,
+                data_frame_store=self._data_frame_store)
         self._scriptrunner.on_event.connect(self._on_scriptrunner_event)
         self._scriptrunner.start()
 
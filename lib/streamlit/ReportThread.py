@@ -28,6 +28,10 @@ ReportContext = namedtuple('ReportContext', [
 
     # The Widgets state object for the report
     'widgets',
+
+    # The DataFrameStore of the report's session, or None if st.dataframe
+    # can't keep DataFrames on the server.
+    'data_frame_store',
 ])
 
 REPORT_CONTEXT_ATTR_NAME = 'streamlit_report_ctx'
@@ -35,9 +39,11 @@ REPORT_CONTEXT_ATTR_NAME = 'streamlit_report_ctx'
 
 class ReportThread(threading.Thread):
     """Extends threading.Thread with a ReportContext member"""
-    def __init__(self, main_dg, sidebar_dg, widgets, target=None, name=None):
+    def __init__(self, main_dg, sidebar_dg, widgets, target=None, name=None,
+                 data_frame_store=None):
         super(ReportThread, self).__init__(target=target, name=name)
-        self.streamlit_report_ctx = ReportContext(main_dg, sidebar_dg, widgets)
+        self.streamlit_report_ctx = ReportContext(
+            main_dg, sidebar_dg, widgets, data_frame_store)
 
 
 def add_report_ctx(thread):
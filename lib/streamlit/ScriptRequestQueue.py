@@ -18,6 +18,8 @@ from collections import deque
 from collections import namedtuple
 from enum import Enum
 
+from blinker import Signal
+
 from streamlit.widgets import coalesce_widget_states
 
 
@@ -52,6 +54,12 @@ class ScriptRequestQueue(object):
         self._lock = threading.Lock()
         self._queue = deque()
 
+        self.on_enqueue = Signal(
+            doc="""Emitted after a request is enqueued.
+
+            This is sent on the thread that enqueued the request.
+            """)
+
     @property
     def has_request(self):
         """True if the queue has at least one element"""
@@ -111,6 +119,8 @@ class ScriptRequestQueue(object):
             else:
                 self._queue.append((request, data))
 
+        self.on_enqueue.send(self)
+
     def dequeue(self):
         """Pops the front-most request from the queue and returns it.
 
@@ -47,7 +47,8 @@ class ScriptRunnerEvent(Enum):
 
 
 class ScriptRunner(object):
-    def __init__(self, report, main_dg, sidebar_dg, widget_states, request_queue):
+    def __init__(self, report, main_dg, sidebar_dg, widget_states,
+                 request_queue, data_frame_store=None):
         """Initialize the ScriptRunner.
 
         (The ScriptRunner won't start executing until start() is called.)
@@ -71,11 +72,16 @@ class ScriptRunner(object):
             ScriptRunner will continue running until the queue is empty,
             and then shut down.
 
+        data_frame_store : DataFrameStore | None
+            Where st.dataframe keeps DataFrames that are sent to the browser
+            a window at a time. If None, DataFrames are always sent whole.
+
         """
         self._report = report
         self._main_dg = main_dg
         self._sidebar_dg = sidebar_dg
         self._request_queue = request_queue
+        self._data_frame_store = data_frame_store
 
         self._widgets = Widgets()
         self._widgets.set_state(widget_states)
@@ -123,7 +129,8 @@ class ScriptRunner(object):
             sidebar_dg=self._sidebar_dg,
             widgets=self._widgets,
             target=self._process_request_queue,
-            name='ScriptRunner.scriptThread')
+            name='ScriptRunner.scriptThread',
+            data_frame_store=self._data_frame_store)
         self._script_thread.start()
 
     def _process_request_queue(self):
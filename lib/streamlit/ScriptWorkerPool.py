@@ -0,0 +1,749 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A pool of worker processes that run scripts.
+
+See runner.numProcesses. Workers are forked by a zygote process, which the
+server forks before it starts any threads. A process forked from one with
+other threads running could inherit locks that those threads held, and
+deadlock on them. The zygote never starts threads, so forking from it is
+safe at any time.
+
+The server process talks to each worker over a multiprocessing Connection:
+
+Server -> worker:
+    (MSG_START, script_path, argv, widget_states)
+        Start serving a ReportSession.
+    (MSG_REQUEST, request, rerun_data)
+        A ScriptRequest from the ReportSession.
+    (MSG_RELEASE,)
+        The ReportSession is done with this worker.
+    (MSG_CLEAR_CACHE,)
+        Clear the worker's st.cache memory cache. Checked-out workers are
+        sent this as soon as the cache is cleared, and idle ones when they're
+        checked out.
+
+Worker -> server:
+    (MSG_FORWARD_MSG, forward_msg)
+        A ForwardMsg the script enqueued.
+    (MSG_EVENT, event, exception)
+        A ScriptRunnerEvent, other than SHUTDOWN.
+    (MSG_MODULES, modules)
+        The modules in the script's folder that the worker has imported, as
+        a dict of module name -> file path. Sent before a
+        SCRIPT_STOPPED_WITH_SUCCESS event, if they changed since the last
+        time. The server watches them, since they aren't in its sys.modules.
+    (MSG_IDLE, num_requests, widget_states)
+        The worker's ScriptRunner shut down after handling num_requests
+        requests. The server releases the worker once it has no more
+        requests for it, and it has seen every request it sent.
+
+Protobufs are sent serialized, and enums by value.
+"""
+
+import importlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import Client
+from multiprocessing.connection import Listener
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+from streamlit import caching
+from streamlit import config
+from streamlit import magic
+from streamlit.DeltaGenerator import DeltaGenerator
+from streamlit.Report import Report
+from streamlit.ScriptRequestQueue import RerunData
+from streamlit.ScriptRequestQueue import ScriptRequest
+from streamlit.ScriptRequestQueue import ScriptRequestQueue
+from streamlit.ScriptRunner import ScriptRunner
+from streamlit.ScriptRunner import ScriptRunnerEvent
+from streamlit.logger import get_logger
+from streamlit.proto.BlockPath_pb2 import BlockPath
+from streamlit.proto.Widget_pb2 import WidgetStates
+
+LOGGER = get_logger(__name__)
+
+MSG_START = 'start'
+MSG_REQUEST = 'request'
+MSG_RELEASE = 'release'
+MSG_CLEAR_CACHE = 'clear_cache'
+MSG_FORWARD_MSG = 'forward_msg'
+MSG_EVENT = 'event'
+MSG_MODULES = 'modules'
+MSG_IDLE = 'idle'
+
+# How often acquire() checks whether the pool was shut down while it waits
+# for an idle worker.
+_ACQUIRE_POLL_INTERVAL_SECS = 0.5
+
+# How long to wait for a terminated worker to exit.
+_TERMINATE_TIMEOUT_SECS = 5
+
+
+def serialize_rerun_data(rerun_data):
+    """Convert RerunData (or None) into something we can send to a worker."""
+    if rerun_data is None:
+        return None
+
+    widget_state = rerun_data.widget_state
+    if widget_state is not None:
+        widget_state = widget_state.SerializeToString()
+    return rerun_data.argv, widget_state
+
+
+def deserialize_rerun_data(data):
+    """The inverse of serialize_rerun_data."""
+    if data is None:
+        return None
+
+    argv, widget_state = data
+    if widget_state is not None:
+        widget_state = parse_widget_states(widget_state)
+    return RerunData(argv=argv, widget_state=widget_state)
+
+
+def parse_widget_states(data):
+    """Parse a serialized WidgetStates protobuf."""
+    widget_states = WidgetStates()
+    widget_states.ParseFromString(data)
+    return widget_states
+
+
+class ScriptWorkerPool(object):
+    """Pre-forked processes that ProcessScriptRunners run scripts in.
+
+    Each ReportSession checks out a worker for as long as its
+    ProcessScriptRunner is alive, i.e. while it has script requests to
+    process.
+    """
+
+    _singleton = None
+
+    @classmethod
+    def get_current(cls):
+        """Return the singleton instance."""
+        if cls._singleton is None:
+            raise RuntimeError('ScriptWorkerPool has not been initialized yet')
+
+        return ScriptWorkerPool._singleton
+
+    def __init__(self, num_processes, script_path=None):
+        """Start the zygote, and fork the worker processes in the background.
+
+        This should be called early on, before the process has started other
+        threads, since the zygote is forked from it.
+
+        Parameters
+        ----------
+        num_processes : int
+        script_path : str | None
+            If set, each worker warms up by importing the modules that this
+            script imports at its top level, so new sessions don't pay for
+            those imports on their first run.
+
+        """
+        if ScriptWorkerPool._singleton is not None:
+            raise RuntimeError(
+                'ScriptWorkerPool already initialized. '
+                'Use .get_current() instead')
+
+        ScriptWorkerPool._singleton = self
+
+        self._script_path = script_path
+        self._idle_workers = queue.Queue()
+        self._is_shutdown = False
+
+        # Incremented every time the cache is cleared. Workers whose
+        # cache_generation is out of date clear their cache when they're
+        # checked out.
+        self._cache_generation = 0
+
+        # The workers that are checked out, whose caches clear_caches() clears
+        # right away. _workers_lock guards it and _cache_generation.
+        self._workers_lock = threading.Lock()
+        self._active_workers = set()
+
+        # Guards _zygote and _is_shutdown while workers are created.
+        self._create_lock = threading.Lock()
+
+        if hasattr(os, 'fork'):
+            self._zygote = _Zygote(script_path)
+        else:
+            # Windows spawns workers, which don't inherit any threads.
+            self._zygote = None
+
+        # The zygote warms up before it forks the first worker. Don't make
+        # the server wait for that.
+        thread = threading.Thread(
+            target=self._create_workers, args=(num_processes,),
+            name='ScriptWorkerPool.createThread')
+        thread.daemon = True
+        thread.start()
+
+    def acquire(self):
+        """Check out an idle worker, waiting for one if they're all busy.
+
+        Returns
+        -------
+        _Worker | None
+            The worker, or None if the pool was shut down.
+
+        """
+        while True:
+            if self._is_shutdown:
+                return None
+            try:
+                worker = self._idle_workers.get(
+                    timeout=_ACQUIRE_POLL_INTERVAL_SECS)
+                break
+            except queue.Empty:
+                pass
+
+        if not worker.is_alive():
+            LOGGER.warning('Replacing script worker that exited')
+            worker = self._create_worker()
+            if worker is None:
+                return None
+
+        with self._workers_lock:
+            self._active_workers.add(worker)
+            self._update_cache(worker)
+
+        return worker
+
+    def release(self, worker):
+        """Return a worker to the pool.
+
+        Parameters
+        ----------
+        worker : _Worker
+
+        """
+        with self._workers_lock:
+            self._active_workers.discard(worker)
+
+        if self._is_shutdown:
+            worker.terminate()
+        else:
+            self._idle_workers.put(worker)
+
+    def discard(self, worker):
+        """Replace a worker that's in an unknown state with a new one.
+
+        Parameters
+        ----------
+        worker : _Worker
+
+        """
+        with self._workers_lock:
+            self._active_workers.discard(worker)
+
+        worker.terminate()
+        worker = self._create_worker()
+        if worker is not None:
+            self._idle_workers.put(worker)
+
+    def clear_caches(self):
+        """Clear the st.cache memory cache of all workers.
+
+        Workers that are checked out clear theirs right away, so the scripts
+        they're running don't keep using it. Idle workers clear theirs when
+        they're checked out.
+        """
+        with self._workers_lock:
+            self._cache_generation += 1
+            for worker in self._active_workers:
+                self._update_cache(worker)
+
+    def _update_cache(self, worker):
+        """Have a worker clear its cache if it was cleared since it last did.
+
+        The caller must hold _workers_lock.
+        """
+        if worker.cache_generation == self._cache_generation:
+            return
+
+        try:
+            worker.send((MSG_CLEAR_CACHE,))
+        except (EOFError, IOError) as e:
+            # The relay thread finds out when it reads from the worker.
+            LOGGER.debug('Failed to clear script worker cache: %s', e)
+        worker.cache_generation = self._cache_generation
+
+    def shutdown(self):
+        """Stop the idle workers.
+
+        Workers that are checked out keep running until they're released,
+        and threads waiting in acquire() give up.
+        """
+        with self._create_lock:
+            self._is_shutdown = True
+            if self._zygote is not None:
+                self._zygote.shutdown()
+
+        while True:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                break
+            worker.terminate()
+
+    def _create_workers(self, num_processes):
+        for _ in range(num_processes):
+            worker = self._create_worker()
+            if worker is None:
+                return
+            self.release(worker)
+
+    def _create_worker(self):
+        """Start a new worker.
+
+        Returns
+        -------
+        _Worker | None
+            The worker, or None if the pool was shut down.
+
+        """
+        with self._create_lock:
+            if self._is_shutdown:
+                return None
+
+            if self._zygote is not None:
+                conn, process = self._zygote.fork_worker()
+            else:
+                conn, process = _start_worker_process(self._script_path)
+
+            return _Worker(conn, process, self._cache_generation)
+
+
+def _get_multiprocessing_context():
+    """Return the multiprocessing context the zygote is created with.
+
+    The zygote is forked, so it starts out with the server's modules already
+    imported. Python 3 on macOS spawns processes by default, which would
+    import everything again.
+    """
+    get_context = getattr(multiprocessing, 'get_context', None)
+    if get_context is None:
+        # Python 2 always forks, except on Windows.
+        return multiprocessing
+    try:
+        return get_context('fork')
+    except ValueError:
+        # Windows can't fork.
+        return multiprocessing
+
+
+class _Zygote(object):
+    """The server's handle on the zygote, which forks the workers.
+
+    Each worker connects back to a Listener of ours, since the zygote can't
+    hand us a pipe to a process it forked.
+    """
+
+    def __init__(self, script_path):
+        context = _get_multiprocessing_context()
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_zygote_main, args=(child_conn, self._conn, script_path),
+            name='ScriptWorkerZygote')
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+
+        # Created after the fork, so the zygote doesn't hold the socket.
+        self._listener = Listener(
+            family='AF_UNIX',
+            authkey=multiprocessing.current_process().authkey)
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    def fork_worker(self):
+        """Fork a worker.
+
+        Returns
+        -------
+        (Connection, _ForkedProcess)
+            The connection to the worker, and its process.
+
+        """
+        self._conn.send(self._listener.address)
+        pid = self._conn.recv()
+        return self._listener.accept(), _ForkedProcess(pid)
+
+    def shutdown(self):
+        """Stop the zygote. Workers it forked keep running."""
+        self._conn.close()
+        self._listener.close()
+        self._process.join()
+
+
+class _ForkedProcess(object):
+    """A worker process that the zygote forked.
+
+    It isn't our child, so we can't wait for it. The zygote reaps it, and
+    its pid goes away once it exits.
+    """
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def is_alive(self):
+        try:
+            os.kill(self.pid, 0)
+        except OSError:
+            return False
+        return True
+
+    def terminate(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def join(self):
+        deadline = time.time() + _TERMINATE_TIMEOUT_SECS
+        while self.is_alive() and time.time() < deadline:
+            time.sleep(0.01)
+
+
+def _start_worker_process(script_path):
+    """Start a worker without the zygote, where we can't fork."""
+    context = _get_multiprocessing_context()
+    conn, child_conn = context.Pipe()
+    process = context.Process(
+        target=_worker_main, args=(child_conn, script_path),
+        name='ScriptWorker')
+    process.daemon = True
+    process.start()
+    child_conn.close()
+    return conn, process
+
+
+class _Worker(object):
+    """The server's handle on a worker process."""
+
+    def __init__(self, conn, process, cache_generation):
+        self._conn = conn
+        self._process = process
+        self.cache_generation = cache_generation
+
+        # The ProcessScriptRunner and the pool can send at the same time.
+        self._send_lock = threading.Lock()
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def send(self, msg):
+        with self._send_lock:
+            self._conn.send(msg)
+
+    def recv(self):
+        return self._conn.recv()
+
+    def terminate(self):
+        self._conn.close()
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+
+
+def _zygote_main(conn, server_conn, script_path):
+    """Entry point of the zygote process.
+
+    It forks a worker for each address it receives, and replies with the
+    worker's pid. The worker connects to the address.
+    """
+    # We inherited the server's end of the pipe. Close it, so we see EOF
+    # once the server closes its copy.
+    server_conn.close()
+
+    # Ctrl-C goes to the whole process group. The server shuts us down, and
+    # we exit when our pipe is closed.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Have the kernel reap workers as they exit.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    if script_path is not None:
+        # Workers inherit the modules imported here. Requests that arrive
+        # in the meantime wait in the pipe.
+        _pre_import_modules(script_path)
+        _drop_changed_local_modules(os.path.dirname(script_path))
+
+    while True:
+        try:
+            address = conn.recv()
+        except (EOFError, IOError):
+            break
+
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            _run_forked_worker(address)
+        conn.send(pid)
+
+
+def _run_forked_worker(address):
+    """Connect to the server, and serve it until it closes the connection.
+
+    This never returns: the worker must not go on to run the zygote's code.
+    """
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    exit_code = 0
+    try:
+        conn = Client(
+            address, authkey=multiprocessing.current_process().authkey)
+        _worker_main(conn, None)
+    except BaseException:
+        LOGGER.exception('Script worker failed')
+        exit_code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def _worker_main(conn, script_path):
+    """Entry point of worker processes."""
+    # Ctrl-C goes to the whole process group. The server shuts us down, and
+    # we exit when our pipe is closed.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if script_path is not None:
+        # Requests that arrive in the meantime wait in the pipe.
+        _pre_import_modules(script_path)
+        _drop_changed_local_modules(os.path.dirname(script_path))
+
+    session = None
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, IOError):
+            break
+
+        msg_type = msg[0]
+
+        if msg_type == MSG_START:
+            _, script_path, argv, widget_states = msg
+            _drop_changed_local_modules(os.path.dirname(script_path))
+            session = _WorkerSession(
+                conn, script_path, argv, parse_widget_states(widget_states))
+
+        elif msg_type == MSG_REQUEST:
+            _, request, data = msg
+            request = ScriptRequest(request)
+            if request == ScriptRequest.RERUN:
+                _drop_changed_local_modules(session.script_folder)
+            session.handle_request(request, deserialize_rerun_data(data))
+
+        elif msg_type == MSG_RELEASE:
+            session = None
+
+        elif msg_type == MSG_CLEAR_CACHE:
+            caching._clear_mem_cache()
+
+        else:
+            LOGGER.warning('No handler for "%s"', msg_type)
+
+
+class _WorkerSession(object):
+    """Runs a ReportSession's scripts, inside a worker process.
+
+    This plays the part of the ReportSession for ScriptRunners in the
+    worker, and relays everything they produce to the server.
+    """
+
+    def __init__(self, conn, script_path, argv, widget_states):
+        self._conn = conn
+        self._send_lock = threading.Lock()
+
+        self._report = Report(script_path, argv)
+        self._main_dg = DeltaGenerator(self.enqueue,
+                                       container=BlockPath.MAIN)
+        self._sidebar_dg = DeltaGenerator(self.enqueue,
+                                          container=BlockPath.SIDEBAR)
+        self._widget_states = widget_states
+        self._script_request_queue = ScriptRequestQueue()
+
+        # Guards _scriptrunner and _num_requests, which are used from both
+        # the worker's main thread and script threads.
+        self._lock = threading.Lock()
+        self._scriptrunner = None
+        self._num_requests = 0
+
+        # The local modules last sent to the server. See MSG_MODULES.
+        self._sent_modules = None
+
+    @property
+    def script_folder(self):
+        return self._report.script_folder
+
+    def handle_request(self, request, data):
+        with self._lock:
+            self._num_requests += 1
+            self._script_request_queue.enqueue(request, data)
+            self._maybe_create_scriptrunner()
+
+    def enqueue(self, msg):
+        """Send a ForwardMsg to the server. See ReportSession.enqueue."""
+        if not config.get_option('client.displayEnabled'):
+            return False
+
+        scriptrunner = self._scriptrunner
+        if scriptrunner is not None:
+            scriptrunner.maybe_handle_execution_control_request()
+
+        self._send((MSG_FORWARD_MSG, msg.SerializeToString()))
+        return True
+
+    def _send(self, msg):
+        # Scripts can enqueue from threads of their own.
+        with self._send_lock:
+            self._conn.send(msg)
+
+    def _maybe_create_scriptrunner(self):
+        if (self._scriptrunner is not None or
+                not self._script_request_queue.has_request):
+            return
+
+        self._scriptrunner = ScriptRunner(
+            report=self._report,
+            main_dg=self._main_dg,
+            sidebar_dg=self._sidebar_dg,
+            widget_states=self._widget_states,
+            request_queue=self._script_request_queue)
+        self._scriptrunner.on_event.connect(self._on_scriptrunner_event)
+        self._scriptrunner.start()
+
+    def _on_scriptrunner_event(self, event, exception=None,
+                               widget_states=None):
+        """Relay a ScriptRunner event to the server.
+
+        This is called on the script thread.
+        """
+        if event == ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS:
+            modules = dict(_iter_local_modules(self.script_folder))
+            if modules != self._sent_modules:
+                self._send((MSG_MODULES, modules))
+                self._sent_modules = modules
+
+        if event != ScriptRunnerEvent.SHUTDOWN:
+            self._send((MSG_EVENT, event.value, _picklable(exception)))
+            return
+
+        with self._lock:
+            self._widget_states = widget_states
+            self._scriptrunner = None
+
+            # Requests can arrive while the ScriptRunner shuts down.
+            self._maybe_create_scriptrunner()
+
+            if self._scriptrunner is None:
+                self._send((MSG_IDLE, self._num_requests,
+                            widget_states.SerializeToString()))
+
+
+def _pre_import_modules(script_path):
+    """Import the modules that the script imports at its top level."""
+    try:
+        with open(script_path) as f:
+            module_names = magic.get_top_level_imports(f.read(), script_path)
+    except Exception as e:
+        LOGGER.debug('Not pre-importing modules: %s', e)
+        return
+
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except BaseException as e:
+            # The script will hit the same error when it runs, and show it.
+            LOGGER.debug('Failed to pre-import %s: %s', name, e)
+
+
+def _picklable(exception):
+    """Return the exception, or a stand-in for it if it can't be pickled."""
+    if exception is None:
+        return None
+
+    try:
+        import pickle
+        pickle.loads(pickle.dumps(exception))
+        return exception
+    except Exception:
+        return RuntimeError('%s: %s' % (type(exception).__name__, exception))
+
+
+# Map: module name -> modification time of its file, when we first saw it.
+_module_mtimes = {}
+
+
+def _iter_local_modules(script_folder):
+    """Yield the (name, file path) of the modules in the script's folder.
+
+    Like LocalSourcesWatcher, this skips server.folderWatchBlacklist.
+    """
+    script_folder = os.path.abspath(script_folder) + os.sep
+    blacklisted_folders = [
+        os.path.abspath(folder) + os.sep
+        for folder in config.get_option('server.folderWatchBlacklist')]
+
+    for name, module in list(sys.modules.items()):
+        filepath = getattr(module, '__file__', None)
+        if filepath is None:
+            continue
+
+        filepath = os.path.abspath(filepath)
+        if not filepath.startswith(script_folder):
+            continue
+
+        if any(filepath.startswith(folder) for folder in blacklisted_folders):
+            continue
+
+        yield name, filepath
+
+
+def _drop_changed_local_modules(script_folder):
+    """Unload modules in the script's folder whose files have changed.
+
+    In the server process, LocalSourcesWatcher unloads the script's modules
+    when they change, so they get imported again on the next run. Workers
+    import those modules themselves, so they check modification times
+    instead.
+    """
+    for name, filepath in _iter_local_modules(script_folder):
+        try:
+            mtime = os.stat(filepath).st_mtime
+        except OSError:
+            continue
+
+        if _module_mtimes.setdefault(name, mtime) != mtime:
+            LOGGER.debug('Unloading changed module %s', name)
+            del sys.modules[name]
+            del _module_mtimes[name]
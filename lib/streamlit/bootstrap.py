@@ -13,16 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import os
 import signal
 import sys
 
 import click
 import tornado.ioloop
+import tornado.netutil
 
+from streamlit import caching
 from streamlit import config
 from streamlit import util
 from streamlit.Report import Report
+from streamlit.ScriptWorkerPool import ScriptWorkerPool
 from streamlit.logger import get_logger
 from streamlit.server.Server import Server
 
@@ -34,6 +38,13 @@ LOGGER = get_logger(__name__)
 # This must be >= 2 * WebSocketConnection.ts#RECONNECT_WAIT_TIME_MS.
 BROWSER_WAIT_TIMEOUT_SEC = 1
 
+# How many times the original process restarts crashed server workers before
+# giving up. See server.numWorkers.
+MAX_WORKER_RESTARTS = 100
+
+# This process's index among the server workers, or None if there's only one.
+_worker_id = None
+
 
 def _set_up_signal_handler():
     LOGGER.debug('Setting up signal handler')
@@ -64,7 +75,125 @@ def _fix_matplotlib_crash():
     if config.get_option('runner.fixMatplotlib'):
         os.environ['MPLBACKEND'] = 'Agg'
 
+def _fork_workers(num_workers):
+    """Bind the server's port, and fork worker processes that share it.
+
+    This returns in each of the workers. The original process stays here,
+    restarts workers that crash, and exits once all of them have exited.
+    SIGTERM is forwarded to the workers, so they shut down cleanly instead
+    of being orphaned.
+
+    Parameters
+    ----------
+    num_workers : int
+
+    Returns
+    -------
+    list of socket.socket
+        The listening sockets, for Server.start.
+
+    """
+    global _worker_id
+
+    sockets = tornado.netutil.bind_sockets(config.get_option('server.port'))
+
+    # Workers share st.cache values through the disk. Those of a previous
+    # run are as stale as its memory caches.
+    caching._clear_shared_disk_cache()
+
+    # Ctrl-C is sent to the whole process group. Let the workers shut down
+    # cleanly, and have the original process exit when they're done.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGQUIT, signal.SIG_IGN)
+
+    original_pid = os.getpid()
+    # Map: pid -> worker id
+    children = {}
+    # Workers we sent SIGTERM to.
+    stopped_pids = set()
+    # A list, so the signal handler can set it.
+    is_stopping = [False]
+
+    def stop_workers():
+        for pid in children:
+            if pid in stopped_pids:
+                continue
+            stopped_pids.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                # It already exited.
+                pass
+
+    def on_sigterm(signal_number, stack_frame):
+        if os.getpid() != original_pid:
+            # A worker that hasn't installed its own handler yet.
+            sys.exit(0)
+        is_stopping[0] = True
+        stop_workers()
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+    def start_worker(worker_id):
+        """Fork a worker. Return True in the worker."""
+        pid = os.fork()
+        if pid == 0:
+            # _set_up_signal_handler installs the worker's own handler.
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            return True
+        children[pid] = worker_id
+        return False
+
+    for worker_id in range(num_workers):
+        if start_worker(worker_id):
+            _worker_id = worker_id
+            LOGGER.debug('Started worker %s of %s', worker_id, num_workers)
+            return sockets
+
+    num_restarts = 0
+    while children:
+        if is_stopping[0]:
+            # SIGTERM may have arrived before the last fork was recorded.
+            stop_workers()
+
+        try:
+            pid, status = os.wait()
+        except OSError as e:
+            # Python 2 doesn't retry after a signal handler runs.
+            if e.errno == errno.EINTR:
+                continue
+            raise
+
+        worker_id = children.pop(pid, None)
+        if worker_id is None:
+            continue
+
+        exited_cleanly = os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        if not exited_cleanly:
+            # Don't leave the values it was sharing half-written.
+            caching._clear_shared_disk_cache(pid)
+
+        if exited_cleanly or is_stopping[0]:
+            continue
+
+        LOGGER.warning(
+            'Worker %s exited unexpectedly (status %s). Restarting it.',
+            worker_id, status)
+        num_restarts += 1
+        if num_restarts > MAX_WORKER_RESTARTS:
+            raise RuntimeError('Too many worker restarts, giving up')
+        if start_worker(worker_id):
+            _worker_id = worker_id
+            return sockets
+
+    sys.exit(0)
+
+
 def _on_server_start(server):
+    if _worker_id:
+        # Only the first worker prints the URL and opens the browser.
+        return
+
     _print_url()
 
     def maybe_open_browser():
@@ -136,6 +265,19 @@ def run(script_path):
     _fix_sys_path(script_path)
     _fix_matplotlib_crash()
 
+    # Fork before creating the ioloop, or any threads.
+    sockets = None
+    num_workers = config.get_option('server.numWorkers')
+    if num_workers > 1:
+        sockets = _fork_workers(num_workers)
+
+    # Script worker processes are forked from this one, so create them
+    # before starting any threads too.
+    pool = None
+    num_processes = config.get_option('runner.numProcesses')
+    if num_processes > 0:
+        pool = ScriptWorkerPool(num_processes, script_path)
+
     # Install a signal handler that will shut down the ioloop
     # and close all our threads
     _set_up_signal_handler()
@@ -145,8 +287,12 @@ def run(script_path):
     # Create and start the server.
     server = Server(ioloop, script_path, sys.argv)
     server.add_preheated_report_session()
-    server.start(_on_server_start)
+    server.start(_on_server_start, sockets)
 
     # Start the ioloop. This function will not return until the
     # server is shut down.
-    ioloop.start()
+    try:
+        ioloop.start()
+    finally:
+        if pool is not None:
+            pool.shutdown()
@@ -67,6 +67,10 @@ DiskCacheEntry = namedtuple('DiskCacheEntry', ['value', 'args_mutated'])
 # The in memory cache.
 _mem_cache = {}  # type: Dict[string, CacheEntry]
 
+# The folder of the disk cache where server workers share the values of
+# functions that aren't persisted. See server.numWorkers.
+_SHARED_CACHE_FOLDER = 'shared'
+
 
 class _AddCopy(ast.NodeTransformer):
     """
@@ -239,8 +243,15 @@ def _write_to_mem_cache(key, value, ignore_hash, args_mutated):
     )
 
 
-def _read_from_disk_cache(key):
-    path = util.get_streamlit_file_path('cache', '%s.pickle' % key)
+def _get_disk_cache_path(key, shared=False):
+    if shared:
+        return util.get_streamlit_file_path(
+            'cache', _SHARED_CACHE_FOLDER, '%s.pickle' % key)
+    return util.get_streamlit_file_path('cache', '%s.pickle' % key)
+
+
+def _read_from_disk_cache(key, shared=False):
+    path = _get_disk_cache_path(key, shared)
 
     try:
         with util.streamlit_read(path, binary=True) as input:
@@ -277,6 +288,46 @@ def _write_to_disk_cache(key, value, args_mutated):
         raise CacheError('Unable to write to cache: %s' % e)
 
 
+def _is_shared_across_workers():
+    """True if other server worker processes run this script's caches too.
+
+    See server.numWorkers. Workers share the values of functions that aren't
+    persisted through _SHARED_CACHE_FOLDER in the disk cache.
+    """
+    return config.get_option('server.numWorkers') > 1
+
+
+def _read_from_shared_disk_cache(key):
+    try:
+        return _read_from_disk_cache(key, shared=True)
+    except (CacheError, pickle.UnpicklingError, EOFError) as e:
+        LOGGER.debug('Unable to read value shared by other workers: %s', e)
+        raise CacheKeyNotFoundError('Key not found in shared disk cache')
+
+
+def _write_to_shared_disk_cache(key, value, args_mutated):
+    """Write a value to the disk cache, so other server workers can read it.
+
+    The value is pickled into a temporary file that's then renamed, so other
+    workers never read a partially-written entry. Values that can't be
+    pickled are just not shared.
+    """
+    path = _get_disk_cache_path(key, shared=True)
+    tmp_path = '%s.%s.tmp' % (path, os.getpid())
+
+    try:
+        with util.streamlit_write(tmp_path, binary=True) as output:
+            entry = DiskCacheEntry(value=value, args_mutated=args_mutated)
+            pickle.dump(entry, output, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, path)
+    except Exception as e:
+        LOGGER.debug('Unable to share value with other workers: %s', e)
+        try:
+            os.remove(tmp_path)
+        except (IOError, OSError):
+            pass
+
+
 def _read_from_cache(key, persisted, ignore_hash, func_or_code, message_opts):
     """
     Read the value from the cache. Our goal is to read from memory
@@ -298,15 +349,21 @@ def _read_from_cache(key, persisted, ignore_hash, func_or_code, message_opts):
 
         if persisted:
             value, args_mutated = _read_from_disk_cache(key)
-            _write_to_mem_cache(key, value, ignore_hash, args_mutated)
-            return value, args_mutated
-        raise e
+        elif _is_shared_across_workers():
+            value, args_mutated = _read_from_shared_disk_cache(key)
+        else:
+            raise e
+
+        _write_to_mem_cache(key, value, ignore_hash, args_mutated)
+        return value, args_mutated
 
 
 def _write_to_cache(key, value, persist, ignore_hash, args_mutated):
     _write_to_mem_cache(key, value, ignore_hash, args_mutated)
     if persist:
         _write_to_disk_cache(key, value, args_mutated)
+    elif _is_shared_across_workers():
+        _write_to_shared_disk_cache(key, value, args_mutated)
 
 
 def cache(func=None, persist=False, ignore_hash=False):
@@ -551,6 +608,7 @@ def clear_cache():
         doesn't exist on disk).
     """
     _clear_mem_cache()
+    _clear_shared_disk_cache()
     return _clear_disk_cache()
 
 
@@ -568,6 +626,35 @@ def _clear_disk_cache():
     return False
 
 
+def _clear_shared_disk_cache(pid=None):
+    """Delete the values that server workers share through the disk cache.
+
+    Other workers may be writing values meanwhile, so files that can't be
+    deleted are skipped. A worker whose temporary file is deleted just
+    doesn't share that value.
+
+    Parameters
+    ----------
+    pid : int or None
+        If set, only delete the temporary files of the process with this pid,
+        which are left behind if it crashes mid-write.
+
+    """
+    cache_path = util.get_streamlit_file_path('cache', _SHARED_CACHE_FOLDER)
+    try:
+        filenames = os.listdir(cache_path)
+    except OSError:
+        return
+
+    for filename in filenames:
+        if pid is not None and not filename.endswith('.%s.tmp' % pid):
+            continue
+        try:
+            os.remove(os.path.join(cache_path, filename))
+        except OSError:
+            pass
+
+
 def _clear_mem_cache():
     global _mem_cache
     _mem_cache = {}
@@ -195,6 +195,52 @@ _create_option(
     default_val=True)
 
 
+_create_option(
+    'global.dataFrameSerialization',
+    description='''
+        How to encode the columns of DataFrames sent to the browser.
+
+        Should be set to one of these values:
+        - "repeated" : one protobuf field per value.
+        - "packed" : the raw bytes of each column, which is much faster to
+          marshall for large DataFrames.
+        - "arrow" : an Apache Arrow stream of all the columns, with
+          dictionary-encoded strings. Requires pyarrow, and falls back to
+          "repeated" if it isn't installed.
+        ''',
+    default_val='repeated')
+
+
+_create_option(
+    'global.dataFrameWindowRows',
+    description='''
+        DataFrames with more rows than this are kept on the server, and
+        st.dataframe only sends the browser this many rows at a time, as the
+        user scrolls. Such tables can't be sorted in the browser.
+
+        Set to 0 to always send whole DataFrames.
+        ''',
+    default_val=0)
+
+
+_create_option(
+    'global.maxDataFrameCacheSize',
+    description='''
+        Maximum total size, in bytes, of the marshalled DataFrames the
+        server keeps, so that DataFrames it has already sent don't need to
+        be converted again when a script reruns or displays them twice.
+        The server also keeps up to this many bytes of the serialized
+        st.dataframe and st.table messages of those DataFrames, which all
+        sessions share, so they're only serialized once.
+
+        Off (0) by default, since fingerprinting a DataFrame that isn't
+        in the cache makes marshalling it about 45% slower. Turn it on, e.g.
+        with 100e6 for 100MB, for scripts that display the same large
+        DataFrames again.
+        ''',
+    default_val=0)
+
+
 @_create_option('global.developmentMode', visibility='hidden')
 def _global_development_mode():
     """Are we in development mode.
@@ -260,6 +306,22 @@ _create_option(
         Streamlit report.''',
     default_val=True)
 
+_create_option(
+    'client.chartPointsPerPixel',
+    description='''
+        Line and area charts with more rows than this many per pixel of
+        their width are downsampled before being sent to the browser. The
+        rows with the smallest and largest values of each series are kept,
+        so the chart looks the same. Bar charts aren't downsampled, since
+        every row is a bar.
+
+        Rows appended with add_rows() aren't downsampled either, so charts
+        that grow with add_rows() send every row they're given.
+
+        Set to 0 to always send every row.
+        ''',
+    default_val=2)
+
 
 # Config Section: Runner #
 
@@ -290,6 +352,19 @@ _create_option(
         ''',
     default_val=True)
 
+_create_option(
+    'runner.numProcesses',
+    description='''
+        Number of worker processes to run scripts in. If 0, scripts run in
+        threads of the server process, so a CPU-heavy script slows down the
+        server and every other session. Otherwise, each script run is handed
+        to one of these pre-forked processes. Workers are forked from a
+        process that imports the script's top-level imports once, and keep
+        their imported modules and st.cache contents between runs, so new
+        sessions start quickly. Not supported on Windows.
+        ''',
+    default_val=0)
+
 # Config Section: Server #
 
 _create_section('server', 'Settings for the Streamlit server')
@@ -354,6 +429,91 @@ def _server_port():
     return 8501
 
 
+_create_option(
+    'server.numWorkers',
+    description='''
+        Number of server processes to run. Workers share the listening
+        socket, and each one runs the scripts of the browsers it serves, so
+        CPU-bound scripts of different users don't compete for one GIL. A
+        browser stays on the same worker for the lifetime of its WebSocket.
+        When this is greater than 1, st.cache also stores values on disk so
+        that all workers can reuse them, until the cache is cleared or the
+        server restarts. Not supported on Windows.
+        ''',
+    default_val=1)
+
+
+_create_option(
+    'server.batchWindowMs',
+    description='''
+        After delivering messages to the browser, wait this many milliseconds
+        before delivering more, so bursts of messages are sent together.
+        Set to 0 to deliver every message as soon as it is enqueued.
+        ''',
+    default_val=10)
+
+
+_create_option(
+    'server.minCachedMessageSize',
+    description='''
+        Messages at least this many bytes big are cached by the browser, so
+        that the server can tell it to reuse them rather than sending them
+        again.
+        ''',
+    visibility='hidden',
+    default_val=10 * 1e3)  # 10KB
+
+_create_option(
+    'server.maxCachedMessages',
+    description='''
+        Maximum number of messages each browser should keep in its message
+        cache. Browsers can ask for a smaller cache.
+        ''',
+    visibility='hidden',
+    default_val=100)
+
+
+_create_option(
+    'server.websocketCompressionLevel',
+    description='''
+        zlib compression level (1-9) for messages sent to the browser over
+        the WebSocket connection, using permessage-deflate. Set to 0 to turn
+        off compression.
+        ''',
+    default_val=1)
+
+_create_option(
+    'server.websocketCompressionMinSize',
+    description='''
+        Messages smaller than this many bytes are sent to the browser
+        uncompressed, since compressing them costs more than it saves.
+        ''',
+    default_val=1024)
+
+_create_option(
+    'server.websocketMaxBufferedBytes',
+    description='''
+        Stop sending messages to a browser while this many bytes are still
+        waiting to be written to its connection. Deltas that are produced in
+        the meantime are combined in the report queue, so slow connections
+        receive fewer, more up-to-date messages instead of an unbounded
+        backlog.
+        ''',
+    default_val=1024 * 1024)
+
+_create_option(
+    'server.idleSessionTimeoutMins',
+    description='''
+        Minutes after a browser's last interaction with a report before its
+        session goes idle. Idle sessions stop watching source files for
+        changes, and release the copy of the report that is kept for saving
+        it. They wake up when the browser interacts with them again, and the
+        report is kept again from its next run. Set to 0 to never make
+        sessions idle.
+        ''',
+    default_val=0)
+
+
 @_create_option('server.enableCORS')
 def _server_enable_cors():
     """Enables support for Cross-Origin Request Sharing, for added security.
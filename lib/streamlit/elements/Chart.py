@@ -67,7 +67,9 @@ from streamlit.compatibility import setup_2_3_shims
 setup_2_3_shims(globals())
 
 from streamlit import case_converters
+from streamlit import config
 from streamlit.elements.lib.ChartComponent import ChartComponent
+from streamlit.elements.lib.downsample import downsample
 import streamlit.elements.data_frame_proto as data_frame_proto
 import streamlit.elements.lib.chart_config as chart_config
 import streamlit.elements.lib.dict_builder as dict_builder
@@ -75,6 +77,13 @@ import streamlit.elements.lib.dict_builder as dict_builder
 from streamlit.logger import get_logger
 LOGGER = get_logger(__name__)
 
+# Chart types whose series are downsampled. See client.chartPointsPerPixel.
+# Not bar charts, since dropping rows would drop bars.
+DOWNSAMPLED_CHART_TYPES = ('line_chart', 'area_chart')
+
+# The width assumed for charts that stretch to the full width of the report.
+FULL_WIDTH_PX = 1000
+
 current_module = __import__(__name__)
 
 
@@ -132,7 +141,8 @@ class Chart(object):
     def marshall(self, proto_chart):
         """Load this chart data into that proto_chart."""
         proto_chart.type = case_converters.to_upper_camel_case(self._type)
-        data_frame_proto.marshall_data_frame(self._data, proto_chart.data)
+        data_frame_proto.marshall_data_frame(
+            self._get_downsampled_data(), proto_chart.data)
         proto_chart.width = self._width
         proto_chart.height = self._height
 
@@ -147,6 +157,15 @@ class Chart(object):
             proto_prop.key = case_converters.to_lower_camel_case(key)
             proto_prop.value = value
 
+    def _get_downsampled_data(self):
+        """Return the rows of our data that the chart has room to show."""
+        points_per_pixel = config.get_option('client.chartPointsPerPixel')
+        if points_per_pixel <= 0 or self._type not in DOWNSAMPLED_CHART_TYPES:
+            return self._data
+
+        width = self._width if self._width > 0 else FULL_WIDTH_PX
+        return downsample(self._data, int(points_per_pixel * width))
+
     def _append_missing_data_components(self):
         """Append all required data components that have not been specified.
 
@@ -15,18 +15,51 @@
 
 """Helper functions to marshall a pandas.DataFrame into a proto.Dataframe."""
 
+import bisect
+import hashlib
 import re
+import threading
 import tzlocal
 
 from collections import namedtuple
 
+from streamlit import config
 from streamlit import util
+from streamlit.DataFrameProtoCache import DataFrameProtoCache
 from streamlit.logger import get_logger
+from streamlit.proto.DataFrame_pb2 import AnyArray
+from streamlit.proto.DataFrame_pb2 import PackedArray
+from streamlit.proto.DataFrame_pb2 import Table
 
 LOGGER = get_logger(__name__)
 
 CSSStyle = namedtuple('CSSStyle', ['property', 'value'])
 
+# Arrow field metadata that tells the frontend how to interpret the int64
+# values of a column. See _to_arrow_array.
+ARROW_TYPE_METADATA_KEY = b'streamlit.type'
+ARROW_DATETIME = b'datetime'
+ARROW_TIMEDELTA = b'timedelta'
+
+# AnyArray types that can be concatenated with dictionary_strings.
+_STRING_ARRAY_TYPES = ('strings', 'packed_strings', 'dictionary_strings')
+
+# Object columns longer than this are only dictionary-encoded if a sample of
+# this many of their strings isn't nearly all distinct. See
+# _may_have_few_strings.
+_STRING_SAMPLE_SIZE = 10000
+
+# Whether pyarrow can be imported. Set by _use_arrow().
+_pyarrow_is_installed = None
+
+# DataFrames with fewer cells than this aren't cached, since fingerprinting
+# them takes about as long as marshalling them.
+_MIN_CACHED_CELLS = 10000
+
+# The DataFrameProtoCache, created on first use. See _get_proto_cache().
+_proto_cache = None
+_proto_cache_lock = threading.Lock()
+
 
 def marshall_data_frame(data, proto_df):
     """Convert a pandas.DataFrame into a proto.DataFrame.
@@ -38,22 +71,160 @@ def marshall_data_frame(data, proto_df):
 
     proto_df : proto.DataFrame
         Output. The protobuf for a Streamlit DataFrame proto.
+
+    Returns
+    -------
+    bytes or None
+        The fingerprint proto_df is cached under, if it went through the
+        DataFrameProtoCache. Every DataFrame with this fingerprint marshalls
+        to the same proto.
     """
     df = convert_anything_to_df(data)
+    styler = data if is_pandas_styler(data) else None
+
+    # Stylers aren't cached, since their styles can't be fingerprinted.
+    fingerprint = None
+    proto_cache = None
+    if styler is None and df.size >= _MIN_CACHED_CELLS:
+        proto_cache = _get_proto_cache()
+        if proto_cache is not None:
+            fingerprint = _get_fingerprint(df)
+
+    if fingerprint is not None:
+        cached_proto = proto_cache.get(fingerprint)
+        if cached_proto is not None:
+            proto_df.MergeFromString(cached_proto)
+            return fingerprint
 
     # Convert df into an iterable of columns (each of type Series).
     df_data = (df.iloc[:, col] for col in range(len(df.columns)))
 
-    import numpy as np
-    import pandas as pd
-
-    _marshall_table(df_data, proto_df.data)
+    if _use_arrow():
+        _marshall_arrow_table(df, proto_df.data)
+    else:
+        _marshall_table(df_data, proto_df.data)
     _marshall_index(df.columns, proto_df.columns)
     _marshall_index(df.index, proto_df.index)
-
-    styler = data if _is_pandas_styler(data) else None
     _marshall_styles(proto_df.style, df, styler)
 
+    if fingerprint is not None:
+        proto_cache.add(fingerprint, proto_df.SerializeToString())
+
+    return fingerprint
+
+
+def _get_proto_cache():
+    """Return the DataFrameProtoCache, or None if
+    global.maxDataFrameCacheSize turns it off.
+    """
+    global _proto_cache
+
+    max_bytes = int(config.get_option('global.maxDataFrameCacheSize'))
+    if max_bytes <= 0:
+        return None
+
+    # Several ScriptRunner threads can get here at once.
+    with _proto_cache_lock:
+        if _proto_cache is None:
+            _proto_cache = DataFrameProtoCache(max_bytes)
+        return _proto_cache
+
+
+def _get_fingerprint(df):
+    """Return a hash of everything marshall_data_frame converts df with.
+
+    That's the values, index and columns of df, with their types, and the
+    options that change how they're marshalled. Object values are hashed as
+    their strings, which is also how they're marshalled.
+
+    Returns
+    -------
+    bytes or None
+        The fingerprint, or None if some values of df can't be hashed, or
+        are periods or intervals. pandas hashes those as objects, which
+        takes longer than marshalling them.
+
+    """
+    import pandas as pd
+
+    dtypes = list(df.dtypes)
+    for pandas_index in [df.index, df.columns]:
+        levels = getattr(pandas_index, 'levels', [pandas_index])
+        dtypes.extend(level.dtype for level in levels)
+    if any(dtype.name.startswith(('period', 'interval')) for dtype in dtypes):
+        return None
+
+    hasher = hashlib.md5()
+    for part in [
+            config.get_option('global.dataFrameSerialization'),
+            _use_arrow(),
+            # Naive datetimes are marshalled in the local timezone.
+            tzlocal.get_localzone(),
+            list(df.dtypes)]:
+        hasher.update(str(part).encode('utf-8'))
+
+    try:
+        hasher.update(pd.util.hash_pandas_object(df, index=False).values)
+        for col in range(len(df.columns)):
+            if df.dtypes.iloc[col].name == 'category':
+                # Unused categories are marshalled too.
+                _update_index_hash(hasher, df.dtypes.iloc[col].categories)
+        _update_index_hash(hasher, df.index)
+        _update_index_hash(hasher, df.columns)
+    except TypeError:
+        return None
+
+    return hasher.digest()
+
+
+def _update_index_hash(hasher, pandas_index):
+    """Add the type and values of a pandas.Index to a hash."""
+    import pandas as pd
+
+    hasher.update(
+        str((type(pandas_index), pandas_index.dtype)).encode('utf-8'))
+    if type(pandas_index) == pd.MultiIndex:
+        # Levels are marshalled with their unused values, and the labels
+        # point into them, so hash both rather than the index's tuples.
+        if hasattr(pandas_index, 'codes'):
+            index_codes = pandas_index.codes
+        else:
+            # Deprecated in Pandas 0.24, do don't bother covering.
+            index_codes = pandas_index.labels  # pragma: no cover
+        for level, codes in zip(pandas_index.levels, index_codes):
+            _update_index_hash(hasher, level)
+            hasher.update(codes.tobytes())
+    else:
+        hasher.update(pd.util.hash_pandas_object(pandas_index).values)
+
+
+def marshall_data_frame_window(window_df, window_id, start, total_rows,
+                               proto_df):
+    """Convert a window of rows of a DataFrame into a proto.DataFrame.
+
+    Parameters
+    ----------
+    window_df : pandas.DataFrame
+        The rows in the window.
+
+    window_id : str
+        The id the browser asks for other rows of the DataFrame with. See
+        DataFrameStore.
+
+    start : int
+        The position of the window's first row in the whole DataFrame.
+
+    total_rows : int
+        The number of rows in the whole DataFrame.
+
+    proto_df : proto.DataFrame
+        Output. The protobuf for a Streamlit DataFrame proto.
+    """
+    marshall_data_frame(window_df, proto_df)
+    proto_df.window.id = window_id
+    proto_df.window.start = start
+    proto_df.window.total_rows = total_rows
+
 
 def convert_anything_to_df(df):
     """Try to convert different formats to a Pandas Dataframe.
@@ -70,7 +241,7 @@ def convert_anything_to_df(df):
     if util.is_type(df, 'pandas.core.frame.DataFrame'):
         return df
 
-    if _is_pandas_styler(df):
+    if is_pandas_styler(df):
         return df.data
 
     import pandas as pd
@@ -83,7 +254,8 @@ def convert_anything_to_df(df):
     return pd.DataFrame(df)
 
 
-def _is_pandas_styler(obj):
+def is_pandas_styler(obj):
+    """True if obj is a pandas.Styler."""
     return util.is_type(obj, 'pandas.io.formats.style.Styler')
 
 
@@ -101,31 +273,41 @@ def _marshall_styles(proto_table_style, df, styler=None):
     # NB: we're using protected members of Styler to get this data,
     # which is non-ideal and could break if Styler's interface changes.
 
-    if styler is not None:
-        styler._compute()
-        translated_style = styler._translate()
-        css_styles = _get_css_styles(translated_style)
-        display_values = _get_custom_display_values(df, translated_style)
-    else:
-        # If we have no Styler, we just make an empty CellStyle for each cell
-        css_styles = {}
-        display_values = {}
+    if styler is None:
+        # Leave the TableStyle empty, so the frontend knows the DataFrame is
+        # unstyled without us sending a CellStyle per cell.
+        return
+
+    styler._compute()
+    translated_style = styler._translate()
+    css_styles = _get_css_styles(translated_style)
+    display_values = _get_custom_display_values(df, translated_style)
+
+    # Only send the cells that have CSS or a display value.
+    styled_cells = set(
+        cell for cell, css in css_styles.items() if len(css) > 0)
+    styled_cells.update(display_values)
 
     nrows, ncols = df.shape
-    for col in range(ncols):
-        proto_col = proto_table_style.cols.add()
-        for row in range(nrows):
-            proto_cell_style = proto_col.styles.add()
+    proto_cols = [proto_table_style.cols.add() for _ in range(ncols)]
+
+    for row, col in sorted(styled_cells):
+        if row >= nrows or col >= ncols:
+            continue
+
+        proto_col = proto_cols[col]
+        proto_col.rows.append(row)
+        proto_cell_style = proto_col.styles.add()
 
-            for css in css_styles.get((row, col), []):
-                proto_css = proto_cell_style.css.add()
-                proto_css.property = css.property
-                proto_css.value = css.value
+        for css in css_styles.get((row, col), []):
+            proto_css = proto_cell_style.css.add()
+            proto_css.property = css.property
+            proto_css.value = css.value
 
-            display_value = display_values.get((row, col), None)
-            if display_value is not None:
-                proto_cell_style.display_value = display_value
-                proto_cell_style.has_display_value = True
+        display_value = display_values.get((row, col), None)
+        if display_value is not None:
+            proto_cell_style.display_value = display_value
+            proto_cell_style.has_display_value = True
 
 
 def _get_css_styles(translated_style):
@@ -197,8 +379,9 @@ def _get_custom_display_values(df, translated_style):
 
         # Pandas applies a default style to all float values, regardless
         # of whether they have a user-specified display format. We test
-        # for that here.
-        return default_formatter(value) != display_value
+        # for that here. (The formatter takes the raw value: it leaves
+        # strings untouched, so formatting str(value) never matches.)
+        return default_formatter(cell['value']) != display_value
 
     cell_selector_regex = re.compile(r'row(\d+)_col(\d+)')
     header_selector_regex = re.compile(r'level(\d+)_row(\d+)')
@@ -276,6 +459,21 @@ def _marshall_index(pandas_index, proto_index):
         proto_index.int_64_index.data.data.extend(pandas_index)
     elif type(pandas_index) == pd.Float64Index:
         proto_index.float_64_index.data.data.extend(pandas_index)
+    elif type(pandas_index) == pd.UInt64Index:
+        # The browser reads both as doubles, so only values that don't fit
+        # in an int64 need to be sent as doubles.
+        if (len(pandas_index) == 0 or
+                pandas_index.max() <= np.uint64(np.iinfo(np.int64).max)):
+            proto_index.int_64_index.data.data.extend(
+                pandas_index.astype(np.int64))
+        else:
+            proto_index.float_64_index.data.data.extend(
+                pandas_index.astype(np.float64))
+    elif type(pandas_index) in (
+            pd.CategoricalIndex, pd.PeriodIndex, pd.IntervalIndex):
+        # Categories of strings stay dictionary-encoded, and periods and
+        # intervals become strings. See _marshall_any_array.
+        _marshall_any_array(pandas_index, proto_index.plain_index.data)
     else:
         raise NotImplementedError("Can't handle %s yet." % type(pandas_index))
 
@@ -290,6 +488,123 @@ def _marshall_table(pandas_table, proto_table):
         _marshall_any_array(pandas_array, proto_table.cols.add())
 
 
+def _use_arrow():
+    """Return whether to marshall DataFrame data as Arrow.
+
+    That's the case when global.dataFrameSerialization is "arrow" and
+    pyarrow is installed. Otherwise, the data is marshalled as repeated
+    fields.
+    """
+    global _pyarrow_is_installed
+
+    if config.get_option('global.dataFrameSerialization') != 'arrow':
+        return False
+
+    if _pyarrow_is_installed is None:
+        try:
+            import pyarrow  # noqa: F401
+            _pyarrow_is_installed = True
+        except ImportError:
+            LOGGER.warning(
+                'global.dataFrameSerialization is "arrow", but pyarrow is not '
+                'installed. Sending DataFrames as repeated fields instead. '
+                'pip install pyarrow')
+            _pyarrow_is_installed = False
+
+    return _pyarrow_is_installed
+
+
+def _marshall_arrow_table(df, proto_table):
+    """Convert a pandas.DataFrame's columns into an Arrow IPC stream.
+
+    df          - pandas.DataFrame (input).
+    proto_table - proto.Table (output)
+    """
+    import pyarrow as pa
+
+    arrays = []
+    fields = []
+    for col in range(len(df.columns)):
+        array, streamlit_type = _to_arrow_array(df.iloc[:, col])
+        metadata = None
+        if streamlit_type is not None:
+            metadata = {ARROW_TYPE_METADATA_KEY: streamlit_type}
+        arrays.append(array)
+        fields.append(pa.field(str(col), array.type, metadata=metadata))
+
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+    proto_table.arrow = _write_arrow_table(table)
+
+
+def _to_arrow_array(pandas_array):
+    """Convert a pandas.Series into a pyarrow.Array.
+
+    Returns
+    -------
+    (pyarrow.Array, bytes or None)
+        The array, and how the frontend should interpret its int64 values,
+        if not as plain numbers: ARROW_DATETIME or ARROW_TIMEDELTA.
+
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    dtype = pandas_array.dtype
+
+    if dtype.name == 'category':
+        # Categoricals are dictionary-encoded as they are, with their
+        # categories as strings.
+        codes = np.asarray(pandas_array.cat.codes)
+        categories = pa.array(
+            list(map(str, dtype.categories)), type=pa.string())
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0), categories), None
+    # np.timedelta64 is an np.integer, so check for it first.
+    elif issubclass(dtype.type, np.timedelta64):
+        return (
+            pa.array(pandas_array.values.astype(np.int64)), ARROW_TIMEDELTA)
+    elif (issubclass(dtype.type, (np.floating, np.integer)) or
+            dtype == np.bool):
+        # Don't turn NaNs into nulls, so the values stay zero-copy.
+        return pa.array(pandas_array.values, from_pandas=False), None
+    # See _marshall_any_array for why datetimes are checked by name.
+    elif dtype.name.startswith('datetime64'):
+        if pandas_array.dt.tz is None:
+            current_zone = tzlocal.get_localzone()
+            pandas_array = pandas_array.dt.tz_localize(current_zone)
+        return (
+            pa.array(np.asarray(pandas_array.astype(np.int64))),
+            ARROW_DATETIME)
+
+    # Everything else, including objects, intervals and periods, is sent as
+    # strings, dictionary-encoded if that at least halves the strings sent.
+    str_values = _to_strings(pandas_array)
+    strings = pa.array(str_values, type=pa.string())
+    if _may_have_few_strings(str_values):
+        encoded = strings.dictionary_encode()
+        if len(encoded.dictionary) * 2 <= len(strings):
+            return encoded, None
+    return strings, None
+
+
+def _write_arrow_table(table):
+    """Serialize a pyarrow.Table into an Arrow IPC stream."""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_stream(sink, table.schema)
+    writer.write_table(table)
+    writer.close()
+    return sink.getvalue().to_pybytes()
+
+
+def _read_arrow_table(data):
+    """Deserialize an Arrow IPC stream into a pyarrow.Table."""
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(data).read_all()
+
+
 def _marshall_any_array(pandas_array, proto_array):
     """Convert a 1D numpy.Array into a proto.AnyArray.
 
@@ -297,6 +612,7 @@ def _marshall_any_array(pandas_array, proto_array):
     proto_array  - proto.AnyArray (output)
     """
     import numpy as np
+    import pandas as pd
     # Convert to np.array as necessary.
     if not hasattr(pandas_array, 'dtype'):
         pandas_array = np.array(pandas_array)
@@ -305,6 +621,36 @@ def _marshall_any_array(pandas_array, proto_array):
     if len(pandas_array.shape) != 1:
         raise ValueError('Array must be 1D.')
 
+    # Categoricals of strings are dictionary-encoded as they are. Other
+    # categoricals are sent as their values, so numbers and dates keep their
+    # types. Other pandas extension dtypes, like intervals and periods, are
+    # sent as strings.
+    if pandas_array.dtype.name == 'category':
+        categorical = pd.Categorical(pandas_array)
+        if categorical.categories.dtype == np.object:
+            _marshall_dictionary_strings(
+                categorical.codes, categorical.categories, proto_array)
+            return
+        pandas_array = pd.Series(np.asarray(categorical))
+
+    # From here on, objects are the strings shown for them, so they're only
+    # converted once.
+    if pandas_array.dtype == np.object or not (
+            isinstance(pandas_array.dtype, np.dtype) or
+            pandas_array.dtype.name.startswith('datetime64')):
+        pandas_array = _to_strings(pandas_array)
+
+        # Only worth it if it at least halves the number of strings sent.
+        if _may_have_few_strings(pandas_array):
+            codes, dictionary = _factorize(pandas_array)
+            if len(dictionary) * 2 <= len(pandas_array):
+                _marshall_dictionary_strings(codes, dictionary, proto_array)
+                return
+
+    if config.get_option('global.dataFrameSerialization') == 'packed':
+        _marshall_packed_array(pandas_array, proto_array)
+        return
+
     # Perform type-conversion based on the array dtype.
     if issubclass(pandas_array.dtype.type, np.floating):
         proto_array.doubles.data.extend(pandas_array)
@@ -315,7 +661,7 @@ def _marshall_any_array(pandas_array, proto_array):
     elif pandas_array.dtype == np.bool:
         proto_array.int64s.data.extend(pandas_array)
     elif pandas_array.dtype == np.object:
-        proto_array.strings.data.extend(map(str, pandas_array))
+        proto_array.strings.data.extend(pandas_array.tolist())
     # Setting a timezone changes (dtype, dtype.type) from
     #   'datetime64[ns]', <class 'numpy.datetime64'>
     # to
@@ -331,52 +677,508 @@ def _marshall_any_array(pandas_array, proto_array):
                                   pandas_array.dtype)
 
 
-def add_rows(delta1, delta2, name=None):
+def _to_strings(pandas_array):
+    """Return the strings shown for an array of values, as an object array.
+
+    Values are dictionary-encoded by their str(), since that's what gets
+    displayed. Comparing the values themselves would merge 1, 1.0 and True,
+    say.
+    """
+    import numpy as np
+
+    strings = np.empty(len(pandas_array), dtype=object)
+    strings[:] = [str(value) for value in pandas_array]
+    return strings
+
+
+def _may_have_few_strings(strings):
+    """Guess whether an array of strings has at most half as many distinct
+    strings, without looking at all of them.
+
+    Short arrays are always factorized. For long ones, this looks at an
+    evenly spaced sample of _STRING_SAMPLE_SIZE strings, and gives up if
+    nearly all of those are distinct, as in columns of names or ids.
+    Factorizing those would only find out that they aren't worth encoding.
+    """
+    if len(strings) <= _STRING_SAMPLE_SIZE:
+        return True
+
+    step = len(strings) // _STRING_SAMPLE_SIZE
+    sample = strings[::step][:_STRING_SAMPLE_SIZE]
+    return len(set(sample)) < 0.95 * len(sample)
+
+
+def _factorize(strings):
+    """Find the distinct strings in an array of strings.
+
+    Returns
+    -------
+    (numpy.ndarray, list)
+        The index of each string among the distinct strings, and the
+        distinct strings.
+
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(strings)
+    return codes, list(uniques)
+
+
+def _marshall_dictionary_strings(codes, dictionary, proto_array):
+    """Marshall dictionary-encoded strings into a proto.AnyArray.
+
+    codes       - the index of each row's value in dictionary, or -1 for
+                  missing values (input).
+    dictionary  - the distinct values (input).
+    proto_array - proto.AnyArray (output)
+    """
+    import numpy as np
+
+    dictionary = list(map(str, dictionary))
+    codes = np.asarray(codes, dtype=np.int32)
+
+    # Missing values show up as 'nan', like in the other string arrays.
+    missing = codes < 0
+    if missing.any():
+        codes = np.where(missing, len(dictionary), codes)
+        dictionary.append(str(float('nan')))
+
+    proto_array.dictionary_strings.dictionary.extend(dictionary)
+    # Extending from a list is about twice as fast as from a numpy array.
+    proto_array.dictionary_strings.codes.extend(codes.tolist())
+
+
+def _marshall_packed_array(pandas_array, proto_array):
+    """Convert a 1D numpy.Array into a packed proto.AnyArray.
+
+    Fixed-width values are copied straight from the array's buffer, and
+    strings are laid out as offsets into one UTF-8 buffer.
+
+    pandas_array - 1D arrays which is AnyArray compatible. Object arrays
+                   must hold strings (input).
+    proto_array  - proto.AnyArray (output)
+    """
+    import numpy as np
+
+    def pack(array, dtype, np_dtype):
+        proto_array.packed.dtype = dtype
+        proto_array.packed.data = np.ascontiguousarray(
+            array, dtype=np_dtype).tobytes()
+
+    if issubclass(pandas_array.dtype.type, np.floating):
+        pack(pandas_array, PackedArray.FLOAT64, '<f8')
+    elif issubclass(pandas_array.dtype.type, np.timedelta64):
+        pack(pandas_array.astype(np.int64), PackedArray.TIMEDELTA64, '<i8')
+    elif issubclass(pandas_array.dtype.type, np.integer):
+        pack(pandas_array, PackedArray.INT64, '<i8')
+    elif pandas_array.dtype == np.bool:
+        pack(pandas_array, PackedArray.BOOL, 'u1')
+    elif pandas_array.dtype == np.object:
+        # Objects have been turned into strings already. See _to_strings.
+        strings = pandas_array.tolist()
+        joined = ''.join(strings)
+        data = joined.encode('utf-8')
+
+        # Offsets are in bytes. For ASCII, that's the same as in characters,
+        # which saves encoding each string on its own.
+        if len(data) != len(joined):
+            strings = [string.encode('utf-8') for string in strings]
+
+        offsets = np.zeros(len(strings) + 1, dtype='<i4')
+        np.cumsum(
+            np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)),
+            out=offsets[1:])
+        proto_array.packed_strings.offsets = offsets.tobytes()
+        proto_array.packed_strings.data = data
+    # See _marshall_any_array for why datetimes are checked by name.
+    elif pandas_array.dtype.name.startswith('datetime64'):
+        if pandas_array.dt.tz is None:
+            current_zone = tzlocal.get_localzone()
+            pandas_array = pandas_array.dt.tz_localize(current_zone)
+        pack(pandas_array.astype(np.int64), PackedArray.DATETIME64, '<i8')
+    else:
+        raise NotImplementedError('Dtype %s not understood.' %
+                                  pandas_array.dtype)
+
+
+def add_rows(delta1, delta2, name=None, max_rows=0, pack=True,
+             lookups=None):
     """Concat the DataFrame in delta2 to the DataFrame in delta1.
 
+    This changes delta1 in place, and only copies the data in delta2. If the
+    DataFrames can't be concatenated, delta1 is left as it was.
+
     Parameters
     ----------
     delta1 : Delta
     delta2 : Delta
     name : str or None
+    max_rows : int
+        If greater than 0, only the last max_rows rows of the concatenated
+        DataFrame are kept.
+    pack : bool
+        If False, packed columns are left as repeated fields, which later
+        add_rows calls append to without copying the rows already there.
+        Call pack_data_frames once done adding rows.
+    lookups : dict or None
+        Where to keep, between calls, the position of each value of delta1's
+        dictionary-encoded columns and MultiIndex levels. Then each call
+        only looks up delta2's values. Pass the same dict for every call
+        that adds rows to delta1, and a new one whenever delta1 is replaced.
 
     """
+    if lookups is None:
+        lookups = {}
+    df_lookups = _Lookups(lookups, name)
+
     df1 = _get_data_frame(delta1, name)
     df2 = _get_data_frame(delta2, name)
 
+    # Arrow tables are turned into columns, so each delta's rows are
+    # appended to them rather than the whole stream being rewritten.
+    if df1.data.arrow:
+        df1.data.CopyFrom(_arrow_to_table(df1.data.arrow))
+    data2 = df2.data
+    if data2.arrow:
+        data2 = _arrow_to_table(data2.arrow)
+
+    # Appending to a bytes field copies all of it, so packed columns are
+    # appended to as repeated fields. delta2 mustn't change, so its columns
+    # are unpacked in a copy.
+    _unpack_data_frame(df1)
+    index2 = df2.index
+    if _has_packed_arrays(data2, index2):
+        data2_copy = Table()
+        data2_copy.CopyFrom(data2)
+        data2 = data2_copy
+        index2 = type(df2.index)()
+        index2.CopyFrom(df2.index)
+        for col in data2.cols:
+            _unpack_any_array(col)
+        _unpack_index(index2)
+
     if len(df1.data.cols) == 0:
-        if len(df2.data.cols) == 0:
+        if len(data2.cols) == 0:
             return
         df1.CopyFrom(df2)
+        df1.data.CopyFrom(data2)
+        df1.index.CopyFrom(index2)
+        _clear_lookups(lookups, name)
+        _trim_rows_and_lookups(df1, max_rows, lookups, name)
+        if pack:
+            _pack_data_frame(df1)
         return
 
-    # Copy Data
-    if len(df1.data.cols) != len(df2.data.cols):
+    # Check everything before changing df1, so it isn't left half-changed.
+    if len(df1.data.cols) != len(data2.cols):
         raise ValueError('Dataframes have incompatible shapes')
-    for (col1, col2) in zip(df1.data.cols, df2.data.cols):
-        _concat_any_array(col1, col2)
+    for (col1, col2) in zip(df1.data.cols, data2.cols):
+        _check_can_concat_any_array(col1, col2)
+    _check_can_concat_index(df1.index, index2)
+
+    # Copy Data
+    num_rows1 = _table_len(df1.data)
+    for i, (col1, col2) in enumerate(zip(df1.data.cols, data2.cols)):
+        _concat_any_array(col1, col2, df_lookups.get('col', i))
 
     # Copy index
-    _concat_index(df1.index, df2.index)
+    _concat_index(df1.index, index2, df_lookups.child('index'))
 
     # Don't concat columns! add_rows should leave the dataframe with the same
     # number of columns as it had before.
     # DON'T DO: _concat_index(df1.columns, df2.columns)
 
     # Copy styles
-    for (style_col1, style_col2) in zip(df1.style.cols, df2.style.cols):
-        _concat_cell_style_array(style_col1, style_col2)
+    if len(df2.style.cols) > 0:
+        while len(df1.style.cols) < len(df2.style.cols):
+            df1.style.cols.add()
+        for (style_col1, style_col2) in zip(df1.style.cols, df2.style.cols):
+            _concat_cell_style_array(style_col1, style_col2, num_rows1)
 
+    _trim_rows_and_lookups(df1, max_rows, lookups, name)
+    if pack:
+        _pack_data_frame(df1)
 
-def _concat_index(index1, index2):
-    """Contact index2 into index1."""
-    # Special case if index1 is empty.
+
+class _Lookups(object):
+    """The dicts of value positions that add_rows keeps in its lookups,
+    whose keys start with a prefix.
+    """
+
+    def __init__(self, lookups, *prefix):
+        self._lookups = lookups
+        self._prefix = prefix
+
+    def get(self, *key):
+        """Return the positions dict for the key, creating it if needed."""
+        return self._lookups.setdefault(self._prefix + key, {})
+
+    def child(self, *key):
+        """Return the _Lookups whose prefix is this one's plus key."""
+        return _Lookups(self._lookups, *(self._prefix + key))
+
+
+def _clear_lookups(lookups, name):
+    """Forget the lookups add_rows kept for the DataFrame with the name."""
+    for key in [key for key in lookups if key[0] == name]:
+        del lookups[key]
+
+
+def _trim_rows_and_lookups(proto_df, max_rows, lookups, name):
+    """trim_rows, and forget the lookups if any rows were dropped, since
+    trimming drops values from dictionaries and levels.
+    """
+    num_rows = _table_len(proto_df.data)
+    trim_rows(proto_df, max_rows)
+    if _table_len(proto_df.data) != num_rows:
+        _clear_lookups(lookups, name)
+
+
+def pack_data_frames(delta):
+    """Pack the columns that add_rows(pack=False) left as repeated fields.
+
+    This is a no-op unless global.dataFrameSerialization is "packed" or
+    "arrow", since columns are only packed then.
+
+    Parameters
+    ----------
+    delta : Delta
+
+    """
+    delta_type = delta.WhichOneof('type')
+    if delta_type == 'add_rows':
+        _pack_data_frame(delta.add_rows.data)
+    elif delta_type == 'new_element':
+        element = delta.new_element
+        element_type = element.WhichOneof('type')
+        if element_type == 'data_frame':
+            _pack_data_frame(element.data_frame)
+        elif element_type == 'table':
+            _pack_data_frame(element.table)
+        elif element_type == 'chart':
+            _pack_data_frame(element.chart.data)
+        elif element_type == 'vega_lite_chart':
+            _pack_data_frame(element.vega_lite_chart.data)
+            for dataset in element.vega_lite_chart.datasets:
+                _pack_data_frame(dataset.data)
+
+
+# The repeated field that each PackedArray.DType is unpacked into, and back.
+_UNPACKED_FIELDS = {
+    PackedArray.FLOAT64: 'doubles',
+    PackedArray.INT64: 'int64s',
+    PackedArray.DATETIME64: 'datetimes',
+    PackedArray.TIMEDELTA64: 'timedeltas',
+    # Like the repeated serialization, which sends bools as int64s.
+    PackedArray.BOOL: 'int64s',
+}
+_PACKED_DTYPES = {
+    'doubles': (PackedArray.FLOAT64, '<f8'),
+    'int64s': (PackedArray.INT64, '<i8'),
+    'datetimes': (PackedArray.DATETIME64, '<i8'),
+    'timedeltas': (PackedArray.TIMEDELTA64, '<i8'),
+}
+
+
+def _has_packed_arrays(table, index):
+    """Return whether a proto.Table or proto.Index has packed arrays."""
+    return any(
+        any_array.WhichOneof('type') in ('packed', 'packed_strings')
+        for any_array in _iter_any_arrays(table, index))
+
+
+def _iter_any_arrays(table, index):
+    """Yield the proto.AnyArrays of a proto.Table's columns and of a
+    proto.Index.
+    """
+    for col in table.cols:
+        yield col
+
+    index_type = index.WhichOneof('type')
+    if index_type == 'plain_index':
+        yield index.plain_index.data
+    elif index_type == 'multi_index':
+        for level in index.multi_index.levels:
+            if level.WhichOneof('type') == 'plain_index':
+                yield level.plain_index.data
+
+
+def _unpack_data_frame(proto_df):
+    """Turn the packed arrays of a proto.DataFrame's data and index into
+    repeated fields, in place.
+    """
+    for any_array in _iter_any_arrays(proto_df.data, proto_df.index):
+        _unpack_any_array(any_array)
+
+
+def _unpack_index(index):
+    """Turn the packed arrays of a proto.Index into repeated fields, in
+    place.
+    """
+    for any_array in _iter_any_arrays(Table(), index):
+        _unpack_any_array(any_array)
+
+
+def _pack_data_frame(proto_df):
+    """Pack the repeated fields of a proto.DataFrame's data and index, in
+    place, if DataFrames are sent packed.
+    """
+    if config.get_option('global.dataFrameSerialization') == 'repeated':
+        return
+    for any_array in _iter_any_arrays(proto_df.data, proto_df.index):
+        _pack_any_array(any_array)
+
+
+def _unpack_any_array(any_array):
+    """Turn a packed proto.AnyArray into its repeated field, in place."""
+    array_type = any_array.WhichOneof('type')
+    if array_type == 'packed':
+        values = _get_any_array_values(any_array)
+        field = getattr(any_array, _UNPACKED_FIELDS[any_array.packed.dtype])
+        # Setting the field, even to nothing, makes it the array's type.
+        field.SetInParent()
+        field.data.extend(values)
+    elif array_type == 'packed_strings':
+        strings = _get_packed_strings(any_array.packed_strings)
+        any_array.strings.SetInParent()
+        any_array.strings.data.extend(strings)
+
+
+def _pack_any_array(any_array):
+    """Turn a proto.AnyArray of numbers or strings into a packed one, in
+    place.
+    """
+    import numpy as np
+
+    array_type = any_array.WhichOneof('type')
+    if array_type in _PACKED_DTYPES:
+        dtype, np_dtype = _PACKED_DTYPES[array_type]
+        data = np.array(
+            getattr(any_array, array_type).data, dtype=np_dtype).tobytes()
+        any_array.packed.dtype = dtype
+        any_array.packed.data = data
+    elif array_type == 'strings':
+        _marshall_packed_array(
+            np.array(list(any_array.strings.data), dtype=object), any_array)
+
+
+def trim_rows(proto_df, max_rows):
+    """Drop all but the last max_rows rows of a proto.DataFrame, in place.
+
+    Parameters
+    ----------
+    proto_df : proto.DataFrame
+    max_rows : int
+        The number of rows to keep. If 0, all rows are kept.
+
+    """
+    if max_rows <= 0:
+        return
+
+    if proto_df.data.arrow:
+        proto_df.data.CopyFrom(_arrow_to_table(proto_df.data.arrow))
+
+    num_dropped = _table_len(proto_df.data) - max_rows
+    if num_dropped <= 0:
+        return
+
+    for col in proto_df.data.cols:
+        _trim_any_array(col, num_dropped)
+
+    _trim_index(proto_df.index, num_dropped)
+
+    for style_col in proto_df.style.cols:
+        _trim_cell_style_array(style_col, num_dropped)
+
+
+def _trim_index(index, num_dropped):
+    """Drop the first num_dropped elements of a proto.Index, in place."""
+    index_type = index.WhichOneof('type')
+    if index_type == 'plain_index':
+        _trim_any_array(index.plain_index.data, num_dropped)
+    elif index_type == 'range_index':
+        index.range_index.start += num_dropped
+    elif index_type == 'multi_index':
+        _trim_multi_index(index.multi_index, num_dropped)
+    elif index_type is not None:
+        del getattr(index, index_type).data.data[:num_dropped]
+
+
+def _trim_multi_index(multi_index, num_dropped):
+    """Drop the first num_dropped elements of a proto.MultiIndex, in place.
+
+    Level values that no label uses anymore are dropped too, so the levels
+    don't keep growing.
+    """
+    import numpy as np
+
+    for level, labels in zip(multi_index.levels, multi_index.labels):
+        del labels.data[:num_dropped]
+
+        codes = np.asarray(labels.data, dtype=np.int32)
+        used = np.unique(codes[codes >= 0])
+        level_len = _index_len(level)
+        if len(used) == level_len or level.WhichOneof('type') == 'range_index':
+            continue
+
+        # Labels of -1 are missing values, and pick the -1 at the end.
+        new_codes = np.full(level_len + 1, -1, dtype=np.int32)
+        new_codes[used] = np.arange(len(used), dtype=np.int32)
+        labels.data[:] = new_codes[codes].tolist()
+        level.CopyFrom(_take_index(level, used.tolist()))
+
+
+def _trim_any_array(any_array, num_dropped):
+    """Drop the first num_dropped elements of a proto.AnyArray, in place."""
+    import numpy as np
+
+    array_type = any_array.WhichOneof('type')
+    if array_type == 'packed':
+        item_size = _packed_item_size(any_array.packed)
+        any_array.packed.data = any_array.packed.data[
+            num_dropped * item_size:]
+    elif array_type == 'packed_strings':
+        strings = any_array.packed_strings
+        offsets = np.frombuffer(strings.offsets, dtype='<i4')
+        start = offsets[num_dropped]
+        strings.offsets = (offsets[num_dropped:] - start).astype(
+            '<i4').tobytes()
+        strings.data = strings.data[start:]
+    elif array_type == 'dictionary_strings':
+        # Drop the strings no row uses anymore, so the dictionary doesn't
+        # keep growing.
+        encoded = any_array.dictionary_strings
+        used, codes = np.unique(
+            np.asarray(encoded.codes[num_dropped:], dtype=np.int32),
+            return_inverse=True)
+        dictionary = [encoded.dictionary[i] for i in used]
+        any_array.ClearField('dictionary_strings')
+        _marshall_dictionary_strings(codes, dictionary, any_array)
+    elif array_type is not None:
+        del getattr(any_array, array_type).data[:num_dropped]
+
+
+def _trim_cell_style_array(style_array, num_dropped):
+    """Drop the styles of the first num_dropped rows of a
+    proto.CellStyleArray, in place.
+    """
+    # An array without rows has one style per row.
+    if len(style_array.rows) == 0:
+        del style_array.styles[:num_dropped]
+        return
+
+    # Rows are in order, so the dropped ones come first.
+    num_styles_dropped = bisect.bisect_left(style_array.rows, num_dropped)
+    del style_array.styles[:num_styles_dropped]
+    style_array.rows[:] = [
+        row - num_dropped for row in style_array.rows[num_styles_dropped:]]
+
+
+def _check_can_concat_index(index1, index2):
+    """Raise an error if index2 can't be concatenated into index1."""
     if _index_len(index1) == 0:
-        index1.Clear()
-        index1.CopyFrom(index2)
         return
 
-    # Otherwise, dispatch based on type.
     type1 = index1.WhichOneof('type')
     type2 = index2.WhichOneof('type')
     # This branch is covered with tests but pytest doesnt seem to realize it.
@@ -387,48 +1189,418 @@ def _concat_index(index1, index2):
         })
 
     if type1 == 'plain_index':
-        _concat_any_array(index1.plain_index.data, index2.plain_index.data)
+        _check_can_concat_any_array(
+            index1.plain_index.data, index2.plain_index.data)
+    elif type1 == 'multi_index':
+        levels1 = index1.multi_index.levels
+        levels2 = index2.multi_index.levels
+        if len(levels1) != len(levels2):
+            raise ValueError(
+                'Cannot concatenate MultiIndices with different numbers of '
+                'levels.')
+        for level1, level2 in zip(levels1, levels2):
+            if level1.WhichOneof('type') == 'range_index':
+                raise NotImplementedError(
+                    'Cannot concatenate MultiIndices with range_index levels.')
+            _check_can_concat_index(level1, level2)
+    elif type1 not in ('range_index', 'int_64_index', 'float_64_index',
+                       'datetime_index', 'timedelta_index'):
+        raise NotImplementedError('Cannot concatenate "%s" indices.' % type1)
+
+
+def _concat_index(index1, index2, lookups=None):
+    """Contact index2 into index1.
+
+    lookups is a _Lookups, or None to look values up from scratch.
+    """
+    # Special case if index1 is empty.
+    if _index_len(index1) == 0:
+        index1.Clear()
+        index1.CopyFrom(index2)
+        return
+
+    # Otherwise, dispatch based on type.
+    _check_can_concat_index(index1, index2)
+    type1 = index1.WhichOneof('type')
+
+    if type1 == 'plain_index':
+        _concat_any_array(
+            index1.plain_index.data, index2.plain_index.data,
+            lookups and lookups.get('dictionary'))
     elif type1 == 'range_index':
         index1.range_index.stop += \
             (index2.range_index.stop - index2.range_index.start)
     elif type1 == 'multi_index':
-        raise NotImplementedError('Cannot yet concatenate MultiIndices.')
+        _concat_multi_index(index1.multi_index, index2.multi_index, lookups)
     elif type1 == 'int_64_index':
         index1.int_64_index.data.data.extend(index2.int_64_index.data.data)
+    elif type1 == 'float_64_index':
+        index1.float_64_index.data.data.extend(
+            index2.float_64_index.data.data)
     elif type1 == 'datetime_index':
         index1.datetime_index.data.data.extend(index2.datetime_index.data.data)
     elif type1 == 'timedelta_index':
         index1.timedelta_index.data.data.extend(
             index2.timedelta_index.data.data)
+
+
+def _concat_multi_index(multi_index1, multi_index2, lookups=None):
+    """Concat multi_index2 into multi_index1.
+
+    Only the values of multi_index2's levels that multi_index1's levels
+    don't have are copied, and its labels are mapped to the merged levels.
+
+    lookups is a _Lookups, which keeps where each value is in
+    multi_index1's levels between calls. If None, they're looked up from
+    scratch.
+    """
+    import numpy as np
+
+    for i, (level1, level2, labels1, labels2) in enumerate(zip(
+            multi_index1.levels, multi_index2.levels,
+            multi_index1.labels, multi_index2.labels)):
+        positions = lookups.get('level', i) if lookups else {}
+        level1_len = _index_len(level1)
+        if not positions:
+            positions.update(
+                (value, j)
+                for j, value in enumerate(_get_index_values(level1)))
+
+        # Where each value of level2 is in the merged level, and which of
+        # them are new.
+        codes = []
+        new_positions = []
+        for j, value in enumerate(_get_index_values(level2)):
+            if value not in positions:
+                positions[value] = level1_len + len(new_positions)
+                new_positions.append(j)
+            codes.append(positions[value])
+
+        if new_positions:
+            _concat_index(
+                level1, _take_index(level2, new_positions),
+                lookups.child('level', i) if lookups else None)
+
+        # Labels of -1 are missing values, and pick the -1 at the end.
+        codes.append(-1)
+        labels1.data.extend(np.asarray(codes, dtype=np.int32)[
+            np.asarray(labels2.data, dtype=np.int32)].tolist())
+
+
+def _get_index_values(index):
+    """Return the values of a proto.Index that isn't a MultiIndex, as a
+    list.
+    """
+    index_type = index.WhichOneof('type')
+    if index_type == 'plain_index':
+        return _get_any_array_values(index.plain_index.data)
+    elif index_type == 'range_index':
+        return list(range(index.range_index.start, index.range_index.stop))
+    elif index_type in ('int_64_index', 'float_64_index', 'datetime_index',
+                        'timedelta_index'):
+        return list(getattr(index, index_type).data.data)
+    raise NotImplementedError('Cannot get the values of "%s" indices.' %
+                              index_type)
+
+
+def _get_any_array_values(any_array):
+    """Return the values of a proto.AnyArray as a list."""
+    import numpy as np
+
+    array_type = any_array.WhichOneof('type')
+    if array_type == 'packed':
+        if any_array.packed.dtype == PackedArray.BOOL:
+            np_dtype = 'u1'
+        elif any_array.packed.dtype == PackedArray.FLOAT64:
+            np_dtype = '<f8'
+        else:
+            np_dtype = '<i8'
+        return np.frombuffer(any_array.packed.data, np_dtype).tolist()
+    elif array_type == 'packed_strings':
+        return _get_packed_strings(any_array.packed_strings)
+    elif array_type == 'dictionary_strings':
+        dictionary = any_array.dictionary_strings.dictionary
+        return [dictionary[code] for code in any_array.dictionary_strings.codes]
+    elif array_type is None:
+        return []
+    return list(getattr(any_array, array_type).data)
+
+
+def _take_index(index, positions):
+    """Return a proto.Index of the values of an index at the positions.
+
+    The index can't be a MultiIndex or RangeIndex.
+    """
+    taken = type(index)()
+    index_type = index.WhichOneof('type')
+    if index_type == 'plain_index':
+        taken.plain_index.data.CopyFrom(
+            _take_any_array(index.plain_index.data, positions))
+    elif index_type in ('int_64_index', 'float_64_index', 'datetime_index',
+                        'timedelta_index'):
+        data = getattr(index, index_type).data.data
+        getattr(taken, index_type).data.data.extend(
+            [data[i] for i in positions])
     else:
-        raise NotImplementedError('Cannot concatenate "%s" indices.' % type1)
+        raise NotImplementedError('Cannot take values of "%s" indices.' %
+                                  index_type)
+    return taken
 
 
-def _concat_any_array(any_array_1, any_array_2):
-    """Concat elements from any_array_2 into any_array_1."""
-    # Special case if any_array_1 is empty
+def _take_any_array(any_array, positions):
+    """Return a proto.AnyArray of the values of an array at the positions,
+    with the same type.
+    """
+    import numpy as np
+
+    taken = type(any_array)()
+    array_type = any_array.WhichOneof('type')
+    if array_type == 'packed':
+        # The values are taken as bytes, which works for any dtype.
+        item_size = _packed_item_size(any_array.packed)
+        items = np.frombuffer(any_array.packed.data, 'V%d' % item_size)
+        taken.packed.dtype = any_array.packed.dtype
+        taken.packed.data = items[positions].tobytes()
+    elif array_type == 'packed_strings':
+        strings = _get_packed_strings(any_array.packed_strings)
+        _marshall_packed_array(
+            np.array([strings[i] for i in positions], dtype=object), taken)
+    elif array_type == 'dictionary_strings':
+        encoded = any_array.dictionary_strings
+        taken.dictionary_strings.dictionary.extend(encoded.dictionary)
+        taken.dictionary_strings.codes.extend(
+            [encoded.codes[i] for i in positions])
+    elif array_type is not None:
+        data = getattr(any_array, array_type).data
+        getattr(taken, array_type).data.extend([data[i] for i in positions])
+    return taken
+
+
+def _arrow_to_table(data):
+    """Convert an Arrow IPC stream into a proto.Table of packed and
+    dictionary-encoded columns, like _marshall_any_array would have made.
+
+    Columns can have rows appended to them in place, whereas an Arrow stream
+    has to be read and written whole.
+    """
+    import pyarrow as pa
+
+    proto_table = Table()
+    table = _read_arrow_table(data)
+    for column, field in zip(table.columns, table.schema):
+        streamlit_type = (field.metadata or {}).get(ARROW_TYPE_METADATA_KEY)
+        chunks = column.chunks
+        if not chunks:
+            # Empty tables have no chunks, but their columns still need a
+            # type.
+            value_type = column.type
+            if pa.types.is_dictionary(value_type):
+                value_type = value_type.value_type
+            chunks = [pa.array([], type=value_type)]
+
+        proto_array = proto_table.cols.add()
+        _arrow_to_any_array(chunks[0], streamlit_type, proto_array)
+        for chunk in chunks[1:]:
+            chunk_array = AnyArray()
+            _arrow_to_any_array(chunk, streamlit_type, chunk_array)
+            _concat_any_array(proto_array, chunk_array)
+    return proto_table
+
+
+def _arrow_to_any_array(arrow_array, streamlit_type, proto_array):
+    """Convert a pyarrow.Array written by _marshall_arrow_table into a
+    proto.AnyArray.
+
+    arrow_array    - pyarrow.Array (input).
+    streamlit_type - its ARROW_TYPE_METADATA_KEY metadata, or None (input).
+    proto_array    - proto.AnyArray (output)
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(arrow_array.type):
+        values = arrow_array.to_pandas()
+        _marshall_dictionary_strings(
+            values.cat.codes, values.cat.categories, proto_array)
+    elif streamlit_type in (ARROW_DATETIME, ARROW_TIMEDELTA):
+        if streamlit_type == ARROW_DATETIME:
+            proto_array.packed.dtype = PackedArray.DATETIME64
+        else:
+            proto_array.packed.dtype = PackedArray.TIMEDELTA64
+        proto_array.packed.data = np.ascontiguousarray(
+            arrow_array.to_numpy(), dtype='<i8').tobytes()
+    else:
+        values = arrow_array.to_numpy(zero_copy_only=False)
+        # Strings come out as an object array.
+        if values.dtype == np.object:
+            values = _to_strings(values)
+        _marshall_packed_array(values, proto_array)
+
+
+def _check_can_concat_any_array(any_array_1, any_array_2):
+    """Raise an error if any_array_2 can't be concatenated into any_array_1.
+    """
     if _any_array_len(any_array_1) == 0:
-        any_array_1.CopyFrom(any_array_2)
         return
 
     type1 = any_array_1.WhichOneof('type')
     type2 = any_array_2.WhichOneof('type')
+    if 'dictionary_strings' in (type1, type2):
+        for array_type in (type1, type2):
+            if array_type not in _STRING_ARRAY_TYPES:
+                raise ValueError(
+                    'Cannot concatenate %s with dictionary_strings.' %
+                    array_type)
+        return
+
     if type1 != type2:
         raise ValueError('Cannot concatenate %(type1)s with %(type2)s.' % {
             'type1': type1,
             'type2': type2
         })
-    getattr(any_array_1, type1).data.extend(getattr(any_array_2, type2).data)
 
+    if (type1 == 'packed' and
+            any_array_1.packed.dtype != any_array_2.packed.dtype):
+        raise ValueError('Cannot concatenate packed arrays of different '
+                         'dtypes.')
+
+
+def _concat_any_array(any_array_1, any_array_2, dictionary_positions=None):
+    """Concat elements from any_array_2 into any_array_1.
 
-def _concat_cell_style_array(style_array1, style_array2):
-    """Concat elements from any_array_2 into any_array_1."""
-    # Special case if array1 is empty
-    if len(style_array1.styles) == 0:
-        style_array1.CopyFrom(style_array2)
+    dictionary_positions keeps where each string is in any_array_1's
+    dictionary between calls, if it's dictionary-encoded. See
+    _concat_dictionary_strings.
+    """
+    # Special case if any_array_1 is empty
+    if _any_array_len(any_array_1) == 0:
+        any_array_1.CopyFrom(any_array_2)
+        return
+
+    _check_can_concat_any_array(any_array_1, any_array_2)
+    type1 = any_array_1.WhichOneof('type')
+    type2 = any_array_2.WhichOneof('type')
+    if 'dictionary_strings' in (type1, type2):
+        _concat_dictionary_strings(
+            any_array_1, any_array_2, dictionary_positions)
         return
 
+    if type1 == 'packed':
+        any_array_1.packed.data += any_array_2.packed.data
+    elif type1 == 'packed_strings':
+        import numpy as np
+        strings1 = any_array_1.packed_strings
+        strings2 = any_array_2.packed_strings
+        offsets1 = np.frombuffer(strings1.offsets, dtype='<i4')
+        offsets2 = np.frombuffer(strings2.offsets, dtype='<i4')
+        # The second array's strings start where the first one's end.
+        strings1.offsets += (offsets2[1:] + offsets1[-1]).astype(
+            '<i4').tobytes()
+        strings1.data += strings2.data
+    else:
+        getattr(any_array_1, type1).data.extend(
+            getattr(any_array_2, type2).data)
+
+
+def _concat_dictionary_strings(any_array_1, any_array_2, positions=None):
+    """Concat the strings in any_array_2 into any_array_1, merging their
+    dictionaries.
+
+    Either array may hold plain strings instead, which get dictionary-encoded
+    first. The result is dictionary-encoded.
+
+    positions is a dict of where each string is in any_array_1's dictionary,
+    which this keeps up to date. It's filled in if empty. Passing the same
+    dict every time saves looking up the whole dictionary again.
+    """
+    import numpy as np
+
+    if positions is None:
+        positions = {}
+
+    if any_array_1.WhichOneof('type') != 'dictionary_strings':
+        _dictionary_encode(any_array_1)
+        positions.clear()
+
+    if any_array_2.WhichOneof('type') != 'dictionary_strings':
+        encoded = type(any_array_2)()
+        encoded.CopyFrom(any_array_2)
+        _dictionary_encode(encoded)
+        any_array_2 = encoded
+
+    dictionary = any_array_1.dictionary_strings.dictionary
+    if not positions:
+        positions.update(
+            (string, i) for i, string in enumerate(dictionary))
+
+    # Where each string in any_array_2's dictionary is in the merged one.
+    new_codes = []
+    for string in any_array_2.dictionary_strings.dictionary:
+        if string not in positions:
+            positions[string] = len(dictionary)
+            dictionary.append(string)
+        new_codes.append(positions[string])
+
+    codes2 = np.asarray(any_array_2.dictionary_strings.codes, dtype=np.int32)
+    any_array_1.dictionary_strings.codes.extend(
+        np.asarray(new_codes, dtype=np.int32)[codes2])
+
+
+def _dictionary_encode(any_array):
+    """Dictionary-encode the strings in a proto.AnyArray, in place."""
+    array_type = any_array.WhichOneof('type')
+    if array_type == 'strings':
+        strings = list(any_array.strings.data)
+    elif array_type == 'packed_strings':
+        strings = _get_packed_strings(any_array.packed_strings)
+    else:
+        raise ValueError(
+            'Cannot concatenate %s with dictionary_strings.' % array_type)
+
+    codes, dictionary = _factorize(strings)
+    any_array.ClearField(array_type)
+    _marshall_dictionary_strings(codes, dictionary, any_array)
+
+
+def _get_packed_strings(packed_strings):
+    """Return the strings in a proto.PackedStringArray."""
+    import numpy as np
+
+    offsets = np.frombuffer(packed_strings.offsets, dtype='<i4')
+    data = packed_strings.data
+    return [
+        data[start:end].decode('utf-8')
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def _concat_cell_style_array(style_array1, style_array2, num_rows1):
+    """Concat elements from style_array2 into style_array1.
+
+    The result is sparse, so rows without styles don't take any space.
+
+    Parameters
+    ----------
+    style_array1 : proto.CellStyleArray
+    style_array2 : proto.CellStyleArray
+    num_rows1 : int
+        The number of rows in style_array1's column, which the rows of
+        style_array2 are offset by.
+
+    """
+    if len(style_array2.styles) == 0:
+        return
+
+    # An array without rows has one style per row. Make that explicit.
+    if len(style_array1.rows) == 0:
+        style_array1.rows.extend(range(len(style_array1.styles)))
+
+    rows2 = style_array2.rows
+    if len(rows2) == 0:
+        rows2 = range(len(style_array2.styles))
+
     style_array1.styles.extend(style_array2.styles)
+    style_array1.rows.extend(row + num_rows1 for row in rows2)
 
 
 def _get_data_frame(delta, name=None):
@@ -504,8 +1676,41 @@ def _index_len(index):
         return len(index.timedelta_index.data.data)
 
 
+def _table_num_cols(table):
+    """Return the number of columns in a proto.Table."""
+    if table.arrow:
+        return _read_arrow_table(table.arrow).num_columns
+    return len(table.cols)
+
+
+def _table_len(table):
+    """Return the number of rows in a proto.Table."""
+    if table.arrow:
+        return _read_arrow_table(table.arrow).num_rows
+    if len(table.cols) == 0:
+        return 0
+    return _any_array_len(table.cols[0])
+
+
+def _packed_item_size(packed):
+    """Return the number of bytes per element of a proto.PackedArray."""
+    return 1 if packed.dtype == PackedArray.BOOL else 8
+
+
 def _any_array_len(any_array):
     """Return the length of an any_array."""
     array_type = any_array.WhichOneof('type')
+
+    if array_type == 'packed':
+        return len(any_array.packed.data) // _packed_item_size(
+            any_array.packed)
+
+    if array_type == 'packed_strings':
+        # There's one more offset than there are strings.
+        return max(0, len(any_array.packed_strings.offsets) // 4 - 1)
+
+    if array_type == 'dictionary_strings':
+        return len(any_array.dictionary_strings.codes)
+
     the_array = getattr(any_array, array_type).data
     return len(the_array)
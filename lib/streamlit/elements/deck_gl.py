@@ -74,7 +74,8 @@ def marshall(proto, spec=None, **kwargs):
             case_converters.to_lower_camel_case, layer)
         layer_proto.spec = json.dumps(fixed_layer)
         # TODO: If several layers use the same data frame, the data gets resent
-        # for each layer. Need to improve this.
+        # for each layer. Large data frames are only converted once, though,
+        # thanks to marshall_data_frame's cache.
         data_frame_proto.marshall_data_frame(data, layer_proto.data)
 
     del spec['layers']
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reduce the rows of a DataFrame to the ones a chart can actually show."""
+
+# Python 2/3 compatibility
+from __future__ import print_function, division, unicode_literals, absolute_import
+from streamlit.compatibility import setup_2_3_shims
+setup_2_3_shims(globals())
+
+
+def downsample(df, num_points):
+    """Return the rows of a DataFrame that keep the shape of its series.
+
+    The rows are split into num_points / 2 buckets of consecutive rows, and
+    for every numeric column, the rows with the smallest and largest values
+    of each bucket are kept, along with the first and last rows. So peaks
+    and dips survive, unlike with evenly spaced rows.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The data to downsample, in x-axis order.
+
+    num_points : int
+        The number of points to reduce each series to.
+
+    Returns
+    -------
+    pandas.DataFrame
+        df itself if it has no more than num_points rows, and otherwise the
+        kept rows of df, in order.
+
+    """
+    import numpy as np
+
+    num_rows = len(df)
+    if num_rows <= num_points or num_points < 2:
+        return df
+
+    bucket_size = -(-num_rows // (num_points // 2))
+    num_buckets = -(-num_rows // bucket_size)
+    num_padded = num_buckets * bucket_size
+    bucket_starts = np.arange(0, num_padded, bucket_size)
+
+    rows = [bucket_starts, [num_rows - 1]]
+
+    values = df.select_dtypes(include=[np.number, np.bool_]).values
+    if values.size:
+        values = values.astype(np.float64)
+        missing = np.isnan(values)
+
+        # Pad the last bucket with values that are never picked, and skip
+        # missing values the same way. argmin and argmax return the first
+        # of equal values, so an all-NaN bucket picks its first row.
+        for fill, argfunc in [(np.inf, np.argmin), (-np.inf, np.argmax)]:
+            padded = np.full((num_padded, values.shape[1]), fill)
+            padded[:num_rows] = np.where(missing, fill, values)
+            buckets = padded.reshape(num_buckets, bucket_size, -1)
+            rows.append(
+                (bucket_starts[:, None] + argfunc(buckets, axis=1)).ravel())
+
+    return df.iloc[np.unique(np.concatenate(rows))]
@@ -40,6 +40,39 @@ def add_magic(code, script_path):
     return code
 
 
+def get_top_level_imports(code, script_path):
+    """Return the modules that the code imports at its top level.
+
+    Parameters
+    ----------
+    code : str
+        The Python code.
+    script_path : str
+        The path to the script file.
+
+    Returns
+    -------
+    list of str
+        The absolute names of the imported modules, in order. Relative
+        imports, and imports inside functions or blocks, are skipped.
+
+    """
+    tree = ast.parse(code, script_path, 'exec')
+    module_names = []
+
+    for node in tree.body:
+        node_type = type(node)
+
+        if node_type is ast.Import:
+            module_names.extend(alias.name for alias in node.names)
+
+        elif (node_type is ast.ImportFrom and node.level == 0 and
+                node.module != '__future__'):
+            module_names.append(node.module)
+
+    return module_names
+
+
 def _modify_ast_subtree(tree, body_attr='body', is_root=False):
     """Parses magic commands and modifies the given AST (sub)tree."""
 
@@ -38,6 +38,9 @@ class MockMetric(object):
     def set(self, *args, **kwargs):
         pass
 
+    def observe(self, *args, **kwargs):
+        pass
+
 
 class Client(object):
 
@@ -66,6 +69,12 @@ class Client(object):
         # yapf: disable
         self._raw_metrics  = [
             ('Counter', 'streamlit_enqueue_deltas_total', 'Total deltas enqueued', ['type']),
+            ('Histogram', 'streamlit_ioloop_blocking_seconds',
+             'Time the IOLoop was blocked by running code', []),
+            ('Gauge', 'streamlit_sessions',
+             'Report sessions, by state (active or idle)', ['state']),
+            ('Gauge', 'streamlit_session_bytes',
+             'Serialized size of the messages held by report sessions', []),
         ]
         # yapf: enable
 
@@ -19,11 +19,22 @@ from enum import Enum
 
 import tornado.concurrent
 import tornado.gen
+import tornado.httpserver
 import tornado.ioloop
+import tornado.locks
 import tornado.web
 import tornado.websocket
 
 from streamlit import config
+from streamlit import metrics
+from streamlit.ForwardMsgCache import ForwardMsgCache
+from streamlit.ForwardMsgCache import PayloadCache
+from streamlit.ForwardMsgCache import compute_hash
+from streamlit.ForwardMsgCache import create_reference_msg
+from streamlit.ForwardMsgCache import get_payload_key
+from streamlit.ForwardMsgCache import is_cacheable_msg
+from streamlit.ForwardMsgCache import serialize_cacheable_msg
+from streamlit.ForwardMsgCache import serialize_payload
 from streamlit.proto.BackMsg_pb2 import BackMsg
 from streamlit import util
 from streamlit.ReportSession import ReportSession
@@ -32,7 +43,10 @@ from streamlit.server.routes import DebugHandler
 from streamlit.server.routes import HealthHandler
 from streamlit.server.routes import MetricsHandler
 from streamlit.server.routes import StaticFileHandler
+from streamlit.server.server_util import CAPABILITY_BATCHED_MESSAGES
+from streamlit.server.server_util import CAPABILITY_MESSAGE_CACHE
 from streamlit.server.server_util import MESSAGE_SIZE_LIMIT
+from streamlit.server.server_util import batch_serialized_forward_msgs
 from streamlit.server.server_util import is_url_from_allowed_origins
 from streamlit.server.server_util import serialize_forward_msg
 
@@ -47,6 +61,21 @@ TORNADO_SETTINGS = {
 }
 
 
+# Threads that serialize ForwardMsgs. See Server._serialize_msgs.
+_SERIALIZATION_WORKERS = 4
+
+# Threads that handle slow browser requests, like DataFrame windows. Kept
+# apart from the serialization threads, so a browser scrolling through big
+# DataFrames can't hold up every browser's messages.
+_REQUEST_WORKERS = 2
+
+# How often we check how long the IOLoop was blocked, when metrics are on.
+_IOLOOP_MONITOR_INTERVAL_SECS = 0.1
+
+# How often we look for idle sessions, and update the session metrics.
+_SESSION_CHECK_INTERVAL_SECS = 60
+
+
 # Dictionary key used to mark the script execution context that starts
 # up before the first browser connects.
 PREHEATED_REPORT_SESSION = 'PREHEATED_REPORT_SESSION'
@@ -98,11 +127,34 @@ class Server(object):
         # Mapping of WebSocket->ReportSession.
         self._report_sessions = {}
 
+        # Hashes of the messages we've sent to browsers, so that browsers can
+        # be told to reuse a message they already have.
+        self._message_cache = ForwardMsgCache()
+
+        # Serialized payloads that sessions with identical messages share.
+        # They're as big as the DataFrames whose fingerprints key them, so
+        # they're bounded like the DataFrameProtoCache.
+        self._payload_cache = PayloadCache(
+            int(config.get_option('global.maxDataFrameCacheSize')))
+
+        # Serializes ForwardMsgs off the IOLoop. See _serialize_msgs.
+        self.executor = tornado.concurrent.futures.ThreadPoolExecutor(
+            max_workers=_SERIALIZATION_WORKERS)
+
+        # Marshalls DataFrame windows and sizes up sessions off the IOLoop.
+        # See _handle_data_frame_window_request and _get_sessions_byte_size.
+        self._request_executor = tornado.concurrent.futures.ThreadPoolExecutor(
+            max_workers=_REQUEST_WORKERS)
+
         self._must_stop = threading.Event()
+
+        # Set whenever a ReportSession enqueues a message for its browser,
+        # so _loop_coroutine wakes up only when there's work to do.
+        self._need_send_data = tornado.locks.Event()
         self._state = None
         self._set_state(State.INITIAL)
 
-    def start(self, on_started):
+    def start(self, on_started, sockets=None):
         """Start the server.
 
         Parameters
@@ -110,6 +162,10 @@ class Server(object):
         on_started : callable
             A callback that will be called when the server's run-loop
             has started, and the server is ready to begin receiving clients.
+        sockets : list of socket.socket or None
+            Already-bound sockets to accept connections on, e.g. when they're
+            shared with other worker processes. If None, we listen on
+            server.port.
 
         """
         if self._state != State.INITIAL:
@@ -117,12 +173,24 @@ class Server(object):
 
         LOGGER.debug('Starting server...')
         app = self._create_app()
-        port = config.get_option('server.port')
-        app.listen(port)
-        LOGGER.debug('Server started on port %s', port)
+        if sockets is None:
+            port = config.get_option('server.port')
+            app.listen(port)
+            LOGGER.debug('Server started on port %s', port)
+        else:
+            http_server = tornado.httpserver.HTTPServer(app)
+            http_server.add_sockets(sockets)
+            LOGGER.debug('Server started on %s shared sockets', len(sockets))
 
         self._ioloop.spawn_callback(self._loop_coroutine, on_started)
 
+        if config.get_option('global.metrics'):
+            self._ioloop.spawn_callback(self._monitor_ioloop_coroutine)
+
+        if (config.get_option('server.idleSessionTimeoutMins') > 0 or
+                config.get_option('global.metrics')):
+            self._ioloop.spawn_callback(self._check_sessions_coroutine)
+
     def get_debug(self):
         return {
             'report': self._report.get_debug(),
@@ -193,27 +261,62 @@ class Server(object):
                 pass
 
             elif self._state == State.ONE_OR_MORE_BROWSERS_CONNECTED:
+                # Clear the flag *before* flushing, so messages enqueued while
+                # we're sending will wake us up again.
+                self._need_send_data.clear()
 
                 # Shallow-clone our sessions into a list, so we can iterate
                 # over it and not worry about whether it's being changed
                 # outside this coroutine.
                 ws_session_pairs = list(self._report_sessions.items())
 
+                # Serialize every session's messages on the executor first,
+                # so they're all serialized concurrently and the IOLoop stays
+                # free to serve other requests in the meantime.
+                pending = []
                 for ws, session in ws_session_pairs:
                     if ws is PREHEATED_REPORT_SESSION:
                         continue
                     if ws is None:
                         continue
+                    if ws.is_write_buffer_full():
+                        # Leave the messages in the session's queue, where
+                        # new deltas get combined with pending ones. We'll be
+                        # notified once the browser catches up.
+                        continue
                     msg_list = session.flush_browser_queue()
-                    for msg in msg_list:
-                        msg_str = serialize_forward_msg(msg)
+                    pending.append((ws, session, msg_list,
+                                    self._serialize_msgs(
+                                        msg_list, ws.max_cached_messages > 0)))
+
+                for ws, session, msg_list, serialize_future in pending:
+                    serialized_msgs = yield serialize_future
+                    if ws not in self._report_sessions:
+                        # The browser disconnected while we were serializing.
+                        continue
+                    msg_strs = [
+                        self._get_msg_str_for_browser(
+                            ws, session, msg, msg_hash, msg_str)
+                        for msg, (msg_hash, msg_str)
+                        in zip(msg_list, serialized_msgs)]
+                    if ws.has_capability(CAPABILITY_BATCHED_MESSAGES):
+                        msg_strs = batch_serialized_forward_msgs(msg_strs)
+                    for msg_str in msg_strs:
                         try:
                             ws.write_message(msg_str, binary=True)
                         except tornado.websocket.WebSocketClosedError:
+                            # Drop the rest of the batch with the browser.
                             self._remove_browser_connection(ws)
+                            break
                         yield
                     yield
 
+                # Give the ScriptRunners a moment to produce more messages, so
+                # bursts of deltas get delivered together.
+                batch_window_ms = config.get_option('server.batchWindowMs')
+                if batch_window_ms > 0:
+                    yield tornado.gen.sleep(batch_window_ms / 1000.0)
+
             elif self._state == State.NO_BROWSERS_CONNECTED:
                 pass
 
@@ -221,19 +324,217 @@ class Server(object):
                 # Break out of the thread loop if we encounter any other state.
                 break
 
-            yield tornado.gen.sleep(0.01)
+            yield self._need_send_data.wait()
 
         # Shut down all ReportSessions
         for session in list(self._report_sessions.values()):
             session.shutdown()
 
+        self.executor.shutdown(wait=False)
+        self._request_executor.shutdown(wait=False)
+
         self._set_state(State.STOPPED)
 
         self._on_stopped()
 
+    @tornado.gen.coroutine
+    def _monitor_ioloop_coroutine(self):
+        """Record how long the IOLoop is blocked, in a histogram metric.
+
+        We repeatedly sleep for a short interval. Any extra time that passes
+        before we wake up was spent running other callbacks without yielding.
+        """
+        histogram = metrics.Client.get('streamlit_ioloop_blocking_seconds')
+
+        while not self._must_stop.is_set():
+            start = self._ioloop.time()
+            yield tornado.gen.sleep(_IOLOOP_MONITOR_INTERVAL_SECS)
+            blocked = (self._ioloop.time() - start -
+                       _IOLOOP_MONITOR_INTERVAL_SECS)
+            histogram.observe(max(blocked, 0))
+
+    @tornado.gen.coroutine
+    def _check_sessions_coroutine(self):
+        """Periodically call _check_sessions, and update the session metrics.
+        """
+        while not self._must_stop.is_set():
+            self._check_sessions()
+
+            if config.get_option('global.metrics'):
+                num_bytes = yield self._get_sessions_byte_size(
+                    list(self._report_sessions.values()))
+                metrics.Client.get('streamlit_session_bytes').set(num_bytes)
+
+            yield tornado.gen.sleep(_SESSION_CHECK_INTERVAL_SECS)
+
+    def _check_sessions(self):
+        """Make sessions idle if their browser has been inactive for a while.
+
+        Also updates the metrics that count sessions.
+
+        """
+        timeout_secs = (
+            config.get_option('server.idleSessionTimeoutMins') * 60)
+
+        num_active = 0
+        num_idle = 0
+
+        for ws, session in list(self._report_sessions.items()):
+            # The preheated session holds the report until a browser
+            # connects, so it's never idle.
+            if (ws is not PREHEATED_REPORT_SESSION and timeout_secs > 0 and
+                    session.get_idle_secs() >= timeout_secs):
+                session.make_idle()
+
+            if session.is_idle:
+                num_idle += 1
+            else:
+                num_active += 1
+
+        sessions_gauge = metrics.Client.get('streamlit_sessions')
+        sessions_gauge.labels('active').set(num_active)
+        sessions_gauge.labels('idle').set(num_idle)
+
+    @tornado.concurrent.run_on_executor(executor='_request_executor')
+    def _get_sessions_byte_size(self, sessions):
+        """Return the total size of the messages the sessions hold.
+
+        This walks every queued message, including big DataFrames, so it
+        runs on self._request_executor rather than blocking the IOLoop.
+        ReportQueues are thread-safe.
+
+        Parameters
+        ----------
+        sessions : list of ReportSession
+
+        Returns
+        -------
+        int
+
+        """
+        return sum(session.get_byte_size() for session in sessions)
+
+    @tornado.concurrent.run_on_executor(executor='_request_executor')
+    def _handle_data_frame_window_request(self, session, request):
+        """Marshall the rows a browser asked for on self._request_executor.
+
+        Windows of big DataFrames take a while to marshall, which would
+        otherwise block every connected browser.
+
+        Parameters
+        ----------
+        session : ReportSession
+        request : streamlit.proto.BackMsg_pb2.DataFrameWindowRequest
+
+        """
+        try:
+            session.handle_data_frame_window_request(request)
+        except BaseException as e:
+            LOGGER.error(e)
+            session.enqueue_exception(e)
+
+    @tornado.concurrent.run_on_executor
+    def _serialize_msgs(self, msg_list, use_cache):
+        """Serialize ForwardMsgs on self.executor.
+
+        Serializing a big DataFrame can take hundreds of milliseconds, which
+        would otherwise block every connected browser. This runs off the
+        IOLoop, and doesn't touch any state that's owned by it.
+
+        Messages with a payload key are serialized and hashed once, for all
+        sessions. See ForwardMsgCache.set_payload_key.
+
+        Parameters
+        ----------
+        msg_list : list of ForwardMsg
+        use_cache : bool
+            True if the browser caches messages. Messages that it can cache
+            are serialized without their metadata, and hashed, so that
+            _get_msg_str_for_browser can turn them into cacheable or
+            reference messages.
+
+        Returns
+        -------
+        list of (str or None, bytes)
+            A (msg_hash, msg_str) pair per message. If msg_hash is None,
+            msg_str is the fully-serialized message. Otherwise msg_str is its
+            payload, as returned by serialize_payload.
+
+        """
+        min_cached_size = config.get_option('server.minCachedMessageSize')
+        serialized_msgs = []
+
+        for msg in msg_list:
+            payload_key = None
+            if use_cache and is_cacheable_msg(msg):
+                payload_key = get_payload_key(msg)
+                if payload_key is not None:
+                    entry = self._payload_cache.get(payload_key)
+                    if entry is not None:
+                        serialized_msgs.append(entry)
+                        continue
+
+            # Small messages aren't worth caching. Huge ones are turned into
+            # exceptions by serialize_forward_msg.
+            if (use_cache and is_cacheable_msg(msg) and
+                    min_cached_size <= msg.ByteSize() <= MESSAGE_SIZE_LIMIT):
+                payload = serialize_payload(msg)
+                msg_hash = compute_hash(payload)
+                if payload_key is not None:
+                    self._payload_cache.add(payload_key, msg_hash, payload)
+                serialized_msgs.append((msg_hash, payload))
+            else:
+                serialized_msgs.append((None, serialize_forward_msg(msg)))
+
+        return serialized_msgs
+
+    def _get_msg_str_for_browser(self, ws, session, msg, msg_hash, msg_str):
+        """Return the bytes to send to the given browser for a ForwardMsg.
+
+        If the browser has already received a message with the same payload,
+        this returns a reference to that message instead.
+
+        Parameters
+        ----------
+        ws : _BrowserWebSocketHandler
+        session : ReportSession
+        msg : ForwardMsg
+        msg_hash : str or None
+        msg_str : bytes
+            The output of _serialize_msgs for this message.
+
+        Returns
+        -------
+        bytes
+
+        """
+        if msg_hash is None:
+            return msg_str
+
+        has_reference = self._message_cache.has_message_reference(
+            msg_hash, session)
+        self._message_cache.add_message(
+            msg_hash, session, ws.max_cached_messages)
+
+        if has_reference:
+            ref_msg = create_reference_msg(msg.metadata, msg_hash)
+            return ref_msg.SerializeToString()
+
+        return serialize_cacheable_msg(msg.metadata, msg_hash, msg_str)
+
     def stop(self):
         self._set_state(State.STOPPING)
         self._must_stop.set()
+        self._notify_loop()
+
+    def _notify_loop(self):
+        """Wake up _loop_coroutine.
+
+        This can be called from any thread (ScriptRunner threads call it via
+        ReportSession.enqueue), so we hop onto the IOLoop before touching the
+        non-thread-safe tornado Event.
+        """
+        self._ioloop.add_callback(self._need_send_data.set)
 
     def _on_stopped(self):
         """Called when our runloop is exiting, to shut down the ioloop.
@@ -279,19 +580,25 @@ class Server(object):
                 session = ReportSession(
                     ioloop=self._ioloop,
                     script_path=self._script_path,
-                    script_argv=self._script_argv)
+                    script_argv=self._script_argv,
+                    message_enqueued_callback=self._notify_loop)
 
             self._report_sessions[ws] = session
 
             if ws is not PREHEATED_REPORT_SESSION:
                 self._set_state(State.ONE_OR_MORE_BROWSERS_CONNECTED)
 
+                # The session may already have messages queued up (e.g. from
+                # a preheated run), so make sure they get sent.
+                self._need_send_data.set()
+
         return self._report_sessions[ws]
 
     def _remove_browser_connection(self, ws):
         if ws in self._report_sessions:
             session = self._report_sessions[ws]
             del self._report_sessions[ws]
+            self._message_cache.remove_session(session)
             session.shutdown()
 
         if len(self._report_sessions) == 0:
@@ -302,14 +609,110 @@ class _BrowserWebSocketHandler(tornado.websocket.WebSocketHandler):
     """Handles a WebSocket connection from the browser"""
     def initialize(self, server):
         self._server = server
+        self._capabilities = frozenset()
+        self.max_cached_messages = 0
+
+        # Bytes passed to write_message that haven't been written to the
+        # socket yet.
+        self._buffered_bytes = 0
 
     def check_origin(self, origin):
         """Set up CORS."""
         return is_url_from_allowed_origins(origin)
 
     def open(self):
+        capabilities = self.get_argument('capabilities', '')
+        self._capabilities = frozenset(
+            c for c in capabilities.split(',') if c)
+
+        # The browser tells us how many messages it can cache. We mirror its
+        # LRU cache, so we must never track more than that.
+        if self.has_capability(CAPABILITY_MESSAGE_CACHE):
+            try:
+                browser_max = int(self.get_argument('max_cached_messages'))
+            except (tornado.web.MissingArgumentError, ValueError):
+                browser_max = 0
+            self.max_cached_messages = min(
+                browser_max, config.get_option('server.maxCachedMessages'))
+
         self._session = self._server._add_browser_connection(self)
 
+    def get_compression_options(self):
+        """Enable permessage-deflate, unless it's turned off in the config."""
+        compression_level = config.get_option(
+            'server.websocketCompressionLevel')
+        if compression_level <= 0:
+            return None
+        return {'compression_level': compression_level}
+
+    def write_message(self, message, binary=False):
+        """Send a message, skipping compression for small messages.
+
+        Compressing tiny deltas costs more CPU than it saves in bandwidth.
+        permessage-deflate lets each message be compressed or not, but
+        Tornado always compresses once it's negotiated, so we briefly hide
+        the connection's compressor when writing small messages.
+
+        The compressor is WebSocketProtocol13._compressor, which is private,
+        so the Pipfile pins Tornado to a major version that has it, and
+        Server_test checks that it's still there. Tornado compresses the
+        message before write_message returns, so nothing else can write
+        while it's hidden.
+        """
+        conn = self.ws_connection
+        compressor = getattr(conn, '_compressor', None)
+        min_size = config.get_option('server.websocketCompressionMinSize')
+
+        if compressor is None or len(message) >= min_size:
+            future = super(_BrowserWebSocketHandler, self).write_message(
+                message, binary=binary)
+        else:
+            conn._compressor = None
+            try:
+                future = super(_BrowserWebSocketHandler, self).write_message(
+                    message, binary=binary)
+            finally:
+                conn._compressor = compressor
+
+        num_bytes = len(message)
+        self._buffered_bytes += num_bytes
+        future.add_done_callback(
+            lambda f: self._on_write_done(f, num_bytes))
+        return future
+
+    def is_write_buffer_full(self):
+        """True if we should stop sending messages until writes complete.
+
+        A browser on a slow link can't keep up with a script that produces
+        deltas quickly. Rather than letting Tornado's write buffer grow
+        without bound, the Server stops flushing this browser's queue while
+        more than server.websocketMaxBufferedBytes are waiting to be written.
+        """
+        return self._buffered_bytes > config.get_option(
+            'server.websocketMaxBufferedBytes')
+
+    def _on_write_done(self, future, num_bytes):
+        was_full = self.is_write_buffer_full()
+        self._buffered_bytes -= num_bytes
+
+        # Retrieve the exception, if any, so it isn't logged as unhandled.
+        # Closed connections are dealt with in on_close.
+        future.exception()
+
+        if was_full and not self.is_write_buffer_full():
+            self._server._notify_loop()
+
+    def has_capability(self, capability):
+        """True if the browser said it supports the given protocol feature.
+
+        Parameters
+        ----------
+        capability : str
+            One of the CAPABILITY_* constants in server_util.
+
+        """
+        return capability in self._capabilities
+
     def on_close(self):
         self._server._remove_browser_connection(self)
 
@@ -321,6 +724,8 @@ class _BrowserWebSocketHandler(tornado.websocket.WebSocketHandler):
             msg.ParseFromString(payload)
             LOGGER.debug('Received the following back message:\n%s', msg)
 
+            self._session.mark_active()
+
             msg_type = msg.WhichOneof('type')
 
             if msg_type == 'cloud_upload':
@@ -337,6 +742,11 @@ class _BrowserWebSocketHandler(tornado.websocket.WebSocketHandler):
             elif msg_type == 'update_widgets':
                 self._session.handle_rerun_script_request(
                     widget_state=msg.update_widgets)
+            elif msg_type == 'data_frame_window':
+                # Not waited for, so scrolling through a big DataFrame
+                # doesn't hold up this browser's other messages.
+                self._server._handle_data_frame_window_request(
+                    self._session, msg.data_frame_window)
             elif msg_type == 'close_connection':
                 if config.get_option('global.developmentMode'):
                     Server.get_current().stop()
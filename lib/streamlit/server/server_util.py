@@ -17,12 +17,34 @@
 
 from streamlit import config
 from streamlit import util
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsgList
 
 # Largest message that can be sent via the WebSocket connection.
 # (Limit was picked arbitrarily)
 # TODO: Break message in several chunks if too large.
 MESSAGE_SIZE_LIMIT = 5 * 10e7  # 50MB
 
+# Batched frames stop growing once they reach this size. Messages that are
+# larger than this on their own are sent in a frame by themselves.
+BATCH_SIZE_LIMIT = 1024 * 1024  # 1MB
+
+# Optional protocol features that a browser can ask for, via the
+# "capabilities" query argument of the /stream WebSocket URL.
+CAPABILITY_BATCHED_MESSAGES = 'batched_messages'
+CAPABILITY_MESSAGE_CACHE = 'message_cache'
+
+# Protobuf wire-format tags (field number + length-delimited wire type) used
+# to wrap already-serialized ForwardMsgs into a batch without re-serializing
+# them.
+WIRETYPE_LENGTH_DELIMITED = 2
+_BATCH_TAG = bytes(bytearray([
+    ForwardMsg.DESCRIPTOR.fields_by_name['batch'].number << 3 |
+    WIRETYPE_LENGTH_DELIMITED]))
+_BATCH_ENTRY_TAG = bytes(bytearray([
+    ForwardMsgList.DESCRIPTOR.fields_by_name['messages'].number << 3 |
+    WIRETYPE_LENGTH_DELIMITED]))
+
 
 def serialize_forward_msg(msg):
     """Serialize a ForwardMsg to send to a client.
@@ -50,6 +72,67 @@ def serialize_forward_msg(msg):
     return msg_str
 
 
+def batch_serialized_forward_msgs(msg_strs, size_limit=BATCH_SIZE_LIMIT):
+    """Group serialized ForwardMsgs into as few WebSocket frames as possible.
+
+    Each returned frame is a serialized ForwardMsg. Groups of two or more
+    messages are wrapped in a ForwardMsg whose `batch` field contains them, in
+    order. A lone message is returned as-is.
+
+    Parameters
+    ----------
+    msg_strs : list of bytes
+        Serialized ForwardMsgs, as returned by serialize_forward_msg.
+    size_limit : int
+        Stop adding messages to a frame once it reaches this many bytes.
+
+    Returns
+    -------
+    list of bytes
+        The frames to send.
+
+    """
+    frames = []
+    group = []
+    group_size = 0
+
+    for msg_str in msg_strs:
+        entry = _BATCH_ENTRY_TAG + encode_varint(len(msg_str)) + msg_str
+        if group and group_size + len(entry) > size_limit:
+            frames.append(_build_frame(group))
+            group = []
+            group_size = 0
+        group.append((msg_str, entry))
+        group_size += len(entry)
+
+    if group:
+        frames.append(_build_frame(group))
+
+    return frames
+
+
+def _build_frame(group):
+    if len(group) == 1:
+        msg_str, _ = group[0]
+        return msg_str
+
+    body = b''.join(entry for _, entry in group)
+    return _BATCH_TAG + encode_varint(len(body)) + body
+
+
+def encode_varint(value):
+    """Encode a non-negative int as a protobuf base-128 varint."""
+    out = bytearray()
+    while True:
+        bits = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
 def _convert_msg_to_exception_msg(msg, e):
     import streamlit.elements.exception_proto as exception_proto
 
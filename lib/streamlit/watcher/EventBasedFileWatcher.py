@@ -202,9 +202,9 @@ class _MultiFileWatcher(object):
 
 class WatchedFile(object):
     """Emits notifications when a single file is modified."""
-    def __init__(self, md5, modification_time):
+    def __init__(self, md5, stat_key):
         self.md5 = md5
-        self.modification_time = modification_time
+        self.stat_key = stat_key
         self.on_file_changed = Signal()
 
 
@@ -239,9 +239,8 @@ class _FolderEventHandler(events.FileSystemEventHandler):
             watched_file = self._watched_files.get(file_path, None)
             if watched_file is None:
                 md5 = util.calc_md5_with_blocking_retries(file_path)
-                modification_time = os.stat(file_path).st_mtime
-                watched_file = WatchedFile(
-                    md5=md5, modification_time=modification_time)
+                stat_key = util.get_file_stat_key(file_path)
+                watched_file = WatchedFile(md5=md5, stat_key=stat_key)
                 self._watched_files[file_path] = watched_file
 
             watched_file.on_file_changed.connect(callback, weak=False)
@@ -309,12 +308,13 @@ class _FolderEventHandler(events.FileSystemEventHandler):
                 file_path, self._watched_files)
             return
 
-        modification_time = os.stat(file_path).st_mtime
-        if modification_time == file_info.modification_time:
-            LOGGER.debug('File timestamp did not change: %s', file_path)
+        # Only read the file if its size, timestamp or inode changed.
+        stat_key = util.get_file_stat_key(file_path)
+        if stat_key == file_info.stat_key:
+            LOGGER.debug('File stat did not change: %s', file_path)
             return
 
-        file_info.modification_time = modification_time
+        file_info.stat_key = stat_key
 
         new_md5 = util.calc_md5_with_blocking_retries(file_path)
         if new_md5 == file_info.md5:
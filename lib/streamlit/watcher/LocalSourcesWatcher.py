@@ -41,23 +41,110 @@ WatchedModule = collections.namedtuple(
     'WatchedModule', ['watcher', 'module_name'])
 
 
+# Map: script path -> the LocalSourcesWatcher shared by that script's
+# sessions. See subscribe().
+_shared_watchers = {}
+
+
+def subscribe(report, on_file_changed):
+    """Call a function whenever one of the report's source files changes.
+
+    All the sessions of a script share a single LocalSourcesWatcher, so each
+    file is watched once, and sys.modules is scanned once per change to it,
+    no matter how many sessions are open.
+
+    This should only be called on the main thread.
+
+    Parameters
+    ----------
+    report : Report
+    on_file_changed : Callable[[], None]
+
+    Returns
+    -------
+    Subscription
+        Call its close() method to unsubscribe.
+
+    """
+    watcher = _shared_watchers.get(report.script_path)
+    if watcher is None:
+        watcher = LocalSourcesWatcher(report, on_file_changed)
+        _shared_watchers[report.script_path] = watcher
+    else:
+        watcher.add_listener(on_file_changed)
+
+    return Subscription(watcher, on_file_changed)
+
+
+class Subscription(object):
+    """A session's handle on a shared LocalSourcesWatcher."""
+
+    def __init__(self, watcher, on_file_changed):
+        self._watcher = watcher
+        self._on_file_changed = on_file_changed
+        self._is_closed = False
+
+    def update_watched_modules(self):
+        if not self._is_closed:
+            self._watcher.update_watched_modules()
+
+    def add_worker_modules(self, modules):
+        if not self._is_closed:
+            self._watcher.add_worker_modules(modules)
+
+    def close(self):
+        if self._is_closed:
+            return
+
+        self._is_closed = True
+        self._watcher.remove_listener(self._on_file_changed)
+
+        if not self._watcher.has_listeners():
+            self._watcher.close()
+            if _shared_watchers.get(self._watcher.script_path) is self._watcher:
+                del _shared_watchers[self._watcher.script_path]
+
+
 class LocalSourcesWatcher(object):
     def __init__(self, report, on_file_changed):
-        self._report = report
-        self._on_file_changed = on_file_changed
+        # Don't hold on to the report itself: the watcher may outlive the
+        # session it belongs to.
+        self.script_path = report.script_path
+        self._script_folder = report.script_folder
+        self._listeners = [on_file_changed]
         self._is_closed = False
 
+        # A copy of sys.modules from the last update_watched_modules() call.
+        self._modules = None
+
+        # Map: module name -> (module, local file path or None) for the
+        # modules looked at by the last update_watched_modules() call.
+        self._classified_modules = {}
+
         self._folder_blacklist = config.get_option(
             'server.folderWatchBlacklist')
 
         # A dict of filepath -> WatchedModule.
         self._watched_modules = {}
 
+        # The local file paths of modules imported by script workers. See
+        # add_worker_modules().
+        self._worker_filepaths = set()
+
         self._register_watcher(
-            self._report.script_path,
+            self.script_path,
             module_name=None,  # Only the root script has None here.
         )
 
+    def add_listener(self, on_file_changed):
+        self._listeners.append(on_file_changed)
+
+    def remove_listener(self, on_file_changed):
+        self._listeners.remove(on_file_changed)
+
+    def has_listeners(self):
+        return len(self._listeners) > 0
+
     def on_file_changed(self, filepath):
         if filepath not in self._watched_modules:
             LOGGER.error('Received event for non-watched file', filepath)
@@ -68,12 +155,18 @@ class LocalSourcesWatcher(object):
         if wm.module_name is not None and wm.module_name in sys.modules:
             del sys.modules[wm.module_name]
 
-        self._on_file_changed()
+        # This is called on the file watcher's thread, while listeners may be
+        # added or removed on the main thread.
+        for listener in list(self._listeners):
+            listener()
 
     def close(self):
         for wm in self._watched_modules.values():
             wm.watcher.close()
         self._watched_modules = {}
+        self._modules = None
+        self._classified_modules = {}
+        self._worker_filepaths = set()
         self._is_closed = True
 
     def _register_watcher(self, filepath, module_name):
@@ -87,7 +180,7 @@ class LocalSourcesWatcher(object):
         if filepath not in self._watched_modules:
             return
 
-        if filepath == self._report.script_path:
+        if filepath == self.script_path:
             return
 
         wm = self._watched_modules[filepath]
@@ -98,62 +191,52 @@ class LocalSourcesWatcher(object):
         if self._is_closed:
             return
 
-        local_filepaths = []
-
         # Clone modules dict here because we may alter the original dict inside
         # the loop.
         modules = dict(sys.modules)
 
-        for name, module in modules.items():
-            try:
-                spec = getattr(module, '__spec__', None)
-
-                if spec is None:
-                    filepath = getattr(module, '__file__', None)
-                    if filepath is None:
-                        # Some modules have neither a spec nor a file. But we
-                        # can ignore those since they're not the user-created
-                        # modules we want to watch anyway.
-                        continue
-                else:
-                    filepath = spec.origin
-
-                if filepath is None:
-                    # Built-in modules (and other stuff) don't have origins.
-                    continue
+        # If no module was added, removed or replaced since the last run, the
+        # set of files to watch didn't change either. Modules compare by
+        # identity, so this is much cheaper than a scan, and saves sessions of
+        # the same script from repeating each other's scan.
+        if modules == self._modules:
+            return
+        self._modules = modules
 
-                filepath = os.path.abspath(filepath)
+        # Only look at modules that were imported since the last scan. A
+        # module that was deleted and reimported (e.g. on a file change) is a
+        # new object, so it gets looked at again.
+        classified_modules = {}
+        local_filepaths = set(self._worker_filepaths)
 
-                if not os.path.isfile(filepath):
-                    # There are some modules that have a .origin, but don't
-                    # point to real files. For example, there's a module where
-                    # .origin is 'built-in'.
+        for name, module in modules.items():
+            classified = self._classified_modules.get(name)
+
+            if classified is not None and classified[0] is module:
+                filepath = classified[1]
+            else:
+                try:
+                    filepath = self._get_local_filepath(module)
+                except Exception:
+                    # In case there's a problem introspecting some specific
+                    # module, let's not stop the entire loop from running.
+                    # For example, the __spec__ field in some modules (like
+                    # IPython) is actually a dynamic property, which can crash
+                    # if the underlying module's code has a bug (as discovered
+                    # by one of our users).
                     continue
 
-                folder_is_blacklisted = any(
-                    _file_is_in_folder(filepath, blacklisted_folder)
-                    for blacklisted_folder in self._folder_blacklist
-                )
-
-                if folder_is_blacklisted:
-                    continue
+            classified_modules[name] = (module, filepath)
 
-                file_is_new = filepath not in self._watched_modules
-                file_is_local = _file_is_in_folder(
-                    filepath, self._report.script_folder)
+            if filepath is None:
+                continue
 
-                local_filepaths.append(filepath)
+            local_filepaths.add(filepath)
 
-                if file_is_local and file_is_new:
-                    self._register_watcher(filepath, name)
+            if filepath not in self._watched_modules:
+                self._register_watcher(filepath, name)
 
-            except Exception:
-                # In case there's a problem introspecting some specific module,
-                # let's not stop the entire loop from running.  For example,
-                # the __spec__ field in some modules (like IPython) is actually
-                # a dynamic property, which can crash if the underlying
-                # module's code has a bug (as discovered by one of our users).
-                continue
+        self._classified_modules = classified_modules
 
         # Clone dict here because we may alter the original dict inside the
         # loop.
@@ -165,6 +248,90 @@ class LocalSourcesWatcher(object):
             if filepath not in local_filepaths:
                 self._deregister_watcher(filepath)
 
+    def add_worker_modules(self, modules):
+        """Watch modules that the script imported in a script worker process.
+
+        Those aren't in this process's sys.modules, so update_watched_modules
+        can't find them. They stay watched until the watcher is closed.
+
+        This should only be called on the main thread.
+
+        Parameters
+        ----------
+        modules : dict
+            Map: module name -> the path of its file.
+
+        """
+        if self._is_closed:
+            return
+
+        for name, filepath in modules.items():
+            filepath = self._to_local_filepath(filepath)
+            if filepath is None:
+                continue
+
+            self._worker_filepaths.add(filepath)
+
+            if filepath not in self._watched_modules:
+                self._register_watcher(filepath, name)
+
+    def _get_local_filepath(self, module):
+        """Return the path of the module's file, if it should be watched.
+
+        Returns
+        -------
+        str or None
+            The module's absolute file path if it's in the script's folder
+            and not blacklisted, or None.
+
+        """
+        spec = getattr(module, '__spec__', None)
+
+        if spec is None:
+            # Some modules have neither a spec nor a file. But we can ignore
+            # those since they're not the user-created modules we want to
+            # watch anyway.
+            filepath = getattr(module, '__file__', None)
+        else:
+            filepath = spec.origin
+
+        if filepath is None:
+            # Built-in modules (and other stuff) don't have origins.
+            return None
+
+        return self._to_local_filepath(filepath)
+
+    def _to_local_filepath(self, filepath):
+        """Return the absolute path of a file, if it should be watched.
+
+        Returns
+        -------
+        str or None
+            The file's absolute path if it's in the script's folder and not
+            blacklisted, or None.
+
+        """
+        filepath = os.path.abspath(filepath)
+
+        if not os.path.isfile(filepath):
+            # There are some modules that have a .origin, but don't point to
+            # real files. For example, there's a module where .origin is
+            # 'built-in'.
+            return None
+
+        folder_is_blacklisted = any(
+            _file_is_in_folder(filepath, blacklisted_folder)
+            for blacklisted_folder in self._folder_blacklist
+        )
+
+        if folder_is_blacklisted:
+            return None
+
+        if not _file_is_in_folder(filepath, self._script_folder):
+            return None
+
+        return filepath
+
 
 def _file_is_in_folder(filepath, folderpath):
     # Assumes filepath is an absolute path, as a teeny tiny optimization.
@@ -20,8 +20,7 @@ from __future__ import print_function, division, unicode_literals, absolute_impo
 from streamlit.compatibility import setup_2_3_shims
 setup_2_3_shims(globals())
 
-from concurrent.futures import ThreadPoolExecutor
-import os
+import threading
 import time
 
 from streamlit.watcher import util
@@ -30,22 +29,19 @@ from streamlit.logger import get_logger
 LOGGER = get_logger(__name__)
 
 
-_MAX_WORKERS = 4
 _POLLING_PERIOD_SECS = 0.2
 
 
 class PollingFileWatcher(object):
     """Watches a single file on disk via a polling loop"""
 
-    _executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS)
-
     @staticmethod
     def close_all():
         """Close top-level watcher object.
 
-        This is a no-op, and exists for interface parity with
-        EventBasedFileWatcher.
+        This stops the polling thread, if it's running.
         """
+        _MultiFilePoller.get_singleton().close()
         LOGGER.debug('Watcher closed')
 
     def __init__(self, file_path, on_file_changed):
@@ -63,43 +59,180 @@ class PollingFileWatcher(object):
         """
         self._file_path = file_path
         self._on_file_changed = on_file_changed
-
         self._active = True
-        self._modification_time = os.stat(self._file_path).st_mtime
-        self._md5 = util.calc_md5_with_blocking_retries(self._file_path)
-        self._schedule()
-
-    def _schedule(self):
-        def task():
-            time.sleep(_POLLING_PERIOD_SECS)
-            self._check_if_file_changed()
 
-        PollingFileWatcher._executor.submit(task)
+        _MultiFilePoller.get_singleton().watch_file(
+            file_path, on_file_changed)
 
-    def _check_if_file_changed(self):
+    def close(self):
+        """Stop watching the file system."""
         if not self._active:
-            # Don't call self._schedule()
             return
 
-        modification_time = os.stat(self._file_path).st_mtime
-        if modification_time <= self._modification_time:
-            self._schedule()
+        self._active = False
+        _MultiFilePoller.get_singleton().stop_watching_file(
+            self._file_path, self._on_file_changed)
+
+
+class _PolledFile(object):
+    """The state of a single file watched by _MultiFilePoller."""
+
+    def __init__(self, md5, stat_key):
+        self.md5 = md5
+        self.stat_key = stat_key
+        self.callbacks = []
+
+
+class _MultiFilePoller(object):
+    """Watches multiple files from a single polling thread.
+
+    Every _POLLING_PERIOD_SECS, the thread stat()s all watched files, and
+    only reads and hashes those whose size, modification time or inode
+    changed. So the cost of a tick grows with the number of stat() calls,
+    not the number of bytes being watched, and the number of threads stays
+    the same no matter how many files there are.
+    """
+
+    _singleton = None
+
+    @classmethod
+    def get_singleton(cls):
+        """Return the singleton _MultiFilePoller object.
+
+        Instantiates one if necessary.
+        """
+        if cls._singleton is None:
+            cls._singleton = _MultiFilePoller()
+
+        return cls._singleton
+
+    def __init__(self):
+        """Constructor."""
+        # Map of file_path -> _PolledFile.
+        self._polled_files = {}
+
+        # Used for mutation of _polled_files and _thread.
+        self._lock = threading.Lock()
+
+        # Started by the first call to watch_file().
+        self._thread = None
+
+    def watch_file(self, file_path, callback):
+        """Start watching a file.
+
+        Parameters
+        ----------
+        file_path : str
+            The full path of the file to watch.
+
+        callback : callable
+            The function to execute when the file is changed.
+
+        """
+        new_polled_file = None
+
+        while True:
+            with self._lock:
+                polled_file = self._polled_files.get(file_path)
+
+                if polled_file is None and new_polled_file is not None:
+                    polled_file = new_polled_file
+                    self._polled_files[file_path] = polled_file
+
+                if polled_file is not None:
+                    polled_file.callbacks.append(callback)
+
+                    if self._thread is None:
+                        self._thread = threading.Thread(
+                            target=self._poll_loop,
+                            name='PollingFileWatcher.pollThread')
+                        self._thread.daemon = True
+                        self._thread.start()
+                    return
+
+            # Hashing blocks while the file is being written, so don't hold
+            # the lock meanwhile. Stat first, so a change made while we hash
+            # is seen on the next tick.
+            stat_key = util.get_file_stat_key(file_path)
+            new_polled_file = _PolledFile(
+                md5=util.calc_md5_with_blocking_retries(file_path),
+                stat_key=stat_key)
+
+    def stop_watching_file(self, file_path, callback):
+        """Stop watching a file.
+
+        Parameters
+        ----------
+        file_path : str
+            The full path of the file to stop watching.
+
+        callback : callable
+            The function to execute when the file is changed.
+
+        """
+        with self._lock:
+            polled_file = self._polled_files.get(file_path)
+            if polled_file is None:
+                return
+
+            polled_file.callbacks.remove(callback)
+            if len(polled_file.callbacks) == 0:
+                del self._polled_files[file_path]
+
+    def close(self):
+        """Stop the polling thread and forget all watched files."""
+        with self._lock:
+            self._polled_files = {}
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _poll_loop(self):
+        """Check all watched files for changes, forever.
+
+        This is run in a separate thread, until close() is called.
+
+        """
+        thread = threading.current_thread()
+
+        while True:
+            time.sleep(_POLLING_PERIOD_SECS)
+
+            with self._lock:
+                if self._thread is not thread:
+                    return
+                polled_files = list(self._polled_files.items())
+
+            for file_path, polled_file in polled_files:
+                try:
+                    self._check_if_file_changed(file_path, polled_file)
+                except Exception as e:
+                    # The file may be in the middle of being replaced, or
+                    # gone. Try again on the next tick.
+                    LOGGER.debug('Could not check %s: %s', file_path, e)
+
+    def _check_if_file_changed(self, file_path, polled_file):
+        stat_key = util.get_file_stat_key(file_path)
+        if stat_key == polled_file.stat_key:
             return
 
-        self._modification_time = modification_time
+        md5 = util.calc_md5_with_blocking_retries(file_path)
+
+        # Only once we have the hash, so that we hash again on the next tick
+        # if that failed.
+        polled_file.stat_key = stat_key
 
-        md5 = util.calc_md5_with_blocking_retries(self._file_path)
-        if md5 == self._md5:
-            self._schedule()
+        if md5 == polled_file.md5:
             return
 
-        self._md5 = md5
+        polled_file.md5 = md5
 
-        LOGGER.debug('Change detected: %s', self._file_path)
-        self._on_file_changed(self._file_path)
+        LOGGER.debug('Change detected: %s', file_path)
 
-        self._schedule()
+        with self._lock:
+            callbacks = list(polled_file.callbacks)
 
-    def close(self):
-        """Stop watching the file system."""
-        self._active = False
+        for callback in callbacks:
+            callback(file_path)
@@ -25,6 +25,7 @@ from streamlit.compatibility import setup_2_3_shims
 setup_2_3_shims(globals())
 
 import hashlib
+import os
 import time
 
 
@@ -72,3 +73,28 @@ def calc_md5_with_blocking_retries(file_path):
 
     # Use hexdigest() instead of digest(), so it's easier to debug.
     return md5.hexdigest()
+
+
+def get_file_stat_key(file_path):
+    """Return a tuple that changes whenever the given file changes on disk.
+
+    This is a single stat() call, so it's much cheaper than
+    calc_md5_with_blocking_retries. Use it to decide whether a file needs to
+    be hashed at all.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the file to check.
+
+    Returns
+    -------
+    tuple
+        The file's size, modification time and inode. The inode changes when
+        an editor saves by replacing the file.
+
+    """
+    stat = os.stat(file_path)
+    # st_mtime_ns is more precise than st_mtime, but only exists in Python 3.
+    mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+    return (stat.st_size, mtime, stat.st_ino)
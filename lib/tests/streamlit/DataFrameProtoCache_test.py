@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for DataFrameProtoCache.py."""
+
+import unittest
+
+from streamlit.DataFrameProtoCache import DataFrameProtoCache
+
+
+class DataFrameProtoCacheTest(unittest.TestCase):
+    def test_add_get_clear(self):
+        cache = DataFrameProtoCache(max_bytes=100)
+        cache.add(b'fp1', b'proto1')
+        self.assertEqual(b'proto1', cache.get(b'fp1'))
+        self.assertIsNone(cache.get(b'fp2'))
+
+        # Adding a fingerprint again replaces its proto.
+        cache.add(b'fp1', b'proto1!')
+        self.assertEqual(b'proto1!', cache.get(b'fp1'))
+        self.assertEqual(7, cache.num_bytes)
+
+        cache.clear()
+        self.assertIsNone(cache.get(b'fp1'))
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.num_bytes)
+
+    def test_evicts_least_recently_used(self):
+        cache = DataFrameProtoCache(max_bytes=10)
+        cache.add(b'fp1', b'aaaa')
+        cache.add(b'fp2', b'bbbb')
+
+        # Using fp1 makes fp2 the least recently used.
+        cache.get(b'fp1')
+        cache.add(b'fp3', b'cccc')
+
+        self.assertIsNotNone(cache.get(b'fp1'))
+        self.assertIsNone(cache.get(b'fp2'))
+        self.assertIsNotNone(cache.get(b'fp3'))
+        self.assertEqual(8, cache.num_bytes)
+
+    def test_skips_protos_bigger_than_cache(self):
+        cache = DataFrameProtoCache(max_bytes=10)
+        cache.add(b'fp1', b'aaaa')
+        cache.add(b'fp2', b'b' * 11)
+
+        self.assertIsNone(cache.get(b'fp2'))
+        self.assertEqual(b'aaaa', cache.get(b'fp1'))
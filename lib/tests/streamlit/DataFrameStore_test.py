@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for DataFrameStore.py."""
+
+import unittest
+
+import pandas as pd
+
+from streamlit.DataFrameStore import DataFrameStore
+from streamlit.proto.DataFrame_pb2 import DataFrame
+
+
+class DataFrameStoreTest(unittest.TestCase):
+    def test_add_get_remove(self):
+        store = DataFrameStore()
+        df = pd.DataFrame({'a': [1, 2, 3]})
+
+        window_id = store.add(df)
+        self.assertIs(df, store.get(window_id))
+        self.assertIsNone(store.get('not an id'))
+
+        store.remove(window_id)
+        self.assertIsNone(store.get(window_id))
+        self.assertEqual(0, len(store))
+
+    def test_append(self):
+        store = DataFrameStore()
+        window_id = store.add(pd.DataFrame({'a': [0, 1, 2]}))
+
+        self.assertTrue(store.append(window_id, pd.DataFrame({'a': [3]})))
+        self.assertTrue(store.append(window_id, pd.DataFrame({'a': [4, 5]})))
+        self.assertFalse(store.append('not an id', pd.DataFrame({'a': [6]})))
+
+        # Windows can span several appended chunks.
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, 2, 3, proto))
+        self.assertEqual([2, 3, 4], proto.data.cols[0].int64s.data)
+        self.assertEqual(6, proto.window.total_rows)
+
+        self.assertEqual(list(range(6)), list(store.get(window_id)['a']))
+
+        with self.assertRaises(ValueError):
+            store.append(window_id, pd.DataFrame({'a': [6], 'b': [7]}))
+
+    def test_append_max_rows(self):
+        store = DataFrameStore()
+        window_id = store.add(pd.DataFrame({'a': [0, 1, 2]}))
+
+        store.append(window_id, pd.DataFrame({'a': [3, 4]}), max_rows=4)
+        store.append(window_id, pd.DataFrame({'a': [5, 6]}), max_rows=4)
+
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, 0, 10, proto))
+        self.assertEqual([3, 4, 5, 6], proto.data.cols[0].int64s.data)
+        self.assertEqual(0, proto.window.start)
+        self.assertEqual(4, proto.window.total_rows)
+
+        store.append(window_id, pd.DataFrame({'a': [7]}), max_rows=4)
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, 1, 2, proto))
+        self.assertEqual([5, 6], proto.data.cols[0].int64s.data)
+
+    def test_marshall_last_window(self):
+        store = DataFrameStore()
+        window_id = store.add(pd.DataFrame({'a': range(10)}))
+
+        store.marshall_window(window_id, 6, 2, DataFrame())
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, None, 3, proto))
+        self.assertEqual(6, proto.window.start)
+        self.assertEqual([6, 7, 8], proto.data.cols[0].int64s.data)
+
+    def test_clear(self):
+        store = DataFrameStore()
+        window_id = store.add(pd.DataFrame({'a': [1, 2, 3]}))
+
+        store.clear()
+        self.assertIsNone(store.get(window_id))
+        self.assertEqual(0, len(store))
+
+    def test_evicts_least_recently_used(self):
+        store = DataFrameStore(max_data_frames=2)
+        id1 = store.add(pd.DataFrame())
+        id2 = store.add(pd.DataFrame())
+
+        # Using id1 makes id2 the least recently used.
+        store.get(id1)
+        id3 = store.add(pd.DataFrame())
+
+        self.assertIsNotNone(store.get(id1))
+        self.assertIsNone(store.get(id2))
+        self.assertIsNotNone(store.get(id3))
+        self.assertEqual(2, len(store))
+
+    def test_marshall_window(self):
+        store = DataFrameStore()
+        df = pd.DataFrame({'a': range(10)}, index=range(100, 110))
+        window_id = store.add(df)
+
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, 4, 3, proto))
+        self.assertEqual([4, 5, 6], proto.data.cols[0].int64s.data)
+        self.assertEqual(104, proto.index.range_index.start)
+        self.assertEqual(107, proto.index.range_index.stop)
+        self.assertEqual(window_id, proto.window.id)
+        self.assertEqual(4, proto.window.start)
+        self.assertEqual(10, proto.window.total_rows)
+
+        # Past the end
+        proto = DataFrame()
+        self.assertTrue(store.marshall_window(window_id, 8, 3, proto))
+        self.assertEqual([8, 9], proto.data.cols[0].int64s.data)
+
+        proto = DataFrame()
+        self.assertFalse(store.marshall_window('not an id', 0, 3, proto))
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for ForwardMsgCache.py."""
+
+import gc
+import unittest
+
+from mock import MagicMock
+
+from streamlit import ForwardMsgCache as forward_msg_cache
+from streamlit.ForwardMsgCache import ForwardMsgCache
+from streamlit.ForwardMsgCache import PayloadCache
+from streamlit.ForwardMsgCache import compute_hash
+from streamlit.ForwardMsgCache import create_reference_msg
+from streamlit.ForwardMsgCache import get_payload_key
+from streamlit.ForwardMsgCache import is_cacheable_msg
+from streamlit.ForwardMsgCache import serialize_cacheable_msg
+from streamlit.ForwardMsgCache import serialize_payload
+from streamlit.ForwardMsgCache import set_payload_key
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+
+def _create_text_msg(body, delta_id=0):
+    msg = ForwardMsg()
+    msg.metadata.delta_id = delta_id
+    msg.delta.new_element.text.body = body
+    return msg
+
+
+class ForwardMsgCacheTest(unittest.TestCase):
+    def test_is_cacheable_msg(self):
+        self.assertTrue(is_cacheable_msg(_create_text_msg('text')))
+
+        msg = ForwardMsg()
+        msg.report_finished = True
+        self.assertFalse(is_cacheable_msg(msg))
+
+    def test_hash_ignores_metadata(self):
+        msg1 = _create_text_msg('text', delta_id=1)
+        msg2 = _create_text_msg('text', delta_id=2)
+        msg3 = _create_text_msg('other text', delta_id=1)
+
+        hash1 = compute_hash(serialize_payload(msg1))
+        hash2 = compute_hash(serialize_payload(msg2))
+        hash3 = compute_hash(serialize_payload(msg3))
+
+        self.assertEqual(hash1, hash2)
+        self.assertNotEqual(hash1, hash3)
+
+        # serialize_payload must leave the message untouched.
+        self.assertEqual(1, msg1.metadata.delta_id)
+
+    def test_serialize_payload(self):
+        msg = _create_text_msg('text', delta_id=3)
+
+        expected = ForwardMsg()
+        expected.delta.CopyFrom(msg.delta)
+        self.assertEqual(
+            expected.SerializeToString(), serialize_payload(msg))
+
+    def test_serialize_cacheable_msg(self):
+        msg = _create_text_msg('text', delta_id=3)
+        payload = serialize_payload(msg)
+        msg_hash = compute_hash(payload)
+
+        received = ForwardMsg()
+        received.ParseFromString(
+            serialize_cacheable_msg(msg.metadata, msg_hash, payload))
+
+        self.assertEqual(msg_hash, received.hash)
+        self.assertTrue(received.metadata.cacheable)
+        self.assertEqual(3, received.metadata.delta_id)
+        self.assertEqual(msg.delta, received.delta)
+
+    def test_create_reference_msg(self):
+        msg = _create_text_msg('text', delta_id=3)
+        ref_msg = create_reference_msg(msg.metadata, 'some_hash')
+
+        self.assertEqual('some_hash', ref_msg.ref_hash)
+        self.assertEqual(msg.metadata, ref_msg.metadata)
+
+    def test_add_message(self):
+        cache = ForwardMsgCache()
+        session1 = MagicMock()
+        session2 = MagicMock()
+
+        msg_hash = compute_hash(serialize_payload(_create_text_msg('text')))
+
+        self.assertFalse(cache.has_message_reference(msg_hash, session1))
+        cache.add_message(msg_hash, session1, 10)
+        self.assertTrue(cache.has_message_reference(msg_hash, session1))
+        self.assertFalse(cache.has_message_reference(msg_hash, session2))
+
+        cache.add_message(msg_hash, session2, 10)
+        self.assertTrue(cache.has_message_reference(msg_hash, session2))
+
+    def test_remove_session(self):
+        cache = ForwardMsgCache()
+        session1 = MagicMock()
+        session2 = MagicMock()
+
+        msg_hash = compute_hash(serialize_payload(_create_text_msg('text')))
+        cache.add_message(msg_hash, session1, 10)
+        cache.add_message(msg_hash, session2, 10)
+
+        cache.remove_session(session1)
+        self.assertFalse(cache.has_message_reference(msg_hash, session1))
+        self.assertTrue(cache.has_message_reference(msg_hash, session2))
+
+    def test_lru_eviction(self):
+        cache = ForwardMsgCache()
+        session1 = MagicMock()
+        session2 = MagicMock()
+
+        hashes = []
+        for i in range(3):
+            msg_hash = compute_hash(
+                serialize_payload(_create_text_msg('text %s' % i)))
+            hashes.append(msg_hash)
+            cache.add_message(msg_hash, session1, 2)
+            cache.add_message(msg_hash, session2, 3)
+
+        # session1's browser can only hold 2 messages, so it dropped the
+        # first one.
+        self.assertFalse(cache.has_message_reference(hashes[0], session1))
+        self.assertTrue(cache.has_message_reference(hashes[1], session1))
+        self.assertTrue(cache.has_message_reference(hashes[2], session1))
+        self.assertTrue(cache.has_message_reference(hashes[0], session2))
+
+        # Using a message makes it the most recently used one.
+        cache.add_message(hashes[1], session1, 2)
+        cache.add_message(
+            compute_hash(serialize_payload(_create_text_msg('text 3'))),
+            session1, 2)
+        self.assertTrue(cache.has_message_reference(hashes[1], session1))
+        self.assertFalse(cache.has_message_reference(hashes[2], session1))
+
+
+class PayloadKeyTest(unittest.TestCase):
+    def test_payload_key(self):
+        msg1 = _create_text_msg('text')
+        msg2 = _create_text_msg('text')
+
+        set_payload_key(msg1, 'key')
+        self.assertEqual('key', get_payload_key(msg1))
+        self.assertIsNone(get_payload_key(msg2))
+
+    def test_payload_key_is_forgotten(self):
+        num_keys = len(forward_msg_cache._payload_keys)
+
+        msg = _create_text_msg('text')
+        set_payload_key(msg, 'key')
+        self.assertEqual(num_keys + 1, len(forward_msg_cache._payload_keys))
+
+        del msg
+        gc.collect()
+        self.assertEqual(num_keys, len(forward_msg_cache._payload_keys))
+
+
+class PayloadCacheTest(unittest.TestCase):
+    def test_get_add(self):
+        cache = PayloadCache(100)
+        self.assertIsNone(cache.get('key'))
+
+        cache.add('key', 'hash', b'payload')
+        self.assertEqual(('hash', b'payload'), cache.get('key'))
+
+    def test_lru_eviction(self):
+        cache = PayloadCache(20)
+        cache.add('key1', 'hash1', b'x' * 10)
+        cache.add('key2', 'hash2', b'x' * 10)
+
+        # Using a payload makes it the most recently used one.
+        cache.get('key1')
+        cache.add('key3', 'hash3', b'x' * 10)
+
+        self.assertIsNotNone(cache.get('key1'))
+        self.assertIsNone(cache.get('key2'))
+        self.assertIsNotNone(cache.get('key3'))
+
+        # Payloads bigger than the cache aren't stored.
+        cache.add('key4', 'hash4', b'x' * 21)
+        self.assertIsNone(cache.get('key4'))
+        self.assertEqual(2, len(cache))
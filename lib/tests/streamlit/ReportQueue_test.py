@@ -18,6 +18,8 @@
 import copy
 import unittest
 
+from mock import patch
+
 from streamlit.ReportQueue import ReportQueue
 from streamlit.elements import data_frame_proto
 from streamlit.proto.BlockPath_pb2 import BlockPath
@@ -60,6 +62,28 @@ class ReportQueueTest(unittest.TestCase):
         self.assertEqual(len(queue), 1)
         self.assertTrue(queue[0].initialize.config.sharing_enabled)
 
+    def test_get_byte_size(self):
+        rq = ReportQueue()
+        self.assertEqual(0, rq.get_byte_size())
+
+        rq.enqueue(INIT_MSG)
+        rq.enqueue(DF_DELTA_MSG)
+        self.assertEqual(
+            INIT_MSG.ByteSize() + DF_DELTA_MSG.ByteSize(), rq.get_byte_size())
+
+    def test_get_byte_size_composed(self):
+        """The size of composed deltas includes all their rows."""
+        DF_DELTA_MSG.metadata.delta_id = 1
+        ADD_ROWS_MSG.metadata.delta_id = 1
+
+        rq = ReportQueue()
+        rq.enqueue(DF_DELTA_MSG)
+        rq.enqueue(ADD_ROWS_MSG)
+
+        composed_msg = list(rq)[0]
+        self.assertGreater(composed_msg.ByteSize(), DF_DELTA_MSG.ByteSize())
+        self.assertEqual(composed_msg.ByteSize(), rq.get_byte_size())
+
     def test_enqueue_two(self):
         rq = ReportQueue()
         self.assertTrue(rq.is_empty())
@@ -167,6 +191,68 @@ class ReportQueueTest(unittest.TestCase):
         self.assertEqual(col0, [0, 1, 2, 3, 4, 5])
         self.assertEqual(col1, [10, 11, 12, 13, 14, 15])
 
+    def test_add_rows_shared_msg(self):
+        """Composing add_rows doesn't change messages in other queues."""
+        DF_DELTA_MSG.metadata.delta_id = 1
+        ADD_ROWS_MSG.metadata.delta_id = 1
+        df_delta_msg = copy.deepcopy(DF_DELTA_MSG)
+
+        rq1 = ReportQueue()
+        rq2 = ReportQueue()
+        for msg in [DF_DELTA_MSG, ADD_ROWS_MSG, ADD_ROWS_MSG]:
+            rq1.enqueue(msg)
+            rq2.enqueue(msg)
+
+        # Messages handed out by the queue aren't changed either.
+        iterated_msg = copy.deepcopy(list(rq1)[0])
+        rq1.enqueue(ADD_ROWS_MSG)
+
+        self.assertEqual(df_delta_msg, DF_DELTA_MSG)
+        self.assertEqual(iterated_msg, list(rq2)[0])
+
+        for rq, num_rows in [(rq1, 12), (rq2, 9)]:
+            queue = rq.flush()
+            self.assertEqual(len(queue), 1)
+            col0 = queue[0].delta.new_element.data_frame.data.cols[0]
+            self.assertEqual(num_rows, len(col0.int64s.data))
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='packed')
+    def test_add_rows_packed(self, _):
+        """Packed columns are appended to unpacked, and packed on flush."""
+        df_msg = ForwardMsg()
+        df_msg.metadata.delta_id = 1
+        data_frame_proto.marshall_data_frame(
+            {'col1': [0, 1], 'col2': ['a', 'b']},
+            df_msg.delta.new_element.data_frame)
+
+        add_rows_msg = ForwardMsg()
+        add_rows_msg.metadata.delta_id = 1
+        data_frame_proto.marshall_data_frame(
+            {'col1': [2, 3], 'col2': ['c', 'd']},
+            add_rows_msg.delta.add_rows.data)
+        add_rows_copy = copy.deepcopy(add_rows_msg)
+
+        rq = ReportQueue()
+        rq.enqueue(df_msg)
+        rq.enqueue(add_rows_msg)
+        rq.enqueue(add_rows_msg)
+
+        # The enqueued message isn't unpacked.
+        self.assertEqual(add_rows_copy, add_rows_msg)
+
+        queue = rq.flush()
+        self.assertEqual(len(queue), 1)
+        cols = queue[0].delta.new_element.data_frame.data.cols
+        self.assertEqual('packed', cols[0].WhichOneof('type'))
+        self.assertEqual('packed_strings', cols[1].WhichOneof('type'))
+        self.assertEqual(
+            [0, 1, 2, 3, 2, 3],
+            data_frame_proto._get_any_array_values(cols[0]))
+        self.assertEqual(
+            ['a', 'b', 'c', 'd', 'c', 'd'],
+            data_frame_proto._get_any_array_values(cols[1]))
+
     def test_multiple_containers(self):
         """Deltas should only be coalesced if they're in the same container"""
         rq = ReportQueue()
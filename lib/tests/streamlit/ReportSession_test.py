@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for ReportSession.py."""
+
+import unittest
+
+import pandas as pd
+from mock import MagicMock
+from mock import patch
+
+from streamlit.ReportSession import ReportSession
+from streamlit.ReportSession import ReportSessionState
+from streamlit.proto.BackMsg_pb2 import DataFrameWindowRequest
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+
+def _create_text_msg(delta_id, text):
+    msg = ForwardMsg()
+    msg.metadata.delta_id = delta_id
+    msg.delta.new_element.text.body = text
+    return msg
+
+
+@patch('streamlit.ReportSession.LocalSourcesWatcher')
+class ReportSessionIdleTest(unittest.TestCase):
+    def _create_session(self):
+        session = ReportSession(MagicMock(), 'script.py', [])
+
+        initial_msg = ForwardMsg()
+        initial_msg.initialize.config.sharing_enabled = True
+        session.enqueue(initial_msg)
+        session.enqueue(_create_text_msg(0, 'text'))
+        session.flush_browser_queue()
+        return session, initial_msg
+
+    def test_make_idle(self, local_sources_watcher):
+        """Test that an idle session drops its messages and DataFrames, and
+        stops watching its source files."""
+        session, initial_msg = self._create_session()
+        subscription = local_sources_watcher.subscribe.return_value
+        session._data_frame_store.add(pd.DataFrame({'a': [1, 2, 3]}))
+
+        session.make_idle()
+
+        self.assertTrue(session.is_idle)
+        self.assertEqual([initial_msg], list(session._report._master_queue))
+        self.assertEqual(initial_msg.ByteSize(), session.get_byte_size())
+        self.assertEqual(0, len(session._data_frame_store))
+        subscription.close.assert_called_once()
+
+        # Doing it again does nothing.
+        session.make_idle()
+        subscription.close.assert_called_once()
+
+    def test_make_idle_running(self, local_sources_watcher):
+        """Test that a session running its script isn't made idle."""
+        session, _ = self._create_session()
+        session._state = ReportSessionState.REPORT_IS_RUNNING
+        num_bytes = session.get_byte_size()
+
+        session.make_idle()
+
+        self.assertFalse(session.is_idle)
+        self.assertEqual(num_bytes, session.get_byte_size())
+        local_sources_watcher.subscribe.return_value.close.assert_not_called()
+
+    def test_mark_active(self, local_sources_watcher):
+        """Test that mark_active wakes an idle session up."""
+        session, _ = self._create_session()
+        self.assertEqual(1, local_sources_watcher.subscribe.call_count)
+
+        # An active session isn't subscribed again.
+        session.mark_active()
+        self.assertEqual(1, local_sources_watcher.subscribe.call_count)
+        self.assertLess(session.get_idle_secs(), 1)
+
+        session.make_idle()
+        new_subscription = MagicMock()
+        local_sources_watcher.subscribe.return_value = new_subscription
+        session.mark_active()
+
+        self.assertFalse(session.is_idle)
+        self.assertEqual(2, local_sources_watcher.subscribe.call_count)
+        self.assertIs(new_subscription, session._local_sources_watcher)
+        new_subscription.update_watched_modules.assert_called_once()
+
+
+def _create_window_request(window_id, start, num_rows):
+    request = DataFrameWindowRequest()
+    request.id = window_id
+    request.start = start
+    request.num_rows = num_rows
+    return request
+
+
+@patch('streamlit.ReportSession.LocalSourcesWatcher')
+class ReportSessionDataFrameWindowTest(unittest.TestCase):
+    def test_handle_request(self, _):
+        """Test that the rows the browser asked for are sent."""
+        session = ReportSession(MagicMock(), 'script.py', [])
+        window_id = session._data_frame_store.add(
+            pd.DataFrame({'a': range(10)}))
+
+        session.handle_data_frame_window_request(
+            _create_window_request(window_id, 4, 3))
+        msgs = session.flush_browser_queue()
+        self.assertEqual(1, len(msgs))
+        self.assertEqual(4, msgs[0].data_frame_window.window.start)
+        self.assertEqual(
+            [4, 5, 6], msgs[0].data_frame_window.data.cols[0].int64s.data)
+
+        # DataFrames that are gone are ignored.
+        session.handle_data_frame_window_request(
+            _create_window_request('not an id', 0, 3))
+        self.assertEqual([], session.flush_browser_queue())
+
+    def test_superseded_request(self, _):
+        """Test that only the latest of concurrent requests is sent."""
+        session = ReportSession(MagicMock(), 'script.py', [])
+        store = session._data_frame_store
+        window_id = store.add(pd.DataFrame({'a': range(10)}))
+        marshall_window = store.marshall_window
+
+        def scroll_while_marshalling(window_id, start, num_rows, proto_df):
+            if start == 0:
+                session.handle_data_frame_window_request(
+                    _create_window_request(window_id, 5, 3))
+            return marshall_window(window_id, start, num_rows, proto_df)
+
+        with patch.object(store, 'marshall_window',
+                          side_effect=scroll_while_marshalling):
+            session.handle_data_frame_window_request(
+                _create_window_request(window_id, 0, 3))
+
+        msgs = session.flush_browser_queue()
+        self.assertEqual(1, len(msgs))
+        self.assertEqual(5, msgs[0].data_frame_window.window.start)
+        self.assertEqual({}, session._data_frame_window_requests)
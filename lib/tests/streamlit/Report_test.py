@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for Report.py."""
+
+import unittest
+
+from streamlit.Report import Report
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+
+def _create_text_msg(delta_id, text):
+    msg = ForwardMsg()
+    msg.metadata.delta_id = delta_id
+    msg.delta.new_element.text.body = text
+    return msg
+
+
+class ReportTest(unittest.TestCase):
+    def test_drop_master_queue(self):
+        """Test that only the initial message survives drop_master_queue."""
+        report = Report('script.py', [])
+
+        initial_msg = ForwardMsg()
+        initial_msg.initialize.config.sharing_enabled = True
+        report.enqueue(initial_msg)
+        report.enqueue(_create_text_msg(0, 'text'))
+        report.flush_browser_queue()
+
+        report.drop_master_queue()
+        self.assertEqual([initial_msg], list(report._master_queue))
+        self.assertEqual(initial_msg.ByteSize(), report.get_byte_size())
+
+        # The master queue fills up again.
+        text_msg = _create_text_msg(0, 'text again')
+        report.enqueue(text_msg)
+        self.assertEqual(
+            [initial_msg, text_msg], list(report._master_queue))
+
+    def test_get_byte_size(self):
+        """Test that get_byte_size counts both queues."""
+        report = Report('script.py', [])
+        msg = _create_text_msg(0, 'text')
+        report.enqueue(msg)
+        self.assertEqual(2 * msg.ByteSize(), report.get_byte_size())
+
+        report.flush_browser_queue()
+        self.assertEqual(msg.ByteSize(), report.get_byte_size())
@@ -15,9 +15,13 @@
 
 """Server.py unit tests"""
 
+import datetime
+import threading
+import time
 import unittest
 
 import mock
+import tornado.concurrent
 import tornado.testing
 import tornado.web
 import tornado.websocket
@@ -25,12 +29,22 @@ from mock import patch
 from tornado import gen
 
 from streamlit import config
+from streamlit.ForwardMsgCache import PayloadCache
+from streamlit.ForwardMsgCache import serialize_payload
+from streamlit.ForwardMsgCache import set_payload_key
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.server.Server import PREHEATED_REPORT_SESSION
+from streamlit.server.Server import _SERIALIZATION_WORKERS
 from streamlit.server.Server import State
+from streamlit.server.Server import _BrowserWebSocketHandler
 from streamlit.server.routes import DebugHandler
 from streamlit.server.routes import HealthHandler
 from streamlit.server.routes import MetricsHandler
+from streamlit.server.server_util import batch_serialized_forward_msgs
 from streamlit.server.server_util import is_url_from_allowed_origins
 from tests.ServerTestCase import ServerTestCase
+from tests.testutil import build_mock_config_get_option
 
 
 # Stub out the Server's ReportSession import. We don't want
@@ -68,8 +82,429 @@ class ServerTest(ServerTestCase):
         yield gen.sleep(0.1)
         self.assertFalse(self.server.browser_is_connected)
 
+    @tornado.testing.gen_test
+    def test_enqueued_message_is_pushed(self, _):
+        """Test that enqueueing a message wakes up the server loop."""
+        yield self.start_server_loop()
+        ws_client = yield self.ws_connect()
+
+        msg = ForwardMsg()
+        msg.report_finished = True
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [msg]
+        self.server._notify_loop()
+
+        received = yield ws_client.read_message()
+        self.assertEqual(msg.SerializeToString(), received)
+
+    @tornado.testing.gen_test
+    def test_serialize_off_ioloop(self, _):
+        """Test that messages are serialized on the executor's threads."""
+        yield self.start_server_loop()
+        ws_client = yield self.ws_connect()
+
+        serializing_threads = []
+
+        def serialize_forward_msg(msg):
+            serializing_threads.append(threading.current_thread())
+            return msg.SerializeToString()
+
+        msg = _create_report_finished_msg()
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [msg]
+
+        with patch('streamlit.server.Server.serialize_forward_msg',
+                   side_effect=serialize_forward_msg):
+            self.server._notify_loop()
+            received = yield ws_client.read_message()
+
+        self.assertEqual(msg.SerializeToString(), received)
+        self.assertEqual(1, len(serializing_threads))
+        self.assertNotEqual(
+            threading.current_thread(), serializing_threads[0])
+
+    @tornado.testing.gen_test
+    def test_monitor_ioloop(self, _):
+        """Test that time spent blocking the IOLoop is recorded."""
+        histogram = mock.MagicMock()
+        with patch('streamlit.server.Server.metrics.Client.get',
+                   return_value=histogram):
+            self.io_loop.spawn_callback(self.server._monitor_ioloop_coroutine)
+            self.io_loop.add_callback(time.sleep, 0.2)
+            yield gen.sleep(0.3)
+            self.server.stop()
+
+        blocked_times = [c[0][0] for c in histogram.observe.call_args_list]
+        self.assertGreaterEqual(max(blocked_times), 0.1)
+
+    @tornado.testing.gen_test
+    def test_batched_messages(self, _):
+        """Test that browsers that ask for it get batched frames."""
+        yield self.start_server_loop()
+        ws_client = yield tornado.websocket.websocket_connect(
+            self.get_ws_url('/stream?capabilities=batched_messages'))
+
+        msgs = [_create_report_finished_msg() for _ in range(3)]
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = msgs
+        self.server._notify_loop()
+
+        received = yield ws_client.read_message()
+        frame = ForwardMsg()
+        frame.ParseFromString(received)
+        self.assertEqual('batch', frame.WhichOneof('type'))
+        self.assertEqual(msgs, list(frame.batch.messages))
+
+    @tornado.testing.gen_test
+    def test_message_cache(self, _):
+        """Test that repeated payloads are sent as references."""
+        yield self.start_server_loop()
+        ws_client = yield tornado.websocket.websocket_connect(
+            self.get_ws_url(
+                '/stream?capabilities=message_cache&max_cached_messages=10'))
+
+        get_option_patch = patch(
+            'streamlit.server.Server.config.get_option',
+            side_effect=build_mock_config_get_option({
+                'server.minCachedMessageSize': 0,
+            }))
+        get_option_patch.start()
+        self.addCleanup(get_option_patch.stop)
+
+        msg1 = ForwardMsg()
+        msg1.metadata.delta_id = 1
+        msg1.delta.new_element.text.body = 'text'
+
+        msg2 = ForwardMsg()
+        msg2.metadata.delta_id = 2
+        msg2.delta.new_element.text.body = 'text'
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [msg1, msg2]
+        self.server._notify_loop()
+
+        received1 = ForwardMsg()
+        received1.ParseFromString((yield ws_client.read_message()))
+        received2 = ForwardMsg()
+        received2.ParseFromString((yield ws_client.read_message()))
+
+        self.assertTrue(received1.metadata.cacheable)
+        self.assertEqual(msg1.delta, received1.delta)
+        self.assertEqual('ref_hash', received2.WhichOneof('type'))
+        self.assertEqual(received1.hash, received2.ref_hash)
+        self.assertEqual(2, received2.metadata.delta_id)
+
+    @tornado.testing.gen_test
+    def test_shared_payloads(self, report_session):
+        """Test that messages with the same payload key are serialized once,
+        for all sessions."""
+        report_session.side_effect = lambda **kwargs: mock.MagicMock()
+        yield self.start_server_loop()
+        self.server._payload_cache = PayloadCache(1e6)
+
+        url = self.get_ws_url(
+            '/stream?capabilities=message_cache&max_cached_messages=10')
+        ws_client1 = yield tornado.websocket.websocket_connect(url)
+        ws_client2 = yield tornado.websocket.websocket_connect(url)
+
+        sessions = list(self.server._report_sessions.values())
+        msgs = []
+        for session in sessions:
+            msg = ForwardMsg()
+            msg.delta.new_element.text.body = 'x' * 10000
+            set_payload_key(msg, 'key')
+            session.flush_browser_queue.return_value = [msg]
+            msgs.append(msg)
+
+        with patch('streamlit.server.Server.serialize_payload',
+                   wraps=serialize_payload) as serialize:
+            self.server._notify_loop()
+            received1 = ForwardMsg()
+            received1.ParseFromString((yield ws_client1.read_message()))
+            received2 = ForwardMsg()
+            received2.ParseFromString((yield ws_client2.read_message()))
+
+        serialize.assert_called_once()
+        self.assertEqual(msgs[0].delta, received1.delta)
+        self.assertEqual(msgs[1].delta, received2.delta)
+        self.assertEqual(received1.hash, received2.hash)
+
+    @tornado.testing.gen_test
+    def test_websocket_compression(self, _):
+        """Test that only large messages are compressed."""
+        yield self.start_server_loop()
+        ws_client = yield tornado.websocket.websocket_connect(
+            self.get_ws_url('/stream'), compression_options={})
+
+        ws = list(self.server._report_sessions.keys())[0]
+        compressor = ws.ws_connection._compressor
+        self.assertIsNotNone(compressor)
+
+        small_msg = ForwardMsg()
+        small_msg.delta.new_element.text.body = 'text'
+        large_msg = ForwardMsg()
+        large_msg.delta.new_element.text.body = 'text' * 1000
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [small_msg, large_msg]
+
+        with patch.object(
+                compressor, 'compress', wraps=compressor.compress) as compress:
+            self.server._notify_loop()
+
+            received1 = ForwardMsg()
+            received1.ParseFromString((yield ws_client.read_message()))
+            received2 = ForwardMsg()
+            received2.ParseFromString((yield ws_client.read_message()))
+
+        self.assertEqual(small_msg, received1)
+        self.assertEqual(large_msg, received2)
+        compress.assert_called_once_with(large_msg.SerializeToString())
+
+    @tornado.testing.gen_test
+    def test_websocket_compressor_attribute(self, _):
+        """Test the private Tornado attribute that write_message hides.
+
+        If a Tornado upgrade renames ws_connection._compressor, small
+        messages would silently be compressed again.
+        """
+        yield self.start_server_loop()
+        yield tornado.websocket.websocket_connect(
+            self.get_ws_url('/stream'), compression_options={})
+
+        ws = list(self.server._report_sessions.keys())[0]
+        compressor = ws.ws_connection._compressor
+        self.assertIsInstance(
+            compressor, tornado.websocket._PerMessageDeflateCompressor)
+
+        # The compressor is only hidden while the message is written.
+        with patch.object(compressor, 'compress') as compress:
+            yield ws.write_message(b'small', binary=True)
+        compress.assert_not_called()
+        self.assertIs(compressor, ws.ws_connection._compressor)
+
+    def test_websocket_compression_disabled(self, _):
+        """Test that compression can be turned off."""
+        handler = mock.MagicMock()
+        with patch(
+                'streamlit.server.Server.config.get_option',
+                side_effect=build_mock_config_get_option({
+                    'server.websocketCompressionLevel': 0,
+                })):
+            self.assertIsNone(
+                _BrowserWebSocketHandler.get_compression_options(handler))
+
+        with patch(
+                'streamlit.server.Server.config.get_option',
+                side_effect=build_mock_config_get_option({
+                    'server.websocketCompressionLevel': 3,
+                })):
+            self.assertEqual(
+                {'compression_level': 3},
+                _BrowserWebSocketHandler.get_compression_options(handler))
+
+    @tornado.testing.gen_test
+    def test_backpressure(self, _):
+        """Test that we stop flushing a session while its writes are pending."""
+        yield self.start_server_loop()
+        yield tornado.websocket.websocket_connect(self.get_ws_url('/stream'))
+
+        get_option_patch = patch(
+            'streamlit.server.Server.config.get_option',
+            side_effect=build_mock_config_get_option({
+                'server.websocketMaxBufferedBytes': 0,
+            }))
+        get_option_patch.start()
+        self.addCleanup(get_option_patch.stop)
+
+        # Writes don't complete until we resolve this future.
+        write_future = tornado.concurrent.Future()
+        write_patch = patch(
+            'tornado.websocket.WebSocketHandler.write_message',
+            return_value=write_future)
+        write_patch.start()
+        self.addCleanup(write_patch.stop)
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [
+            _create_report_finished_msg()]
+        self.server._notify_loop()
+        yield gen.sleep(0.05)
+        flush_count = session.flush_browser_queue.call_count
+
+        # The write is still pending, so the session's queue is left alone.
+        self.server._notify_loop()
+        yield gen.sleep(0.05)
+        self.assertEqual(flush_count, session.flush_browser_queue.call_count)
+
+        # Once the write completes, the server flushes the queue again.
+        session.flush_browser_queue.return_value = []
+        write_future.set_result(None)
+        yield gen.sleep(0.05)
+        self.assertEqual(
+            flush_count + 1, session.flush_browser_queue.call_count)
+
+    @tornado.testing.gen_test
+    def test_websocket_closed_mid_batch(self, _):
+        """Test that we stop writing to a browser once its socket is closed."""
+        yield self.start_server_loop()
+        yield tornado.websocket.websocket_connect(self.get_ws_url('/stream'))
+
+        session = list(self.server._report_sessions.values())[0]
+        session.flush_browser_queue.return_value = [
+            _create_report_finished_msg() for _ in range(3)]
+
+        remove_browser_connection = patch.object(
+            self.server, '_remove_browser_connection',
+            wraps=self.server._remove_browser_connection).start()
+        self.addCleanup(patch.stopall)
+
+        with patch.object(
+                _BrowserWebSocketHandler, 'write_message',
+                side_effect=tornado.websocket.WebSocketClosedError) \
+                as write_message:
+            self.server._notify_loop()
+            yield gen.sleep(0.05)
+
+        write_message.assert_called_once()
+        remove_browser_connection.assert_called_once()
+        self.assertEqual({}, self.server._report_sessions)
+
+    @tornado.testing.gen_test
+    def test_data_frame_window_request(self, _):
+        """Test that window requests are handled off the IOLoop."""
+        yield self.start_server_loop()
+        ws_client = yield self.ws_connect()
+        session = list(self.server._report_sessions.values())[0]
+
+        threads = []
+        session.handle_data_frame_window_request.side_effect = (
+            lambda request: threads.append(threading.current_thread()))
+
+        msg = BackMsg()
+        msg.data_frame_window.id = 'window'
+        yield ws_client.write_message(msg.SerializeToString(), binary=True)
+        yield gen.sleep(0.05)
+
+        session.handle_data_frame_window_request.assert_called_once_with(
+            msg.data_frame_window)
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.current_thread(), threads[0])
+
+    @tornado.testing.gen_test
+    def test_data_frame_window_requests_dont_block_messages(self, _):
+        """Test that slow window requests don't hold up serialization."""
+        yield self.start_server_loop()
+        ws_client = yield self.ws_connect()
+        session = list(self.server._report_sessions.values())[0]
+
+        # Window requests take until we set this.
+        done = threading.Event()
+        self.addCleanup(done.set)
+        session.handle_data_frame_window_request.side_effect = (
+            lambda request: done.wait(5))
+
+        request = BackMsg()
+        request.data_frame_window.id = 'window'
+        for _ in range(_SERIALIZATION_WORKERS):
+            yield ws_client.write_message(
+                request.SerializeToString(), binary=True)
+        yield gen.sleep(0.05)
+
+        msg = _create_report_finished_msg()
+        session.flush_browser_queue.return_value = [msg]
+        self.server._notify_loop()
+
+        received = yield gen.with_timeout(
+            datetime.timedelta(seconds=1), ws_client.read_message())
+        self.assertEqual(msg.SerializeToString(), received)
+        self.assertFalse(done.is_set())
+
+    @tornado.testing.gen_test
+    def test_idle_sessions(self, _):
+        """Test that inactive sessions are made idle, and woken up."""
+        yield self.start_server_loop()
+        ws_client = yield self.ws_connect()
+        session = list(self.server._report_sessions.values())[0]
+        preheated_session = mock.MagicMock()
+        self.server._report_sessions[PREHEATED_REPORT_SESSION] = (
+            preheated_session)
+
+        get_option_patch = patch(
+            'streamlit.server.Server.config.get_option',
+            side_effect=build_mock_config_get_option({
+                'server.idleSessionTimeoutMins': 1,
+            }))
+        get_option_patch.start()
+        self.addCleanup(get_option_patch.stop)
+
+        for s in (session, preheated_session):
+            s.is_idle = False
+            s.get_byte_size.return_value = 100
+
+        session.get_idle_secs.return_value = 59
+        self.server._check_sessions()
+        session.make_idle.assert_not_called()
+
+        session.get_idle_secs.return_value = 60
+        preheated_session.get_idle_secs.return_value = 60
+        self.server._check_sessions()
+        session.make_idle.assert_called_once()
+        preheated_session.make_idle.assert_not_called()
+
+        num_bytes = yield self.server._get_sessions_byte_size(
+            [session, preheated_session])
+        self.assertEqual(200, num_bytes)
+
+        # Any BackMsg wakes the session up.
+        msg = BackMsg()
+        msg.stop_report = True
+        yield ws_client.write_message(msg.SerializeToString(), binary=True)
+        yield gen.sleep(0.05)
+        session.mark_active.assert_called_once()
+
 
 class ServerUtilsTest(unittest.TestCase):
+    def test_batch_serialized_forward_msgs(self):
+        msgs = [_create_report_finished_msg() for _ in range(5)]
+        frames = batch_serialized_forward_msgs(
+            [m.SerializeToString() for m in msgs])
+
+        self.assertEqual(1, len(frames))
+        frame = ForwardMsg()
+        frame.ParseFromString(frames[0])
+        self.assertEqual(msgs, list(frame.batch.messages))
+
+    def test_batch_serialized_forward_msgs_single_msg(self):
+        msg_str = _create_report_finished_msg().SerializeToString()
+        self.assertEqual(
+            [msg_str], batch_serialized_forward_msgs([msg_str]))
+
+    def test_batch_serialized_forward_msgs_size_limit(self):
+        msgs = []
+        for i in range(10):
+            msg = ForwardMsg()
+            msg.report_uploaded = 'x' * (100 + i)
+            msgs.append(msg)
+
+        frames = batch_serialized_forward_msgs(
+            [m.SerializeToString() for m in msgs], size_limit=250)
+
+        received = []
+        for frame_str in frames:
+            self.assertLessEqual(len(frame_str), 260)
+            frame = ForwardMsg()
+            frame.ParseFromString(frame_str)
+            if frame.WhichOneof('type') == 'batch':
+                received.extend(frame.batch.messages)
+            else:
+                received.append(frame)
+
+        self.assertGreater(len(frames), 1)
+        self.assertEqual(msgs, received)
+
     def test_is_url_from_allowed_origins_allowed_domains(self):
         self.assertTrue(
             is_url_from_allowed_origins('localhost'))
@@ -105,6 +540,12 @@ class ServerUtilsTest(unittest.TestCase):
                 is_url_from_allowed_origins('s3.amazon.com'))
 
 
+def _create_report_finished_msg():
+    msg = ForwardMsg()
+    msg.report_finished = True
+    return msg
+
+
 class HealthHandlerTest(tornado.testing.AsyncHTTPTestCase):
     """Tests the /healthz endpoint"""
     def setUp(self):
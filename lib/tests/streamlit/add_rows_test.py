@@ -121,6 +121,33 @@ class DeltaGeneratorAddRowsTest(testutil.DeltaGeneratorTestCase):
             self._dg._reset()
             self.report_queue.clear()
 
+    def test_add_rows_max_rows(self):
+        """Test add_rows with max_rows."""
+        for method in self._get_unnamed_data_methods():
+            el = method(DATAFRAME)
+
+            # Rows composed onto the element are trimmed.
+            el.add_rows(NEW_ROWS, max_rows=4)
+            df_proto = data_frame_proto._get_data_frame(
+                self.get_delta_from_queue())
+            self.assertEqual(
+                [2, 3, 4, 5], df_proto.data.cols[0].int64s.data)
+
+            # So are the rows in an add_rows delta, which tells the browser
+            # to trim the rows it has.
+            self.report_queue.clear()
+            el.add_rows(NEW_ROWS, max_rows=2)
+            ar = self.get_delta_from_queue().add_rows
+            self.assertEqual([4, 5], ar.data.data.cols[0].int64s.data)
+            self.assertEqual(2, ar.max_rows)
+
+            with self.assertRaises(ValueError):
+                el.add_rows(NEW_ROWS, max_rows=0)
+
+            # Clear the queue so the next loop is like a brand new test.
+            self._dg._reset()
+            self.report_queue.clear()
+
     def test_named_add_rows(self):
         """Test add_rows with a named dataset."""
         for method in self._get_named_data_methods():
@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import signal
+import subprocess
 import sys
+import time
 import unittest
 from mock import patch
 try:
@@ -95,3 +99,49 @@ class BootstrapPrintTest(unittest.TestCase):
         out = sys.stdout.getvalue()
         self.assertTrue('Local URL: http://localhost' in out)
         self.assertTrue('Network URL: http://internal-ip' in out)
+
+
+# Forks two server workers, which print their pids and wait for SIGTERM.
+FORK_WORKERS_SCRIPT = """
+import os
+import signal
+import sys
+
+from streamlit import bootstrap
+from streamlit import config
+
+config.set_option('server.port', 0)
+bootstrap._fork_workers(2)
+
+signal.signal(signal.SIGTERM, lambda signal_number, stack_frame: sys.exit(0))
+sys.stdout.write('%s\\n' % os.getpid())
+sys.stdout.flush()
+signal.pause()
+"""
+
+
+@unittest.skipIf(sys.platform == 'win32', 'Windows can\'t fork')
+class BootstrapForkWorkersTest(unittest.TestCase):
+    """Test bootstrap._fork_workers."""
+
+    def test_sigterm_stops_workers(self):
+        """SIGTERM to the original process stops the workers too."""
+        proc = subprocess.Popen(
+            [sys.executable, '-c', FORK_WORKERS_SCRIPT],
+            stdout=subprocess.PIPE,
+            cwd=os.path.dirname(os.path.dirname(bootstrap.__file__)))
+        worker_pids = [int(proc.stdout.readline()) for _ in range(2)]
+
+        proc.send_signal(signal.SIGTERM)
+
+        deadline = time.time() + 10
+        while proc.poll() is None and time.time() < deadline:
+            time.sleep(0.05)
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+
+        self.assertEqual(0, proc.returncode)
+        for pid in worker_pids:
+            with self.assertRaises(OSError):
+                os.kill(pid, 0)
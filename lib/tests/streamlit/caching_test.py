@@ -16,12 +16,18 @@
 """st.caching unit tests."""
 
 import inspect
+import os
+import random
+import shutil
+import tempfile
 import unittest
 
 from mock import patch
 
 import streamlit as st
+from streamlit import caching
 from streamlit.caching import _build_args_mutated_message
+from tests.testutil import build_mock_config_get_option
 
 
 class CacheTest(unittest.TestCase):
@@ -86,6 +92,95 @@ class CacheTest(unittest.TestCase):
         warning.assert_called_with(_build_args_mutated_message(f))
 
 
+class SharedCacheTest(unittest.TestCase):
+    """Test that st.cache shares values across server worker processes."""
+
+    def setUp(self):
+        self._cache_dir = tempfile.mkdtemp()
+
+        def get_streamlit_file_path(*filepath):
+            folder_path = os.path.join(self._cache_dir, *filepath[:-1])
+            if not os.path.isdir(folder_path):
+                os.makedirs(folder_path)
+            return os.path.join(self._cache_dir, *filepath)
+
+        patches = [
+            patch('streamlit.caching.util.get_streamlit_file_path',
+                  side_effect=get_streamlit_file_path),
+            patch('streamlit.caching.config.get_option',
+                  side_effect=build_mock_config_get_option({
+                      'server.numWorkers': 2,
+                  })),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        caching._clear_mem_cache()
+
+    def tearDown(self):
+        caching._clear_mem_cache()
+        shutil.rmtree(self._cache_dir)
+
+    def test_shared_across_workers(self):
+        @st.cache
+        def f(x):
+            return [x, random.random()]
+
+        value = f(1)
+        self.assertEqual(value, f(1))
+
+        # Another worker has an empty memory cache, but finds the value on
+        # disk.
+        caching._clear_mem_cache()
+        self.assertEqual(value, f(1))
+
+    def test_unpicklable_value(self):
+        @st.cache
+        def f():
+            return [lambda: random.random()]
+
+        value = f()
+        self.assertIs(value, f())
+
+        # The value can't be shared, so nothing is left on disk.
+        self.assertEqual([], os.listdir(self._get_shared_cache_path()))
+
+    def test_clear_cache(self):
+        """Test that clear_cache deletes the values workers share."""
+        @st.cache
+        def f(x):
+            return [x, random.random()]
+
+        value = f(1)
+        self.assertNotEqual([], os.listdir(self._get_shared_cache_path()))
+
+        caching.clear_cache()
+        self.assertFalse(os.path.exists(self._get_shared_cache_path()))
+        self.assertNotEqual(value, f(1))
+
+    def test_clear_stale_tmp_files(self):
+        """Test that temporary files left by crashed workers are deleted."""
+        folder = self._get_shared_cache_path()
+        os.makedirs(folder)
+        for filename in ('a.pickle.123.tmp', 'b.pickle.456.tmp', 'c.pickle'):
+            with open(os.path.join(folder, filename), 'w') as f:
+                f.write('')
+
+        # Only those of the process that crashed.
+        caching._clear_shared_disk_cache(123)
+        self.assertEqual(
+            ['b.pickle.456.tmp', 'c.pickle'], sorted(os.listdir(folder)))
+
+        # All of them.
+        caching._clear_shared_disk_cache()
+        self.assertEqual([], os.listdir(folder))
+
+    def _get_shared_cache_path(self):
+        return os.path.join(
+            self._cache_dir, 'cache', caching._SHARED_CACHE_FOLDER)
+
+
 # Temporarily turn off these tests since there's no Cache object in __init__
 # right now.
 class CachingObjectTest(unittest.TestCase):
@@ -255,14 +255,19 @@ class ConfigTest(unittest.TestCase):
             u'browser.serverPort',
             u'client.caching',
             u'client.displayEnabled',
+            u'client.chartPointsPerPixel',
+            u'global.dataFrameSerialization',
+            u'global.dataFrameWindowRows',
             u'global.developmentMode',
             u'global.logLevel',
+            u'global.maxDataFrameCacheSize',
             u'global.metrics',
             u'global.sharingMode',
             u'global.showWarningOnDirectExecution',
             u'global.unitTest',
             u'global.useNode',
             u'runner.magicEnabled',
+            u'runner.numProcesses',
             u'runner.installTracer',
             u'runner.fixMatplotlib',
             u's3.accessKeyId',
@@ -273,12 +278,20 @@ class ConfigTest(unittest.TestCase):
             u's3.requireLoginToView',
             u's3.secretAccessKey',
             u's3.url',
+            u'server.batchWindowMs',
             u'server.enableCORS',
             u'server.folderWatchBlacklist',
             u'server.headless',
+            u'server.idleSessionTimeoutMins',
             u'server.liveSave',
+            u'server.maxCachedMessages',
+            u'server.minCachedMessageSize',
+            u'server.numWorkers',
             u'server.port',
             u'server.runOnSave',
+            u'server.websocketCompressionLevel',
+            u'server.websocketCompressionMinSize',
+            u'server.websocketMaxBufferedBytes',
         ])
         keys = sorted(config._config_options.keys())
         self.assertEqual(config_options, keys)
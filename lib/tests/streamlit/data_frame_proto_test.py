@@ -33,10 +33,12 @@ from streamlit.proto.DataFrame_pb2 import CellStyleArray
 from streamlit.proto.DataFrame_pb2 import DataFrame
 from streamlit.proto.DataFrame_pb2 import Index
 from streamlit.proto.DataFrame_pb2 import Int32Array
+from streamlit.proto.DataFrame_pb2 import PackedArray
 from streamlit.proto.DataFrame_pb2 import Table
 from streamlit.proto.Delta_pb2 import Delta
 from streamlit.proto.VegaLiteChart_pb2 import VegaLiteChart
 from streamlit.proto.NamedDataSet_pb2 import NamedDataSet
+from tests.testutil import build_mock_config_get_option
 
 
 def _css_style(prop, value):
@@ -66,7 +68,7 @@ class DataFrameProtoTest(unittest.TestCase):
         pass
 
     def test_is_pandas_styler(self):
-        """Test streamlit.data_frame_proto._is_pandas_styler.
+        """Test streamlit.data_frame_proto.is_pandas_styler.
 
         Need to test the following:
         * object is of type pandas.io.formats.style.Styler
@@ -74,17 +76,34 @@ class DataFrameProtoTest(unittest.TestCase):
         pass
 
     def test_marshall_styles(self):
-        """Test streamlit.data_frame_proto._marshall_styles.
+        """Test streamlit.data_frame_proto._marshall_styles."""
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': [4, 5, 6]})
 
-        Need to test the following:
-        * styler is:
-          * None
-          * not None
-        * display_values is:
-          * None
-          * not None
-        """
-        pass
+        # Unstyled DataFrames have no styles at all.
+        proto = DataFrame()
+        data_frame_proto._marshall_styles(proto.style, df)
+        self.assertEqual(0, len(proto.style.cols))
+
+        # Only styled cells are sent.
+        styler = df.style.applymap(
+            lambda v: 'color: red' if v == 2 else '', subset=['a'])
+        styler = styler.format('{:.1f}', subset=pd.IndexSlice[2, 'b'])
+
+        proto = DataFrame()
+        data_frame_proto._marshall_styles(proto.style, df, styler)
+
+        self.assertEqual(2, len(proto.style.cols))
+        col_a, col_b = proto.style.cols
+
+        self.assertEqual([1], col_a.rows)
+        self.assertEqual(
+            [_css_style('color', 'red')], list(col_a.styles[0].css))
+        self.assertFalse(col_a.styles[0].has_display_value)
+
+        self.assertEqual([2], col_b.rows)
+        self.assertEqual(0, len(col_b.styles[0].css))
+        self.assertEqual('6.0', col_b.styles[0].display_value)
+        self.assertTrue(col_b.styles[0].has_display_value)
 
     def test_get_css_styles(self):
         """Test streamlit.data_frame_proto._get_css_styles.
@@ -175,15 +194,93 @@ class DataFrameProtoTest(unittest.TestCase):
 
         # Period index
         df_period = pd.period_range(start='2005-12-21 08:45 ',
-                                    end='2005-12-21 11:55',
+                                    end='2005-12-21 10:55',
                                     freq='H')
         proto = Index()
-        with pytest.raises(NotImplementedError) as e:
-            data_frame_proto._marshall_index(df_period, proto)
-        err_msg = (
-            "Can't handle <class 'pandas.core.indexes.period.PeriodIndex'>"
-            ' yet.')
-        self.assertEqual(err_msg, str(e.value))
+        data_frame_proto._marshall_index(df_period, proto)
+        self.assertEqual(
+            ['2005-12-21 08:00', '2005-12-21 09:00', '2005-12-21 10:00'],
+            proto.plain_index.data.strings.data)
+
+        # Interval index
+        proto = Index()
+        data_frame_proto._marshall_index(pd.interval_range(0, 2), proto)
+        self.assertEqual(
+            ['(0, 1]', '(1, 2]'], proto.plain_index.data.strings.data)
+
+        # Categorical index, which stays dictionary-encoded
+        proto = Index()
+        data_frame_proto._marshall_index(
+            pd.CategoricalIndex(['a', 'b', 'a']), proto)
+        encoded = proto.plain_index.data.dictionary_strings
+        self.assertEqual(['a', 'b'], encoded.dictionary)
+        self.assertEqual([0, 1, 0], encoded.codes)
+
+        # UInt64 index
+        proto = Index()
+        data_frame_proto._marshall_index(pd.UInt64Index([1, 2]), proto)
+        self.assertEqual([1, 2], proto.int_64_index.data.data)
+
+        proto = Index()
+        data_frame_proto._marshall_index(pd.UInt64Index([2 ** 63]), proto)
+        self.assertEqual([2.0 ** 63], proto.float_64_index.data.data)
+
+    @patch.object(data_frame_proto, '_proto_cache', None)
+    @patch('streamlit.config.get_option',
+           side_effect=build_mock_config_get_option(
+               {'global.maxDataFrameCacheSize': 100e6}))
+    def test_marshall_data_frame_cache(self, _):
+        """Test that marshall_data_frame reuses the protos of large
+        DataFrames it has seen before."""
+        df = pd.DataFrame({'a': np.arange(10000), 'b': np.arange(10000) / 2})
+
+        proto1 = DataFrame()
+        fingerprint1 = data_frame_proto.marshall_data_frame(df, proto1)
+        self.assertEqual(1, len(data_frame_proto._proto_cache))
+        self.assertIsNotNone(fingerprint1)
+
+        with patch(
+                'streamlit.elements.data_frame_proto._marshall_table') as m:
+            proto2 = DataFrame()
+            fingerprint2 = data_frame_proto.marshall_data_frame(
+                df.copy(), proto2)
+            m.assert_not_called()
+        self.assertEqual(proto1, proto2)
+        self.assertEqual(fingerprint1, fingerprint2)
+
+        # Changing the values, types, index or columns is a miss.
+        changed_dfs = [
+            df.assign(a=df['a'] + 1),
+            df.astype(np.float64),
+            df.set_index(df.index + 1),
+            df.rename(columns={'a': 'c'}),
+            df.set_index(['a', 'b']).reset_index(level=1),
+        ]
+        for i, changed_df in enumerate(changed_dfs):
+            data_frame_proto.marshall_data_frame(changed_df, DataFrame())
+            self.assertEqual(i + 2, len(data_frame_proto._proto_cache))
+
+        # Small DataFrames, and periods, aren't cached.
+        self.assertIsNone(
+            data_frame_proto.marshall_data_frame(df.iloc[:10], DataFrame()))
+        data_frame_proto.marshall_data_frame(
+            df.set_index(pd.period_range('2000', periods=10000)),
+            DataFrame())
+        self.assertEqual(6, len(data_frame_proto._proto_cache))
+
+    @patch.object(data_frame_proto, '_proto_cache', None)
+    @patch.object(data_frame_proto, '_get_fingerprint')
+    def test_marshall_data_frame_cache_disabled(self, get_fingerprint):
+        """Test that the cache is off by default, and that
+        global.maxDataFrameCacheSize=0 turns it off."""
+        df = pd.DataFrame({'a': np.arange(10000)})
+        data_frame_proto.marshall_data_frame(df, DataFrame())
+        with patch('streamlit.config.get_option',
+                   side_effect=build_mock_config_get_option(
+                       {'global.maxDataFrameCacheSize': 0})):
+            data_frame_proto.marshall_data_frame(df, DataFrame())
+        get_fingerprint.assert_not_called()
+        self.assertIsNone(data_frame_proto._proto_cache)
 
     def test_marshall_table(self):
         """Test streamlit.data_frame_proto._marshall_table."""
@@ -239,13 +336,36 @@ class DataFrameProtoTest(unittest.TestCase):
         self.assertEqual(bool_proto.int64s.data, bool_data.tolist())
 
         # object
-        obj_data = np.array([json.dumps, json.dumps], dtype=np.object)
+        obj_data = np.array([json.dumps, json.loads], dtype=np.object)
         obj_proto = AnyArray()
-        truth = [str(json.dumps), str(json.dumps)]
+        truth = [str(json.dumps), str(json.loads)]
 
         data_frame_proto._marshall_any_array(obj_data, obj_proto)
         self.assertEqual(obj_proto.strings.data, truth)
 
+        # object, with repeated values
+        obj_data = np.array(
+            ['a', None, 'a', 'a', np.nan, 'a', 'a', 2], dtype=np.object)
+        obj_proto = AnyArray()
+
+        data_frame_proto._marshall_any_array(obj_data, obj_proto)
+        self.assertEqual(
+            ['a', 'None', 'nan', '2'],
+            obj_proto.dictionary_strings.dictionary)
+        self.assertEqual(
+            [0, 1, 0, 0, 2, 0, 0, 3], obj_proto.dictionary_strings.codes)
+
+        # object, with values that are equal but display differently
+        obj_data = pd.Series([1, 1.0, True, 'a'] * 4, dtype=np.object)
+        obj_proto = AnyArray()
+
+        data_frame_proto._marshall_any_array(obj_data, obj_proto)
+        self.assertEqual(
+            ['1', '1.0', 'True', 'a'],
+            obj_proto.dictionary_strings.dictionary)
+        self.assertEqual(
+            [0, 1, 2, 3] * 4, obj_proto.dictionary_strings.codes)
+
         # No timezone
         dt_data = pd.Series([np.datetime64('2019-04-09T12:34:56')])
         dt_proto = AnyArray()
@@ -276,6 +396,240 @@ class DataFrameProtoTest(unittest.TestCase):
             err_msg = 'Dtype |S6 not understood.'
         self.assertEqual(err_msg, str(e.value))
 
+    def test_marshall_high_cardinality_strings(self):
+        """Test that object columns with mostly distinct strings are sent as
+        strings, converted once, and without factorizing them."""
+        class Value(object):
+            num_str_calls = 0
+
+            def __init__(self, i):
+                self.i = i
+
+            def __str__(self):
+                Value.num_str_calls += 1
+                return 'value %d' % self.i
+
+        values = [Value(i) for i in range(20000)]
+
+        def get_strings(proto):
+            if proto.WhichOneof('type') == 'packed_strings':
+                return data_frame_proto._get_packed_strings(
+                    proto.packed_strings)
+            return list(proto.strings.data)
+
+        for serialization in ['repeated', 'packed']:
+            Value.num_str_calls = 0
+            proto = AnyArray()
+            with patch.object(
+                    data_frame_proto, '_factorize',
+                    wraps=data_frame_proto._factorize) as factorize, \
+                    patch('streamlit.config.get_option',
+                          side_effect=build_mock_config_get_option({
+                              'global.dataFrameSerialization':
+                                  serialization})):
+                data_frame_proto._marshall_any_array(
+                    pd.Series(values, dtype=np.object), proto)
+
+            factorize.assert_not_called()
+            self.assertEqual(20000, Value.num_str_calls)
+            strings = get_strings(proto)
+            self.assertEqual(20000, len(strings))
+            self.assertEqual(['value 0', 'value 1'], strings[:2])
+
+        # A column with few distinct strings is still dictionary-encoded.
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            pd.Series(['a', 'b'] * 10000, dtype=np.object), proto)
+        self.assertEqual(['a', 'b'], proto.dictionary_strings.dictionary)
+
+    def test_marshall_extension_arrays(self):
+        """Test _marshall_any_array with pandas extension dtypes."""
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            pd.Series(pd.Categorical([1, 2, 1])), proto)
+        self.assertEqual([1, 2, 1], proto.int64s.data)
+
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            pd.Series(pd.Categorical(
+                ['b', None, 'a'], categories=['a', 'b', 'c'])),
+            proto)
+        self.assertEqual(
+            ['a', 'b', 'c', 'nan'], proto.dictionary_strings.dictionary)
+        self.assertEqual([1, 3, 0], proto.dictionary_strings.codes)
+        self.assertEqual(3, data_frame_proto._any_array_len(proto))
+
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            pd.Series(pd.period_range('2019-04-09', periods=2, freq='D')),
+            proto)
+        self.assertEqual(['2019-04-09', '2019-04-10'], proto.strings.data)
+
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            pd.Series(pd.interval_range(0, 2)), proto)
+        self.assertEqual(['(0, 1]', '(1, 2]'], proto.strings.data)
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='packed')
+    def test_marshall_packed_array(self, _):
+        """Test _marshall_any_array with packed serialization."""
+        data = [
+            (np.array([1.5, 2.5]), PackedArray.FLOAT64, '<f8', [1.5, 2.5]),
+            (np.array([1, 2]), PackedArray.INT64, '<i8', [1, 2]),
+            (np.array([True, False]), PackedArray.BOOL, 'u1', [1, 0]),
+            (np.array([1, 2], dtype='timedelta64[ns]'),
+             PackedArray.TIMEDELTA64, '<i8', [1, 2]),
+            (pd.Series([np.datetime64('2019-04-09T12:34:56')]).dt.tz_localize(
+                'UTC'), PackedArray.DATETIME64, '<i8',
+             [1554813296000000000]),
+        ]
+
+        for array, dtype, np_dtype, values in data:
+            proto = AnyArray()
+            data_frame_proto._marshall_any_array(array, proto)
+
+            self.assertEqual(dtype, proto.packed.dtype)
+            self.assertEqual(
+                values,
+                np.frombuffer(proto.packed.data, dtype=np_dtype).tolist())
+            self.assertEqual(
+                len(array), data_frame_proto._any_array_len(proto))
+
+        # object
+        proto = AnyArray()
+        data_frame_proto._marshall_any_array(
+            np.array(['a', u'h\xe9llo', 3], dtype=np.object), proto)
+
+        self.assertEqual(
+            [0, 1, 7, 8],
+            np.frombuffer(proto.packed_strings.offsets, '<i4').tolist())
+        self.assertEqual(
+            u'ah\xe9llo3'.encode('utf-8'), proto.packed_strings.data)
+        self.assertEqual(3, data_frame_proto._any_array_len(proto))
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='arrow')
+    def test_marshall_arrow_table(self, _):
+        """Test marshall_data_frame with Arrow serialization."""
+        import pyarrow as pa
+
+        df = pd.DataFrame({
+            'float': [1.5, np.nan],
+            'uint': np.array([1, 2], dtype=np.uint64),
+            'bool': [True, False],
+            'category': pd.Categorical(['a', 'b']),
+            'repeated': ['x', 'x'],
+            'mixed': ['x', 3],
+            'period': pd.period_range('2019-04-09', periods=2, freq='D'),
+            'interval': pd.interval_range(0, 2),
+            'datetime': pd.Series(
+                pd.to_datetime(['2019-04-09T12:34:56'] * 2)).dt.tz_localize(
+                    'UTC'),
+            'timedelta': pd.to_timedelta([1, 2]),
+        })
+
+        proto = DataFrame()
+        data_frame_proto.marshall_data_frame(df, proto)
+
+        self.assertEqual(0, len(proto.data.cols))
+        table = data_frame_proto._read_arrow_table(proto.data.arrow)
+        self.assertEqual(
+            [str(i) for i in range(len(df.columns))], table.schema.names)
+
+        def column(name):
+            i = list(df.columns).index(name)
+            return table.schema[i], table.column(i).to_pylist()
+
+        field, values = column('float')
+        self.assertEqual(pa.float64(), field.type)
+        self.assertEqual(1.5, values[0])
+        self.assertTrue(np.isnan(values[1]))
+
+        field, values = column('uint')
+        self.assertEqual(pa.uint64(), field.type)
+        self.assertEqual([1, 2], values)
+
+        field, values = column('bool')
+        self.assertEqual(pa.bool_(), field.type)
+
+        field, values = column('category')
+        self.assertTrue(pa.types.is_dictionary(field.type))
+        self.assertEqual(['a', 'b'], values)
+
+        # Strings are dictionary-encoded when they repeat enough.
+        field, values = column('repeated')
+        self.assertTrue(pa.types.is_dictionary(field.type))
+        self.assertEqual(['x', 'x'], values)
+
+        field, values = column('mixed')
+        self.assertEqual(pa.string(), field.type)
+        self.assertEqual(['x', '3'], values)
+
+        field, values = column('period')
+        self.assertEqual(['2019-04-09', '2019-04-10'], values)
+
+        field, values = column('interval')
+        self.assertEqual(['(0, 1]', '(1, 2]'], values)
+
+        field, values = column('datetime')
+        self.assertEqual(pa.int64(), field.type)
+        self.assertEqual(
+            {data_frame_proto.ARROW_TYPE_METADATA_KEY:
+             data_frame_proto.ARROW_DATETIME},
+            field.metadata)
+        self.assertEqual([1554813296000000000] * 2, values)
+
+        field, values = column('timedelta')
+        self.assertEqual(pa.int64(), field.type)
+        self.assertEqual(
+            {data_frame_proto.ARROW_TYPE_METADATA_KEY:
+             data_frame_proto.ARROW_TIMEDELTA},
+            field.metadata)
+        self.assertEqual([1, 2], values)
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='arrow')
+    def test_add_rows_arrow(self, _):
+        """Test add_rows with Arrow serialization."""
+        def delta(df):
+            delta = Delta()
+            data_frame_proto.marshall_data_frame(
+                df, delta.new_element.data_frame)
+            return delta
+
+        # The categories differ, so the dictionaries do too.
+        dt1 = delta(pd.DataFrame({
+            'a': pd.Categorical(['x', 'y']), 'b': [1, 2]}))
+        dt2 = delta(pd.DataFrame({'a': pd.Categorical(['z']), 'b': [3]}))
+
+        data_frame_proto.add_rows(dt1, dt2)
+
+        # The rows are appended to columns rather than to the Arrow stream.
+        df = dt1.new_element.data_frame
+        self.assertEqual(b'', df.data.arrow)
+        values = data_frame_proto._get_any_array_values
+        self.assertEqual(['x', 'y', 'z'], values(df.data.cols[0]))
+        self.assertEqual([1, 2, 3], values(df.data.cols[1]))
+        self.assertEqual(3, data_frame_proto._index_len(df.index))
+
+        # The delta that was added isn't changed.
+        self.assertNotEqual(b'', dt2.new_element.data_frame.data.arrow)
+
+        # Different shapes
+        with pytest.raises(ValueError) as e:
+            data_frame_proto.add_rows(dt1, delta(pd.DataFrame({'a': [1]})))
+
+        err_msg = 'Dataframes have incompatible shapes'
+        self.assertEqual(err_msg, str(e.value))
+
+        # Arrow and non-Arrow data
+        dt3 = Delta()
+        dt3.new_element.data_frame.data.cols.add().int64s.data.extend([1])
+
+        with pytest.raises(ValueError):
+            data_frame_proto.add_rows(dt1, dt3)
+
     def test_add_rows(self):
         """Test streamlit.data_frame_proto._add_rows."""
         # Generic Data
@@ -311,6 +665,7 @@ class DataFrameProtoTest(unittest.TestCase):
 
         style_combined = CellStyleArray()
         style_combined.styles.extend([cell_style, cell_style])
+        style_combined.rows.extend([0, 2])
 
         combined.new_element.data_frame.data.cols.extend([aa_combined])
         row_index = combined.new_element.data_frame.index.plain_index
@@ -353,6 +708,23 @@ class DataFrameProtoTest(unittest.TestCase):
         err_msg = 'Dataframes have incompatible shapes'
         self.assertEqual(err_msg, str(e.value))
 
+        # Test different types in the last column, which leaves the first
+        # DataFrame as it was.
+        bb = AnyArray()
+        bb.doubles.data.extend([1.0, 2.0])
+
+        types0 = Delta()
+        types0.new_element.data_frame.data.cols.extend([aa, aa])
+        types1 = Delta()
+        types1.new_element.data_frame.data.cols.extend([aa, bb])
+        types0_copy = Delta()
+        types0_copy.CopyFrom(types0)
+
+        with pytest.raises(ValueError):
+            data_frame_proto.add_rows(types0, types1)
+
+        self.assertEqual(types0_copy, types0)
+
     def test_concat_index(self):
         """Test streamlit.data_frame_proto._concat_index."""
         # Empty
@@ -402,20 +774,23 @@ class DataFrameProtoTest(unittest.TestCase):
         self.assertEqual(r_idx1, r_combined)
 
         # multi
-        int32_array = Int32Array()
-        int32_array.data.extend([4, 5])
-
-        m_idx1 = Index()
-        m_idx1.multi_index.labels.extend([int32_array])
+        def multi_index(arrays):
+            idx = Index()
+            data_frame_proto._marshall_index(
+                pd.MultiIndex.from_arrays(arrays), idx)
+            return idx
 
-        m_idx2 = Index()
-        m_idx2.multi_index.labels.extend([int32_array])
+        m_idx1 = multi_index([['a', 'b', 'a'], [1, 2, np.nan]])
+        m_idx2 = multi_index([['c', 'a'], [2, 3]])
+        m_combined = multi_index(
+            [['a', 'b', 'a', 'c', 'a'], [1, 2, np.nan, 2, 3]])
 
-        with pytest.raises(NotImplementedError) as e:
-            data_frame_proto._concat_index(m_idx1, m_idx2)
+        data_frame_proto._concat_index(m_idx1, m_idx2)
+        self.assertEqual(m_combined, m_idx1)
 
-        err_msg = 'Cannot yet concatenate MultiIndices.'
-        self.assertEqual(err_msg, str(e.value))
+        # Different numbers of levels
+        with pytest.raises(ValueError):
+            data_frame_proto._concat_index(m_idx1, multi_index([['a']]))
 
         # int_64_index
         i_idx1 = Index()
@@ -456,18 +831,15 @@ class DataFrameProtoTest(unittest.TestCase):
         data_frame_proto._concat_index(td_idx1, td_idx2)
         self.assertEqual(td_idx1, td_combined)
 
-        # Not implemented
+        # float_64_index
         f_idx1 = Index()
         f_idx1.float_64_index.data.data.extend([1.0, 2.0])
 
         f_idx2 = Index()
         f_idx2.float_64_index.data.data.extend([3.0, 4.0])
 
-        with pytest.raises(NotImplementedError) as e:
-            data_frame_proto._concat_index(f_idx1, f_idx2)
-
-        err_msg = 'Cannot concatenate "float_64_index" indices.'
-        self.assertEqual(err_msg, str(e.value))
+        data_frame_proto._concat_index(f_idx1, f_idx2)
+        self.assertEqual([1.0, 2.0, 3.0, 4.0], f_idx1.float_64_index.data.data)
 
     def test_concat_any_array(self):
         """Test streamlit.data_frame_proto._concat_any_array."""
@@ -501,6 +873,86 @@ class DataFrameProtoTest(unittest.TestCase):
         err_msg = 'Cannot concatenate int64s with doubles.'
         self.assertEqual(err_msg, str(e.value))
 
+    def test_concat_packed_arrays(self):
+        """Test _concat_any_array with packed arrays."""
+        aa1 = AnyArray()
+        aa1.packed.dtype = PackedArray.INT64
+        aa1.packed.data = np.array([1, 2], dtype='<i8').tobytes()
+
+        aa2 = AnyArray()
+        aa2.packed.dtype = PackedArray.INT64
+        aa2.packed.data = np.array([3], dtype='<i8').tobytes()
+
+        data_frame_proto._concat_any_array(aa1, aa2)
+        self.assertEqual(
+            [1, 2, 3], np.frombuffer(aa1.packed.data, '<i8').tolist())
+
+        # dtypes don't match
+        aa3 = AnyArray()
+        aa3.packed.dtype = PackedArray.FLOAT64
+        aa3.packed.data = np.array([1.0], dtype='<f8').tobytes()
+
+        with pytest.raises(ValueError):
+            data_frame_proto._concat_any_array(aa1, aa3)
+
+        # strings
+        ss1 = AnyArray()
+        ss1.packed_strings.offsets = np.array(
+            [0, 1, 3], dtype='<i4').tobytes()
+        ss1.packed_strings.data = b'abc'
+
+        ss2 = AnyArray()
+        ss2.packed_strings.offsets = np.array([0, 2], dtype='<i4').tobytes()
+        ss2.packed_strings.data = b'de'
+
+        data_frame_proto._concat_any_array(ss1, ss2)
+        self.assertEqual(
+            [0, 1, 3, 5],
+            np.frombuffer(ss1.packed_strings.offsets, '<i4').tolist())
+        self.assertEqual(b'abcde', ss1.packed_strings.data)
+        self.assertEqual(3, data_frame_proto._any_array_len(ss1))
+
+    def test_concat_dictionary_strings(self):
+        """Test _concat_any_array with dictionary-encoded strings."""
+        aa1 = AnyArray()
+        aa1.dictionary_strings.dictionary.extend(['a', 'b'])
+        aa1.dictionary_strings.codes.extend([0, 1, 0])
+
+        aa2 = AnyArray()
+        aa2.dictionary_strings.dictionary.extend(['c', 'a'])
+        aa2.dictionary_strings.codes.extend([1, 0])
+
+        data_frame_proto._concat_any_array(aa1, aa2)
+        self.assertEqual(['a', 'b', 'c'], aa1.dictionary_strings.dictionary)
+        self.assertEqual([0, 1, 0, 0, 2], aa1.dictionary_strings.codes)
+
+        # Plain strings are merged into the dictionary, without changing
+        # the array they come from.
+        ss = AnyArray()
+        ss.strings.data.extend(['d', 'b'])
+
+        data_frame_proto._concat_any_array(aa1, ss)
+        self.assertEqual(
+            ['a', 'b', 'c', 'd'], aa1.dictionary_strings.dictionary)
+        self.assertEqual([0, 1, 0, 0, 2, 3, 1], aa1.dictionary_strings.codes)
+        self.assertEqual(['d', 'b'], ss.strings.data)
+
+        # And the other way around.
+        ss = AnyArray()
+        ss.packed_strings.offsets = np.array([0, 1], dtype='<i4').tobytes()
+        ss.packed_strings.data = b'c'
+
+        data_frame_proto._concat_any_array(ss, aa2)
+        self.assertEqual(['c', 'a'], ss.dictionary_strings.dictionary)
+        self.assertEqual([0, 1, 0], ss.dictionary_strings.codes)
+
+        # Not strings
+        ii = AnyArray()
+        ii.int64s.data.extend([1])
+
+        with pytest.raises(ValueError):
+            data_frame_proto._concat_any_array(ii, aa2)
+
     def test_concat_cell_style_array(self):
         """Test streamlit.data_frame_proto._concat_cell_style_array."""
         cell_style1 = CellStyle()
@@ -517,18 +969,189 @@ class DataFrameProtoTest(unittest.TestCase):
         style2 = CellStyleArray()
         style2.styles.extend([cell_style2])
 
-        # Combine 1 and 2
+        # Combine 1 and 2, where style1's column has 3 rows.
         style3 = CellStyleArray()
         style3.styles.extend([cell_style1, cell_style2])
+        style3.rows.extend([0, 3])
 
         # not empty
-        data_frame_proto._concat_cell_style_array(style1, style2)
+        data_frame_proto._concat_cell_style_array(style1, style2, 3)
         self.assertEqual(str(style1), str(style3))
 
         # style0 is empty
-        data_frame_proto._concat_cell_style_array(style0, style1)
+        data_frame_proto._concat_cell_style_array(style0, style1, 0)
         self.assertEqual(str(style0), str(style1))
 
+        # Sparse arrays are offset by the rows before them.
+        style4 = CellStyleArray()
+        data_frame_proto._concat_cell_style_array(style4, style1, 10)
+        self.assertEqual([10, 13], style4.rows)
+
+    def test_trim_rows(self):
+        """Test streamlit.data_frame_proto.trim_rows."""
+        df = DataFrame()
+        df.data.cols.add().int64s.data.extend([1, 2, 3, 4])
+        df.index.range_index.start = 0
+        df.index.range_index.stop = 4
+
+        cell_style = CellStyle()
+        cell_style.css.extend([_css_style('color', 'black')])
+        sparse = df.style.cols.add()
+        sparse.styles.extend([cell_style, cell_style])
+        sparse.rows.extend([1, 3])
+        dense = df.style.cols.add()
+        dense.styles.extend([cell_style] * 4)
+
+        # Fewer rows than max_rows, or no max_rows.
+        df_copy = DataFrame()
+        df_copy.CopyFrom(df)
+        data_frame_proto.trim_rows(df, 4)
+        data_frame_proto.trim_rows(df, 0)
+        self.assertEqual(df_copy, df)
+
+        data_frame_proto.trim_rows(df, 2)
+        self.assertEqual([3, 4], df.data.cols[0].int64s.data)
+        self.assertEqual(2, df.index.range_index.start)
+        self.assertEqual(4, df.index.range_index.stop)
+        self.assertEqual([1], df.style.cols[0].rows)
+        self.assertEqual(1, len(df.style.cols[0].styles))
+        self.assertEqual(2, len(df.style.cols[1].styles))
+
+    def test_add_rows_lookups(self):
+        """Test add_rows with lookups kept between calls."""
+        def delta(level0, values, add_rows):
+            d = Delta()
+            df = pd.DataFrame({'v': values}, index=pd.MultiIndex.from_arrays(
+                [level0, list(range(len(values)))]))
+            data_frame_proto.marshall_data_frame(
+                df, d.add_rows.data if add_rows else d.new_element.data_frame)
+            return d
+
+        lookups = {}
+        d1 = delta(['a', 'b'], ['x', 'x'], False)
+        data_frame_proto.add_rows(
+            d1, delta(['c', 'a'], ['y', 'x'], True), lookups=lookups)
+        # The lookups are kept up to date with the new values.
+        data_frame_proto.add_rows(
+            d1, delta(['c', 'd'], ['z', 'y'], True), lookups=lookups)
+        self.assertIn((None, 'index', 'level', 0), lookups)
+        self.assertIn((None, 'col', 0), lookups)
+
+        df = d1.new_element.data_frame
+        multi_index = df.index.multi_index
+        self.assertEqual(
+            ['a', 'b', 'c', 'd'],
+            data_frame_proto._get_index_values(multi_index.levels[0]))
+        self.assertEqual([0, 1, 2, 0, 2, 3], multi_index.labels[0].data)
+        self.assertEqual(
+            ['x', 'y', 'z'], df.data.cols[0].dictionary_strings.dictionary)
+        self.assertEqual(
+            [0, 0, 1, 0, 2, 1], df.data.cols[0].dictionary_strings.codes)
+
+        # Trimming renumbers the levels, so the lookups start over.
+        data_frame_proto.add_rows(
+            d1, delta(['b', 'e'], ['x', 'x'], True), max_rows=3,
+            lookups=lookups)
+        data_frame_proto.add_rows(
+            d1, delta(['d', 'b'], ['x', 'y'], True), lookups=lookups)
+        self.assertEqual(
+            ['b', 'd', 'e'],
+            data_frame_proto._get_index_values(multi_index.levels[0]))
+        self.assertEqual([1, 0, 2, 1, 0], multi_index.labels[0].data)
+
+    def test_trim_multi_index(self):
+        """Test trim_rows with a MultiIndex, whose unused level values are
+        dropped.
+        """
+        df = DataFrame()
+        data_frame_proto.marshall_data_frame(
+            pd.DataFrame({'v': [1, 2, 3, 4]}, index=pd.MultiIndex.from_arrays(
+                [['a', 'b', 'a', 'c'], [10, 20, 30, np.nan]])), df)
+        data_frame_proto.trim_rows(df, 2)
+
+        multi_index = df.index.multi_index
+        self.assertEqual(
+            ['a', 'c'],
+            data_frame_proto._get_index_values(multi_index.levels[0]))
+        self.assertEqual([0, 1], multi_index.labels[0].data)
+        self.assertEqual([30], multi_index.levels[1].int_64_index.data.data)
+        self.assertEqual([0, -1], multi_index.labels[1].data)
+
+    def test_trim_any_array(self):
+        """Test streamlit.data_frame_proto._trim_any_array."""
+        aa = AnyArray()
+        aa.packed.dtype = PackedArray.INT64
+        aa.packed.data = np.array([1, 2, 3], dtype='<i8').tobytes()
+        data_frame_proto._trim_any_array(aa, 2)
+        self.assertEqual([3], np.frombuffer(aa.packed.data, '<i8').tolist())
+
+        ss = AnyArray()
+        ss.packed_strings.offsets = np.array(
+            [0, 1, 3, 6], dtype='<i4').tobytes()
+        ss.packed_strings.data = b'abcdef'
+        data_frame_proto._trim_any_array(ss, 1)
+        self.assertEqual(
+            [0, 2, 5],
+            np.frombuffer(ss.packed_strings.offsets, '<i4').tolist())
+        self.assertEqual(b'bcdef', ss.packed_strings.data)
+
+        # Strings that aren't used anymore leave the dictionary.
+        ds = AnyArray()
+        ds.dictionary_strings.dictionary.extend(['a', 'b', 'c'])
+        ds.dictionary_strings.codes.extend([0, 2, 1, 2])
+        data_frame_proto._trim_any_array(ds, 2)
+        self.assertEqual(['b', 'c'], ds.dictionary_strings.dictionary)
+        self.assertEqual([0, 1], ds.dictionary_strings.codes)
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='arrow')
+    def test_trim_arrow_table(self, _):
+        """Test streamlit.data_frame_proto.trim_rows with Arrow tables."""
+        df = DataFrame()
+        data_frame_proto.marshall_data_frame(
+            pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}), df)
+        data_frame_proto.trim_rows(df, 1)
+
+        values = data_frame_proto._get_any_array_values
+        self.assertEqual([3], values(df.data.cols[0]))
+        self.assertEqual(['z'], values(df.data.cols[1]))
+        self.assertEqual(1, data_frame_proto._index_len(df.index))
+
+    @patch('streamlit.elements.data_frame_proto.config.get_option',
+           return_value='arrow')
+    def test_arrow_to_table(self, _):
+        """Test streamlit.data_frame_proto._arrow_to_table."""
+        df = DataFrame()
+        data_frame_proto.marshall_data_frame(pd.DataFrame({
+            'float': np.array([1.5, np.nan], dtype=np.float32),
+            'uint': np.array([1, 2], dtype=np.uint16),
+            'bool': [True, False],
+            'string': ['x', u'\xe9'],
+            'category': pd.Categorical(['x', None]),
+            'datetime': pd.to_datetime([1, 2], utc=True),
+            'timedelta': pd.to_timedelta([1, 2]),
+        }), df)
+
+        table = data_frame_proto._arrow_to_table(df.data.arrow)
+
+        def col(i):
+            return table.cols[i]
+
+        values = data_frame_proto._get_any_array_values
+        self.assertEqual(PackedArray.FLOAT64, col(0).packed.dtype)
+        self.assertEqual(1.5, values(col(0))[0])
+        self.assertTrue(np.isnan(values(col(0))[1]))
+        self.assertEqual(PackedArray.INT64, col(1).packed.dtype)
+        self.assertEqual([1, 2], values(col(1)))
+        self.assertEqual(PackedArray.BOOL, col(2).packed.dtype)
+        self.assertEqual([1, 0], values(col(2)))
+        self.assertEqual(['x', u'\xe9'], values(col(3)))
+        self.assertEqual(['x', 'nan'], values(col(4)))
+        self.assertEqual(PackedArray.DATETIME64, col(5).packed.dtype)
+        self.assertEqual([1, 2], values(col(5)))
+        self.assertEqual(PackedArray.TIMEDELTA64, col(6).packed.dtype)
+        self.assertEqual([1, 2], values(col(6)))
+
     def test_get_data_frame(self):
         """Test streamlit.data_frame_proto._get_data_frame."""
         # Test delta not new_element or add_rows
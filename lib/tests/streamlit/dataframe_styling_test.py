@@ -208,6 +208,13 @@ def get_cell_style(proto_df, col, row):
         return CellStyle()
 
     col_style = proto_df.style.cols[col]
+
+    # Sparse styles list the rows they apply to.
+    if len(col_style.rows) > 0:
+        if row not in col_style.rows:
+            return CellStyle()
+        return col_style.styles[list(col_style.rows).index(row)]
+
     if row >= len(col_style.styles):
         return CellStyle()
 
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit test of st.dataframe with global.dataFrameWindowRows."""
+
+import threading
+
+import pandas as pd
+from mock import patch
+
+from streamlit.DataFrameStore import DataFrameStore
+from streamlit.ReportThread import REPORT_CONTEXT_ATTR_NAME
+from streamlit.ReportThread import ReportContext
+from streamlit.proto.DataFrame_pb2 import DataFrame
+from streamlit.widgets import Widgets
+from tests import testutil
+
+DATAFRAME = pd.DataFrame({'a': range(10), 'b': range(10, 20)})
+
+
+class DataFrameWindowTest(testutil.DeltaGeneratorTestCase):
+    """Test windowed st.dataframe."""
+
+    def setUp(self):
+        super(DataFrameWindowTest, self).setUp(override_root=False)
+        self.store = DataFrameStore()
+        self.dg = self.new_delta_generator()
+        setattr(threading.current_thread(),
+                REPORT_CONTEXT_ATTR_NAME,
+                ReportContext(main_dg=self.dg, sidebar_dg=None,
+                              widgets=Widgets(), data_frame_store=self.store))
+
+        patcher = patch(
+            'streamlit.config.get_option',
+            side_effect=testutil.build_mock_config_get_option({
+                'global.dataFrameWindowRows': 4,
+            }))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_data_frame(self):
+        return self.get_delta_from_queue().new_element.data_frame
+
+    def test_small_data_frame(self):
+        """DataFrames that fit in a window are sent whole."""
+        self.dg.dataframe(DATAFRAME.head(4))
+
+        df_proto = self._get_data_frame()
+        self.assertEqual('', df_proto.window.id)
+        self.assertEqual(4, len(df_proto.data.cols[0].int64s.data))
+        self.assertEqual(0, len(self.store))
+
+    def test_large_data_frame(self):
+        """Only the first window of larger DataFrames is sent."""
+        self.dg.dataframe(DATAFRAME)
+
+        df_proto = self._get_data_frame()
+        self.assertEqual([0, 1, 2, 3], df_proto.data.cols[0].int64s.data)
+        self.assertEqual(0, df_proto.window.start)
+        self.assertEqual(10, df_proto.window.total_rows)
+        self.assertIs(DATAFRAME, self.store.get(df_proto.window.id))
+
+    def test_styler(self):
+        """Stylers are sent whole."""
+        self.dg.dataframe(DATAFRAME.style)
+
+        df_proto = self._get_data_frame()
+        self.assertEqual('', df_proto.window.id)
+        self.assertEqual(10, len(df_proto.data.cols[0].int64s.data))
+
+    def test_add_rows(self):
+        """add_rows stores the rows, and only sends the last window again,
+        with the new total."""
+        el = self.dg.dataframe(DATAFRAME)
+        window_id = self._get_data_frame().window.id
+        num_msgs = len(self.report_queue._queue)
+
+        el.add_rows(DATAFRAME)
+
+        self.assertEqual(num_msgs + 1, len(self.report_queue._queue))
+        df_proto = self.get_message_from_queue().data_frame_window
+        self.assertEqual(window_id, df_proto.window.id)
+        self.assertEqual(0, df_proto.window.start)
+        self.assertEqual(20, df_proto.window.total_rows)
+        self.assertEqual([0, 1, 2, 3], df_proto.data.cols[0].int64s.data)
+        self.assertEqual(20, len(self.store.get(window_id)))
+
+        # The browser scrolled further down.
+        self.store.marshall_window(window_id, 8, 4, DataFrame())
+        el.add_rows(DATAFRAME, max_rows=25)
+
+        df_proto = self.get_message_from_queue().data_frame_window
+        self.assertEqual(8, df_proto.window.start)
+        self.assertEqual(25, df_proto.window.total_rows)
+        self.assertEqual([3, 4, 5, 6], df_proto.data.cols[0].int64s.data)
+
+        with self.assertRaises(ValueError):
+            el.add_rows(pd.DataFrame({'a': [1]}))
+
+    def test_add_rows_dropped(self):
+        """add_rows fails once the DataFrame was dropped."""
+        el = self.dg.dataframe(DATAFRAME)
+        self.store.clear()
+
+        with self.assertRaises(RuntimeError):
+            el.add_rows(DATAFRAME)
+
+    def test_replaced_element(self):
+        """Elements that replace a windowed DataFrame take add_rows as
+        usual."""
+        el = self.dg.empty()
+        el.dataframe(DATAFRAME)
+        el.dataframe(DATAFRAME.head(2))
+
+        el.add_rows(DATAFRAME.head(2))
+
+        # The queue composes the add_rows delta into the new element.
+        df_proto = self._get_data_frame()
+        self.assertEqual('', df_proto.window.id)
+        self.assertEqual([0, 1, 0, 1], df_proto.data.cols[0].int64s.data)
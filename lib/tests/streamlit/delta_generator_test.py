@@ -23,6 +23,8 @@ setup_2_3_shims(globals())
 import json
 import sys
 
+from mock import patch
+import numpy as np
 import pandas as pd
 
 try:
@@ -406,6 +408,57 @@ class DeltaGeneratorChartTest(testutil.DeltaGeneratorTestCase):
         self.assertEqual(element.chart.data.data.cols[0].int64s.data[0], 20)
         self.assertEqual(len(element.chart.components), 8)
 
+    def test_chart_downsampling(self):
+        """Test that long series are downsampled to the chart's width."""
+        data = pd.DataFrame({
+            'a': np.sin(np.arange(10000) / 100.0),
+            'b': np.zeros(10000),
+        })
+        data.loc[1234, 'a'] = 10
+        data.loc[5678, 'b'] = np.nan
+        data.loc[8765, 'b'] = -10
+
+        st.line_chart(data, width=100)
+
+        chart = self.get_delta_from_queue().new_element.chart
+        index = chart.data.index.int_64_index.data.data
+        a = chart.data.data.cols[0].doubles.data
+        b = chart.data.data.cols[1].doubles.data
+
+        # 2 points per pixel is 100 buckets, with a min and max row per
+        # series in each, plus the last row.
+        self.assertLessEqual(len(index), 100 * 2 * 2 + 1)
+        self.assertEqual(0, index[0])
+        self.assertEqual(9999, index[-1])
+        self.assertEqual(sorted(index), list(index))
+        self.assertIn(1234, index)
+        self.assertIn(8765, index)
+        self.assertEqual(10, max(a))
+        self.assertEqual(-10, min(b))
+
+    def test_bar_chart_not_downsampled(self):
+        """Test that bar charts keep every row, since each is a bar."""
+        data = pd.DataFrame({'a': np.arange(10000)})
+
+        st.bar_chart(data, width=100)
+
+        chart = self.get_delta_from_queue().new_element.chart
+        self.assertEqual(10000, len(chart.data.data.cols[0].int64s.data))
+
+    def test_chart_downsampling_disabled(self):
+        """Test that client.chartPointsPerPixel = 0 sends every row."""
+        data = pd.DataFrame({'a': np.arange(10000)})
+
+        with patch(
+                'streamlit.config.get_option',
+                side_effect=testutil.build_mock_config_get_option({
+                    'client.chartPointsPerPixel': 0,
+                })):
+            st.line_chart(data, width=100)
+
+        chart = self.get_delta_from_queue().new_element.chart
+        self.assertEqual(10000, len(chart.data.data.cols[0].int64s.data))
+
 
 class DeltaGeneratorImageTest(testutil.DeltaGeneratorTestCase):
     """Test DeltaGenerator Images"""
@@ -119,3 +119,23 @@ with None:
     a
 '''
         self._testCode(CODE_WITH_STATEMENT, 1)
+
+    def test_get_top_level_imports(self):
+        """Test that only top-level absolute imports are returned"""
+        CODE_IMPORTS = '''
+"""Docstring"""
+from __future__ import print_function
+import numpy as np, os.path
+from pandas import DataFrame
+from . import sibling
+import streamlit as st
+
+def f():
+    import scipy
+
+if True:
+    import altair
+'''
+        self.assertEqual(
+            ['numpy', 'os.path', 'pandas', 'streamlit'],
+            magic.get_top_level_imports(CODE_IMPORTS, './'))
@@ -134,7 +134,10 @@ class MetricsTest(unittest.TestCase):
             client.get('unittest_gauge').dec()
 
             calls = [
-                call(),  # Constructor
+                call(),  # Constructor: streamlit_enqueue_deltas_total
+                call(),  # Constructor: streamlit_ioloop_blocking_seconds
+                call(),  # Constructor: streamlit_sessions
+                call(),  # Constructor: streamlit_session_bytes
                 call(),  # unittest_counter
                 call(),  # unittest_counter_labels
                 call(),  # unittest_gauge
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests ProcessScriptRunner functionality"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+from streamlit import config
+from streamlit.ProcessScriptRunner import ProcessScriptRunner
+from streamlit.Report import Report
+from streamlit.ReportQueue import ReportQueue
+from streamlit.ScriptRequestQueue import RerunData
+from streamlit.ScriptRequestQueue import ScriptRequest
+from streamlit.ScriptRequestQueue import ScriptRequestQueue
+from streamlit.ScriptRunner import ScriptRunnerEvent
+from streamlit.ScriptWorkerPool import ScriptWorkerPool
+from streamlit.ScriptWorkerPool import _drop_changed_local_modules
+from streamlit.ScriptWorkerPool import _get_multiprocessing_context
+from streamlit.ScriptWorkerPool import _module_mtimes
+from streamlit.proto.Widget_pb2 import WidgetStates
+
+
+class ProcessScriptRunnerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ScriptWorkerPool(1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        ScriptWorkerPool._singleton = None
+
+    def test_run_script(self):
+        """Tests that we can run a script to completion in a worker."""
+        scriptrunner = TestProcessScriptRunner('good_script.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        # Relay threads mustn't keep the server from exiting.
+        self.assertTrue(scriptrunner._thread.daemon)
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual([
+            ScriptRunnerEvent.SCRIPT_STARTED,
+            ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+            ScriptRunnerEvent.SHUTDOWN
+        ], scriptrunner.events)
+        self.assertEqual(['complete!'], scriptrunner.text_deltas())
+
+    def test_compile_error(self):
+        """Tests that compile errors are relayed from the worker."""
+        scriptrunner = TestProcessScriptRunner('compile_error.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual([
+            ScriptRunnerEvent.SCRIPT_STARTED,
+            ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+            ScriptRunnerEvent.SHUTDOWN
+        ], scriptrunner.events)
+        self.assertIsInstance(scriptrunner.exceptions[0], SyntaxError)
+
+    def test_stop_script(self):
+        """Tests that we can stop a script while it's running in a worker."""
+        scriptrunner = TestProcessScriptRunner('infinite_loop.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+
+        time.sleep(0.2)
+        scriptrunner.enqueue_stop()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual([
+            ScriptRunnerEvent.SCRIPT_STARTED,
+            ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+            ScriptRunnerEvent.SHUTDOWN
+        ], scriptrunner.events)
+        self.assertEqual(['loop_forever'], scriptrunner.text_deltas())
+
+    def test_widget_states(self):
+        """Tests that widget states make the round trip to the worker."""
+        states = WidgetStates()
+        widget = states.widgets.add()
+        widget.id = 'checkbox-checkbox'
+        widget.bool_value = True
+
+        scriptrunner = TestProcessScriptRunner(
+            'widgets_script.py', self.pool)
+        scriptrunner.enqueue_rerun(widget_state=states)
+        scriptrunner.start()
+
+        time.sleep(0.2)
+        scriptrunner.enqueue_shutdown()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual(
+            ['True', 'ahoy!', '0', 'False', 'loop_forever'],
+            scriptrunner.text_deltas())
+        self.assertTrue(scriptrunner.widget_states.widgets[0].bool_value)
+
+    def test_worker_exit(self):
+        """Tests that a worker that dies is reported and replaced."""
+        scriptrunner = TestProcessScriptRunner('exit_process.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual([
+            ScriptRunnerEvent.SCRIPT_STARTED,
+            ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+            ScriptRunnerEvent.SHUTDOWN
+        ], scriptrunner.events)
+        self.assertEqual(['exiting'], scriptrunner.text_deltas())
+
+        # The pool can still run scripts.
+        scriptrunner = TestProcessScriptRunner('good_script.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self.assertEqual(['complete!'], scriptrunner.text_deltas())
+
+    def test_modules_imported(self):
+        """Tests that the worker reports the local modules it imported."""
+        scriptrunner = TestProcessScriptRunner(
+            'imports_local_module.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self.assertEqual(['imported'], scriptrunner.text_deltas())
+        self.assertEqual(
+            _get_script_path('local_module.py'),
+            scriptrunner.modules.get('local_module'))
+
+    def test_clear_caches_of_active_worker(self):
+        """Tests that a checked-out worker's cache is cleared right away."""
+        scriptrunner = TestProcessScriptRunner('cached_value.py', self.pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+
+        def get_value():
+            # The rerun's delta replaces the first run's in the ReportQueue.
+            values = [
+                text for text in scriptrunner.text_deltas()
+                if text != 'loop_forever']
+            return values[0] if values else None
+
+        try:
+            _wait_for(lambda: get_value() is not None)
+            value = get_value()
+
+            self.pool.clear_caches()
+            scriptrunner.enqueue_rerun()
+            _wait_for(lambda: get_value() != value)
+        finally:
+            scriptrunner.enqueue_shutdown()
+            scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+
+    @unittest.skipIf(sys.platform == 'win32', 'Windows can\'t fork')
+    def test_workers_are_forked(self):
+        """Tests that workers are forked, even where spawn is the default."""
+        context = _get_multiprocessing_context()
+        if hasattr(context, 'get_start_method'):
+            self.assertEqual('fork', context.get_start_method())
+
+    def _assert_no_exceptions(self, scriptrunner):
+        self.assertEqual([], scriptrunner.thread_exceptions)
+
+
+class ScriptWorkerPoolTest(unittest.TestCase):
+    def tearDown(self):
+        ScriptWorkerPool.get_current().shutdown()
+        ScriptWorkerPool._singleton = None
+
+    def test_pre_import_modules(self):
+        """Tests that workers import the script's imports ahead of time."""
+        pool = ScriptWorkerPool(1, _get_script_path('pre_import.py'))
+
+        scriptrunner = TestProcessScriptRunner('pre_import.py', pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self.assertEqual(['True'], scriptrunner.text_deltas())
+
+    @unittest.skipIf(sys.platform == 'win32', 'Windows can\'t fork')
+    def test_workers_are_forked_by_zygote(self):
+        """Tests that workers are forked by the zygote, not the server."""
+        pool = ScriptWorkerPool(1)
+
+        scriptrunner = TestProcessScriptRunner('parent_pid.py', pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self.assertEqual([str(pool._zygote.pid)], scriptrunner.text_deltas())
+
+    def test_shutdown(self):
+        """Tests that shutting down the pool stops waiting for workers."""
+        pool = ScriptWorkerPool(1)
+        worker = pool.acquire()
+
+        # Waits, since the only worker is checked out.
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(pool.acquire()))
+        thread.start()
+
+        pool.shutdown()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([None], acquired)
+
+        # Workers released after the shutdown are stopped.
+        pool.release(worker)
+        self.assertFalse(worker.is_alive())
+
+        # So are the runners that were waiting for them.
+        scriptrunner = TestProcessScriptRunner('good_script.py', pool)
+        scriptrunner.enqueue_rerun()
+        scriptrunner.start()
+        scriptrunner.join()
+        self.assertEqual([ScriptRunnerEvent.SHUTDOWN], scriptrunner.events)
+
+
+class DropChangedLocalModulesTest(unittest.TestCase):
+    def test_drop_changed_local_modules(self):
+        """Tests that changed modules are unloaded, unless blacklisted."""
+        folder = tempfile.mkdtemp()
+        module = types.ModuleType('changed_module')
+        module.__file__ = os.path.join(folder, 'changed_module.py')
+        with open(module.__file__, 'w') as f:
+            f.write('')
+
+        prev_blacklist = config.get_option('server.folderWatchBlacklist')
+        try:
+            sys.modules['changed_module'] = module
+            _module_mtimes['changed_module'] = 0
+
+            config.set_option('server.folderWatchBlacklist', [folder])
+            _drop_changed_local_modules(folder)
+            self.assertIn('changed_module', sys.modules)
+
+            config.set_option('server.folderWatchBlacklist', [])
+            _drop_changed_local_modules(folder)
+            self.assertNotIn('changed_module', sys.modules)
+        finally:
+            config.set_option('server.folderWatchBlacklist', prev_blacklist)
+            sys.modules.pop('changed_module', None)
+            _module_mtimes.pop('changed_module', None)
+            os.remove(module.__file__)
+            os.rmdir(folder)
+
+
+def _get_script_path(script_name):
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'test_data', script_name)
+
+
+def _wait_for(condition, timeout=5):
+    """Wait until condition() is true, or fail after the timeout."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError('Timed out')
+        time.sleep(0.01)
+
+
+class TestProcessScriptRunner(ProcessScriptRunner):
+    """Subclasses ProcessScriptRunner to provide some testing features."""
+
+    def __init__(self, script_name, pool):
+        self.report_queue = ReportQueue()
+        self.script_request_queue = ScriptRequestQueue()
+
+        super(TestProcessScriptRunner, self).__init__(
+            report=Report(_get_script_path(script_name), []),
+            enqueue=self.report_queue.enqueue,
+            widget_states=WidgetStates(),
+            request_queue=self.script_request_queue,
+            pool=pool)
+
+        # Accumulates uncaught exceptions thrown by our relay thread.
+        self.thread_exceptions = []
+
+        # Accumulates all ScriptRunnerEvents emitted by us, and the
+        # exceptions that came with them.
+        self.events = []
+        self.exceptions = []
+        self.widget_states = None
+
+        def record_event(event, exception=None, widget_states=None):
+            self.events.append(event)
+            if exception is not None:
+                self.exceptions.append(exception)
+            if widget_states is not None:
+                self.widget_states = widget_states
+
+        self.on_event.connect(record_event, weak=False)
+
+        # The local modules the worker reported last.
+        self.modules = {}
+
+        def record_modules(modules):
+            self.modules = modules
+
+        self.on_modules_imported.connect(record_modules, weak=False)
+
+    def enqueue_rerun(self, argv=None, widget_state=None):
+        self.script_request_queue.enqueue(
+            ScriptRequest.RERUN,
+            RerunData(argv=argv, widget_state=widget_state))
+
+    def enqueue_stop(self):
+        self.script_request_queue.enqueue(ScriptRequest.STOP)
+
+    def enqueue_shutdown(self):
+        self.script_request_queue.enqueue(ScriptRequest.SHUTDOWN)
+
+    def _process_request_queue(self):
+        try:
+            super(TestProcessScriptRunner, self)._process_request_queue()
+        except BaseException as e:
+            self.thread_exceptions.append(e)
+
+    def join(self):
+        """Joins the relay thread, if it was started"""
+        if self._thread is not None:
+            self._thread.join()
+
+    def text_deltas(self):
+        """Returns the text deltas in our ReportQueue"""
+        return [
+            msg.delta.new_element.text.body
+            for msg in self.report_queue._queue
+            if msg.HasField('delta') and
+            msg.delta.new_element.HasField('text')
+        ]
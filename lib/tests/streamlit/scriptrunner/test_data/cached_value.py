@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A script for ProcessScriptRunnerTest that shows a cached value"""
+
+import random
+import time
+
+import streamlit as st
+
+
+@st.cache
+def get_value():
+    return random.random()
+
+
+st.text('%s' % get_value())
+
+element = st.empty()
+while True:
+    element.text('loop_forever')
+    time.sleep(0.01)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018-2019 Streamlit Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A script for ProcessScriptRunnerTest that checks if it was pre-imported"""
+
+import sys
+
+WAS_IMPORTED = 'tabnanny' in sys.modules
+
+import tabnanny
+import streamlit as st
+
+st.text('%s' % WAS_IMPORTED)
@@ -29,6 +29,7 @@ import numpy as np
 import pandas as pd
 
 from streamlit import __version__
+from streamlit.ForwardMsgCache import get_payload_key
 from streamlit.elements.Chart import Chart
 from streamlit.proto.Balloons_pb2 import Balloons
 from streamlit.proto.Text_pb2 import Text
@@ -516,6 +517,30 @@ class StreamlitAPITest(testutil.DeltaGeneratorTestCase):
         self.assertEqual(el.table.columns.plain_index.data.strings.data,
                          ['col1', 'col2'])
 
+    @patch('streamlit.elements.data_frame_proto._proto_cache', None)
+    def test_st_table_payload_key(self):
+        """Test that st.table and st.dataframe give the deltas of DataFrames
+        in the DataFrameProtoCache a payload key."""
+        df = pd.DataFrame({'a': np.arange(10000)})
+
+        with patch('streamlit.config.get_option',
+                   side_effect=testutil.build_mock_config_get_option({
+                       'global.maxDataFrameCacheSize': 100e6,
+                       'global.dataFrameWindowRows': 0,
+                   })):
+            st.table(df)
+            table_msg = self.get_message_from_queue()
+            st.dataframe(df)
+            data_frame_msg = self.get_message_from_queue()
+            st.table(df.iloc[:10])
+            small_msg = self.get_message_from_queue()
+
+        table_key = get_payload_key(table_msg)
+        self.assertEqual('table', table_key[0])
+        self.assertEqual(('data_frame', table_key[1]),
+                         get_payload_key(data_frame_msg))
+        self.assertIsNone(get_payload_key(small_msg))
+
     def test_st_text(self):
         """Test st.text."""
         dg = st.text('some text')
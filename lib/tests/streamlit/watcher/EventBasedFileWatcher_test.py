@@ -51,7 +51,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
         """Test that when a file is modified, the callback is called."""
         cb = mock.Mock()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = EventBasedFileWatcher.EventBasedFileWatcher('/this/is/my/file.py', cb)
@@ -63,7 +63,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         cb.assert_not_called()
 
-        self.os.stat = lambda x: FakeStat(102)
+        self.mock_util.get_file_stat_key = lambda x: 102
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
         ev = events.FileSystemEvent('/this/is/my/file.py')
@@ -74,11 +74,11 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         ro.close()
 
-    def test_callback_not_called_if_same_mtime(self):
-        """Test that we ignore files with same mtime."""
+    def test_callback_not_called_if_same_stat(self):
+        """Test that we ignore files with same size, mtime and inode."""
         cb = mock.Mock()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = EventBasedFileWatcher.EventBasedFileWatcher('/this/is/my/file.py', cb)
@@ -90,7 +90,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         cb.assert_not_called()
 
-        # self.os.stat = lambda x: FakeStat(102)  # Same mtime!
+        # self.mock_util.get_file_stat_key = lambda x: 102  # Same stat!
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
         ev = events.FileSystemEvent('/this/is/my/file.py')
@@ -106,7 +106,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
         """Test that we ignore files with same md5."""
         cb = mock.Mock()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = EventBasedFileWatcher.EventBasedFileWatcher('/this/is/my/file.py', cb)
@@ -118,7 +118,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         cb.assert_not_called()
 
-        self.os.stat = lambda x: FakeStat(102)
+        self.mock_util.get_file_stat_key = lambda x: 102
         # Same MD5:
         # self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
@@ -135,7 +135,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
         """Test that we ignore created files."""
         cb = mock.Mock()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = EventBasedFileWatcher.EventBasedFileWatcher('/this/is/my/file.py', cb)
@@ -147,7 +147,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         cb.assert_not_called()
 
-        self.os.stat = lambda x: FakeStat(102)
+        self.mock_util.get_file_stat_key = lambda x: 102
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
         ev = events.FileSystemEvent('/this/is/my/file.py')
@@ -166,7 +166,7 @@ class EventBasedFileWatcherTest(unittest.TestCase):
 
         mod_count = [0]
         def modify_mock_file():
-            self.os.stat = lambda x: FakeStat(mod_count[0])
+            self.mock_util.get_file_stat_key = lambda x: mod_count[0]
             self.mock_util.calc_md5_with_blocking_retries = \
                 lambda x: '%d' % mod_count[0]
 
@@ -215,9 +215,3 @@ class EventBasedFileWatcherTest(unittest.TestCase):
         assert 1 == cb1.call_count
         assert 2 == cb2.call_count
 
-
-class FakeStat(object):
-    """Emulates the output of os.stat()."""
-    def __init__(self, mtime):
-        self.st_mtime = mtime
-
@@ -19,6 +19,7 @@ import os
 import sys
 import unittest
 
+from mock import call
 from mock import patch
 
 from streamlit import config
@@ -195,6 +196,129 @@ class LocalSourcesWatcherTest(unittest.TestCase):
         # Reset the config object.
         config.set_option('server.folderWatchBlacklist', prev_blacklist)
 
+    @patch('streamlit.watcher.LocalSourcesWatcher.FileWatcher')
+    def test_only_new_modules_are_classified(self, fob):
+        lso = LocalSourcesWatcher.LocalSourcesWatcher(REPORT, CALLBACK)
+        lso.update_watched_modules()
+
+        with patch.object(
+                lso, '_get_local_filepath',
+                wraps=lso._get_local_filepath) as get_local_filepath:
+            sys.modules['DUMMY_MODULE_1'] = DUMMY_MODULE_1
+            lso.update_watched_modules()
+
+            get_local_filepath.assert_called_once_with(DUMMY_MODULE_1)
+
+            # A module that was replaced by a different object is looked at
+            # again.
+            get_local_filepath.reset_mock()
+            sys.modules['DUMMY_MODULE_1'] = DUMMY_MODULE_2
+            sys.modules['DUMMY_MODULE_2'] = DUMMY_MODULE_2
+            lso.update_watched_modules()
+
+            self.assertEqual(
+                [call(DUMMY_MODULE_2), call(DUMMY_MODULE_2)],
+                get_local_filepath.call_args_list)
+
+        # DUMMY_MODULE_1 is no longer watched.
+        fob.return_value.close.assert_called_once()
+
+    @patch('streamlit.watcher.LocalSourcesWatcher.FileWatcher')
+    def test_module_swapped_for_another(self, fob):
+        """Tests that a scan isn't skipped when the number of modules stays
+        the same but the modules don't."""
+        sys.modules['DUMMY_MODULE_1'] = DUMMY_MODULE_1
+        lso = LocalSourcesWatcher.LocalSourcesWatcher(REPORT, CALLBACK)
+        lso.update_watched_modules()
+
+        fob.reset_mock()
+        del sys.modules['DUMMY_MODULE_1']
+        sys.modules['DUMMY_MODULE_2'] = DUMMY_MODULE_2
+        lso.update_watched_modules()
+
+        fob.assert_called_once()
+        self.assertEqual(fob.call_args.args[0], DUMMY_MODULE_2_FILE)
+        fob.return_value.close.assert_called_once()
+
+    @patch('streamlit.watcher.LocalSourcesWatcher.FileWatcher')
+    def test_worker_modules(self, fob):
+        """Tests that modules imported in script workers are watched."""
+        lso = LocalSourcesWatcher.LocalSourcesWatcher(REPORT, CALLBACK)
+
+        fob.reset_mock()
+        lso.add_worker_modules({
+            'DUMMY_MODULE_1': DUMMY_MODULE_1_FILE,
+            'os': os.__file__,
+        })
+
+        # Modules outside the script's folder aren't watched.
+        fob.assert_called_once()
+        self.assertEqual(fob.call_args.args[0], DUMMY_MODULE_1_FILE)
+
+        # They aren't in sys.modules, but scans keep watching them.
+        fob.reset_mock()
+        sys.modules['DUMMY_MODULE_2'] = DUMMY_MODULE_2
+        lso.update_watched_modules()
+
+        fob.return_value.close.assert_not_called()
+        self.assertIn(DUMMY_MODULE_1_FILE, lso._watched_modules)
+
+    @patch('streamlit.watcher.LocalSourcesWatcher.FileWatcher')
+    def test_worker_modules_blacklist(self, fob):
+        prev_blacklist = config.get_option('server.folderWatchBlacklist')
+        config.set_option(
+                'server.folderWatchBlacklist',
+                [os.path.dirname(DUMMY_MODULE_1.__file__)])
+
+        try:
+            lso = LocalSourcesWatcher.LocalSourcesWatcher(REPORT, CALLBACK)
+
+            fob.reset_mock()
+            lso.add_worker_modules({'DUMMY_MODULE_1': DUMMY_MODULE_1_FILE})
+
+            fob.assert_not_called()
+        finally:
+            config.set_option('server.folderWatchBlacklist', prev_blacklist)
+
+
+class SubscribeTest(unittest.TestCase):
+    def tearDown(self):
+        LocalSourcesWatcher._shared_watchers.clear()
+
+    @patch('streamlit.watcher.LocalSourcesWatcher.FileWatcher')
+    def test_shared_watcher(self, fob):
+        """Tests that sessions of the same script share one watcher."""
+        calls = []
+        sub1 = LocalSourcesWatcher.subscribe(
+            REPORT, lambda: calls.append(1))
+        sub2 = LocalSourcesWatcher.subscribe(
+            REPORT, lambda: calls.append(2))
+
+        # The script is only watched once.
+        fob.assert_called_once()
+        self.assertEqual(1, len(LocalSourcesWatcher._shared_watchers))
+
+        watcher = LocalSourcesWatcher._shared_watchers[REPORT_PATH]
+        watcher.on_file_changed(REPORT_PATH)
+        self.assertEqual([1, 2], calls)
+
+        # Only the first update scans sys.modules.
+        fob.reset_mock()
+        sub1.update_watched_modules()
+        fob.reset_mock()
+        sub2.update_watched_modules()
+        fob.assert_not_called()
+
+        # Unsubscribed sessions aren't notified.
+        sub1.close()
+        watcher.on_file_changed(REPORT_PATH)
+        self.assertEqual([1, 2, 2], calls)
+
+        # The watcher closes with its last subscriber.
+        sub2.close()
+        self.assertEqual({}, LocalSourcesWatcher._shared_watchers)
+        fob.return_value.close.assert_called()
+
 
 def sort_args_list(args_list):
     return sorted(args_list, key=lambda args: args[0])
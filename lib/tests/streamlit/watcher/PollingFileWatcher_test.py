@@ -19,6 +19,7 @@ from streamlit.compatibility import setup_2_3_shims
 setup_2_3_shims(globals())
 
 import mock
+import threading
 import time
 import unittest
 
@@ -35,14 +36,12 @@ class PollingFileWatcherTest(unittest.TestCase):
         super(PollingFileWatcherTest, self).setUp()
         self.util_patcher = mock.patch(
             'streamlit.watcher.PollingFileWatcher.util')
-        self.os_patcher = mock.patch('streamlit.watcher.PollingFileWatcher.os')
         self.mock_util = self.util_patcher.start()
-        self.os = self.os_patcher.start()
 
     def tearDown(self):
         super(PollingFileWatcherTest, self).tearDown()
+        PollingFileWatcher.PollingFileWatcher.close_all()
         self.util_patcher.stop()
-        self.os_patcher.stop()
 
     def test_file_watch_and_callback(self):
         """Test that when a file is modified, the callback is called."""
@@ -51,7 +50,7 @@ class PollingFileWatcherTest(unittest.TestCase):
         def cb(x):
             cb_marker()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = PollingFileWatcher.PollingFileWatcher('/this/is/my/file.py', cb)
@@ -62,7 +61,7 @@ class PollingFileWatcherTest(unittest.TestCase):
             pass
         cb_marker.assert_not_called()
 
-        self.os.stat = lambda x: FakeStat(102)
+        self.mock_util.get_file_stat_key = lambda x: 102
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
         time.sleep(4 * PollingFileWatcher._POLLING_PERIOD_SECS)
@@ -70,14 +69,14 @@ class PollingFileWatcherTest(unittest.TestCase):
 
         ro.close()
 
-    def test_callback_not_called_if_same_mtime(self):
-        """Test that we ignore files with same mtime."""
+    def test_callback_not_called_if_same_stat(self):
+        """Test that we ignore files with same size, mtime and inode."""
         cb_marker = mock.Mock()
 
         def cb(x):
             cb_marker()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = PollingFileWatcher.PollingFileWatcher('/this/is/my/file.py', cb)
@@ -88,7 +87,7 @@ class PollingFileWatcherTest(unittest.TestCase):
             pass
         cb_marker.assert_not_called()
 
-        # self.os.stat = lambda x: FakeStat(102)  # Same mtime!
+        # self.mock_util.get_file_stat_key = lambda x: 102  # Same stat!
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
         # This is the test:
@@ -107,7 +106,7 @@ class PollingFileWatcherTest(unittest.TestCase):
         def cb(x):
             cb_marker()
 
-        self.os.stat = lambda x: FakeStat(101)
+        self.mock_util.get_file_stat_key = lambda x: 101
         self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
 
         ro = PollingFileWatcher.PollingFileWatcher('/this/is/my/file.py', cb)
@@ -118,7 +117,7 @@ class PollingFileWatcherTest(unittest.TestCase):
             pass
         cb_marker.assert_not_called()
 
-        self.os.stat = lambda x: FakeStat(102)
+        self.mock_util.get_file_stat_key = lambda x: 102
         # Same MD5:
         # self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
 
@@ -137,7 +136,7 @@ class PollingFileWatcherTest(unittest.TestCase):
 
         mod_count = [0]
         def modify_mock_file():
-            self.os.stat = lambda x: FakeStat(mod_count[0])
+            self.mock_util.get_file_stat_key = lambda x: mod_count[0]
             self.mock_util.calc_md5_with_blocking_retries = \
                 lambda x: '%d' % mod_count[0]
 
@@ -189,10 +188,102 @@ class PollingFileWatcherTest(unittest.TestCase):
         assert 1 == cb1.call_count
         assert 2 == cb2.call_count
 
+    def test_single_thread_many_files(self):
+        """Test that all files are polled by one thread, and only the
+        changed ones are hashed."""
+        num_threads = threading.active_count()
+        stat_keys = {}
+        md5_calls = []
 
-class FakeStat(object):
-    """Emulates the output of os.stat()."""
-    def __init__(self, mtime):
-        self.st_mtime = mtime
+        def calc_md5(path):
+            md5_calls.append(path)
+            return stat_keys[path]
 
+        self.mock_util.get_file_stat_key = lambda x: stat_keys[x]
+        self.mock_util.calc_md5_with_blocking_retries = calc_md5
 
+        cb = mock.Mock()
+        watchers = []
+        for i in range(100):
+            path = '/this/is/file%d.py' % i
+            stat_keys[path] = 1
+            watchers.append(PollingFileWatcher.PollingFileWatcher(path, cb))
+
+        self.assertEqual(num_threads + 1, threading.active_count())
+
+        del md5_calls[:]
+        stat_keys['/this/is/file7.py'] = 2
+        time.sleep(4 * PollingFileWatcher._POLLING_PERIOD_SECS)
+
+        self.assertEqual(['/this/is/file7.py'], md5_calls)
+        cb.assert_called_once_with('/this/is/file7.py')
+
+        for watcher in watchers:
+            watcher.close()
+
+    def test_stat_error(self):
+        """Test that a file that can't be stat'd is checked again later."""
+        cb = mock.Mock()
+
+        self.mock_util.get_file_stat_key = lambda x: 101
+        self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
+
+        ro = PollingFileWatcher.PollingFileWatcher('/this/is/my/file.py', cb)
+
+        def raise_error(x):
+            raise OSError('File is being replaced')
+
+        self.mock_util.get_file_stat_key = raise_error
+        time.sleep(2 * PollingFileWatcher._POLLING_PERIOD_SECS)
+
+        self.mock_util.get_file_stat_key = lambda x: 102
+        self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
+        time.sleep(4 * PollingFileWatcher._POLLING_PERIOD_SECS)
+
+        cb.assert_called_once()
+
+        ro.close()
+
+    def test_md5_error(self):
+        """Test that a file that can't be hashed is hashed again later,
+        even though its stat didn't change again."""
+        cb = mock.Mock()
+
+        self.mock_util.get_file_stat_key = lambda x: 101
+        self.mock_util.calc_md5_with_blocking_retries = lambda x: '1'
+
+        ro = PollingFileWatcher.PollingFileWatcher('/this/is/my/file.py', cb)
+
+        def raise_error(x):
+            raise IOError('File is being written')
+
+        self.mock_util.get_file_stat_key = lambda x: 102
+        self.mock_util.calc_md5_with_blocking_retries = raise_error
+        time.sleep(2 * PollingFileWatcher._POLLING_PERIOD_SECS)
+
+        self.mock_util.calc_md5_with_blocking_retries = lambda x: '2'
+        time.sleep(4 * PollingFileWatcher._POLLING_PERIOD_SECS)
+
+        cb.assert_called_once()
+
+        ro.close()
+
+    def test_watch_file_hashes_without_lock(self):
+        """Test that watching a new file doesn't hold the lock while it's
+        hashed."""
+        poller = PollingFileWatcher._MultiFilePoller.get_singleton()
+        lock_was_held = []
+
+        def calc_md5(path):
+            lock_was_held.append(poller._lock.locked())
+            return '1'
+
+        self.mock_util.get_file_stat_key = lambda x: 101
+        self.mock_util.calc_md5_with_blocking_retries = calc_md5
+
+        ro = PollingFileWatcher.PollingFileWatcher(
+            '/this/is/my/file.py', mock.Mock())
+
+        self.assertEqual([False], lock_was_held)
+
+        ro.close()
@@ -34,3 +34,12 @@ class UtilTest(unittest.TestCase):
                    mock_open(read_data=b'hello')) as m:
             md5 = util.calc_md5_with_blocking_retries('foo')
             m.assert_called_once_with('foo', 'rb')
+
+    def test_file_stat_key(self):
+        with patch('streamlit.watcher.util.os.stat') as stat:
+            stat.return_value.st_size = 5
+            stat.return_value.st_mtime_ns = 1000
+            stat.return_value.st_ino = 42
+
+            self.assertEqual((5, 1000, 42), util.get_file_stat_key('foo'))
+            stat.assert_called_once_with('foo')
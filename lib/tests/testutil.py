@@ -57,7 +57,7 @@ class DeltaGeneratorTestCase(unittest.TestCase):
             setattr(threading.current_thread(),
                     REPORT_CONTEXT_ATTR_NAME,
                     ReportContext(main_dg=main_dg, sidebar_dg=sidebar_dg,
-                                  widgets=Widgets()))
+                                  widgets=Widgets(), data_frame_store=None))
 
     def tearDown(self):
         self.report_queue._clear()